@@ -0,0 +1,274 @@
+"""
+Columnar analytics snapshot of the case tables
+Copies the analytics tables out of SQLite into Parquet files and answers the
+dashboards' aggregate queries through DuckDB, so heavy group-bys neither load
+whole tables into pandas nor hold read locks against case entry.
+
+Each refresh appends one Parquet part per table holding the rows added since
+the last id watermark and the rows changed since the last updated_at
+watermark. Readers keep the newest copy of every id. Once a table collects
+COMPACT_AFTER_PARTS parts it is rewritten in full, which also drops deleted
+rows. Without pyarrow and duckdb installed, analytics_query runs straight
+against SQLite instead.
+
+Refresh by hand with: python analytics_snapshot.py [--full]
+"""
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+
+from arrow_types import arrow_type, coerce_value
+from database import get_db_connection
+from migrations import file_lock
+
+try:
+    import duckdb
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    SNAPSHOT_AVAILABLE = True
+except ImportError:
+    SNAPSHOT_AVAILABLE = False
+
+SNAPSHOT_DIR = "analytics_snapshot"
+WATERMARK_FILE = "watermarks.json"
+
+# Snapshot tables and the column that moves when a row changes (None = append-only)
+SNAPSHOT_TABLES = {
+    "cases": "updated_at",
+    "cases_simplified": "updated_at",
+    "case_allocations": "updated_at",
+    "internal_fraud_cases": "updated_at",
+    "regulatory_reports": "updated_at",
+    "audit_logs": None,
+}
+
+EXPORT_CHUNK_ROWS = 20000
+COMPACT_AFTER_PARTS = 50
+SNAPSHOT_MAX_AGE_SECONDS = 300
+
+_refresh_lock = threading.Lock()
+_background_refresh = None
+
+def _table_dir(table):
+    return os.path.join(SNAPSHOT_DIR, table)
+
+def _load_watermarks():
+    """Read the per-table watermarks, or {} before the first refresh"""
+    try:
+        with open(os.path.join(SNAPSHOT_DIR, WATERMARK_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_watermarks(watermarks):
+    """Write the watermarks atomically"""
+    path = os.path.join(SNAPSHOT_DIR, WATERMARK_FILE)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(watermarks, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+def _arrow_schema(cursor, table):
+    """Map the table's declared SQLite column types onto a fixed Arrow schema"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    fields = [pa.field(row[1], arrow_type(row[2])) for row in cursor.fetchall()]
+    fields.append(pa.field("_snapshot_version", pa.int64()))
+    return pa.schema(fields)
+
+def _write_part(directory, schema, batches, version):
+    """Stream row batches into one new Parquet part; returns the row count"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{version}-{uuid.uuid4().hex[:8]}.parquet")
+    names = schema.names
+    written = 0
+
+    # Readers glob *.parquet, so they never see a half-written part
+    writer = pq.ParquetWriter(f"{path}.tmp", schema)
+    try:
+        for batch in batches:
+            columns = {name: [] for name in names}
+            for row in batch:
+                for name in names[:-1]:
+                    columns[name].append(coerce_value(row[name], schema.field(name).type))
+                columns["_snapshot_version"].append(version)
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            written += len(batch)
+    finally:
+        writer.close()
+
+    if written or not any(name.endswith(".parquet") for name in os.listdir(directory)):
+        os.replace(f"{path}.tmp", path)
+    else:
+        os.remove(f"{path}.tmp")
+    return written
+
+def _refresh_table(cursor, table, updated_column, state, full):
+    """Export one table's new and changed rows; returns (rows written, new state)"""
+    schema = _arrow_schema(cursor, table)
+    version = time.time_ns()
+    last_id = state.get("last_id", 0)
+    watermark = state.get("updated_at")
+    boundary_ids = set(state.get("boundary_ids", []))
+    tracker = {"last_id": last_id, "updated_at": watermark, "boundary_ids": set(boundary_ids)}
+
+    def track(rows, skip_boundary):
+        kept = []
+        for row in rows:
+            updated = row[updated_column] if updated_column else None
+            # Rows stamped in the watermark second may have been exported already
+            if skip_boundary and updated == watermark and row["id"] in boundary_ids:
+                continue
+            kept.append(row)
+            tracker["last_id"] = max(tracker["last_id"], row["id"])
+            if updated is None:
+                continue
+            if tracker["updated_at"] is None or updated > tracker["updated_at"]:
+                tracker["updated_at"] = updated
+                tracker["boundary_ids"] = {row["id"]}
+            elif updated == tracker["updated_at"]:
+                tracker["boundary_ids"].add(row["id"])
+        return kept
+
+    def batches(sql, params, skip_boundary=False):
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(EXPORT_CHUNK_ROWS)
+            if not rows:
+                return
+            kept = track(rows, skip_boundary)
+            if kept:
+                yield kept
+
+    if full:
+        tracker = {"last_id": 0, "updated_at": None, "boundary_ids": set()}
+        rebuild_dir = f"{_table_dir(table)}.rebuild"
+        shutil.rmtree(rebuild_dir, ignore_errors=True)
+        written = _write_part(rebuild_dir, schema, batches(f"SELECT * FROM {table} ORDER BY id", ()), version)
+
+        old_dir = f"{_table_dir(table)}.old"
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.isdir(_table_dir(table)):
+            os.rename(_table_dir(table), old_dir)
+        os.rename(rebuild_dir, _table_dir(table))
+        shutil.rmtree(old_dir, ignore_errors=True)
+        parts = 1
+    else:
+        def incremental_batches():
+            yield from batches(f"SELECT * FROM {table} WHERE id > ? ORDER BY id", (last_id,))
+            if updated_column and watermark is not None:
+                yield from batches(
+                    f"SELECT * FROM {table} WHERE {updated_column} >= ? AND id <= ?",
+                    (watermark, last_id),
+                    skip_boundary=True
+                )
+
+        written = _write_part(_table_dir(table), schema, incremental_batches(), version)
+        parts = state.get("parts", 0) + (1 if written else 0)
+
+    return written, {
+        "last_id": tracker["last_id"],
+        "updated_at": tracker["updated_at"],
+        "boundary_ids": sorted(tracker["boundary_ids"]),
+        "parts": parts,
+        "refreshed_at": time.time(),
+    }
+
+def refresh_snapshot(full=False):
+    """Bring every snapshot table up to date; returns {table: rows written}"""
+    if not SNAPSHOT_AVAILABLE:
+        raise RuntimeError("The analytics snapshot needs pyarrow and duckdb installed")
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    # The thread lock serializes this process; the file lock serializes every process sharing SNAPSHOT_DIR
+    with _refresh_lock, file_lock(os.path.join(SNAPSHOT_DIR, ".refresh.lock")):
+        watermarks = _load_watermarks()
+        written = {}
+
+        with get_db_connection() as conn:
+            # One read transaction: a consistent WAL snapshot that never blocks writers
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            cursor = conn.cursor()
+
+            for table, updated_column in SNAPSHOT_TABLES.items():
+                state = watermarks.get(table, {})
+                table_full = (
+                    full or not state or not os.path.isdir(_table_dir(table))
+                    or state.get("parts", 0) >= COMPACT_AFTER_PARTS
+                )
+                written[table], watermarks[table] = _refresh_table(cursor, table, updated_column, state, table_full)
+
+        _save_watermarks(watermarks)
+        return written
+
+def snapshot_age():
+    """Seconds since the stalest table was refreshed (None before the first refresh)"""
+    watermarks = _load_watermarks()
+    if not watermarks or any(table not in watermarks for table in SNAPSHOT_TABLES):
+        return None
+    return time.time() - min(state["refreshed_at"] for state in watermarks.values())
+
+def ensure_snapshot_fresh(max_age=SNAPSHOT_MAX_AGE_SECONDS):
+    """Refresh a stale snapshot in the background; build a missing one now"""
+    global _background_refresh
+
+    age = snapshot_age()
+    if age is None:
+        refresh_snapshot()
+    elif age > max_age and not (_background_refresh and _background_refresh.is_alive()):
+        _background_refresh = threading.Thread(target=refresh_snapshot, name="analytics-snapshot", daemon=True)
+        _background_refresh.start()
+
+def _snapshot_connection():
+    """DuckDB connection with one deduplicated view per snapshot table"""
+    con = duckdb.connect()
+    for table in SNAPSHOT_TABLES:
+        pattern = os.path.join(_table_dir(table), "*.parquet").replace("'", "''")
+        con.execute(f'''
+            CREATE VIEW {table} AS
+            SELECT * EXCLUDE (_snapshot_version, _snapshot_rank) FROM (
+                SELECT *, row_number() OVER (PARTITION BY id ORDER BY _snapshot_version DESC) AS _snapshot_rank
+                FROM read_parquet('{pattern}', union_by_name = true)
+            ) WHERE _snapshot_rank = 1
+        ''')
+    return con
+
+def analytics_query(sql, params=()):
+    """Run a read-only aggregate query and return a list of dicts
+
+    Uses the snapshot when pyarrow and duckdb are available, otherwise SQLite.
+    Stick to SQL both engines understand (substr rather than strftime, etc.).
+    """
+    if SNAPSHOT_AVAILABLE:
+        try:
+            ensure_snapshot_fresh()
+            con = _snapshot_connection()
+            try:
+                result = con.execute(sql, list(params))
+                columns = [description[0] for description in result.description]
+                return [dict(zip(columns, row)) for row in result.fetchall()]
+            finally:
+                con.close()
+        except Exception as e:
+            print(f"Analytics snapshot unavailable, querying SQLite: {e}")
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def main(argv):
+    from database import init_database
+
+    init_database()
+    written = refresh_snapshot(full="--full" in argv)
+    for table, rows in written.items():
+        print(f"{table}: {rows} rows exported")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,6 +1,7 @@
 import streamlit as st
 from auth import authenticate_user, is_authenticated, logout_user, check_session_timeout, update_last_activity
 from database import init_database, create_account_request
+from face_worker import start_worker_in_background
 from email_service import send_account_request_notification
 import pages.dashboard as dashboard
 import pages.case_entry as case_entry
@@ -27,6 +28,9 @@ import pages.advanced_risk_assessment as advanced_risk_assessment
 # Initialize database
 init_database()
 
+# Launch the face worker now so its models are warm before the first face match
+start_worker_in_background()
+
 # Page configuration
 st.set_page_config(page_title="Tathya - Case Management System",
                    page_icon="🔎",
@@ -0,0 +1,30 @@
+"""
+SQLite to Arrow column types
+Shared by the Parquet writers (data exports and the analytics snapshot) so
+both map declared SQLite types, and values that don't fit them, the same way.
+"""
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+def arrow_type(declared):
+    """Arrow type for a declared SQLite column type, by SQLite's affinity rules"""
+    declared = (declared or "").upper()
+    if "INT" in declared:
+        return pa.int64()
+    if any(name in declared for name in ("REAL", "FLOA", "DOUB", "NUMERIC", "DECIMAL")):
+        return pa.float64()
+    return pa.string()
+
+def coerce_value(value, column_type):
+    """Fit one SQLite value into its Arrow column type (bad numbers become null)"""
+    if value is None:
+        return None
+    if pa.types.is_string(column_type):
+        return value if isinstance(value, str) else str(value)
+    try:
+        return int(value) if pa.types.is_integer(column_type) else float(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,310 @@
+"""
+Cold-storage archive for closed cases and aged audit logs
+Closed cases past ARCHIVE_AFTER_DAYS move, with their child rows, out of the
+hot case_management.db into one SQLite file per year under ARCHIVE_DIR, and
+audit entries past AUDIT_ARCHIVE_AFTER_DAYS follow them. The hot database then
+only holds working data, which keeps its indexes shallow, its page cache warm
+and VACUUM quick.
+
+Archive files are ATTACHed to the reading connection on demand, so lookups
+that miss the hot tables (get_case_by_id, get_audit_logs, search_cases) fall
+through to the archives with the same SQL.
+
+Archive by hand with: python case_archive.py [--days N] [--audit-days N]
+"""
+import os
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+
+from database import _open_connection, flush_audit_log, init_database
+
+ARCHIVE_DIR = "archive"
+ARCHIVE_FILE_PATTERN = re.compile(r"^case_archive_(\d{4})\.db$")
+
+ARCHIVE_AFTER_DAYS = 365
+AUDIT_ARCHIVE_AFTER_DAYS = 730
+ARCHIVE_BATCH_SIZE = 500
+
+ARCHIVED_STATUSES = ("Closed",)
+
+# Case tables and the column that dates a case's closure
+ARCHIVE_ROOT_TABLES = {
+    "cases": "COALESCE(closed_at, updated_at, created_at)",
+    "cases_simplified": "COALESCE(updated_at, created_at)",
+}
+
+# Rows keyed by case_id that leave with their case
+ARCHIVE_CHILD_TABLES = (
+    "case_comments", "case_documents", "documents", "case_actions", "case_assignments",
+    "case_allocations", "case_stage_data", "case_events", "investigation_details",
+    "primary_reviews", "agency_responses", "adjudication_decisions", "regulatory_reports",
+    "stakeholder_actions", "interaction_requests",
+)
+
+def archive_path(year):
+    return os.path.join(ARCHIVE_DIR, f"case_archive_{year}.db")
+
+def archive_years():
+    """Years that have an archive file, newest first"""
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    years = [match.group(1) for match in map(ARCHIVE_FILE_PATTERN.match, os.listdir(ARCHIVE_DIR)) if match]
+    return sorted(years, reverse=True)
+
+def _attached_schemas(conn):
+    return {row[1] for row in conn.execute("PRAGMA database_list")}
+
+def attach_archives(conn):
+    """Attach every archive file to conn, returning their schema names newest first
+
+    ATTACH is not allowed inside a transaction, so a connection that is
+    mid-write only sees the archives it had attached already.
+    """
+    attached = _attached_schemas(conn)
+    schemas = []
+    for year in archive_years():
+        schema = f"archive_{year}"
+        if schema not in attached:
+            if conn.in_transaction:
+                continue
+            try:
+                conn.execute(f"ATTACH DATABASE ? AS {schema}", (archive_path(year),))
+            except Exception as e:
+                # SQLite caps attached databases per connection (10 by default)
+                print(f"Error attaching archive {year}: {e}")
+                break
+        schemas.append(schema)
+    return schemas
+
+def _table_columns(conn, schema, table):
+    return [row[1] for row in conn.execute(f'PRAGMA "{schema}".table_info("{table}")')]
+
+def archive_lookup(conn, table, where="1 = 1", params=(), extra_columns=(), order_by=None, limit=None):
+    """Run one SELECT against table in every attached archive
+
+    The query reads "FROM <archive>.<table> c WHERE <where>" per archive, glued
+    with UNION ALL. Each part selects the hot table's columns in the hot
+    order, NULL for any an older archive lacks, then extra_columns; order_by
+    may only name result columns. Returns the executed cursor, or None when no
+    archive holds the table.
+    """
+    hot_columns = _table_columns(conn, "main", table)
+    if not hot_columns:
+        return None
+    parts = []
+    for schema in attach_archives(conn):
+        archive_columns = set(_table_columns(conn, schema, table))
+        if not archive_columns:
+            continue
+        # Archives only gain a new hot column the next time their year is written
+        select = [f'c."{column}"' if column in archive_columns else f'NULL AS "{column}"' for column in hot_columns]
+        parts.append(f"SELECT {', '.join(select + list(extra_columns))} FROM {schema}.{table} c WHERE {where}")
+    if not parts:
+        return None
+
+    query = " UNION ALL ".join(parts)
+    all_params = list(params) * len(parts)
+    if order_by:
+        query += f" ORDER BY {order_by}"
+    if limit:
+        query += " LIMIT ?"
+        all_params.append(limit)
+    return conn.execute(query, all_params)
+
+def _ensure_archive_table(conn, schema, table):
+    """Create table in the archive from the hot schema, adding any newer columns
+
+    Returns the columns both copies share, or [] when the hot table is missing.
+    """
+    row = conn.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    if row is None:
+        return []
+
+    hot_columns = conn.execute(f'PRAGMA main.table_info("{table}")').fetchall()
+    archive_columns = _table_columns(conn, schema, table)
+    if not archive_columns:
+        create_sql = re.sub(r"^CREATE TABLE\s+\"?\w+\"?", f"CREATE TABLE {schema}.{table}", row[0], count=1)
+        conn.execute(create_sql)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_{table}_archive_case ON {table} (case_id)")
+        if table == "audit_logs":
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_audit_logs_archive_performed ON audit_logs (performed_at)")
+        return [column[1] for column in hot_columns]
+
+    for column in hot_columns:
+        if column[1] not in archive_columns:
+            conn.execute(f'ALTER TABLE {schema}.{table} ADD COLUMN "{column[1]}" {column[2]}')
+    return [column[1] for column in hot_columns]
+
+def _copy_rows(conn, schema, table, where, params=()):
+    """Copy the matching hot rows of table into the archive (re-copies replace)"""
+    columns = _ensure_archive_table(conn, schema, table)
+    if not columns:
+        return 0
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    cursor = conn.execute(
+        f"INSERT OR REPLACE INTO {schema}.{table} ({column_list}) SELECT {column_list} FROM main.{table} WHERE {where}",
+        params
+    )
+    return cursor.rowcount
+
+def _cutoff(days):
+    return (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+def _closed_case_candidates(conn, cutoff, limit):
+    """(case_id, year) of closed cases past the cutoff in every case table they appear in"""
+    statuses = ", ".join("?" * len(ARCHIVED_STATUSES))
+    parts = []
+    params = []
+    for table, closed_at in ARCHIVE_ROOT_TABLES.items():
+        # A case still open (or recent) in another case table keeps all its rows hot
+        blockers = " ".join(
+            f'''AND NOT EXISTS (
+                SELECT 1 FROM {other} o WHERE o.case_id = c.case_id
+                AND NOT (o.status IN ({statuses}) AND {other_closed_at} < ?)
+            )'''
+            for other, other_closed_at in ARCHIVE_ROOT_TABLES.items() if other != table
+        )
+        parts.append(f'''
+            SELECT c.case_id, substr(COALESCE(c.created_at, {closed_at}), 1, 4) AS year FROM {table} c
+            WHERE c.status IN ({statuses}) AND {closed_at} < ? {blockers}
+        ''')
+        params.extend(ARCHIVED_STATUSES)
+        params.append(cutoff)
+        for other in ARCHIVE_ROOT_TABLES:
+            if other != table:
+                params.extend(ARCHIVED_STATUSES)
+                params.append(cutoff)
+
+    query = f"SELECT case_id, MIN(year) FROM ({' UNION ALL '.join(parts)}) GROUP BY case_id LIMIT ?"
+    params.append(limit)
+    return conn.execute(query, params).fetchall()
+
+def _attach_for_write(conn, year):
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    schema = f"archive_{year}"
+    if schema not in _attached_schemas(conn):
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (archive_path(year),))
+    return schema
+
+def archive_closed_cases(older_than_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE):
+    """Move closed cases older than older_than_days, with their child rows, to the archives
+
+    Cases are filed by the year they were opened. Each batch copies into one
+    archive and deletes from the hot tables in a single transaction; the hot
+    delete triggers keep the search index, rollups and workflow projections in
+    step, and the face index is pruned afterwards. Returns the number of cases
+    archived.
+    """
+    cutoff = _cutoff(older_than_days)
+    conn = _open_connection()
+    archived = 0
+    try:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (case_id TEXT PRIMARY KEY)")
+        conn.commit()
+        while True:
+            candidates = _closed_case_candidates(conn, cutoff, batch_size)
+            if not candidates:
+                break
+            year = max(row[1] or "0000" for row in candidates)
+            batch = [row[0] for row in candidates if (row[1] or "0000") == year]
+            schema = _attach_for_write(conn, year)
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM temp.archive_batch")
+                conn.executemany("INSERT INTO temp.archive_batch (case_id) VALUES (?)", [(case_id,) for case_id in batch])
+                where = "case_id IN (SELECT case_id FROM temp.archive_batch)"
+
+                tables = list(ARCHIVE_ROOT_TABLES) + list(ARCHIVE_CHILD_TABLES)
+                for table in tables:
+                    _copy_rows(conn, schema, table, where)
+                # Cases first, so the comment triggers find no search row left to refresh
+                for table in tables:
+                    if _table_columns(conn, "main", table):
+                        conn.execute(f"DELETE FROM main.{table} WHERE {where}")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            archived += len(batch)
+    finally:
+        conn.close()
+
+    if archived:
+        # Archived cases leave the cross-case face index with their documents
+        try:
+            from face_index import prune_face_index
+            prune_face_index()
+        except Exception as e:
+            print(f"Error pruning the face index: {e}")
+    return archived
+
+def archive_audit_logs(older_than_days=AUDIT_ARCHIVE_AFTER_DAYS):
+    """Move audit entries older than older_than_days to the archive of their year"""
+    flush_audit_log()
+    cutoff = _cutoff(older_than_days)
+    conn = _open_connection()
+    moved = 0
+    try:
+        years = [row[0] for row in conn.execute(
+            "SELECT DISTINCT substr(performed_at, 1, 4) FROM audit_logs WHERE performed_at < ?", (cutoff,)
+        ).fetchall()]
+        conn.commit()
+        for year in years:
+            schema = _attach_for_write(conn, year or "0000")
+            where = "performed_at < ? AND substr(performed_at, 1, 4) = ?"
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                _copy_rows(conn, schema, "audit_logs", where, (cutoff, year))
+                moved += conn.execute(f"DELETE FROM main.audit_logs WHERE {where}", (cutoff, year)).rowcount
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+    finally:
+        conn.close()
+    return moved
+
+def get_archive_summary():
+    """Case and audit row counts per archive file, newest year first"""
+    summary = []
+    conn = _open_connection()
+    try:
+        for year in archive_years():
+            schema = _attach_for_write(conn, year)
+            counts = {}
+            for table in ("cases", "cases_simplified", "audit_logs"):
+                if _table_columns(conn, schema, table):
+                    counts[table] = conn.execute(f"SELECT COUNT(*) FROM {schema}.{table}").fetchone()[0]
+                else:
+                    counts[table] = 0
+            summary.append({
+                "year": year,
+                "size_mb": os.path.getsize(archive_path(year)) / (1024 * 1024),
+                **counts,
+            })
+    finally:
+        conn.close()
+    return summary
+
+def main(argv):
+    init_database()
+
+    days = ARCHIVE_AFTER_DAYS
+    audit_days = AUDIT_ARCHIVE_AFTER_DAYS
+    if "--days" in argv:
+        days = int(argv[argv.index("--days") + 1])
+    if "--audit-days" in argv:
+        audit_days = int(argv[argv.index("--audit-days") + 1])
+
+    cases = archive_closed_cases(days)
+    logs = archive_audit_logs(audit_days)
+    print(f"Archived {cases} closed cases older than {days} days and {logs} audit entries older than {audit_days} days")
+    for entry in get_archive_summary():
+        print(f"  {archive_path(entry['year'])}: {entry['cases']} cases, "
+              f"{entry['cases_simplified']} simplified cases, {entry['audit_logs']} audit entries")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 import plotly.graph_objects as go
 import plotly.express as px
 from database import get_db_connection
+from case_records import get_field
 
 def analyze_case_complexity(case_details):
     """
@@ -16,18 +17,8 @@ def analyze_case_complexity(case_details):
     risk_factors = []
     recommendations = []
     
-    # Helper function to safely get values
-    def safe_get(key, default='N/A'):
-        try:
-            if hasattr(case_details, 'get'):
-                return case_details.get(key, default)
-            else:
-                return getattr(case_details, key, default)
-        except:
-            return default
-    
     # 1. LOAN AMOUNT ANALYSIS (Weight: 25%)
-    loan_amount = safe_get('loan_amount', '0')
+    loan_amount = get_field(case_details, 'loan_amount', '0')
     try:
         loan_amount = float(loan_amount) if loan_amount else 0
     except:
@@ -46,7 +37,7 @@ def analyze_case_complexity(case_details):
         risk_factors.append("Standard Value Loan")
     
     # 2. CASE TYPE ANALYSIS (Weight: 20%)
-    case_type = safe_get('case_type', '').lower()
+    case_type = get_field(case_details, 'case_type', '').lower()
     if 'financial fraud' in case_type or 'embezzlement' in case_type:
         complexity_score += 20
         risk_factors.append("Financial Fraud Case")
@@ -64,10 +55,10 @@ def analyze_case_complexity(case_details):
         risk_factors.append("Payment Default Case")
     
     # 3. CUSTOMER PROFILE ANALYSIS (Weight: 15%)
-    customer_name = safe_get('customer_name', '')
-    customer_pan = safe_get('customer_pan', '')
-    customer_mobile = safe_get('customer_mobile', '')
-    customer_email = safe_get('customer_email', '')
+    customer_name = get_field(case_details, 'customer_name', '')
+    customer_pan = get_field(case_details, 'customer_pan', '')
+    customer_mobile = get_field(case_details, 'customer_mobile', '')
+    customer_email = get_field(case_details, 'customer_email', '')
     
     # Check for incomplete customer information
     missing_info = 0
@@ -89,8 +80,8 @@ def analyze_case_complexity(case_details):
         risk_factors.append("Limited Customer Information")
     
     # 4. TEMPORAL ANALYSIS (Weight: 15%)
-    case_date = safe_get('case_date')
-    disbursement_date = safe_get('disbursement_date')
+    case_date = get_field(case_details, 'case_date')
+    disbursement_date = get_field(case_details, 'disbursement_date')
     
     case_datetime = None
     disbursement_datetime = None
@@ -134,9 +125,9 @@ def analyze_case_complexity(case_details):
         pass
     
     # 5. GEOGRAPHIC AND PRODUCT ANALYSIS (Weight: 10%)
-    region = safe_get('region', '')
-    product = safe_get('product', '')
-    branch_location = safe_get('branch_location', '')
+    region = get_field(case_details, 'region', '')
+    product = get_field(case_details, 'product', '')
+    branch_location = get_field(case_details, 'branch_location', '')
     
     # High-risk regions (example criteria)
     high_risk_regions = ['tier 3', 'rural', 'remote']
@@ -152,7 +143,7 @@ def analyze_case_complexity(case_details):
         risk_factors.append("Complex Financial Product")
     
     # 6. CASE DESCRIPTION ANALYSIS (Weight: 10%)
-    case_description = safe_get('case_description', '')
+    case_description = get_field(case_details, 'case_description', '')
     
     # Keyword analysis for complexity indicators
     high_complexity_keywords = ['multiple', 'suspicious', 'fraudulent', 'forged', 'fake', 'criminal', 'conspiracy']
@@ -390,16 +381,6 @@ def show_complexity_analyzer_widget(case_details, case_id):
 def export_analysis_report(analysis_result, case_details, case_id):
     """Export complexity analysis to downloadable report"""
     
-    # Helper function to safely get values
-    def safe_get(key, default='N/A'):
-        try:
-            if hasattr(case_details, 'get'):
-                return case_details.get(key, default)
-            else:
-                return getattr(case_details, key, default)
-        except:
-            return default
-    
     report_content = f"""
 # CASE COMPLEXITY ANALYSIS REPORT
 **Case ID:** {case_id}
@@ -410,11 +391,11 @@ def export_analysis_report(analysis_result, case_details, case_id):
 - **Complexity Score:** {analysis_result['complexity_score']}/100
 
 ## CASE DETAILS
-- **Customer Name:** {safe_get('customer_name')}
+- **Customer Name:** {get_field(case_details, 'customer_name')}
 - **Loan Amount:** ₹{analysis_result['loan_amount']:,.2f}
-- **Case Type:** {safe_get('case_type')}
-- **Product:** {safe_get('product')}
-- **Region:** {safe_get('region')}
+- **Case Type:** {get_field(case_details, 'case_type')}
+- **Product:** {get_field(case_details, 'product')}
+- **Region:** {get_field(case_details, 'region')}
 
 ## IDENTIFIED RISK FACTORS
 """
@@ -5,6 +5,7 @@ Reference format from Investigation Panel 🗂️ Case Investigation section
 import streamlit as st
 from utils import format_datetime
 from light_professional_styles import apply_light_professional_styling
+from case_records import get_field
 
 def show_standardized_case_details(case_details, show_customer_info=True):
     """
@@ -103,30 +104,15 @@ def show_standardized_case_details(case_details, show_customer_info=True):
     st.markdown('<div class="case-details-card">', unsafe_allow_html=True)
     st.markdown('<div class="case-details-header">📄 Case Details</div>', unsafe_allow_html=True)
     
-    # Safe value extraction with defaults (handle both dict and sqlite3.Row)
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                # This is a sqlite3.Row object
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                # This is a dict
-                return obj.get(key, default)
-            else:
-                # This is an object with attributes
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
-    case_id = safe_get(case_details, 'case_id')
-    lan = safe_get(case_details, 'lan')
-    case_type = safe_get(case_details, 'case_type')
-    product = safe_get(case_details, 'product')
-    region = safe_get(case_details, 'region')
-    referred_by = safe_get(case_details, 'referred_by')
-    status = safe_get(case_details, 'status')
-    case_date = safe_get(case_details, 'case_date')
-    case_description = safe_get(case_details, 'case_description')
+    case_id = get_field(case_details, 'case_id')
+    lan = get_field(case_details, 'lan')
+    case_type = get_field(case_details, 'case_type')
+    product = get_field(case_details, 'product')
+    region = get_field(case_details, 'region')
+    referred_by = get_field(case_details, 'referred_by')
+    status = get_field(case_details, 'status')
+    case_date = get_field(case_details, 'case_date')
+    case_description = get_field(case_details, 'case_description')
     
     # Format case date
     formatted_case_date = format_datetime(case_date) if case_date != 'N/A' else 'N/A'
@@ -185,29 +171,14 @@ def show_standardized_customer_info(case_details):
     st.markdown('<div class="customer-info-card">', unsafe_allow_html=True)
     st.markdown('<div class="customer-info-header">👤 Customer Information</div>', unsafe_allow_html=True)
     
-    # Safe value extraction with defaults (handle both dict and sqlite3.Row)
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                # This is a sqlite3.Row object
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                # This is a dict
-                return obj.get(key, default)
-            else:
-                # This is an object with attributes
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
-    customer_name = safe_get(case_details, 'customer_name')
-    customer_mobile = safe_get(case_details, 'customer_mobile')
-    customer_email = safe_get(case_details, 'customer_email')
-    customer_pan = safe_get(case_details, 'customer_pan')
-    customer_dob = safe_get(case_details, 'customer_dob')
-    branch_location = safe_get(case_details, 'branch_location')
-    loan_amount = safe_get(case_details, 'loan_amount') or 0
-    disbursement_date = safe_get(case_details, 'disbursement_date')
+    customer_name = get_field(case_details, 'customer_name')
+    customer_mobile = get_field(case_details, 'customer_mobile')
+    customer_email = get_field(case_details, 'customer_email')
+    customer_pan = get_field(case_details, 'customer_pan')
+    customer_dob = get_field(case_details, 'customer_dob')
+    branch_location = get_field(case_details, 'branch_location')
+    loan_amount = get_field(case_details, 'loan_amount') or 0
+    disbursement_date = get_field(case_details, 'disbursement_date')
     
     # Format values
     formatted_dob = format_datetime(customer_dob) if customer_dob != 'N/A' else 'N/A'
@@ -0,0 +1,113 @@
+"""
+Case ID allocation from a per-day sequence
+Case IDs keep their CASE{YYYYMMDD}XXdddX shape, but the six characters after
+the date now spell out that day's sequence number in mixed radix (letters are
+base 26, digits base 10) instead of being random. IDs therefore sort in the
+order they were handed out and can never collide, so inserts need no
+existence check and land at the end of the case_id index.
+
+Each process reserves CASE_ID_BLOCK_SIZE numbers at a time from the
+case_id_sequences table and hands them out from memory; batch inserts reserve
+exactly the block they need in a single write.
+"""
+import string
+import threading
+from datetime import datetime
+
+from database import get_write_connection
+
+CASE_ID_PREFIX = "CASE"
+CASE_ID_BLOCK_SIZE = 10
+
+# Radix of each sequence character, most significant first: XX ddd X
+SUFFIX_ALPHABETS = (
+    string.ascii_uppercase, string.ascii_uppercase,
+    string.digits, string.digits, string.digits,
+    string.ascii_uppercase,
+)
+
+IDS_PER_DAY = 1
+for alphabet in SUFFIX_ALPHABETS:
+    IDS_PER_DAY *= len(alphabet)
+
+_block_lock = threading.Lock()
+_block = {"day": None, "next": 0, "end": 0}
+
+def encode_case_id(day, sequence):
+    """Case ID for the sequence'th case of day (a YYYYMMDD string)"""
+    if not 0 <= sequence < IDS_PER_DAY:
+        raise ValueError(f"Case ID sequence {sequence} is out of range for one day")
+    characters = []
+    for alphabet in reversed(SUFFIX_ALPHABETS):
+        sequence, position = divmod(sequence, len(alphabet))
+        characters.append(alphabet[position])
+    return f"{CASE_ID_PREFIX}{day}{''.join(reversed(characters))}"
+
+def decode_case_id(case_id):
+    """(day, sequence) of a case ID, or None if it isn't in the CASE{YYYYMMDD}XXdddX shape"""
+    prefix_length = len(CASE_ID_PREFIX)
+    if not case_id or len(case_id) != prefix_length + 8 + len(SUFFIX_ALPHABETS) or not case_id.startswith(CASE_ID_PREFIX):
+        return None
+    day = case_id[prefix_length:prefix_length + 8]
+    if not day.isdigit():
+        return None
+
+    sequence = 0
+    for character, alphabet in zip(case_id[prefix_length + 8:], SUFFIX_ALPHABETS):
+        position = alphabet.find(character)
+        if position < 0:
+            return None
+        sequence = sequence * len(alphabet) + position
+    return day, sequence
+
+def reserve_sequence_block(day, count):
+    """Reserve count consecutive sequence numbers for day; returns the first"""
+    with get_write_connection() as conn:
+        conn.execute(
+            "INSERT INTO case_id_sequences (day, next_value) VALUES (?, 0) ON CONFLICT (day) DO NOTHING",
+            (day,)
+        )
+        conn.execute("UPDATE case_id_sequences SET next_value = next_value + ? WHERE day = ?", (count, day))
+        end = conn.execute("SELECT next_value FROM case_id_sequences WHERE day = ?", (day,)).fetchone()[0]
+    if end > IDS_PER_DAY:
+        raise RuntimeError(f"All {IDS_PER_DAY} case IDs for {day} have been allocated")
+    return end - count
+
+def next_case_id():
+    """One new case ID, taken from this process's reserved block"""
+    day = datetime.now().strftime("%Y%m%d")
+    with _block_lock:
+        if _block["day"] != day or _block["next"] >= _block["end"]:
+            start = reserve_sequence_block(day, CASE_ID_BLOCK_SIZE)
+            _block.update(day=day, next=start, end=start + CASE_ID_BLOCK_SIZE)
+        sequence = _block["next"]
+        _block["next"] += 1
+    return encode_case_id(day, sequence)
+
+def allocate_case_ids(count):
+    """count new case IDs in ascending order, reserved with one write"""
+    if count <= 0:
+        return []
+    day = datetime.now().strftime("%Y%m%d")
+    start = reserve_sequence_block(day, count)
+    return [encode_case_id(day, sequence) for sequence in range(start, start + count)]
+
+def seed_case_id_sequences(cursor, tables=("cases", "cases_simplified", "internal_fraud_cases")):
+    """Start each day's sequence after the highest existing case ID of that day
+
+    Older random IDs decode to scattered sequence numbers, so starting past
+    the largest keeps new IDs clear of every one of them.
+    """
+    highest = {}
+    for table in tables:
+        cursor.execute(f"SELECT case_id FROM {table}")
+        for (case_id,) in cursor.fetchall():
+            decoded = decode_case_id(case_id)
+            if decoded:
+                day, sequence = decoded
+                highest[day] = max(highest.get(day, -1), sequence)
+
+    cursor.executemany('''
+        INSERT INTO case_id_sequences (day, next_value) VALUES (?, ?)
+        ON CONFLICT (day) DO UPDATE SET next_value = MAX(next_value, excluded.next_value)
+    ''', [(day, sequence + 1) for day, sequence in highest.items()])
@@ -0,0 +1,177 @@
+"""
+Bulk case import from CSV / XLSX referral spreadsheets
+The whole sheet is validated column-wise with pandas, applying the same rules
+as utils.validate_case_data, so every row gets the messages the case entry
+form would have shown. Valid rows receive a block of case IDs and are inserted
+into cases with executemany, IMPORT_CHUNK_ROWS rows (and their audit entries)
+per transaction. The result is a per-row report of what was imported and why
+the rest was rejected.
+"""
+import os
+import re
+import sqlite3
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from database import get_write_connection, AUDIT_INSERT_SQL
+from case_ids import allocate_case_ids
+
+IMPORT_CHUNK_ROWS = 500
+
+# validate_case_data's required fields, less the generated case_id and the
+# category, which cases has no column for
+REQUIRED_FIELDS = [
+    "lan", "customer_name", "customer_mobile", "customer_email", "customer_pan",
+    "branch_location", "case_description", "referred_by", "case_type",
+]
+# NOT NULL in cases, so required for an import even though the form fills them itself
+TABLE_REQUIRED_FIELDS = ["product", "region"]
+
+IMPORT_COLUMNS = [
+    "case_id", "lan", "case_type", "product", "region", "referred_by", "case_description",
+    "case_date", "created_by", "status", "customer_name", "customer_dob", "customer_pan",
+    "customer_aadhaar", "customer_mobile", "customer_email", "customer_address_full",
+    "customer_occupation", "customer_income", "customer_cibil_score",
+    "customer_relationship_status", "branch_location", "loan_amount", "disbursement_date",
+]
+
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+
+CASE_INSERT_SQL = f'''
+    INSERT INTO cases ({", ".join(IMPORT_COLUMNS)})
+    VALUES ({", ".join("?" * len(IMPORT_COLUMNS))})
+'''
+
+def _field_label(field):
+    return "Type of Case" if field == "case_type" else field.replace("_", " ").title()
+
+def read_case_file(source, filename=None):
+    """Load a CSV or XLSX sheet as text columns with normalised headers
+
+    source is a path or an uploaded file object; filename picks the parser
+    when source has no name of its own.
+    """
+    name = (filename or getattr(source, "name", None) or str(source)).lower()
+    if name.endswith((".xlsx", ".xls")):
+        df = pd.read_excel(source, dtype=str)
+    else:
+        df = pd.read_csv(source, dtype=str, keep_default_na=False)
+    df = df.fillna("")
+    df.columns = [re.sub(r"\W+", "_", str(column).strip().lower()).strip("_") for column in df.columns]
+    return df.reset_index(drop=True)
+
+def _text(df, field):
+    if field not in df.columns:
+        return pd.Series("", index=df.index)
+    return df[field].astype(str).str.strip()
+
+def validate_case_frame(df):
+    """Per-row validation messages for a sheet, as a list of lists
+
+    Checks run in validate_case_data's order and wording, one column at a
+    time over the whole sheet.
+    """
+    checks = []
+
+    for field in REQUIRED_FIELDS + TABLE_REQUIRED_FIELDS:
+        value = _text(df, field)
+        checks.append(((value == "") | value.str.startswith("Select"), f"{_field_label(field)} is required"))
+
+    pan = _text(df, "customer_pan")
+    mobile = _text(df, "customer_mobile")
+    email = _text(df, "customer_email")
+    aadhaar = _text(df, "customer_aadhaar")
+    amount_text = _text(df, "loan_amount")
+    amount = pd.to_numeric(amount_text, errors="coerce")
+    mobile_bad = (mobile != "") & ((mobile.str.len() != 10) | ~mobile.str.isdigit())
+
+    checks.append(((pan != "") & ((pan.str.len() != 10) | ~pan.str.isalnum()),
+                   "PAN must be exactly 10 alphanumeric characters"))
+    checks.append((mobile_bad, "Mobile number must be exactly 10 digits"))
+    checks.append(((email != "") & ~email.str.contains("@", regex=False), "Email must contain @ symbol"))
+    checks.append(((aadhaar != "") & ((aadhaar.str.len() != 12) | ~aadhaar.str.isdigit()),
+                   "Aadhaar number must be exactly 12 digits"))
+    # A blank amount counts as the form's default of 0
+    checks.append(((amount_text == "") | (amount <= 0), "Loan amount must be greater than 0"))
+    checks.append(((pan != "") & (pan.str.len() != 10), "PAN must be exactly 10 characters"))
+    checks.append((mobile_bad, "Mobile number must be exactly 10 digits"))
+    checks.append(((email != "") & ~email.str.match(EMAIL_PATTERN), "Please enter a valid email address"))
+    checks.append(((amount_text == "") | (amount == 0), "Loan amount is required"))
+    checks.append(((amount_text != "") & amount.isna(), "Loan amount must be a valid number"))
+    checks.append((amount < 0, "Loan amount must be greater than 0"))
+
+    errors = [[] for _ in range(len(df))]
+    for mask, message in checks:
+        for position in np.flatnonzero(mask.to_numpy(dtype=bool)):
+            errors[position].append(message)
+    return errors
+
+def _case_rows(df, case_ids, created_by, status):
+    today = datetime.now().strftime("%Y-%m-%d")
+    frame = pd.DataFrame(index=df.index)
+    for column in IMPORT_COLUMNS:
+        frame[column] = _text(df, column) if column in df.columns else ""
+    frame["case_id"] = case_ids
+    frame["created_by"] = created_by
+    # Imports always enter the workflow at its start, whatever the sheet says
+    frame["status"] = status
+    frame["case_date"] = frame["case_date"].where(frame["case_date"] != "", today)
+    frame["loan_amount"] = pd.to_numeric(frame["loan_amount"])
+    frame["customer_cibil_score"] = pd.to_numeric(frame["customer_cibil_score"], errors="coerce").fillna(0).astype(int)
+    return [
+        tuple(value.item() if isinstance(value, np.generic) else value for value in row)
+        for row in frame.itertuples(index=False, name=None)
+    ]
+
+def import_cases(source, created_by, status="Draft", filename=None, dry_run=False):
+    """Validate a referral sheet and insert its valid rows into cases
+
+    Returns a report DataFrame with one row per sheet row: its spreadsheet
+    row number, the LAN, the assigned case ID and whether it was Imported,
+    Valid (dry run), Rejected (with the validation errors) or Failed (the
+    database refused its chunk).
+    """
+    df = read_case_file(source, filename)
+    errors = validate_case_frame(df)
+    valid = np.array([not row_errors for row_errors in errors], dtype=bool)
+
+    report = pd.DataFrame({
+        # Row 1 of the sheet is the header
+        "row": df.index + 2,
+        "lan": _text(df, "lan"),
+        "case_id": "",
+        "result": np.where(valid, "Valid" if dry_run else "Imported", "Rejected"),
+        "errors": ["; ".join(row_errors) for row_errors in errors],
+    })
+    if dry_run or not valid.any():
+        return report
+
+    valid_positions = np.flatnonzero(valid)
+    case_ids = allocate_case_ids(len(valid_positions))
+    rows = _case_rows(df.iloc[valid_positions], case_ids, created_by, status)
+    report.loc[valid_positions, "case_id"] = case_ids
+
+    performed_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    source_name = os.path.basename(filename or getattr(source, "name", None) or str(source))
+    for start in range(0, len(rows), IMPORT_CHUNK_ROWS):
+        chunk = rows[start:start + IMPORT_CHUNK_ROWS]
+        audit_entries = [
+            (row[0], "Case Created", f"Case imported from {source_name} with status: {row[9]}", created_by, performed_at)
+            for row in chunk
+        ]
+        try:
+            with get_write_connection() as conn:
+                conn.executemany(CASE_INSERT_SQL, chunk)
+                conn.executemany(AUDIT_INSERT_SQL, audit_entries)
+        except sqlite3.Error as e:
+            positions = valid_positions[start:start + IMPORT_CHUNK_ROWS]
+            report.loc[positions, "result"] = "Failed"
+            report.loc[positions, "case_id"] = ""
+            report.loc[positions, "errors"] = f"Database error: {e}"
+    return report
+
+def import_summary(report):
+    """Counts of each result in an import report"""
+    return report["result"].value_counts().to_dict()
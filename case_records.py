@@ -0,0 +1,135 @@
+"""
+Compact read-only records for rows of the case tables
+A CaseRecord holds one tuple of values plus a reference to the column layout
+shared by every record from the same query, instead of a dict per row. It
+reads like a dict (record["status"], record.get(...), dict(record),
+pandas.DataFrame(records)). Listing queries leave the long free-text columns
+out; the first record to touch one loads them for the whole result set in a
+single query.
+"""
+from collections.abc import Mapping
+
+from database import get_db_connection
+
+# Long free-text columns left out of listing queries and loaded on first use
+DEFERRED_COLUMNS = {
+    "cases": (
+        "case_description", "customer_address_full", "closure_reason",
+    ),
+    "cases_simplified": (
+        "case_description", "suspected_fraud_modus_operandi", "customer_statement_summary",
+        "escalation_reason", "method_of_compromise", "observation_summary", "description",
+    ),
+    "internal_fraud_cases": (
+        "incident_description", "supporting_documents", "allocation_remarks",
+        "investigation_summary", "preliminary_findings", "evidence_collected",
+        "reviewer_comments", "primary_closure_remarks", "final_closure_remarks",
+    ),
+}
+
+# Ids per deferred-column query, well under SQLite's bound parameter limit
+DEFERRED_LOAD_BATCH = 500
+
+_table_columns = {}
+
+def get_field(record, key, default='N/A'):
+    """Read one field from a case record, dict or sqlite3.Row
+
+    Missing fields and NULL values both come back as default.
+    """
+    if record is None:
+        return default
+    try:
+        value = record[key]
+    except (KeyError, IndexError):
+        return default
+    except TypeError:
+        value = getattr(record, key, None)
+    return default if value is None else value
+
+def table_columns(table):
+    """Column names of a case table, read once per process"""
+    if table not in _table_columns:
+        with get_db_connection() as conn:
+            _table_columns[table] = tuple(row[1] for row in conn.execute(f"PRAGMA table_info({table})"))
+    return _table_columns[table]
+
+def listing_columns(table):
+    """SELECT list for a listing query: every column except the deferred ones"""
+    deferred = set(DEFERRED_COLUMNS.get(table, ()))
+    return ", ".join(column for column in table_columns(table) if column not in deferred)
+
+class RecordSet:
+    """Column layout and deferred-column cache shared by one query's records"""
+    __slots__ = ("table", "columns", "index", "deferred", "ids", "_deferred_rows")
+
+    def __init__(self, table, columns):
+        self.table = table
+        self.columns = tuple(columns)
+        self.index = {column: position for position, column in enumerate(self.columns)}
+        self.deferred = tuple(
+            column for column in DEFERRED_COLUMNS.get(table, ())
+            if column not in self.index and column in table_columns(table)
+        )
+        self.ids = []
+        self._deferred_rows = None
+
+    def deferred_value(self, record_id, column):
+        """Value of a deferred column, loading them for every record on first use"""
+        if self._deferred_rows is None:
+            self._deferred_rows = {}
+            columns = ", ".join(self.deferred)
+            with get_db_connection() as conn:
+                for start in range(0, len(self.ids), DEFERRED_LOAD_BATCH):
+                    batch = self.ids[start:start + DEFERRED_LOAD_BATCH]
+                    placeholders = ", ".join("?" * len(batch))
+                    for row in conn.execute(
+                        f"SELECT id, {columns} FROM {self.table} WHERE id IN ({placeholders})", batch
+                    ):
+                        self._deferred_rows[row[0]] = tuple(row)[1:]
+        values = self._deferred_rows.get(record_id)
+        return values[self.deferred.index(column)] if values else None
+
+class CaseRecord(Mapping):
+    """One read-only case row"""
+    __slots__ = ("_set", "_values")
+
+    def __init__(self, record_set, values):
+        self._set = record_set
+        self._values = values
+
+    def __getitem__(self, key):
+        position = self._set.index.get(key)
+        if position is not None:
+            return self._values[position]
+        if key in self._set.deferred:
+            return self._set.deferred_value(self._values[self._set.index["id"]], key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from self._set.columns
+        yield from self._set.deferred
+
+    def __len__(self):
+        return len(self._set.columns) + len(self._set.deferred)
+
+    def __contains__(self, key):
+        return key in self._set.index or key in self._set.deferred
+
+    def __repr__(self):
+        return f"CaseRecord({self._set.table}, case_id={self.get('case_id')!r})"
+
+    def to_dict(self):
+        """Plain dict copy of the record, deferred columns included"""
+        return dict(self.items())
+
+def records_from_cursor(cursor, table):
+    """Wrap every remaining row of an executed cursor in CaseRecords"""
+    record_set = RecordSet(table, (description[0] for description in cursor.description))
+    # Plain tuples straight from sqlite3, no intermediate Row objects
+    cursor.row_factory = None
+    records = [CaseRecord(record_set, row) for row in cursor.fetchall()]
+    if record_set.deferred:
+        id_position = record_set.index["id"]
+        record_set.ids = [record._values[id_position] for record in records]
+    return records
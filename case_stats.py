@@ -0,0 +1,120 @@
+"""
+Materialized case statistics for the dashboards
+The case_stats table holds one count per (source table, dimension, value) and
+is kept current by triggers on the source tables (installed by migration
+0007), so dashboard widgets read a handful of rollup rows instead of counting
+every case. NULL values are stored as '' and read back as None.
+
+Verify the rollups against a full recount with: python case_stats.py
+Rebuild them from scratch with: python case_stats.py --rebuild
+"""
+import sys
+
+from database import get_db_connection, get_write_connection, init_database
+
+# Per source table: (dimension, watched column, value expression over a row alias)
+ROLLUP_DIMENSIONS = {
+    "cases": [
+        ("total", None, "''"),
+        ("status", "status", "{row}.status"),
+        ("region", "region", "{row}.region"),
+        ("product", "product", "{row}.product"),
+        ("created_by", "created_by", "{row}.created_by"),
+        ("day", "created_at", "date({row}.created_at)"),
+    ],
+    "internal_fraud_cases": [
+        ("total", None, "''"),
+        ("status", "status", "{row}.status"),
+        ("case_type", "case_type", "{row}.case_type"),
+        ("hr_action", "hr_action", "{row}.hr_action"),
+        ("created_by", "created_by", "{row}.created_by"),
+        ("day", "created_at", "date({row}.created_at)"),
+    ],
+}
+
+def _recount(cursor, source):
+    """Count every dimension of a source table from scratch"""
+    counts = {}
+    for dimension, _, value in ROLLUP_DIMENSIONS[source]:
+        cursor.execute(f'''
+            SELECT COALESCE({value.format(row=source)}, '') AS value, COUNT(*)
+            FROM {source} GROUP BY 1
+        ''')
+        for row_value, count in cursor.fetchall():
+            counts[(dimension, row_value)] = count
+    return counts
+
+def rebuild_case_stats(cursor=None):
+    """Replace every rollup with a full recount of its source table"""
+    if cursor is not None:
+        _rebuild(cursor)
+        return
+    with get_write_connection() as conn:
+        _rebuild(conn.cursor())
+
+def _rebuild(cursor):
+    """Recount every source inside the caller's transaction"""
+    cursor.execute("DELETE FROM case_stats")
+    for source in ROLLUP_DIMENSIONS:
+        cursor.executemany(
+            "INSERT INTO case_stats (source, dimension, value, count) VALUES (?, ?, ?, ?)",
+            [(source, dimension, value, count) for (dimension, value), count in _recount(cursor, source).items()]
+        )
+
+def verify_case_stats():
+    """Compare the rollups with a full recount; returns a list of mismatches"""
+    mismatches = []
+
+    with get_db_connection() as conn:
+        # Read rollups and recount from one snapshot so concurrent writes can't skew them
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        cursor = conn.cursor()
+        for source in ROLLUP_DIMENSIONS:
+            expected = _recount(cursor, source)
+            cursor.execute(
+                "SELECT dimension, value, count FROM case_stats WHERE source = ? AND count != 0",
+                (source,)
+            )
+            stored = {(dimension, value): count for dimension, value, count in cursor.fetchall()}
+
+            for key in sorted(set(expected) | set(stored)):
+                if expected.get(key, 0) != stored.get(key, 0):
+                    mismatches.append(
+                        f"{source}.{key[0]}={key[1]!r}: rollup {stored.get(key, 0)}, recount {expected.get(key, 0)}"
+                    )
+
+    return mismatches
+
+def get_rollup(source):
+    """Read one source's rollups as {dimension: {value: count}}"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT dimension, value, count FROM case_stats WHERE source = ? AND count > 0",
+            (source,)
+        )
+        rollup = {dimension: {} for dimension, _, _ in ROLLUP_DIMENSIONS[source]}
+        for dimension, value, count in cursor.fetchall():
+            rollup.setdefault(dimension, {})[value if value != "" else None] = count
+        return rollup
+
+def main(argv):
+    init_database()
+
+    if "--rebuild" in argv:
+        rebuild_case_stats()
+        print("Rebuilt case_stats from a full recount")
+
+    mismatches = verify_case_stats()
+    if mismatches:
+        print(f"{len(mismatches)} rollup counters disagree with a full recount:")
+        for mismatch in mismatches:
+            print(f"  - {mismatch}")
+        return 1
+
+    print("case_stats matches a full recount")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -4,6 +4,8 @@ Expandable case table utilities for presentable case display
 import streamlit as st
 from case_display_utils import show_standardized_case_details, show_standardized_customer_info, show_standardized_case_history, show_standardized_documents
 from light_professional_styles import apply_light_professional_styling
+from case_records import get_field
+from unit_of_work import bulk_set_status
 
 def show_expandable_case_table(cases, current_user, panel_type="default"):
     """
@@ -110,28 +112,13 @@ def show_expandable_case_table(cases, current_user, panel_type="default"):
     
     # Add table rows
     for case in cases:
-        # Safe value extraction (handle both dict and sqlite3.Row)
-        def safe_get(obj, key, default='N/A'):
-            try:
-                if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                    # This is a sqlite3.Row object
-                    return obj[key] if key in obj.keys() and obj[key] is not None else default
-                elif hasattr(obj, 'get'):
-                    # This is a dict
-                    return obj.get(key, default)
-                else:
-                    # This is an object with attributes
-                    return getattr(obj, key, default)
-            except (KeyError, AttributeError, TypeError):
-                return default
-        
-        case_id = safe_get(case, 'case_id')
-        customer_name = safe_get(case, 'customer_name')
-        case_type = safe_get(case, 'case_type')
-        product = safe_get(case, 'product')
-        region = safe_get(case, 'region')
-        loan_amount = safe_get(case, 'loan_amount') or 0
-        status = safe_get(case, 'status')
+        case_id = get_field(case, 'case_id')
+        customer_name = get_field(case, 'customer_name')
+        case_type = get_field(case, 'case_type')
+        product = get_field(case, 'product')
+        region = get_field(case, 'region')
+        loan_amount = get_field(case, 'loan_amount') or 0
+        status = get_field(case, 'status')
         
         # Convert loan amount to float for comparison
         try:
@@ -163,17 +150,8 @@ def show_expandable_case_table(cases, current_user, panel_type="default"):
     st.markdown("### 📋 Click to Expand Case Details")
     
     for case in cases:
-        # Safe value extraction (handle both dict and sqlite3.Row)
-        def safe_get(obj, key, default='N/A'):
-            if hasattr(obj, 'get'):
-                return obj.get(key, default)
-            elif hasattr(obj, key):
-                return getattr(obj, key) or default
-            else:
-                return default
-        
-        case_id = safe_get(case, 'case_id')
-        customer_name = safe_get(case, 'customer_name')
+        case_id = get_field(case, 'case_id')
+        customer_name = get_field(case, 'customer_name')
         
         # Use streamlit expander for interaction
         with st.expander(f"📄 {case_id} - {customer_name}", expanded=False):
@@ -204,17 +182,8 @@ def add_panel_specific_actions(case, current_user, panel_type):
 
 def add_reviewer_actions(case, current_user):
     """Add reviewer-specific actions"""
-    # Safe value extraction (handle both dict and sqlite3.Row)
-    def safe_get(obj, key, default='N/A'):
-        if hasattr(obj, 'get'):
-            return obj.get(key, default)
-        elif hasattr(obj, key):
-            return getattr(obj, key) or default
-        else:
-            return default
-    
-    case_id = safe_get(case, 'case_id')
-    status = safe_get(case, 'status')
+    case_id = get_field(case, 'case_id')
+    status = get_field(case, 'status')
     
     if status in ['Submitted', 'Under Review']:
         st.divider()
@@ -259,6 +228,9 @@ def add_reviewer_actions(case, current_user):
                     if update_case_status(case_id, "Approved", current_user, comment_text):
                         st.success("✅ Case approved and sent to Approver 1")
                         st.rerun()
+                    else:
+                        from error_handler import handle_status_change_error
+                        handle_status_change_error(case_id, "Approved")
                 else:
                     st.warning("Please add review comments")
         
@@ -270,6 +242,9 @@ def add_reviewer_actions(case, current_user):
                     if update_case_status(case_id, "Rejected", current_user, comment_text):
                         st.success("❌ Case rejected")
                         st.rerun()
+                    else:
+                        from error_handler import handle_status_change_error
+                        handle_status_change_error(case_id, "Rejected")
                 else:
                     st.warning("Please add rejection reason")
         
@@ -295,23 +270,8 @@ def add_legal_actions(case, current_user):
 
 def add_closure_actions(case, current_user):
     """Add closure-specific actions"""
-    # Safe value extraction (handle both dict and sqlite3.Row)
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                # This is a sqlite3.Row object
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                # This is a dict
-                return obj.get(key, default)
-            else:
-                # This is an object with attributes
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
-    case_id = safe_get(case, 'case_id')
-    status = safe_get(case, 'status')
+    case_id = get_field(case, 'case_id')
+    status = get_field(case, 'status')
     
     if status in ['Legal Review', 'Final Review']:
         st.divider()
@@ -339,10 +299,13 @@ def add_closure_actions(case, current_user):
                 if closure_comment.strip():
                     comment_text = f"CASE CLOSED - {closure_action}: {closure_comment}"
                     from models import update_case_status, add_case_comment
-                    if add_case_comment(case_id, comment_text, current_user, "Closure Action"):
-                        if update_case_status(case_id, "Closed", current_user):
+                    if update_case_status(case_id, "Closed", current_user):
+                        if add_case_comment(case_id, comment_text, current_user, "Closure Action"):
                             st.success(f"✅ Case closed with action: {closure_action}")
                             st.rerun()
+                    else:
+                        from error_handler import handle_status_change_error
+                        handle_status_change_error(case_id, "Closed")
                 else:
                     st.warning("Please add closure comments")
         
@@ -351,13 +314,78 @@ def add_closure_actions(case, current_user):
                 if closure_comment.strip():
                     comment_text = f"ADDITIONAL INFO REQUESTED: {closure_comment}"
                     from models import add_case_comment, update_case_status
-                    if add_case_comment(case_id, comment_text, current_user, "Info Request"):
-                        if update_case_status(case_id, "Under Review", current_user):
+                    if update_case_status(case_id, "Under Review", current_user):
+                        if add_case_comment(case_id, comment_text, current_user, "Info Request"):
                             st.success("📤 Additional information requested")
                             st.rerun()
+                    else:
+                        from error_handler import handle_status_change_error
+                        handle_status_change_error(case_id, "Under Review")
                 else:
                     st.warning("Please specify what information is needed")
 
+def show_bulk_status_actions(cases, current_user, actions, key):
+    """Apply one status transition to several selected cases at once
+    
+    actions maps a button label to (new status, comment prefix). Every
+    selected case is moved in a single transaction; cases the workflow won't
+    allow are listed with the reason and left as they are. After a batch
+    moves any case the page reruns, so the listing drops the moved cases,
+    and the outcome is shown on the rerun.
+    """
+    outcome = st.session_state.pop(f"bulk_outcome_{key}", None)
+    if outcome:
+        new_status, moved, unchanged, failed = outcome
+        st.success(f"✅ {moved} case(s) moved to {new_status}")
+        if unchanged:
+            st.info(f"ℹ️ {unchanged} case(s) were already {new_status}")
+        if failed:
+            st.warning(f"⚠️ {len(failed)} case(s) were not changed")
+            st.dataframe(failed, use_container_width=True, hide_index=True)
+    
+    if not cases:
+        return
+    
+    with st.expander(f"⚡ Bulk Actions ({len(cases)} cases)"):
+        labels = {
+            get_field(case, 'case_id'): f"{get_field(case, 'case_id')} - {get_field(case, 'customer_name', 'N/A')}"
+            for case in cases
+        }
+        select_all = st.checkbox("Select all", key=f"bulk_all_{key}")
+        selected = st.multiselect(
+            "Cases",
+            list(labels),
+            default=list(labels) if select_all else [],
+            format_func=labels.get,
+            key=f"bulk_cases_{key}_{select_all}"
+        )
+        action = st.selectbox("Action", list(actions), key=f"bulk_action_{key}")
+        comment = st.text_area("Comments (applied to every selected case)", key=f"bulk_comment_{key}", height=80)
+        
+        if st.button(f"Apply to {len(selected)} case(s)", key=f"bulk_apply_{key}", disabled=not selected):
+            if not comment.strip():
+                st.warning("Please add comments for the bulk action")
+                return
+            
+            new_status, prefix = actions[action]
+            try:
+                results = bulk_set_status(selected, new_status, current_user, f"{prefix}: {comment}")
+            except Exception as e:
+                st.error(f"❌ Bulk action failed, no cases were changed: {str(e)}")
+                return
+            
+            moved = [result for result in results if result["moved"]]
+            unchanged = [result for result in results if result["ok"] and not result["moved"]]
+            failed = [result for result in results if not result["ok"]]
+            if moved:
+                st.session_state[f"bulk_outcome_{key}"] = (new_status, len(moved), len(unchanged), failed)
+                st.rerun()
+            if unchanged:
+                st.info(f"ℹ️ {len(unchanged)} case(s) were already {new_status}")
+            if failed:
+                st.warning(f"⚠️ {len(failed)} case(s) were not changed")
+                st.dataframe(failed, use_container_width=True, hide_index=True)
+
 def show_compact_case_grid(cases, title="Cases"):
     """
     Display cases in a compact grid format for dashboard views
@@ -0,0 +1,269 @@
+"""
+Streaming exports of case data
+Queries are read EXPORT_CHUNK_ROWS rows at a time off the cursor and each
+chunk is written out before the next is fetched, so memory stays flat however
+large the table. Output can be plain CSV, gzip-compressed CSV or Parquet
+(when pyarrow is installed), as separate files or bundled into one ZIP.
+Export files are deleted once older than EXPORT_RETENTION_SECONDS, checked
+whenever a new export is written.
+"""
+import csv
+import gzip
+import io
+import os
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+
+from arrow_types import arrow_type, coerce_value
+from database import get_db_connection, flush_audit_log
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+EXPORT_DIR = "exports"
+EXPORT_CHUNK_ROWS = 5000
+# Export files are only kept long enough to be downloaded
+EXPORT_RETENTION_SECONDS = 24 * 3600
+
+# Per-row search metadata, not case data
+SEARCH_RESULT_COLUMNS = ("match_snippet", "match_rank")
+
+# Format -> file extension
+EXPORT_FORMATS = {"csv": ".csv", "csv.gz": ".csv.gz", "parquet": ".parquet"}
+
+# Admin "export all data" bundle: file stem -> (query, source table for column types)
+ADMIN_EXPORTS = {
+    "cases": ("SELECT * FROM cases ORDER BY id", "cases"),
+    "users": ("SELECT id, username, role, email, created_at, is_active FROM users ORDER BY id", "users"),
+    "audit_logs": ("SELECT * FROM audit_logs ORDER BY id", "audit_logs"),
+}
+
+def clean_exports(max_age_seconds=EXPORT_RETENTION_SECONDS):
+    """Delete export files older than max_age_seconds; returns how many were removed"""
+    if not os.path.isdir(EXPORT_DIR):
+        return 0
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for name in os.listdir(EXPORT_DIR):
+        path = os.path.join(EXPORT_DIR, name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError as e:
+            print(f"Error removing old export {path}: {e}")
+    return removed
+
+def _export_dir():
+    """EXPORT_DIR, created if needed and cleared of expired exports"""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    clean_exports()
+    return EXPORT_DIR
+
+def available_formats():
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "parquet" or PARQUET_AVAILABLE]
+
+def stream_query(sql, params=(), chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield (columns, rows) for each chunk of a query's results
+
+    The whole export reads from one snapshot of the database, since the
+    connection's read transaction stays open until the last chunk.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(sql, params)
+        columns = [description[0] for description in cursor.description]
+        rows = cursor.fetchmany(chunk_rows)
+        # An empty result still yields once, so the export gets its header
+        yield columns, rows
+        while rows:
+            rows = cursor.fetchmany(chunk_rows)
+            if rows:
+                yield columns, rows
+
+def write_csv(chunks, stream, transform=None):
+    """Write chunks as CSV to a text stream, returning the row count"""
+    writer = csv.writer(stream)
+    written = 0
+    header_written = False
+    for columns, rows in chunks:
+        if not header_written:
+            writer.writerow(columns)
+            header_written = True
+        if transform:
+            rows = [transform(columns, row) for row in rows]
+        writer.writerows(rows)
+        written += len(rows)
+    return written
+
+def _declared_types(table):
+    """Declared type of each column of table, widened to fit the values actually stored
+
+    SQLite lets any column hold any value, so a numeric column holding text is
+    exported as a string, and an integer column holding reals as a float,
+    instead of losing those cells to null.
+    """
+    if not table:
+        return {}
+    with get_db_connection() as conn:
+        declared = {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+        numeric = [column for column, kind in declared.items() if not pa.types.is_string(arrow_type(kind))]
+        if not numeric:
+            return declared
+        checks = ", ".join(
+            f"MAX(typeof(\"{column}\") IN ('text', 'blob')), MAX(typeof(\"{column}\") = 'real')" for column in numeric
+        )
+        found = conn.execute(f"SELECT {checks} FROM {table}").fetchone()
+    for position, column in enumerate(numeric):
+        holds_text, holds_reals = found[2 * position], found[2 * position + 1]
+        if holds_text:
+            declared[column] = "TEXT"
+        elif holds_reals and pa.types.is_integer(arrow_type(declared[column])):
+            declared[column] = "REAL"
+    return declared
+
+def write_parquet(chunks, path, table=None, transform=None):
+    """Write chunks to a Parquet file, one row group per chunk; returns the row count
+
+    Column types follow the SQLite types of table, widened where stored values
+    don't fit them; other columns (and every column of an ad-hoc query) are
+    written as strings.
+    """
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("Parquet export needs pyarrow installed")
+
+    declared = _declared_types(table)
+    writer = None
+    written = 0
+    try:
+        for columns, rows in chunks:
+            if transform:
+                rows = [transform(columns, row) for row in rows]
+            if writer is None:
+                schema = pa.schema([pa.field(column, arrow_type(declared.get(column))) for column in columns])
+                writer = pq.ParquetWriter(path, schema)
+            data = {
+                column: [coerce_value(row[position], schema.field(column).type) for row in rows]
+                for position, column in enumerate(columns)
+            }
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+            written += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+def export_query(sql, params, path, fmt="csv", table=None, transform=None):
+    """Stream a query's results to path in the given format; returns the row count"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    chunks = stream_query(sql, params)
+    if fmt == "parquet":
+        return write_parquet(chunks, path, table, transform)
+    opener = gzip.open if fmt == "csv.gz" else open
+    with opener(path, "wt", newline="", encoding="utf-8") as stream:
+        return write_csv(chunks, stream, transform)
+
+def export_tables(exports=None, fmt="csv", bundle=True):
+    """Export each query in exports ({stem: (sql, table)}) under EXPORT_DIR
+
+    With bundle=True every file goes into one ZIP, streamed in and never held
+    in memory whole. Returns (paths written, {stem: row count}).
+    """
+    exports = exports or ADMIN_EXPORTS
+    flush_audit_log()
+    _export_dir()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    counts = {}
+
+    if not bundle:
+        paths = []
+        for stem, (sql, table) in exports.items():
+            path = os.path.join(EXPORT_DIR, f"{stem}_export_{timestamp}{EXPORT_FORMATS[fmt]}")
+            counts[stem] = export_query(sql, (), path, fmt, table)
+            paths.append(path)
+        return paths, counts
+
+    zip_path = os.path.join(EXPORT_DIR, f"data_export_{timestamp}.zip")
+    # CSV is deflated by the ZIP itself, so gzip inside it would only cost time
+    fmt = "csv" if fmt == "csv.gz" else fmt
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for stem, (sql, table) in exports.items():
+            member = f"{stem}{EXPORT_FORMATS[fmt]}"
+            if fmt == "parquet":
+                # pyarrow needs a file it can tell() on, which a ZIP member being written isn't
+                handle, scratch = tempfile.mkstemp(dir=EXPORT_DIR, suffix=".parquet")
+                os.close(handle)
+                try:
+                    counts[stem] = write_parquet(stream_query(sql), scratch, table)
+                    archive.write(scratch, member)
+                finally:
+                    os.remove(scratch)
+            else:
+                with archive.open(member, "w", force_zip64=True) as raw:
+                    with io.TextIOWrapper(raw, encoding="utf-8", newline="") as stream:
+                        counts[stem] = write_csv(stream_query(sql), stream)
+    return [zip_path], counts
+
+def _format_minutes(value):
+    """Timestamp text trimmed to minutes, as the case CSV has always shown it"""
+    if not value:
+        return value
+    try:
+        return datetime.fromisoformat(str(value)).strftime("%Y-%m-%d %H:%M")
+    except ValueError:
+        return value
+
+def format_case_row(columns, row):
+    """Trim created_at / updated_at of one exported case row to minutes"""
+    return [
+        _format_minutes(value) if column in ("created_at", "updated_at") else value
+        for column, value in zip(columns, row)
+    ]
+
+def export_cases(filters=None, fmt="csv.gz"):
+    """Stream the cases matching filters to a file under EXPORT_DIR; returns (path, rows)"""
+    from models import case_filter_clauses
+
+    _export_dir()
+    clauses, params = case_filter_clauses(filters)
+    sql = "SELECT * FROM cases c"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY c.created_at DESC"
+
+    path = os.path.join(EXPORT_DIR, f"cases_filtered_{datetime.now().strftime('%Y%m%d_%H%M%S')}{EXPORT_FORMATS[fmt]}")
+    rows = export_query(sql, params, path, fmt, table="cases", transform=format_case_row)
+    return path, rows
+
+def export_case_rows(cases, fmt="csv.gz"):
+    """Write case rows already fetched (e.g. search results) to a file under EXPORT_DIR; returns (path, rows)
+
+    Rows are written EXPORT_CHUNK_ROWS at a time without building the file in
+    memory, and the search-only match_snippet / match_rank columns are left out.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if not cases:
+        return None, 0
+
+    columns = [column for column in cases[0].keys() if column not in SEARCH_RESULT_COLUMNS]
+
+    def chunks():
+        for start in range(0, len(cases), EXPORT_CHUNK_ROWS):
+            yield columns, [[case[column] for column in columns] for case in cases[start:start + EXPORT_CHUNK_ROWS]]
+
+    path = os.path.join(_export_dir(), f"cases_search_{datetime.now().strftime('%Y%m%d_%H%M%S')}{EXPORT_FORMATS[fmt]}")
+    if fmt == "parquet":
+        return path, write_parquet(chunks(), path, table="cases", transform=format_case_row)
+    opener = gzip.open if fmt == "csv.gz" else open
+    with opener(path, "wt", newline="", encoding="utf-8") as stream:
+        return path, write_csv(chunks(), stream, transform=format_case_row)
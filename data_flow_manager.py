@@ -3,12 +3,49 @@ Data Flow Manager for ensuring seamless data flow between workflow stages
 Handles case transitions and data inheritance between stages
 """
 import streamlit as st
-from database import get_db_connection, log_audit
+from database import get_db_connection, flush_audit_log
+from unit_of_work import CaseUnitOfWork
+from workflow_engine import WORKFLOW_STAGES, get_case_workflow, stage_for_status
 import json
-from datetime import datetime
+
+def get_stage_data(case_id, stage_names=None):
+    """Get saved stage data for a case in one query, keyed by stage
+    
+    Pass stage_names to fetch only those stages. Each entry holds the stage,
+    timestamp, user, version and data, in the order the stages were first saved.
+    """
+    query = "SELECT stage, data, version, saved_by, saved_at FROM case_stage_data WHERE case_id = ?"
+    params = [case_id]
+    if stage_names is not None:
+        if not stage_names:
+            return {}
+        query += f" AND stage IN ({', '.join('?' * len(stage_names))})"
+        params.extend(stage_names)
+    query += " ORDER BY id"
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        
+        stage_data = {}
+        for row in cursor.fetchall():
+            try:
+                data = json.loads(row['data'])
+            except json.JSONDecodeError:
+                data = {}
+            stage_data[row['stage']] = {
+                'stage': row['stage'],
+                'timestamp': row['saved_at'],
+                'user': row['saved_by'],
+                'version': row['version'],
+                'data': data
+            }
+        
+        return stage_data
 
 def get_case_flow_data(case_id):
     """Get comprehensive flow data for a case from all previous stages"""
+    flush_audit_log()
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
@@ -22,7 +59,7 @@ def get_case_flow_data(case_id):
         # Get all comments/updates in chronological order
         cursor.execute("""
             SELECT * FROM case_comments 
-            WHERE case_id = ? 
+            WHERE case_id = ? AND comment NOT LIKE 'STAGE_DATA:%'
             ORDER BY created_at ASC
         """, (case_id,))
         comments = cursor.fetchall()
@@ -31,118 +68,66 @@ def get_case_flow_data(case_id):
         cursor.execute("""
             SELECT * FROM audit_logs 
             WHERE case_id = ? 
-            ORDER BY created_at ASC
+            ORDER BY performed_at ASC
         """, (case_id,))
         audit_logs = cursor.fetchall()
         
         # Get uploaded documents
         cursor.execute("""
-            SELECT * FROM uploaded_files 
+            SELECT * FROM documents 
             WHERE case_id = ? 
             ORDER BY uploaded_at ASC
         """, (case_id,))
         documents = cursor.fetchall()
         
-        # Organize flow data by stages
-        flow_data = {
-            'case_basic': dict(case_data) if case_data else {},
+        return {
+            'case_basic': dict(case_data),
             'comments': [dict(comment) for comment in comments],
             'audit_trail': [dict(log) for log in audit_logs],
             'documents': [dict(doc) for doc in documents],
-            'stage_data': {}
+            'stage_data': get_stage_data(case_id)
         }
-        
-        # Extract stage-specific data from comments
-        for comment in comments:
-            if comment['comment'].startswith('STAGE_DATA:'):
-                try:
-                    stage_info = json.loads(comment['comment'][11:])  # Remove 'STAGE_DATA:' prefix
-                    stage_name = stage_info.get('stage', 'Unknown')
-                    flow_data['stage_data'][stage_name] = stage_info
-                except json.JSONDecodeError:
-                    continue
-        
-        return flow_data
 
 def save_stage_data(case_id, stage_name, stage_data, user):
     """Save stage-specific data that will flow to next stages"""
-    from database import add_case_comment
-    
-    # Create stage data package
-    stage_package = {
-        'stage': stage_name,
-        'timestamp': datetime.now().isoformat(),
-        'user': user,
-        'data': stage_data
-    }
-    
-    # Save as special comment
-    stage_data_json = json.dumps(stage_package)
-    add_case_comment(case_id, f"STAGE_DATA:{stage_data_json}", user)
-    
-    # Log audit
-    log_audit(case_id, f"{stage_name} Data Saved", f"Stage data saved by {user}", user)
+    with CaseUnitOfWork(user) as uow:
+        uow.save_stage_data(case_id, stage_name, stage_data)
 
 def get_previous_stage_data(case_id, stage_names):
     """Get data from specific previous stages"""
-    flow_data = get_case_flow_data(case_id)
-    
-    if not flow_data:
-        return {}
-    
-    previous_data = {}
-    for stage_name in stage_names:
-        if stage_name in flow_data['stage_data']:
-            previous_data[stage_name] = flow_data['stage_data'][stage_name]['data']
-    
-    return previous_data
+    stage_data = get_stage_data(case_id, stage_names)
+    return {stage_name: stage_info['data'] for stage_name, stage_info in stage_data.items()}
 
 def update_case_with_flow_data(case_id, new_data, stage_name, user):
-    """Update case with new data while preserving flow history"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Build dynamic update query based on provided data
-        update_fields = []
-        values = []
+    """Update case with new data while preserving flow history
+    
+    The case update, stage data and audit entries commit in one transaction.
+    """
+    fields = {key: value for key, value in new_data.items() if key != 'case_id'}  # Don't update case_id
+    if not fields:
+        return
+    
+    with CaseUnitOfWork(user) as uow:
+        uow.update_case(case_id, dict(fields, updated_by=user))
         
-        for key, value in new_data.items():
-            if key != 'case_id':  # Don't update case_id
-                update_fields.append(f"{key} = ?")
-                values.append(value)
+        # Save stage data for flow
+        uow.save_stage_data(case_id, stage_name, new_data)
         
-        if update_fields:
-            # Add updated_by and updated_at
-            update_fields.extend(["updated_by = ?", "updated_at = CURRENT_TIMESTAMP"])
-            values.extend([user])
-            values.append(case_id)  # For WHERE clause
-            
-            query = f"UPDATE cases SET {', '.join(update_fields)} WHERE case_id = ?"
-            cursor.execute(query, values)
-            conn.commit()
-            
-            # Save stage data for flow
-            save_stage_data(case_id, stage_name, new_data, user)
-            
-            # Log audit
-            log_audit(case_id, f"{stage_name} Update", f"Case updated by {user}", user)
+        uow.audit(case_id, f"{stage_name} Update", f"Case updated by {user}")
 
 def show_previous_stage_summary(case_id, current_stage):
     """Display summary of data from previous stages"""
-    flow_data = get_case_flow_data(case_id)
-    
-    if not flow_data:
-        return
+    saved_stages = get_stage_data(case_id)
     
     st.markdown("### 📊 Previous Stage Summary")
     
     # Show stage progression
-    if flow_data['stage_data']:
-        stages_completed = list(flow_data['stage_data'].keys())
+    if saved_stages:
+        stages_completed = list(saved_stages.keys())
         st.markdown(f"**Completed Stages:** {' → '.join(stages_completed)} → **{current_stage}**")
         
         # Show key data from each stage
-        for stage_name, stage_info in flow_data['stage_data'].items():
+        for stage_name, stage_info in saved_stages.items():
             with st.expander(f"📋 {stage_name} Data", expanded=False):
                 stage_data = stage_info.get('data', {})
                 
@@ -199,58 +184,40 @@ def create_stage_data_form(case_id, stage_name, current_user, form_fields):
         return form_data
 
 def get_workflow_progression(case_id):
-    """Get the workflow progression for a case"""
-    flow_data = get_case_flow_data(case_id)
-    
-    if not flow_data:
-        return []
-    
-    # Standard workflow stages
-    all_stages = [
-        "Case Registration",
-        "Case Allocation", 
-        "Agency Investigation",
-        "Regional Investigation",
-        "Primary Review",
-        "Approver 1",
-        "Approver 2", 
-        "Final Review",
-        "Legal Review",
-        "Closure"
-    ]
+    """Get the workflow progression for a case from its workflow projection"""
+    workflow = get_case_workflow(case_id)
+    if workflow is None:
+        return {}
     
-    # Get completed stages
-    completed_stages = list(flow_data['stage_data'].keys())
-    current_status = flow_data['case_basic'].get('status', 'Unknown')
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT stage FROM case_stage_data WHERE case_id = ? ORDER BY id", (case_id,))
+        completed_stages = [row['stage'] for row in cursor.fetchall()]
     
-    # Map status to stage
-    status_to_stage = {
-        'Draft': 'Case Registration',
-        'Submitted': 'Case Allocation',
-        'Agency Investigation': 'Agency Investigation', 
-        'Regional Investigation': 'Regional Investigation',
-        'Under Investigation': 'Case Allocation',
-        'Primary Review': 'Primary Review',
-        'Under Review': 'Primary Review',
-        'Approved': 'Approver 1',
-        'Approver 2': 'Approver 2',
-        'Final Review': 'Final Review', 
-        'Legal Review': 'Legal Review',
-        'Closed': 'Closure'
-    }
+    current_status = workflow['status'] or 'Unknown'
+    current_stage = workflow['stage'] or current_status
     
-    current_stage = status_to_stage.get(current_status, current_status)
+    # Stages the case has moved out of count as completed too
+    for event in workflow['events']:
+        if event['from_status']:
+            stage = stage_for_status(event['from_status'])
+            if stage != current_stage and stage not in completed_stages:
+                completed_stages.append(stage)
     
     return {
-        'all_stages': all_stages,
+        'all_stages': WORKFLOW_STAGES,
         'completed_stages': completed_stages,
         'current_stage': current_stage,
-        'current_status': current_status
+        'current_status': current_status,
+        'entered_at': workflow['entered_at'],
+        'days_in_stage': (workflow['seconds_in_status'] or 0) / 86400
     }
 
 def show_workflow_progress_tracker(case_id):
     """Display workflow progress tracker"""
     progression = get_workflow_progression(case_id)
+    if not progression:
+        return
     
     st.markdown("### 🔄 Workflow Progress Tracker")
     
@@ -300,4 +267,7 @@ def show_workflow_progress_tracker(case_id):
     st.markdown(progress_html, unsafe_allow_html=True)
     
     # Show current status
-    st.markdown(f"**Current Status:** {progression['current_status']} | **Current Stage:** {progression['current_stage']}")
\ No newline at end of file
+    st.markdown(
+        f"**Current Status:** {progression['current_status']} | **Current Stage:** {progression['current_stage']}"
+        f" | **In Stage:** {progression['days_in_stage']:.1f} days"
+    )
\ No newline at end of file
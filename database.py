@@ -1,18 +1,42 @@
 import sqlite3
 import os
 import hashlib
-from datetime import datetime
+import time
+import atexit
+import threading
+from datetime import datetime, timezone
 from contextlib import contextmanager
+from query_cache import cached_query
 
 DATABASE_PATH = "case_management.db"
 
+# Connection tuning applied once to every pooled connection
+SQLITE_BUSY_TIMEOUT_MS = 30000
+SQLITE_CACHE_SIZE_KB = 65536
+SQLITE_MMAP_SIZE = 268435456
+
+_local = threading.local()
+_writer_lock = threading.RLock()
+_writer_conn = None
+_journal_lock = threading.Lock()
+_journal_configured = False
+
+# Audit entries logged outside a transaction are group-committed in batches
+AUDIT_BATCH_SIZE = 200
+AUDIT_FLUSH_INTERVAL_SECONDS = 1.0
+
+_audit_buffer = []
+_audit_condition = threading.Condition()
+_audit_flush_lock = threading.Lock()
+_audit_writer = None
+
 def get_password_hash(password):
     """Generate password hash"""
     return hashlib.sha256(password.encode()).hexdigest()
 
 def create_account_request(request_data):
     """Create a new account request"""
-    with get_db_connection() as conn:
+    with get_write_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO account_requests 
@@ -45,7 +69,7 @@ def get_account_requests(status=None):
 
 def update_account_request_status(request_id, status, admin_notes=None, processed_by=None):
     """Update account request status"""
-    with get_db_connection() as conn:
+    with get_write_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             UPDATE account_requests 
@@ -55,455 +79,229 @@ def update_account_request_status(request_id, status, admin_notes=None, processe
         conn.commit()
         return cursor.rowcount > 0
 
+def _open_connection(check_same_thread=True):
+    """Open a new SQLite connection with the standard pragmas applied"""
+    global _journal_configured
+    conn = sqlite3.connect(
+        DATABASE_PATH,
+        timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=check_same_thread
+    )
+    conn.row_factory = sqlite3.Row
+    
+    # WAL is persistent in the database file, so only switch it on once per process
+    if not _journal_configured:
+        with _journal_lock:
+            if not _journal_configured:
+                conn.execute("PRAGMA journal_mode=WAL")
+                _journal_configured = True
+    
+    conn.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+def _get_thread_connection():
+    """Get (or lazily open) the pooled connection owned by the current thread"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _open_connection()
+        _local.conn = conn
+        _local.depth = 0
+    return conn
+
 @contextmanager
 def get_db_connection():
-    """Database connection context manager"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
+    """Database connection context manager
+    
+    Yields the calling thread's pooled connection. Nested calls on the same
+    thread share the connection; anything left uncommitted when the outermost
+    block exits is rolled back, matching the old close-per-call behaviour.
+    """
+    conn = _get_thread_connection()
+    _local.depth += 1
     try:
         yield conn
     finally:
+        _local.depth -= 1
+        if _local.depth == 0 and conn.in_transaction:
+            conn.rollback()
+
+@contextmanager
+def get_write_connection():
+    """Serialized writer connection context manager
+    
+    All writers in the process share one connection guarded by a lock, so they
+    queue in Python instead of spinning on SQLITE_BUSY. The block runs in a
+    single IMMEDIATE transaction that commits on success and rolls back on error.
+    Nested calls on the same thread join the outer transaction.
+    """
+    global _writer_conn
+    
+    # The thread already holds uncommitted writes on its pooled connection;
+    # join that transaction rather than wait on our own write lock.
+    thread_conn = getattr(_local, "conn", None)
+    if thread_conn is not None and thread_conn.in_transaction:
+        yield thread_conn
+        return
+    
+    with _writer_lock:
+        if _writer_conn is None:
+            _writer_conn = _open_connection(check_same_thread=False)
+        conn = _writer_conn
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        _local.writer_depth = getattr(_local, "writer_depth", 0) + 1
+        try:
+            yield conn
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        else:
+            if conn.in_transaction:
+                conn.commit()
+        finally:
+            _local.writer_depth -= 1
+
+def close_all_connections():
+    """Close the current thread's and the writer's pooled connections"""
+    global _writer_conn
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "depth", 0) == 0:
         conn.close()
+        _local.conn = None
+    with _writer_lock:
+        if _writer_conn is not None:
+            _writer_conn.close()
+            _writer_conn = None
+
+def _get_open_transaction():
+    """Return the connection holding this thread's open write transaction, if any"""
+    thread_conn = getattr(_local, "conn", None)
+    if thread_conn is not None and thread_conn.in_transaction:
+        return thread_conn
+    if getattr(_local, "writer_depth", 0) > 0 and _writer_conn is not None and _writer_conn.in_transaction:
+        return _writer_conn
+    return None
 
 def init_database():
-    """Initialize database with tables and default data"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                role TEXT NOT NULL,
-                email TEXT,
-                name TEXT,
-                team TEXT,
-                functional_designation TEXT,
-                referred_by TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_active BOOLEAN DEFAULT 1
-            )
-        ''')
-        
-        # Create interaction_requests table for workflow communication
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS interaction_requests (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                case_id TEXT NOT NULL,
-                from_stage TEXT NOT NULL,
-                to_stage TEXT NOT NULL,
-                request_type TEXT NOT NULL,
-                message TEXT NOT NULL,
-                requested_by TEXT NOT NULL,
-                status TEXT DEFAULT 'Pending',
-                response TEXT,
-                responded_by TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                responded_at TIMESTAMP,
-                FOREIGN KEY (case_id) REFERENCES cases (case_id)
-            )
-        ''')
-        
-        # Account requests table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS account_requests (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                full_name TEXT NOT NULL,
-                email TEXT NOT NULL,
-                phone TEXT,
-                organization TEXT,
-                designation TEXT,
-                requested_role TEXT NOT NULL,
-                business_justification TEXT NOT NULL,
-                manager_name TEXT,
-                manager_email TEXT,
-                status TEXT DEFAULT 'Pending',
-                admin_notes TEXT,
-                processed_by TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                processed_at TIMESTAMP
-            )
-        ''')
-        
-        # Cases table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cases (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                case_id TEXT UNIQUE NOT NULL,
-                lan TEXT NOT NULL,
-                case_type TEXT NOT NULL,
-                product TEXT NOT NULL,
-                region TEXT NOT NULL,
-                referred_by TEXT NOT NULL,
-                case_description TEXT NOT NULL,
-                case_date DATE NOT NULL,
-                status TEXT DEFAULT 'Draft',
-                created_by TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                reviewed_by TEXT,
-                reviewed_at TIMESTAMP,
-                approved_by TEXT,
-                approved_at TIMESTAMP,
-                legal_reviewed_by TEXT,
-                legal_reviewed_at TIMESTAMP,
-                closed_by TEXT,
-                closed_at TIMESTAMP,
-                closure_reason TEXT,
-                -- SLA tracking
-                fmr1_due_date DATE,
-                fmr1_submitted_date DATE,
-                fmr3_due_date DATE,
-                fmr3_submitted_date DATE,
-                document_retention_date DATE,
-                sla_status TEXT DEFAULT 'On Track',
-                -- Demographics
-                customer_name TEXT,
-                customer_dob DATE,
-                customer_pan TEXT,
-                customer_address TEXT,
-                customer_mobile TEXT,
-                customer_email TEXT,
-                branch_location TEXT,
-                loan_amount DECIMAL(15,2),
-                disbursement_date DATE,
-                repayment_status TEXT,
-                linked_loan_accounts TEXT,
-                customer_type TEXT DEFAULT 'Individual',
-                kyc_status TEXT DEFAULT 'Pending',
-                risk_category TEXT,
-                case_source TEXT,
-                FOREIGN KEY (created_by) REFERENCES users (username)
-            )
-        ''')
-        
-        # Documents table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS documents (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                case_id TEXT NOT NULL,
-                filename TEXT NOT NULL,
-                original_filename TEXT NOT NULL,
-                file_path TEXT NOT NULL,
-                file_size INTEGER NOT NULL,
-                uploaded_by TEXT NOT NULL,
-                uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (case_id) REFERENCES cases (case_id),
-                FOREIGN KEY (uploaded_by) REFERENCES users (username)
-            )
-        ''')
-        
-        # Audit logs table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS audit_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                case_id TEXT,
-                action TEXT NOT NULL,
-                details TEXT,
-                performed_by TEXT NOT NULL,
-                performed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (case_id) REFERENCES cases (case_id),
-                FOREIGN KEY (performed_by) REFERENCES users (username)
-            )
-        ''')
-        
-        # Case actions table for Case Action workflow
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS case_actions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                case_id TEXT NOT NULL,
-                action_type TEXT NOT NULL,
-                action_details TEXT,
-                created_by TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (case_id) REFERENCES cases (case_id),
-                FOREIGN KEY (created_by) REFERENCES users (username)
-            )
-        ''')
-        
-        # Case documents table for document uploads
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS case_documents (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                case_id TEXT NOT NULL,
-                original_filename TEXT NOT NULL,
-                stored_filename TEXT NOT NULL,
-                file_path TEXT NOT NULL,
-                upload_type TEXT,
-                uploaded_by TEXT NOT NULL,
-                uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (case_id) REFERENCES cases (case_id),
-                FOREIGN KEY (uploaded_by) REFERENCES users (username)
-            )
-        ''')
-        
-        # Case comments table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS case_comments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                case_id TEXT NOT NULL,
-                comment TEXT NOT NULL,
-                comment_type TEXT DEFAULT 'General',
-                created_by TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (case_id) REFERENCES cases (case_id),
-                FOREIGN KEY (created_by) REFERENCES users (username)
-            )
-        ''')
-        
-        # Investigation details table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS investigation_details (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                case_id TEXT NOT NULL,
-                investigation_type TEXT,
-                investigation_status TEXT DEFAULT 'In Progress',
-                field_verification_status TEXT DEFAULT 'Pending',
-                document_verification_status TEXT DEFAULT 'Pending',
-                reference_verification_status TEXT DEFAULT 'Pending',
-                technical_verification_status TEXT DEFAULT 'Pending',
-                investigation_findings TEXT,
-                risk_assessment TEXT,
-                fraud_indicators TEXT,
-                recommendations TEXT,
-                evidence_collected TEXT,
-                investigation_date DATE,
-                completed_date DATE,
-                investigator_name TEXT,
-                supervisor_name TEXT,
-                final_conclusion TEXT,
-                created_by TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (case_id) REFERENCES cases (case_id),
-                FOREIGN KEY (created_by) REFERENCES users (username)
-            )
-        ''')
-        
-        # Case assignments table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS case_assignments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                case_id TEXT NOT NULL,
-                assignment_types TEXT,
-                assignee TEXT,
-                tat TEXT,
-                assigned_by TEXT,
-                assignment_date TEXT,
-                status TEXT DEFAULT 'Active',
-                FOREIGN KEY (case_id) REFERENCES cases (case_id)
-            )
-        ''')
-        
-        # Agency responses table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS agency_responses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                case_id TEXT NOT NULL,
-                agency_name TEXT,
-                investigation_status TEXT,
-                investigation_summary TEXT,
-                risk_assessment TEXT,
-                recommendation TEXT,
-                additional_comments TEXT,
-                verification_details TEXT,
-                response_routing TEXT,
-                submitted_by TEXT,
-                submission_date TEXT,
-                FOREIGN KEY (case_id) REFERENCES cases (case_id)
-            )
-        ''')
-        
-        conn.commit()
-        
-        # Add new columns to existing users table if they don't exist
-        try:
-            cursor.execute("ALTER TABLE users ADD COLUMN name TEXT")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        try:
-            cursor.execute("ALTER TABLE users ADD COLUMN team TEXT")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        try:
-            cursor.execute("ALTER TABLE users ADD COLUMN functional_designation TEXT")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        try:
-            cursor.execute("ALTER TABLE users ADD COLUMN referred_by TEXT")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        try:
-            cursor.execute("ALTER TABLE users ADD COLUMN all_roles_access BOOLEAN DEFAULT 0")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        # Add missing columns to investigation_details table if they don't exist
-        try:
-            cursor.execute("ALTER TABLE investigation_details ADD COLUMN investigation_findings TEXT")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        try:
-            cursor.execute("ALTER TABLE investigation_details ADD COLUMN recommendations TEXT")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
+    """Initialize database with tables and default data
+    
+    Applies any pending schema migrations. Only the first call in a process
+    touches the database; later calls (every Streamlit rerun) return at once.
+    """
+    from migrations import apply_migrations
+    return apply_migrations()
+
+AUDIT_INSERT_SQL = "INSERT INTO audit_logs (case_id, action, details, performed_by, performed_at) VALUES (?, ?, ?, ?, ?)"
+
+def log_audit(case_id, action, details, performed_by, conn=None):
+    """Log audit trail
+    
+    The entry is written in the caller's transaction when one is open on this
+    thread (or `conn` is passed), so it commits or rolls back with the change it
+    describes. Otherwise it is buffered and group-committed by a background
+    writer; call flush_audit_log() to force buffered entries out.
+    """
+    # Same format as CURRENT_TIMESTAMP, captured now rather than at flush time
+    performed_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    entry = (case_id, action, details, performed_by, performed_at)
+    
+    conn = conn or _get_open_transaction()
+    if conn is not None:
+        conn.execute(AUDIT_INSERT_SQL, entry)
+        return
+    
+    with _audit_condition:
+        _audit_buffer.append(entry)
+        if len(_audit_buffer) >= AUDIT_BATCH_SIZE:
+            _audit_condition.notify()
+    _ensure_audit_writer()
+
+def flush_audit_log():
+    """Write all buffered audit entries in one transaction; returns the count"""
+    with _audit_flush_lock:
+        with _audit_condition:
+            batch = list(_audit_buffer)
+            del _audit_buffer[:]
+        if not batch:
+            return 0
         try:
-            cursor.execute("ALTER TABLE investigation_details ADD COLUMN risk_assessment TEXT")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        # Achievement tables
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS achievements (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                description TEXT NOT NULL,
-                icon TEXT NOT NULL,
-                tier TEXT NOT NULL DEFAULT 'bronze',
-                points INTEGER NOT NULL DEFAULT 10,
-                category TEXT NOT NULL DEFAULT 'General',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_achievements (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL,
-                achievement_id TEXT NOT NULL,
-                earned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (username) REFERENCES users (username),
-                FOREIGN KEY (achievement_id) REFERENCES achievements (id),
-                UNIQUE(username, achievement_id)
+            with get_write_connection() as conn:
+                conn.executemany(AUDIT_INSERT_SQL, batch)
+        except Exception:
+            # Put the batch back in front so nothing is lost; retried on next flush
+            with _audit_condition:
+                _audit_buffer[:0] = batch
+            raise
+        return len(batch)
+
+def _audit_writer_loop():
+    """Background writer: flush when the buffer fills or the interval elapses"""
+    while True:
+        with _audit_condition:
+            _audit_condition.wait_for(
+                lambda: len(_audit_buffer) >= AUDIT_BATCH_SIZE,
+                timeout=AUDIT_FLUSH_INTERVAL_SECONDS
             )
-        ''')
-        
-        conn.commit()
-        
-        # Clean up old test users first
-        test_users_to_remove = ["initiator", "reviewer", "approver", "legal", "closure", "actioner"]
-        for user_id in test_users_to_remove:
-            cursor.execute("DELETE FROM users WHERE username = ?", (user_id,))
-        
-        # Insert default users if they don't exist (all real users from the master list)
-        default_users = [
-            ("admin", "admin123", "Admin", "admin@abcl.com", "System Administrator", "IT", "System Admin", "Technical Team")
-        ]
-        
-        for username, password, role, email, name, team, designation, referred_by in default_users:
-            cursor.execute("SELECT COUNT(*) FROM users WHERE username = ?", (username,))
-            if cursor.fetchone()[0] == 0:
-                password_hash = get_password_hash(password)
-                cursor.execute('''
-                    INSERT INTO users (username, password_hash, role, email, name, team, 
-                                     functional_designation, referred_by) 
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (username, password_hash, role, email, name, team, designation, referred_by))
-        
-        # Initialize default achievements
-        default_achievements = [
-            ("first_case", "First Case", "Handle your first case", "🎯", "bronze", 10, "Getting Started"),
-            ("cases_5", "Case Handler", "Successfully handle 5 cases", "📝", "bronze", 25, "Progress"),
-            ("cases_10", "Case Expert", "Successfully handle 10 cases", "🏅", "silver", 50, "Progress"),
-            ("cases_25", "Case Master", "Successfully handle 25 cases", "🎖️", "silver", 100, "Progress"),
-            ("cases_50", "Case Champion", "Successfully handle 50 cases", "🏆", "gold", 250, "Progress"),
-            ("cases_100", "Case Legend", "Successfully handle 100 cases", "👑", "gold", 500, "Progress"),
-            ("speed_resolver", "Speed Demon", "Resolve cases quickly", "⚡", "silver", 75, "Performance"),
-            ("quality_expert", "Quality Master", "Maintain high quality standards", "💎", "gold", 200, "Performance"),
-            ("team_player", "Team Player", "Collaborate effectively", "🤝", "bronze", 30, "Collaboration"),
-            ("mentor", "Mentor", "Help train new team members", "🎓", "gold", 150, "Leadership")
-        ]
-        
-        for achievement_id, name, description, icon, tier, points, category in default_achievements:
-            cursor.execute("SELECT COUNT(*) FROM achievements WHERE id = ?", (achievement_id,))
-            if cursor.fetchone()[0] == 0:
-                cursor.execute('''
-                    INSERT INTO achievements (id, name, description, icon, tier, points, category) 
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (achievement_id, name, description, icon, tier, points, category))
-        
-        conn.commit()
+        try:
+            flush_audit_log()
+        except Exception as e:
+            print(f"Error flushing audit log: {e}")
+            time.sleep(AUDIT_FLUSH_INTERVAL_SECONDS)
 
-def log_audit(case_id, action, details, performed_by):
-    """Log audit trail"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO audit_logs (case_id, action, details, performed_by) VALUES (?, ?, ?, ?)",
-            (case_id, action, details, performed_by)
-        )
-        conn.commit()
+def _ensure_audit_writer():
+    """Start the background audit writer on first use"""
+    global _audit_writer
+    if _audit_writer is not None and _audit_writer.is_alive():
+        return
+    with _audit_condition:
+        if _audit_writer is None or not _audit_writer.is_alive():
+            _audit_writer = threading.Thread(target=_audit_writer_loop, name="audit-log-writer", daemon=True)
+            _audit_writer.start()
+
+def _flush_audit_log_at_exit():
+    """Make sure buffered audit entries survive interpreter shutdown"""
+    try:
+        flush_audit_log()
+    except Exception as e:
+        print(f"Error flushing audit log at exit: {e}")
+
+atexit.register(_flush_audit_log_at_exit)
 
 def update_case_status(case_id, new_status, updated_by, comments=None):
-    """Update case status"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Update case status
-        update_fields = ["status = ?", "updated_at = CURRENT_TIMESTAMP"]
-        params = [new_status]
-        
-        # Add specific reviewer fields based on status
-        if new_status == "Under Review":
-            update_fields.append("reviewed_by = ?")
-            update_fields.append("reviewed_at = CURRENT_TIMESTAMP")
-            params.append(updated_by)
-        elif new_status == "Approved":
-            update_fields.append("approved_by = ?")
-            update_fields.append("approved_at = CURRENT_TIMESTAMP")
-            params.append(updated_by)
-        elif new_status == "Legal Review":
-            update_fields.append("legal_reviewed_by = ?")
-            update_fields.append("legal_reviewed_at = CURRENT_TIMESTAMP")
-            params.append(updated_by)
-        elif new_status == "Closed":
-            update_fields.append("closed_by = ?")
-            update_fields.append("closed_at = CURRENT_TIMESTAMP")
-            params.append(updated_by)
-        
-        params.append(case_id)
-        
-        cursor.execute(f'''
-            UPDATE cases 
-            SET {", ".join(update_fields)}
-            WHERE case_id = ?
-        ''', params)
-        
-        # Add comment if provided
+    """Update case status
+    
+    The status change, optional comment and audit entries commit together.
+    """
+    from unit_of_work import CaseUnitOfWork
+    
+    with CaseUnitOfWork(updated_by) as uow:
+        uow.set_status(case_id, new_status, comments=comments)
         if comments:
-            cursor.execute('''
-                INSERT INTO case_comments (case_id, comment, comment_type, created_by)
-                VALUES (?, ?, ?, ?)
-            ''', (case_id, comments, f"Status Change to {new_status}", updated_by))
-        
-        conn.commit()
-        
-        # Log audit
-        log_audit(case_id, "Status Update", f"Status changed to: {new_status}", updated_by)
-        
-        return True
+            uow.add_comment(case_id, comments, f"Status Change to {new_status}")
+        uow.audit(case_id, "Status Update", f"Status changed to: {new_status}")
+    
+    return True
 
 def add_case_comment(case_id, comment, created_by, comment_type="General"):
     """Add comment to a case"""
-    with get_db_connection() as conn:
+    with get_write_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO case_comments (case_id, comment, comment_type, created_by)
             VALUES (?, ?, ?, ?)
         ''', (case_id, comment, comment_type, created_by))
-        conn.commit()
         
-        # Log audit
-        log_audit(case_id, "Comment Added", f"Comment type: {comment_type}", created_by)
+        # Log audit in the same transaction
+        log_audit(case_id, "Comment Added", f"Comment type: {comment_type}", created_by, conn)
 
+@cached_query("users")
 def get_investigator_names():
     """Get all active user names for investigator assignment dropdowns"""
     with get_db_connection() as conn:
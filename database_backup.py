@@ -0,0 +1,361 @@
+"""
+Online backups of the case database and its archives
+Full backups go through the SQLite backup API a few pages at a time, so a
+backup of the live database never holds up writers for long and never catches
+a half-written file the way a plain file copy can. Each copy is checked with
+PRAGMA integrity_check before it is kept, optionally gzipped, and rotated so
+only the newest BACKUP_RETENTION_COUNT full backups (and the incrementals
+taken on top of them) stay on disk.
+
+Incremental backups take the same online copy but only store the pages that
+changed since the previous backup in the chain, so frequent backups cost disk
+in proportion to the change volume. Restoring replays the chain onto its full
+backup.
+
+The yearly archive files under case_archive.ARCHIVE_DIR hold the only copy of
+archived cases, so every backup run also takes a full, checked backup of each
+archive (an incremental run only of archives written since their last
+backup), rotated per archive like the main database.
+
+Back up by hand with: python database_backup.py [--incremental] [--no-compress]
+Check a backup restores cleanly with: python database_backup.py --verify NAME
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import struct
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from case_archive import archive_path, archive_years
+from database import DATABASE_PATH, _open_connection
+
+BACKUP_DIR = "backups"
+BACKUP_PREFIX = "case_management"
+ARCHIVE_BACKUP_PREFIX = "case_archive_{year}"
+BACKUP_FILE_PATTERN = re.compile(
+    rf"^({BACKUP_PREFIX}|case_archive_\d{{4}})_(\d{{8}}_\d{{6}}_\d{{6}})\.(full\.db(?:\.gz)?|inc\.gz)$"
+)
+CHAIN_STATE_FILE = "incremental_state.json"
+
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_SLEEP_SECONDS = 0.05
+# Writes from other connections restart a stepped backup; after this many it finishes in one pass
+BACKUP_MAX_RESTARTS = 5
+BACKUP_RETENTION_COUNT = 14
+
+PAGE_RECORD_HEADER = struct.Struct(">I")
+
+class BackupError(Exception):
+    """A backup or restore failed its integrity check"""
+
+class _BackupRestarted(Exception):
+    pass
+
+def _backup_name(kind, prefix=BACKUP_PREFIX):
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    return f"{prefix}_{timestamp}.{kind}"
+
+def _online_copy(target_path, source_path=None):
+    """Copy the live database (or source_path) to target_path with the backup API, returning its page count"""
+    source = _open_connection() if source_path is None else sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    restarts = [0]
+    remaining_before = [None]
+
+    def progress(status, remaining, total):
+        if remaining_before[0] is not None and remaining > remaining_before[0]:
+            restarts[0] += 1
+            if restarts[0] > BACKUP_MAX_RESTARTS:
+                raise _BackupRestarted()
+        remaining_before[0] = remaining
+
+    try:
+        try:
+            source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=progress, sleep=BACKUP_STEP_SLEEP_SECONDS)
+        except _BackupRestarted:
+            # One pass reads a single WAL snapshot, so it finishes however busy the writers are
+            source.backup(target, pages=-1)
+
+        # The copy is a standalone file: no -wal sidecar to ship with it
+        target.execute("PRAGMA journal_mode=DELETE")
+        check_integrity(target)
+        return target.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        target.close()
+        source.close()
+
+def check_integrity(conn):
+    """Raise BackupError unless PRAGMA integrity_check passes on conn"""
+    problems = [row[0] for row in conn.execute("PRAGMA integrity_check").fetchall()]
+    if problems != ["ok"]:
+        raise BackupError("; ".join(problems[:5]))
+
+def _page_hashes(path, page_size):
+    hashes = []
+    with open(path, "rb") as f:
+        for page in iter(lambda: f.read(page_size), b""):
+            hashes.append(hashlib.blake2b(page, digest_size=8).hexdigest())
+    return hashes
+
+def _page_size(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA page_size").fetchone()[0]
+    finally:
+        conn.close()
+
+def _load_chain_state():
+    try:
+        with open(os.path.join(BACKUP_DIR, CHAIN_STATE_FILE), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def _save_chain_state(state):
+    path = os.path.join(BACKUP_DIR, CHAIN_STATE_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+def _full_backup(name, compress, source_path=None):
+    """Write a checked full copy to BACKUP_DIR/name; returns (path, pages, page_size, page hashes)"""
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    path = os.path.join(BACKUP_DIR, name)
+    partial = os.path.join(BACKUP_DIR, f".{name}.partial")
+
+    try:
+        pages = _online_copy(partial, source_path)
+        page_size = _page_size(partial)
+        hashes = _page_hashes(partial, page_size)
+        if compress:
+            with open(partial, "rb") as src, gzip.open(path, "wb") as dest:
+                shutil.copyfileobj(src, dest, 1024 * 1024)
+            os.remove(partial)
+        else:
+            os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return path, pages, page_size, hashes
+
+def create_backup(compress=True):
+    """Take a verified full backup of the live database and every archive
+
+    Returns {name, path, size, pages, seconds, archives}, archives being the
+    backup_archives summaries. The backup also starts a new chain for
+    create_incremental_backup.
+    """
+    started = time.monotonic()
+    name = _backup_name("full.db.gz" if compress else "full.db")
+    path, pages, page_size, hashes = _full_backup(name, compress)
+    _save_chain_state({"base": name, "page_size": page_size, "hashes": hashes})
+    archives = backup_archives(compress=compress)
+    rotate_backups()
+    return {"name": name, "path": path, "size": os.path.getsize(path), "pages": pages,
+            "seconds": time.monotonic() - started, "archives": archives}
+
+def _modified_at(path):
+    """Newest modification time of a database file and its WAL"""
+    return max(datetime.fromtimestamp(os.path.getmtime(candidate))
+               for candidate in (path, f"{path}-wal") if os.path.exists(candidate))
+
+def backup_archives(changed_only=False, compress=True):
+    """Take a verified full backup of each case archive file
+
+    With changed_only, archives not written since their newest backup are
+    skipped. Returns one {name, path, size, pages} per archive backed up.
+    """
+    newest = {}
+    for backup in list_backups():
+        if backup["kind"] == "full":
+            newest[backup["database"]] = backup["taken_at"]
+
+    results = []
+    for year in archive_years():
+        source = archive_path(year)
+        prefix = ARCHIVE_BACKUP_PREFIX.format(year=year)
+        if changed_only and prefix in newest and _modified_at(source) <= newest[prefix]:
+            continue
+        name = _backup_name("full.db.gz" if compress else "full.db", prefix)
+        path, pages, _, _ = _full_backup(name, compress, source)
+        results.append({"name": name, "path": path, "size": os.path.getsize(path), "pages": pages})
+    return results
+
+def create_incremental_backup():
+    """Store only the pages changed since the last backup in the chain
+
+    Falls back to a full backup when there is no chain yet or the page size
+    changed. Returns the same summary as create_backup plus changed_pages.
+    """
+    state = _load_chain_state()
+    if state is None or not os.path.exists(os.path.join(BACKUP_DIR, state["base"])):
+        return dict(create_backup(), changed_pages=None)
+
+    started = time.monotonic()
+    name = _backup_name("inc.gz")
+    path = os.path.join(BACKUP_DIR, name)
+    handle, snapshot = tempfile.mkstemp(dir=BACKUP_DIR, suffix=".snapshot")
+    os.close(handle)
+
+    try:
+        pages = _online_copy(snapshot)
+        page_size = _page_size(snapshot)
+        if page_size != state["page_size"]:
+            os.remove(snapshot)
+            return dict(create_backup(), changed_pages=None)
+
+        previous = state["hashes"]
+        hashes = []
+        changed = 0
+        with open(snapshot, "rb") as src, gzip.open(path + ".partial", "wb") as dest:
+            header = {"base": state["base"], "page_size": page_size, "page_count": pages}
+            dest.write(json.dumps(header).encode() + b"\n")
+            for page_number, page in enumerate(iter(lambda: src.read(page_size), b"")):
+                digest = hashlib.blake2b(page, digest_size=8).hexdigest()
+                hashes.append(digest)
+                if page_number >= len(previous) or previous[page_number] != digest:
+                    dest.write(PAGE_RECORD_HEADER.pack(page_number))
+                    dest.write(page)
+                    changed += 1
+        os.replace(path + ".partial", path)
+    finally:
+        for leftover in (snapshot, path + ".partial"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    _save_chain_state({"base": state["base"], "page_size": page_size, "hashes": hashes})
+    archives = backup_archives(changed_only=True)
+    rotate_backups()
+    return {"name": name, "path": path, "size": os.path.getsize(path), "pages": pages,
+            "changed_pages": changed, "seconds": time.monotonic() - started, "archives": archives}
+
+def list_backups():
+    """Backups on disk, oldest first, as {name, database, kind, taken_at, size}"""
+    if not os.path.isdir(BACKUP_DIR):
+        return []
+    backups = []
+    for name in os.listdir(BACKUP_DIR):
+        match = BACKUP_FILE_PATTERN.match(name)
+        if match:
+            backups.append({
+                "name": name,
+                "database": match.group(1),
+                "kind": "incremental" if match.group(3) == "inc.gz" else "full",
+                "taken_at": datetime.strptime(match.group(2), "%Y%m%d_%H%M%S_%f"),
+                "size": os.path.getsize(os.path.join(BACKUP_DIR, name)),
+            })
+    return sorted(backups, key=lambda backup: (backup["taken_at"], backup["kind"] == "incremental"))
+
+def rotate_backups(keep=BACKUP_RETENTION_COUNT):
+    """Per database, delete all but the newest keep full backups and the incrementals older than them"""
+    by_database = {}
+    for backup in list_backups():
+        by_database.setdefault(backup["database"], []).append(backup)
+
+    removed = []
+    for backups in by_database.values():
+        fulls = [backup for backup in backups if backup["kind"] == "full"]
+        if len(fulls) <= keep:
+            continue
+        oldest_kept = fulls[-keep]["taken_at"]
+        for backup in backups:
+            if backup["taken_at"] < oldest_kept:
+                os.remove(os.path.join(BACKUP_DIR, backup["name"]))
+                removed.append(backup["name"])
+    return removed
+
+def _read_increment(path):
+    with gzip.open(path, "rb") as f:
+        header = json.loads(f.readline())
+        pages = []
+        while True:
+            record = f.read(PAGE_RECORD_HEADER.size)
+            if not record:
+                break
+            pages.append((PAGE_RECORD_HEADER.unpack(record)[0], f.read(header["page_size"])))
+    return header, pages
+
+def restore_backup(name, target_path):
+    """Rebuild the database as of backup name at target_path and integrity-check it
+
+    Incrementals are restored by replaying every increment of their chain, up
+    to and including name, onto the chain's full backup. The live database is
+    never touched.
+    """
+    chain = [name]
+    if name.endswith(".inc.gz"):
+        header, _ = _read_increment(os.path.join(BACKUP_DIR, name))
+        base = header["base"]
+        chain = [base]
+        for backup in list_backups():
+            if backup["kind"] == "incremental" and backup["name"] <= name:
+                increment_header, _ = _read_increment(os.path.join(BACKUP_DIR, backup["name"]))
+                if increment_header["base"] == base:
+                    chain.append(backup["name"])
+
+    base_path = os.path.join(BACKUP_DIR, chain[0])
+    opener = gzip.open if base_path.endswith(".gz") else open
+    with opener(base_path, "rb") as src, open(target_path, "wb") as dest:
+        shutil.copyfileobj(src, dest, 1024 * 1024)
+
+    with open(target_path, "r+b") as dest:
+        for increment in chain[1:]:
+            header, pages = _read_increment(os.path.join(BACKUP_DIR, increment))
+            for page_number, page in pages:
+                dest.seek(page_number * header["page_size"])
+                dest.write(page)
+            dest.truncate(header["page_count"] * header["page_size"])
+
+    conn = sqlite3.connect(target_path)
+    try:
+        check_integrity(conn)
+    finally:
+        conn.close()
+    return target_path
+
+def verify_backup(name):
+    """Restore backup name to a scratch file and integrity-check it; True when it is sound"""
+    handle, scratch = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+    try:
+        restore_backup(name, scratch)
+        return True
+    except (BackupError, sqlite3.DatabaseError, OSError, ValueError) as e:
+        print(f"Backup {name} failed verification: {e}")
+        return False
+    finally:
+        os.remove(scratch)
+
+def main(argv):
+    if "--verify" in argv:
+        name = argv[argv.index("--verify") + 1]
+        ok = verify_backup(name)
+        print(f"{name}: {'restores cleanly' if ok else 'FAILED verification'}")
+        return 0 if ok else 1
+
+    if not os.path.exists(DATABASE_PATH):
+        print(f"No database at {DATABASE_PATH}")
+        return 1
+
+    if "--incremental" in argv:
+        result = create_incremental_backup()
+    else:
+        result = create_backup(compress="--no-compress" not in argv)
+
+    changed = result.get("changed_pages")
+    detail = f", {changed} changed pages" if changed is not None else ""
+    print(f"Wrote {result['path']} ({result['size'] / 1024:.0f} KB, {result['pages']} pages{detail}) "
+          f"in {result['seconds']:.1f}s")
+    for archive in result["archives"]:
+        print(f"Wrote {archive['path']} ({archive['size'] / 1024:.0f} KB, {archive['pages']} pages)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
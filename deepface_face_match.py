@@ -1,13 +1,16 @@
 import streamlit as st
-import cv2
 import numpy as np
-from deepface import DeepFace
 from PIL import Image
 import io
 import base64
 import tempfile
 import os
 
+from face_embeddings import verify_images, embed_images, cosine_distance_matrix, verification_threshold
+
+# Rows drawn for a bulk comparison; larger result sets are summarised
+BULK_RESULTS_SHOWN = 200
+
 def image_to_temp_file(uploaded_file):
     """Convert uploaded file to temporary file for DeepFace processing"""
     try:
@@ -33,13 +36,8 @@ def compare_faces_deepface(image1_path, image2_path, model_name='VGG-Face'):
     Available models: VGG-Face, Facenet, OpenFace, DeepFace, DeepID, ArcFace, Dlib, SFace
     """
     try:
-        # Verify faces using DeepFace
-        result = DeepFace.verify(
-            img1_path=image1_path,
-            img2_path=image2_path,
-            model_name=model_name,
-            distance_metric='cosine'
-        )
+        # Verify faces from cached embeddings; each image is only run through the model once
+        result = verify_images(image1_path, image2_path, model_name, enforce_detection=True)
         
         # Convert distance to confidence percentage
         distance = result['distance']
@@ -116,7 +114,7 @@ def show_deepface_interface():
     # Upload option selection
     upload_mode = st.radio(
         "Choose upload method:",
-        ["Compare Two Images", "Upload All Photos at Once"],
+        ["Compare Two Images", "Upload All Photos at Once", "Search Prior Cases"],
         horizontal=True
     )
     
@@ -124,6 +122,10 @@ def show_deepface_interface():
         show_deepface_bulk_upload(selected_model)
         return
     
+    if upload_mode == "Search Prior Cases":
+        show_prior_case_search(selected_model)
+        return
+    
     # Two image comparison
     show_deepface_two_image_comparison(selected_model)
 
@@ -222,6 +224,40 @@ def show_deepface_two_image_comparison(model_name):
                 else:
                     st.error("❌ Failed to process uploaded images")
 
+def show_prior_case_search(model_name):
+    """Look a face photo up in the index of photos uploaded to earlier cases"""
+    from face_index import search_faces, face_index_stats
+    
+    stats = face_index_stats(model_name)
+    st.caption(f"{stats['faces']} photos from {stats['cases']} cases indexed for {model_name}")
+    
+    photo = st.file_uploader("Upload a face photo", type=['jpg', 'jpeg', 'png'], key="prior_case_search_photo")
+    top_k = st.slider("Cases to show", 1, 20, 5)
+    
+    if photo and st.button("🔎 Search Prior Cases", type="primary"):
+        with st.spinner("Searching indexed case photos..."):
+            try:
+                matches = search_faces(photo, top_k, model_name)
+            except Exception as e:
+                st.error(f"❌ Face search failed: {str(e)}")
+                return
+        
+        if not matches:
+            st.info("No indexed case photos to compare against yet.")
+            return
+        
+        for match in matches:
+            col1, col2, col3 = st.columns([3, 1, 1])
+            with col1:
+                st.write(f"**{match['case_id']}** ({match['source'] or 'document'})")
+            with col2:
+                st.write(f"{match['confidence']:.1f}%")
+            with col3:
+                if match['verified']:
+                    st.success("✓ Same person")
+                else:
+                    st.error("✗ Different")
+
 def show_deepface_bulk_upload(model_name):
     """Interface for bulk photo upload and comparison using DeepFace"""
     st.markdown("### 📤 Bulk Photo Upload & AI Comparison")
@@ -275,6 +311,57 @@ def show_deepface_bulk_upload(model_name):
     else:
         st.info("📝 Upload multiple face images to start AI-powered bulk comparison")
 
+def bulk_compare_faces(image_paths, file_names, mode, threshold, model_name='VGG-Face', progress=None):
+    """
+    Run one of the bulk comparison modes from a single similarity matrix
+    Returns (pair results, number of pairs compared)
+    """
+    embeddings, errors = embed_images(image_paths, model_name, enforce_detection=True, progress=progress)
+    distances = cosine_distance_matrix(embeddings)
+    model_threshold = verification_threshold(model_name)
+    
+    if mode == "Compare all images with first image (1 vs All)":
+        first = np.zeros(len(image_paths) - 1, dtype=int)
+        second = np.arange(1, len(image_paths))
+    else:
+        first, second = np.triu_indices(len(image_paths), k=1)
+    
+    pair_distances = distances[first, second]
+    confidences = np.nan_to_num(np.maximum(0, (1 - pair_distances) * 100))
+    total_comparisons = len(first)
+    
+    if mode == "Find best matches (Smart Grouping)":
+        selected = np.flatnonzero(confidences >= threshold)
+        selected = selected[np.argsort(-confidences[selected], kind='stable')]
+    else:
+        selected = np.arange(total_comparisons)
+    
+    results = []
+    for k in selected:
+        i, j = first[k], second[k]
+        failed = errors.get(i) or errors.get(j)
+        if failed:
+            result = {'success': False, 'error': f"DeepFace comparison failed: {failed}"}
+        else:
+            result = {
+                'success': True,
+                'verified': bool(pair_distances[k] <= model_threshold),
+                'confidence': float(confidences[k]),
+                'distance': float(pair_distances[k]),
+                'model_used': model_name,
+                'threshold': model_threshold
+            }
+        analysis = analyze_deepface_result(result)
+        results.append({
+            'pair': f"{file_names[i]} vs {file_names[j]}",
+            'confidence': analysis['confidence'],
+            'match_status': analysis['match_status'],
+            'message': analysis['message'],
+            'verified': analysis.get('verified', False)
+        })
+    
+    return results, total_comparisons
+
 def process_deepface_bulk_comparison(uploaded_files, mode, threshold, show_details, model_name):
     """Process bulk face comparison using DeepFace based on selected mode"""
     
@@ -296,85 +383,22 @@ def process_deepface_bulk_comparison(uploaded_files, mode, threshold, show_detai
             st.error("❌ Failed to process images. Please try different images.")
             return
         
-        results = []
-        total_comparisons = 0
-        
         if mode == "Compare all images with first image (1 vs All)":
-            reference_path = temp_files[0]
-            reference_name = file_names[0]
-            
-            st.markdown(f"**Reference Image:** {reference_name}")
-            
-            progress_bar = st.progress(0)
-            
-            for i in range(1, len(temp_files)):
-                progress_bar.progress(i / (len(temp_files) - 1))
-                
-                result = compare_faces_deepface(reference_path, temp_files[i], model_name)
-                analysis = analyze_deepface_result(result)
-                
-                results.append({
-                    'pair': f"{reference_name} vs {file_names[i]}",
-                    'confidence': analysis['confidence'],
-                    'match_status': analysis['match_status'],
-                    'message': analysis['message'],
-                    'verified': analysis.get('verified', False)
-                })
-                total_comparisons += 1
+            st.markdown(f"**Reference Image:** {file_names[0]}")
         
-        elif mode == "Compare all images pairwise (All vs All)":
-            total_pairs = len(temp_files) * (len(temp_files) - 1) // 2
-            progress_bar = st.progress(0)
-            current_pair = 0
-            
-            for i in range(len(temp_files)):
-                for j in range(i + 1, len(temp_files)):
-                    progress_bar.progress(current_pair / total_pairs)
-                    
-                    result = compare_faces_deepface(temp_files[i], temp_files[j], model_name)
-                    analysis = analyze_deepface_result(result)
-                    
-                    results.append({
-                        'pair': f"{file_names[i]} vs {file_names[j]}",
-                        'confidence': analysis['confidence'],
-                        'match_status': analysis['match_status'],
-                        'message': analysis['message'],
-                        'verified': analysis.get('verified', False)
-                    })
-                    
-                    current_pair += 1
-                    total_comparisons += 1
-        
-        elif mode == "Find best matches (Smart Grouping)":
-            best_matches = []
-            total_pairs = len(temp_files) * (len(temp_files) - 1) // 2
-            progress_bar = st.progress(0)
-            current_pair = 0
-            
-            for i in range(len(temp_files)):
-                for j in range(i + 1, len(temp_files)):
-                    progress_bar.progress(current_pair / total_pairs)
-                    
-                    result = compare_faces_deepface(temp_files[i], temp_files[j], model_name)
-                    analysis = analyze_deepface_result(result)
-                    
-                    if analysis['confidence'] >= threshold:
-                        best_matches.append({
-                            'pair': f"{file_names[i]} vs {file_names[j]}",
-                            'confidence': analysis['confidence'],
-                            'match_status': analysis['match_status'],
-                            'message': analysis['message'],
-                            'verified': analysis.get('verified', False)
-                        })
-                    
-                    current_pair += 1
-                    total_comparisons += 1
-            
-            results = sorted(best_matches, key=lambda x: x['confidence'], reverse=True)
+        # Each image is embedded once; every pair then comes out of one distance matrix
+        progress_bar = st.progress(0)
+        results, total_comparisons = bulk_compare_faces(
+            temp_files, file_names, mode, threshold, model_name,
+            progress=lambda done, total: progress_bar.progress(done / total)
+        )
         
         # Display results
         if results:
-            for idx, result in enumerate(results):
+            if len(results) > BULK_RESULTS_SHOWN:
+                st.caption(f"Showing the first {BULK_RESULTS_SHOWN} of {len(results)} results; the summary covers all of them.")
+            
+            for idx, result in enumerate(results[:BULK_RESULTS_SHOWN]):
                 col1, col2, col3, col4 = st.columns([3, 1, 1, 2])
                 
                 with col1:
@@ -9,14 +9,9 @@ import streamlit as st
 from PIL import Image
 import io
 
-# DeepFace imports
-try:
-    from deepface import DeepFace
-    import cv2
-    import numpy as np
-    DEEPFACE_AVAILABLE = True
-except ImportError:
-    DEEPFACE_AVAILABLE = False
+# DeepFace (and TensorFlow) load in the face worker, not here
+from face_worker import DEEPFACE_AVAILABLE, analyze
+from face_embeddings import verify_images, encoded_image_bytes
 
 class DeepFaceVerification:
     """DeepFace-based face verification system"""
@@ -50,28 +45,8 @@ class DeepFaceVerification:
             model = model_name or self.default_model
             detector = detector_backend or self.default_detector
             
-            # Save images to temporary files for DeepFace processing
-            ref_path = self._save_temp_image(reference_image)
-            comp_path = self._save_temp_image(comparison_image)
-            
-            if not ref_path or not comp_path:
-                return {
-                    'success': False,
-                    'error': 'Failed to process uploaded images'
-                }
-            
-            # Perform face verification using DeepFace
-            result = DeepFace.verify(
-                img1_path=ref_path,
-                img2_path=comp_path,
-                model_name=model,
-                detector_backend=detector,
-                distance_metric='cosine',
-                enforce_detection=False
-            )
-            
-            # Clean up temporary files
-            self._cleanup_temp_files([ref_path, comp_path])
+            # Embeddings are cached per image content, so only unseen images reach the model
+            result = verify_images(reference_image, comparison_image, model, detector)
             
             # Process results
             verified = result.get('verified', False)
@@ -136,20 +111,8 @@ class DeepFaceVerification:
             }
         
         try:
-            image_path = self._save_temp_image(image)
-            if not image_path:
-                return {'success': False, 'error': 'Failed to process image'}
-            
-            # Perform face analysis
-            analysis = DeepFace.analyze(
-                img_path=image_path,
-                actions=actions,
-                detector_backend=self.default_detector,
-                enforce_detection=False
-            )
-            
-            # Clean up
-            self._cleanup_temp_files([image_path])
+            # Perform face analysis in the face worker
+            analysis = analyze(encoded_image_bytes(image), actions, self.default_detector)
             
             # Process results (handle both single face and multiple faces)
             if isinstance(analysis, list):
@@ -171,43 +134,28 @@ class DeepFaceVerification:
                 'error': f'Face analysis failed: {str(e)}'
             }
     
-    def find_similar_faces(self, target_image, database_path, model_name=None):
+    def find_matching_cases(self, target_image, k=5, model_name=None, exclude_case_id=None):
         """
-        Find similar faces in a database of images
+        Find prior cases whose indexed photos match a face
         
         Args:
-            target_image: PIL Image or file upload object
-            database_path: Path to directory containing face images
+            target_image: PIL Image, file upload object or file path
+            k: Number of cases to return
             model_name: DeepFace model to use
+            exclude_case_id: Case to leave out of the results (usually the current one)
         
         Returns:
-            dict: Results with similar faces found
+            dict: Best match per case, closest first
         """
-        if not DEEPFACE_AVAILABLE:
-            return {'success': False, 'error': 'DeepFace library not available'}
-        
         try:
-            model = model_name or self.default_model
-            target_path = self._save_temp_image(target_image)
-            
-            if not target_path:
-                return {'success': False, 'error': 'Failed to process target image'}
-            
-            # Find similar faces
-            results = DeepFace.find(
-                img_path=target_path,
-                db_path=database_path,
-                model_name=model,
-                detector_backend=self.default_detector,
-                enforce_detection=False
-            )
-            
-            self._cleanup_temp_files([target_path])
+            from face_index import search_faces
             
+            model = model_name or self.default_model
+            matches = search_faces(target_image, k, model, self.default_detector, exclude_case_id)
             return {
                 'success': True,
-                'matches_found': len(results) if isinstance(results, list) else 0,
-                'results': results,
+                'matches_found': len(matches),
+                'results': matches,
                 'model_used': model
             }
             
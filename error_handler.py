@@ -112,6 +112,20 @@ def handle_permission_error(action_name, required_role):
         error_type="warning"
     )
 
+def handle_status_change_error(case_id, new_status):
+    """
+    Handle a case status change the workflow refused
+
+    Args:
+        case_id (str): The case that was to move
+        new_status (str): The status it was to move to
+    """
+    show_error_box(
+        error_title="Status Not Changed",
+        error_message=f"Case {case_id} could not be moved to '{new_status}'. The workflow may not allow that step from its current status, or another user has already moved it. Refresh to see where it is now.",
+        error_type="error"
+    )
+
 def handle_api_error(service_name, exception, endpoint=None):
     """
     Handle API/external service errors
@@ -0,0 +1,235 @@
+"""
+Face embedding cache
+DeepFace.verify runs detection, alignment and the embedding network on both
+images on every call. Here each image's embedding is computed once per
+(SHA-256 of the image bytes, model, detector) and kept in an in-memory LRU
+backed by a small SQLite store of float32 vectors, so verification becomes two
+lookups and a cosine distance, and the network only ever sees new images.
+Misses are embedded by the face worker (face_worker), so this module never
+loads DeepFace itself.
+"""
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+EMBEDDING_DIR = "face_embeddings"
+EMBEDDING_DB_FILE = "embeddings.db"
+EMBEDDING_CACHE_MAX_ENTRIES = 1024
+
+DEFAULT_MODEL = "VGG-Face"
+DEFAULT_DETECTOR = "opencv"
+
+# DeepFace's cosine-distance verification thresholds (deepface.modules.verification),
+# copied so that verifying doesn't import TensorFlow into the web process
+COSINE_THRESHOLDS = {
+    "VGG-Face": 0.68,
+    "Facenet": 0.40,
+    "Facenet512": 0.30,
+    "ArcFace": 0.68,
+    "Dlib": 0.07,
+    "SFace": 0.593,
+    "OpenFace": 0.10,
+    "DeepFace": 0.23,
+    "DeepID": 0.015,
+    "GhostFaceNet": 0.65,
+}
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+_store_lock = threading.Lock()
+_store = None
+_stats = {"memory_hits": 0, "store_hits": 0, "computed": 0}
+
+def image_bytes(image):
+    """Raw bytes of a path, bytes, uploaded file or PIL image"""
+    if isinstance(image, (bytes, bytearray)):
+        return bytes(image)
+    if isinstance(image, (str, os.PathLike)):
+        with open(image, "rb") as f:
+            return f.read()
+    if hasattr(image, "getvalue"):
+        return image.getvalue()
+    if hasattr(image, "read"):
+        position = image.tell() if hasattr(image, "tell") else None
+        data = image.read()
+        if position is not None:
+            image.seek(position)
+        return data
+    if hasattr(image, "tobytes") and hasattr(image, "mode"):
+        # PIL image: hash the decoded pixels, which don't depend on how it was saved
+        return f"{image.mode}:{image.size}".encode() + image.tobytes()
+    raise TypeError(f"Unsupported image type: {type(image).__name__}")
+
+def image_hash(image):
+    """SHA-256 hex digest of an image's bytes"""
+    return hashlib.sha256(image_bytes(image)).hexdigest()
+
+def encoded_image_bytes(image):
+    """Encoded image file bytes, re-encoding PIL images as PNG"""
+    if hasattr(image, "tobytes") and hasattr(image, "mode"):
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+    return image_bytes(image)
+
+def _get_store():
+    global _store
+    if _store is None:
+        os.makedirs(EMBEDDING_DIR, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(EMBEDDING_DIR, EMBEDDING_DB_FILE), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS face_embeddings (
+                image_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                detector TEXT NOT NULL,
+                dims INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                face_detected INTEGER NOT NULL,
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (image_hash, model, detector)
+            ) WITHOUT ROWID
+        ''')
+        conn.commit()
+        _store = conn
+    return _store
+
+def _load(key):
+    with _store_lock:
+        row = _get_store().execute(
+            "SELECT vector, face_detected FROM face_embeddings WHERE image_hash = ? AND model = ? AND detector = ?",
+            key
+        ).fetchone()
+    if row is None:
+        return None
+    return np.frombuffer(row[0], dtype=np.float32), bool(row[1])
+
+def _save(key, vector, face_detected):
+    with _store_lock:
+        conn = _get_store()
+        conn.execute('''
+            INSERT OR REPLACE INTO face_embeddings (image_hash, model, detector, dims, vector, face_detected)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (*key, len(vector), vector.tobytes(), int(face_detected)))
+        conn.commit()
+
+def _remember(key, entry):
+    with _memory_lock:
+        _memory[key] = entry
+        _memory.move_to_end(key)
+        while len(_memory) > EMBEDDING_CACHE_MAX_ENTRIES:
+            _memory.popitem(last=False)
+
+def _represent(image, model_name, detector_backend):
+    """(embedding of the largest face, whether a face was found), from the face worker"""
+    from face_worker import embed
+
+    return embed(encoded_image_bytes(image), model_name, detector_backend)
+
+def get_embedding(image, model_name=DEFAULT_MODEL, detector_backend=DEFAULT_DETECTOR, enforce_detection=False):
+    """Embedding vector of the largest face in image, computed at most once per image
+
+    With enforce_detection=True an image where no face was found raises
+    ValueError, as DeepFace itself would.
+    """
+    key = (image_hash(image), model_name, detector_backend)
+
+    with _memory_lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            _memory.move_to_end(key)
+            _stats["memory_hits"] += 1
+
+    if entry is None:
+        entry = _load(key)
+        if entry is not None:
+            _stats["store_hits"] += 1
+        else:
+            entry = _represent(image, model_name, detector_backend)
+            _stats["computed"] += 1
+            _save(key, *entry)
+        _remember(key, entry)
+
+    vector, face_detected = entry
+    if enforce_detection and not face_detected:
+        raise ValueError("Face could not be detected. Please confirm that the picture is a face photo.")
+    return vector
+
+def cosine_distance(a, b):
+    """1 - cosine similarity of two vectors"""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    denominator = np.linalg.norm(a) * np.linalg.norm(b)
+    if denominator == 0:
+        return 1.0
+    return float(1 - np.dot(a, b) / denominator)
+
+def verification_threshold(model_name):
+    """Cosine distance under which two faces count as the same person"""
+    return COSINE_THRESHOLDS.get(model_name, 0.40)
+
+def verify_images(image1, image2, model_name=DEFAULT_MODEL, detector_backend=DEFAULT_DETECTOR, enforce_detection=False):
+    """DeepFace.verify-style result for two images, from cached embeddings"""
+    distance = cosine_distance(
+        get_embedding(image1, model_name, detector_backend, enforce_detection),
+        get_embedding(image2, model_name, detector_backend, enforce_detection)
+    )
+    threshold = verification_threshold(model_name)
+    return {
+        "verified": distance <= threshold,
+        "distance": distance,
+        "threshold": threshold,
+        "model": model_name,
+        "detector_backend": detector_backend,
+        "similarity_metric": "cosine",
+    }
+
+def embed_images(images, model_name=DEFAULT_MODEL, detector_backend=DEFAULT_DETECTOR, enforce_detection=False, progress=None):
+    """Stack the embeddings of images into one matrix, a row per image
+
+    Rows of images that could not be embedded are NaN and their errors are
+    returned as {position: message}. progress, if given, is called with
+    (done, total) after each image.
+    """
+    vectors = []
+    errors = {}
+    for position, image in enumerate(images):
+        try:
+            vectors.append(get_embedding(image, model_name, detector_backend, enforce_detection))
+        except Exception as e:
+            vectors.append(None)
+            errors[position] = str(e)
+        if progress:
+            progress(position + 1, len(images))
+
+    dims = next((len(vector) for vector in vectors if vector is not None), 0)
+    matrix = np.full((len(images), dims), np.nan)
+    for position, vector in enumerate(vectors):
+        if vector is not None:
+            matrix[position] = vector
+    return matrix, errors
+
+def cosine_distance_matrix(matrix):
+    """Cosine distance between every pair of rows, from a single matrix multiply
+
+    Matches cosine_distance pair by pair: zero rows are at distance 1 from
+    everything and NaN rows stay NaN.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    unit = matrix / np.where(norms == 0, 1, norms)
+    return 1 - unit @ unit.T
+
+def embedding_cache_stats():
+    """Memory entries, stored vectors and hit counters"""
+    with _memory_lock:
+        memory_entries = len(_memory)
+        stats = dict(_stats)
+    with _store_lock:
+        stored = _get_store().execute("SELECT COUNT(*) FROM face_embeddings").fetchone()[0]
+    return {"memory_entries": memory_entries, "stored": stored, **stats}
@@ -0,0 +1,360 @@
+"""
+Cross-case face index
+Every face photo uploaded to a case is embedded once (through the
+face_embeddings cache) and recorded here with its case_id and document_id, so
+a new photo can be checked against all prior cases in milliseconds instead of
+re-running DeepFace.find over a directory.
+
+Index entries live next to the cached vectors in the embedding store and are
+loaded into one in-memory matrix per (model, detector), picking up rows other
+processes added since the last search. Up to FACE_INDEX_IVF_MIN_FACES faces
+are searched exactly with a single matrix-vector product; past that,
+rebuild_face_index partitions the vectors into k-means lists (IVF) and a
+search only scans the FACE_INDEX_PROBES lists closest to the query.
+
+The entries are derived from the case documents in the main database, so the
+embedding store stays a disposable cache: --backfill rebuilds the index from
+case_documents, documents and the allocation customer photos, and
+prune_face_index drops entries whose document has left the hot database. Archiving cases prunes, so archived and
+deleted cases stop matching new photos.
+
+Backfill, prune and partition by hand with: python face_index.py [--backfill] [--prune] [--rebuild]
+"""
+import os
+import sys
+import threading
+
+import numpy as np
+
+from face_embeddings import (
+    DEFAULT_MODEL, DEFAULT_DETECTOR, get_embedding, image_hash, verification_threshold,
+    _get_store, _store_lock,
+)
+
+FACE_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+FACE_INDEX_IVF_MIN_FACES = 5000
+FACE_INDEX_PROBES = 8
+# Partition again once the index has grown this much past its last training
+FACE_INDEX_RETRAIN_GROWTH = 2
+FACE_INDEX_TRAIN_SAMPLE = 20000
+FACE_INDEX_KMEANS_ITERATIONS = 10
+
+_tables_ready = False
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+def _store():
+    global _tables_ready
+    conn = _get_store()
+    if not _tables_ready:
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS face_index_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                model TEXT NOT NULL,
+                detector TEXT NOT NULL,
+                image_hash TEXT NOT NULL,
+                case_id TEXT NOT NULL,
+                document_id TEXT NOT NULL,
+                source TEXT,
+                list_id INTEGER,
+                added_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_face_index_entries_document
+                ON face_index_entries (model, detector, document_id);
+            CREATE INDEX IF NOT EXISTS idx_face_index_entries_case
+                ON face_index_entries (case_id);
+            CREATE TABLE IF NOT EXISTS face_index_centroids (
+                model TEXT NOT NULL,
+                detector TEXT NOT NULL,
+                list_id INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, detector, list_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS face_index_meta (
+                model TEXT NOT NULL,
+                detector TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                trained_size INTEGER NOT NULL,
+                PRIMARY KEY (model, detector)
+            ) WITHOUT ROWID;
+        ''')
+        conn.commit()
+        _tables_ready = True
+    return conn
+
+def _unit(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+def _empty_state(version):
+    return {
+        "version": version, "last_id": 0, "trained_size": 0, "centroids": None,
+        "ids": np.zeros(0, dtype=np.int64), "lists": np.zeros(0, dtype=np.int64),
+        "matrix": None, "case_ids": [], "document_ids": [], "sources": [],
+    }
+
+def _index_state(model_name, detector_backend):
+    """This process's copy of the index, brought up to date with the store"""
+    key = (model_name, detector_backend)
+    with _loaded_lock, _store_lock:
+        conn = _store()
+        meta = conn.execute(
+            "SELECT version, trained_size FROM face_index_meta WHERE model = ? AND detector = ?", key
+        ).fetchone()
+        version = meta[0] if meta else 0
+
+        state = _loaded.get(key)
+        if state is None or state["version"] != version:
+            # A rebuild reassigned every list: start over
+            state = _empty_state(version)
+            if meta:
+                state["trained_size"] = meta[1]
+                state["centroids"] = _load_centroids(conn, key)
+            _loaded[key] = state
+
+        rows = conn.execute('''
+            SELECT i.id, i.case_id, i.document_id, i.source, i.list_id, e.vector
+            FROM face_index_entries i
+            JOIN face_embeddings e
+              ON e.image_hash = i.image_hash AND e.model = i.model AND e.detector = i.detector
+            WHERE i.model = ? AND i.detector = ? AND i.id > ? AND e.face_detected = 1
+            ORDER BY i.id
+        ''', (*key, state["last_id"])).fetchall()
+
+        if rows:
+            vectors = _unit([np.frombuffer(row[5], dtype=np.float32) for row in rows])
+            state["matrix"] = vectors if state["matrix"] is None else np.vstack([state["matrix"], vectors])
+            state["ids"] = np.concatenate([state["ids"], [row[0] for row in rows]])
+            state["lists"] = np.concatenate([state["lists"], [-1 if row[4] is None else row[4] for row in rows]])
+            state["case_ids"].extend(row[1] for row in rows)
+            state["document_ids"].extend(row[2] for row in rows)
+            state["sources"].extend(row[3] for row in rows)
+            state["last_id"] = rows[-1][0]
+        return state
+
+def _load_centroids(conn, key):
+    rows = conn.execute(
+        "SELECT vector FROM face_index_centroids WHERE model = ? AND detector = ? ORDER BY list_id", key
+    ).fetchall()
+    if not rows:
+        return None
+    return np.vstack([np.frombuffer(row[0], dtype=np.float32) for row in rows])
+
+def _nearest_list(conn, key, vector):
+    """IVF list for a new vector, or None while the index is unpartitioned"""
+    meta = conn.execute("SELECT version FROM face_index_meta WHERE model = ? AND detector = ?", key).fetchone()
+    if meta is None:
+        return None
+    state = _loaded.get(key)
+    centroids = state["centroids"] if state and state["version"] == meta[0] else _load_centroids(conn, key)
+    if centroids is None:
+        return None
+    return int(np.argmax(centroids @ _unit(vector)))
+
+def index_face(image, case_id, document_id, source=None, model_name=DEFAULT_MODEL, detector_backend=DEFAULT_DETECTOR):
+    """Add the face in image to the index under case_id / document_id
+
+    document_id identifies the upload (e.g. "case_documents:42"); indexing the
+    same document again is a no-op. Images with no detectable face (scanned
+    forms, screenshots) are skipped rather than indexed as a whole-image
+    embedding. Returns True when a new entry was added.
+    """
+    try:
+        vector = get_embedding(image, model_name, detector_backend, enforce_detection=True)
+    except ValueError:
+        return False
+    key = (model_name, detector_backend)
+    with _store_lock:
+        conn = _store()
+        list_id = _nearest_list(conn, key, vector)
+        cursor = conn.execute('''
+            INSERT OR IGNORE INTO face_index_entries (model, detector, image_hash, case_id, document_id, source, list_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (*key, image_hash(image), case_id, document_id, source, list_id))
+        conn.commit()
+    return cursor.rowcount > 0
+
+def index_case_photo(file_path, case_id, document_id, source=None):
+    """Index an uploaded case document if it is a photo; failures are logged, never raised"""
+    if not file_path.lower().endswith(FACE_IMAGE_EXTENSIONS):
+        return False
+    try:
+        return index_face(file_path, case_id, document_id, source)
+    except Exception as e:
+        print(f"Could not index face photo {file_path} for {case_id}: {e}")
+        return False
+
+def search_faces(image, k=5, model_name=DEFAULT_MODEL, detector_backend=DEFAULT_DETECTOR,
+                 exclude_case_id=None, probes=FACE_INDEX_PROBES):
+    """The k prior cases whose photos best match the face in image
+
+    Returns one dict per case, closest first, with the best-matching
+    document's case_id, document_id, source, distance, confidence and
+    whether the distance passes the model's verification threshold.
+    """
+    state = _index_state(model_name, detector_backend)
+    if state["matrix"] is None:
+        return []
+
+    query = _unit(get_embedding(image, model_name, detector_backend))
+    if state["centroids"] is None:
+        candidates = np.arange(len(state["ids"]))
+    else:
+        probed = np.argsort(-(state["centroids"] @ query))[:probes]
+        # Rows added without a list (before the first training) are always scanned
+        candidates = np.flatnonzero(np.isin(state["lists"], probed) | (state["lists"] < 0))
+
+    distances = 1 - state["matrix"][candidates] @ query
+    threshold = verification_threshold(model_name)
+    matches = []
+    seen = set()
+    for position in np.argsort(distances, kind="stable"):
+        row = candidates[position]
+        case_id = state["case_ids"][row]
+        if case_id in seen or case_id == exclude_case_id:
+            continue
+        seen.add(case_id)
+        distance = float(distances[position])
+        matches.append({
+            "case_id": case_id,
+            "document_id": state["document_ids"][row],
+            "source": state["sources"][row],
+            "distance": distance,
+            "confidence": max(0, (1 - distance) * 100),
+            "verified": distance <= threshold,
+        })
+        if len(matches) == k:
+            break
+    return matches
+
+def _kmeans(vectors, lists, iterations=FACE_INDEX_KMEANS_ITERATIONS):
+    """Spherical k-means on unit vectors: centroids as a (lists, dims) matrix"""
+    rng = np.random.default_rng(0)
+    centroids = vectors[rng.choice(len(vectors), lists, replace=False)]
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=lists)
+        empty = counts == 0
+        # Reseed empty lists from random vectors so every list stays in use
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = _unit(sums)
+    return centroids
+
+def rebuild_face_index(model_name=DEFAULT_MODEL, detector_backend=DEFAULT_DETECTOR, force=False):
+    """Partition the index into IVF lists once it is big enough to need them
+
+    Trains on up to FACE_INDEX_TRAIN_SAMPLE vectors and reassigns every
+    entry. Without force it only runs past FACE_INDEX_IVF_MIN_FACES and once
+    the index has grown FACE_INDEX_RETRAIN_GROWTH times since the last
+    training. Returns the number of lists, or 0 when nothing was done.
+    """
+    state = _index_state(model_name, detector_backend)
+    size = len(state["ids"])
+    if size == 0:
+        return 0
+    if not force and (size < FACE_INDEX_IVF_MIN_FACES or
+                      (state["trained_size"] and size < state["trained_size"] * FACE_INDEX_RETRAIN_GROWTH)):
+        return 0
+
+    # About 4 * sqrt(n) lists, each with enough members for k-means to place its centroid
+    lists = max(1, min(int(4 * np.sqrt(size)), size // 40))
+    rng = np.random.default_rng(0)
+    sample = state["matrix"]
+    if size > FACE_INDEX_TRAIN_SAMPLE:
+        sample = sample[rng.choice(size, FACE_INDEX_TRAIN_SAMPLE, replace=False)]
+    centroids = _kmeans(sample, lists)
+    assignment = np.concatenate([
+        np.argmax(state["matrix"][start:start + 10000] @ centroids.T, axis=1)
+        for start in range(0, size, 10000)
+    ])
+
+    key = (model_name, detector_backend)
+    with _store_lock:
+        conn = _store()
+        with conn:
+            conn.executemany(
+                "UPDATE face_index_entries SET list_id = ? WHERE id = ?",
+                zip(assignment.tolist(), state["ids"].tolist())
+            )
+            conn.execute("DELETE FROM face_index_centroids WHERE model = ? AND detector = ?", key)
+            conn.executemany(
+                "INSERT INTO face_index_centroids (model, detector, list_id, vector) VALUES (?, ?, ?, ?)",
+                [(*key, list_id, centroid.astype(np.float32).tobytes()) for list_id, centroid in enumerate(centroids)]
+            )
+            conn.execute('''
+                INSERT INTO face_index_meta (model, detector, version, trained_size) VALUES (?, ?, 1, ?)
+                ON CONFLICT (model, detector) DO UPDATE SET version = version + 1, trained_size = excluded.trained_size
+            ''', (*key, size))
+    return lists
+
+def _case_documents():
+    """(document_id, case_id, file_path, source) of every document and allocation photo in the hot case database"""
+    from database import get_db_connection
+
+    with get_db_connection() as conn:
+        return conn.execute('''
+            SELECT 'case_documents:' || id, case_id, file_path, upload_type FROM case_documents
+            UNION ALL
+            SELECT 'documents:' || id, case_id, file_path, 'document' FROM documents
+            UNION ALL
+            SELECT 'case_allocations:' || id, case_id, customer_photo, 'customer_photo' FROM case_allocations
+            WHERE customer_photo IS NOT NULL AND customer_photo != ''
+        ''').fetchall()
+
+def prune_face_index():
+    """Drop entries whose document is no longer in the case database; returns the number dropped"""
+    live = {row[0] for row in _case_documents()}
+    with _store_lock:
+        conn = _store()
+        stale = [row for row in conn.execute("SELECT id, model, detector, document_id FROM face_index_entries") if row[3] not in live]
+        if stale:
+            with conn:
+                conn.executemany("DELETE FROM face_index_entries WHERE id = ?", [(row[0],) for row in stale])
+                # A new version makes every process reload the index without the dropped rows
+                conn.executemany('''
+                    INSERT INTO face_index_meta (model, detector, version, trained_size) VALUES (?, ?, 1, 0)
+                    ON CONFLICT (model, detector) DO UPDATE SET version = version + 1
+                ''', {(row[1], row[2]) for row in stale})
+    return len(stale)
+
+def index_existing_photos(model_name=DEFAULT_MODEL, detector_backend=DEFAULT_DETECTOR):
+    """Index every photo already uploaded to a case; returns the number newly added"""
+    prune_face_index()
+    documents = _case_documents()
+
+    added = 0
+    for document_id, case_id, file_path, source in documents:
+        if not file_path or not file_path.lower().endswith(FACE_IMAGE_EXTENSIONS) or not os.path.exists(file_path):
+            continue
+        try:
+            added += index_face(file_path, case_id, document_id, source, model_name, detector_backend)
+        except Exception as e:
+            print(f"Could not index face photo {file_path} for {case_id}: {e}")
+    rebuild_face_index(model_name, detector_backend)
+    return added
+
+def face_index_stats(model_name=DEFAULT_MODEL, detector_backend=DEFAULT_DETECTOR):
+    """Indexed faces, distinct cases and IVF lists for one model"""
+    state = _index_state(model_name, detector_backend)
+    return {
+        "faces": len(state["ids"]),
+        "cases": len(set(state["case_ids"])),
+        "lists": 0 if state["centroids"] is None else len(state["centroids"]),
+    }
+
+def main(argv):
+    if "--backfill" in argv:
+        print(f"Indexed {index_existing_photos()} new face photos")
+    if "--prune" in argv:
+        print(f"Dropped {prune_face_index()} entries for documents no longer in the case database")
+    if "--rebuild" in argv:
+        print(f"Partitioned the index into {rebuild_face_index(force=True)} lists")
+    print(face_index_stats())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,170 @@
+"""
+DeepFace model registry
+DeepFace builds a recognition model (and downloads its weights) the first
+time it is asked for it, inside whoever's request happened to ask first. The
+registry builds each model once per process, and preload_models builds the
+pinned set at startup and runs one warm-up inference per model and detector in
+the background, so the first face match a user runs finds the model ready.
+
+Pinned models (FACE_MODELS_PINNED) stay resident for the life of the process;
+any other model a user picks is loaded on demand and evicted least recently
+used once more than FACE_MODELS_MAX_RESIDENT models are held. Load time,
+warm-up time and the memory each load added are kept per model for
+model_status.
+
+The face worker preloads on start; configure with e.g.
+FACE_MODELS_PINNED="VGG-Face,Facenet512" FACE_DETECTORS_PRELOAD="opencv,retinaface"
+"""
+import gc
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+FACE_MODELS_PINNED = [name.strip() for name in os.environ.get("FACE_MODELS_PINNED", "VGG-Face").split(",") if name.strip()]
+FACE_DETECTORS_PRELOAD = [name.strip() for name in os.environ.get("FACE_DETECTORS_PRELOAD", "opencv").split(",") if name.strip()]
+FACE_MODELS_MAX_RESIDENT = int(os.environ.get("FACE_MODELS_MAX_RESIDENT", "3"))
+
+# A mid-grey frame: enough for each model to trace its graph, no face needed
+WARMUP_IMAGE_SIZE = 224
+
+_models = OrderedDict()
+# Held while a model is built, so each is built once
+_registry_lock = threading.RLock()
+# Held briefly for every read or write of _models and its entries, never during a build
+_models_lock = threading.Lock()
+
+def _rss_bytes():
+    """Resident memory of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        # Peak rather than current RSS, but the best portable figure
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+def _forget(model_name):
+    """Drop DeepFace's own cached copy of a model so its memory can be freed"""
+    for module_name, attribute in (("deepface.modules.modeling", "cached_models"), ("deepface.DeepFace", "model_obj")):
+        cache = getattr(sys.modules.get(module_name), attribute, None)
+        if not isinstance(cache, dict):
+            continue
+        cache.pop(model_name, None)
+        # Newer DeepFace versions nest the cache by task
+        for nested in cache.values():
+            if isinstance(nested, dict):
+                nested.pop(model_name, None)
+
+def _new_entry(model_name):
+    return {
+        "state": "not loaded", "pinned": model_name in FACE_MODELS_PINNED, "model": None,
+        "load_seconds": None, "warmup_seconds": None, "memory_mb": None, "last_used": None, "error": None,
+    }
+
+def _entry(model_name):
+    """The registry entry for model_name, created if new (call with _models_lock held)"""
+    if model_name not in _models:
+        _models[model_name] = _new_entry(model_name)
+    return _models[model_name]
+
+def _update(model_name, **fields):
+    with _models_lock:
+        _entry(model_name).update(fields)
+
+def _evict():
+    """Mark the least recently used unpinned models past FACE_MODELS_MAX_RESIDENT evicted
+
+    Call with _models_lock held; returns the evicted names for the caller to release.
+    """
+    resident = [name for name, entry in _models.items() if entry["model"] is not None]
+    excess = len(resident) - FACE_MODELS_MAX_RESIDENT
+    if excess <= 0:
+        return []
+    # _models is kept in least-recently-used order
+    evicted = [name for name in resident if not _models[name]["pinned"]][:excess]
+    for name in evicted:
+        _models[name].update(model=None, state="evicted")
+    return evicted
+
+def load_model(model_name):
+    """The built DeepFace model for model_name, building it on first use
+
+    Marks the model most recently used and evicts the least recently used
+    unpinned models past FACE_MODELS_MAX_RESIDENT.
+    """
+    with _registry_lock:
+        with _models_lock:
+            model = _entry(model_name)["model"]
+        if model is None:
+            from deepface import DeepFace
+
+            _update(model_name, state="loading")
+            rss_before = _rss_bytes()
+            started = time.monotonic()
+            try:
+                model = DeepFace.build_model(model_name)
+            except Exception as e:
+                _update(model_name, state="failed", error=str(e))
+                raise
+            _update(
+                model_name, model=model, state="loaded", error=None,
+                load_seconds=time.monotonic() - started,
+                memory_mb=max(0, _rss_bytes() - rss_before) / (1024 * 1024),
+            )
+        with _models_lock:
+            _entry(model_name)["last_used"] = time.time()
+            _models.move_to_end(model_name)
+            evicted = _evict()
+        for name in evicted:
+            _forget(name)
+        if evicted:
+            gc.collect()
+        return model
+
+def warm_up(model_name, detectors=None):
+    """Load a model and run one inference through it with each detector"""
+    from deepface import DeepFace
+
+    load_model(model_name)
+    frame = np.full((WARMUP_IMAGE_SIZE, WARMUP_IMAGE_SIZE, 3), 128, dtype=np.uint8)
+    started = time.monotonic()
+    for detector in detectors or FACE_DETECTORS_PRELOAD:
+        DeepFace.represent(img_path=frame, model_name=model_name, detector_backend=detector, enforce_detection=False)
+    with _registry_lock:
+        _update(model_name, state="ready", warmup_seconds=time.monotonic() - started)
+
+def preload_models(models=None, background=True):
+    """Load and warm up the pinned models (or models), in a daemon thread by default"""
+    def run():
+        for model_name in models or FACE_MODELS_PINNED:
+            try:
+                warm_up(model_name)
+            except Exception as e:
+                print(f"Could not preload face model {model_name}: {e}")
+
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=run, name="face-model-preload", daemon=True)
+    thread.start()
+    return thread
+
+def model_status():
+    """One row per model this process has seen: state, pinning, timings and memory
+
+    Copies the registry under the short _models_lock, not the registry lock,
+    so status stays available while a model is being built. Pinned models not
+    yet seen are reported as not loaded without being added to the registry.
+    """
+    with _models_lock:
+        entries = [(name, dict(entry)) for name, entry in _models.items()]
+    seen = {name for name, _ in entries}
+    entries += [(name, _new_entry(name)) for name in FACE_MODELS_PINNED if name not in seen]
+    return [
+        {"model_name": name, **{key: value for key, value in entry.items() if key != "model"}}
+        for name, entry in entries
+    ]
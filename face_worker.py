@@ -0,0 +1,368 @@
+"""
+Face inference worker
+DeepFace pulls in TensorFlow and the model weights, hundreds of MB per
+process. Instead of every Streamlit process loading them, one worker process
+owns the loaded models and serves embed / analyze requests from all sessions
+over a Unix socket (multiprocessing.connection). Requests that arrive together
+are taken as one batch, per model, by a single inference thread, so
+concurrent verifications share one warm model and an image sent twice in a
+batch is only run once.
+
+The web side is a thin client: app startup launches the worker in the
+background when FACE_WORKER_AUTOSTART is set, infer() sends requests to it
+(starting it then if it is still not running), and only falls back to running
+DeepFace in its own process when no worker can be reached. Verification stays on the client side as two cached embeddings
+and a cosine distance (see face_embeddings), so only unseen images cross the
+socket.
+
+The socket and a random per-install key sit in FACE_WORKER_DIR, a 0700
+directory the code refuses to use if another user owns it or can write to it.
+Both ends prove they hold the key before any message is unpickled.
+
+Run the worker by hand with: python face_worker.py
+"""
+import importlib.util
+import io
+import os
+import queue
+import secrets
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+# Socket and key live in a directory only this user can enter; the key is
+# generated per install unless FACE_WORKER_AUTHKEY supplies one
+FACE_WORKER_DIR = os.environ.get("FACE_WORKER_DIR") or os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(), f"tathya-face-worker-{os.getuid()}"
+)
+FACE_WORKER_SOCKET_NAME = "worker.sock"
+FACE_WORKER_KEY_NAME = "authkey"
+FACE_WORKER_AUTOSTART = os.environ.get("FACE_WORKER_AUTOSTART", "1") == "1"
+FACE_WORKER_START_TIMEOUT_SECONDS = 60
+# After a failed start, run inference in process for this long before trying again
+FACE_WORKER_RETRY_AFTER_SECONDS = 300
+FACE_WORKER_BATCH_SIZE = 16
+# How long the inference thread waits for more requests to join a batch
+FACE_WORKER_BATCH_WAIT_SECONDS = 0.01
+
+DEEPFACE_AVAILABLE = importlib.util.find_spec("deepface") is not None
+
+class WorkerUnavailable(Exception):
+    """No face worker is listening on the worker socket"""
+
+_client = threading.local()
+_authkey = []
+_start_lock = threading.Lock()
+_fallback_reported = [False]
+_start_failed_at = [None]
+_background_start = []
+
+def _private_dir():
+    """FACE_WORKER_DIR, created 0700 and refused if anyone else could write to it"""
+    os.makedirs(FACE_WORKER_DIR, mode=0o700, exist_ok=True)
+    info = os.lstat(FACE_WORKER_DIR)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(f"{FACE_WORKER_DIR} must be a directory owned by this user with mode 0700")
+    return FACE_WORKER_DIR
+
+def worker_address():
+    return os.path.join(_private_dir(), FACE_WORKER_SOCKET_NAME)
+
+def worker_authkey():
+    """The shared secret for the worker socket, generated into a 0600 file on first use"""
+    if not _authkey:
+        if os.environ.get("FACE_WORKER_AUTHKEY"):
+            _authkey.append(os.environ["FACE_WORKER_AUTHKEY"].encode())
+        else:
+            path = os.path.join(_private_dir(), FACE_WORKER_KEY_NAME)
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(fd, "w") as f:
+                    f.write(secrets.token_hex(32))
+            except FileExistsError:
+                pass
+            with open(path) as f:
+                key = f.read().strip()
+            if not key:
+                raise RuntimeError(f"Face worker key file {path} is empty")
+            _authkey.append(key.encode())
+    return _authkey[0]
+
+def _image_array(data):
+    """BGR pixel array of encoded image bytes, the layout DeepFace expects"""
+    from PIL import Image
+
+    return np.asarray(Image.open(io.BytesIO(data)).convert("RGB"))[:, :, ::-1].copy()
+
+def embed_locally(data, model_name, detector_backend):
+    """Run DeepFace on image bytes: (embedding of the largest face, whether a face was found)"""
+    if not DEEPFACE_AVAILABLE:
+        raise RuntimeError("DeepFace library not available. Please install deepface, tensorflow, and opencv-python.")
+    from deepface import DeepFace
+    from face_models import load_model
+
+    # Builds the model through the registry so its load is timed and counts towards LRU eviction
+    load_model(model_name)
+    faces = DeepFace.represent(
+        img_path=_image_array(data),
+        model_name=model_name,
+        detector_backend=detector_backend,
+        enforce_detection=False
+    )
+    face = max(faces, key=lambda found: found["facial_area"]["w"] * found["facial_area"]["h"])
+    # With enforce_detection off DeepFace embeds the whole image and reports zero confidence
+    face_detected = face.get("face_confidence", 1) > 0
+    return np.asarray(face["embedding"], dtype=np.float32), face_detected
+
+def analyze_locally(data, actions, detector_backend):
+    """DeepFace.analyze on image bytes, first face only"""
+    if not DEEPFACE_AVAILABLE:
+        raise RuntimeError("DeepFace library not available")
+    from deepface import DeepFace
+
+    analysis = DeepFace.analyze(
+        img_path=_image_array(data),
+        actions=list(actions),
+        detector_backend=detector_backend,
+        enforce_detection=False
+    )
+    if isinstance(analysis, list):
+        analysis = analysis[0]
+    # Plain Python values only, so the result pickles without NumPy scalars
+    return {key: value.item() if isinstance(value, np.generic) else value for key, value in analysis.items()}
+
+def _run_locally(request):
+    if request["op"] == "embed":
+        return embed_locally(request["image"], request["model"], request["detector"])
+    if request["op"] == "analyze":
+        return analyze_locally(request["image"], request["actions"], request["detector"])
+    if request["op"] == "ping":
+        return os.getpid()
+    if request["op"] == "models":
+        from face_models import model_status
+        return model_status()
+    raise ValueError(f"Unknown face worker operation: {request['op']}")
+
+# Worker side
+
+def _run_batch(batch):
+    """Answer a batch of (request, reply) pairs, grouped by model and deduplicated by image"""
+    groups = defaultdict(list)
+    for request, reply in batch:
+        key = (request["op"], request.get("model"), request.get("detector"), tuple(request.get("actions", ())))
+        groups[key].append((request, reply))
+
+    for pending in groups.values():
+        results = {}
+        for request, reply in pending:
+            image = request.get("image")
+            if image not in results:
+                try:
+                    results[image] = {"ok": True, "result": _run_locally(request)}
+                except Exception as e:
+                    results[image] = {"ok": False, "error": str(e)}
+            reply.put(results[image])
+
+def _inference_loop(requests):
+    while True:
+        batch = [requests.get()]
+        deadline = time.monotonic() + FACE_WORKER_BATCH_WAIT_SECONDS
+        while len(batch) < FACE_WORKER_BATCH_SIZE:
+            try:
+                batch.append(requests.get(timeout=max(0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        _run_batch(batch)
+
+def _serve_connection(conn, requests):
+    reply = queue.Queue(maxsize=1)
+    try:
+        while True:
+            request = conn.recv()
+            if request["op"] in ("ping", "models"):
+                # Status requests skip the inference queue so they answer while models load
+                conn.send({"ok": True, "result": _run_locally(request)})
+                continue
+            requests.put((request, reply))
+            conn.send(reply.get())
+    except (EOFError, OSError):
+        pass
+    finally:
+        conn.close()
+
+def serve(address=None):
+    """Run the worker until killed; exits quietly if another worker already owns the socket"""
+    address = address or worker_address()
+    authkey = worker_authkey()
+    if os.path.exists(address):
+        try:
+            Client(address, family="AF_UNIX", authkey=authkey).close()
+            print(f"A face worker is already listening on {address}")
+            return 1
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Left behind by a worker that died; only this user can have put it there
+            os.remove(address)
+
+    listener = Listener(address, family="AF_UNIX", authkey=authkey)
+    os.chmod(address, 0o600)
+    requests = queue.Queue()
+    threading.Thread(target=_inference_loop, args=(requests,), daemon=True).start()
+    if DEEPFACE_AVAILABLE:
+        from face_models import preload_models
+        preload_models()
+    print(f"Face worker {os.getpid()} listening on {address}")
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                # A client with the wrong key or a dropped handshake
+                print(f"Face worker rejected a connection: {e}")
+                continue
+            threading.Thread(target=_serve_connection, args=(conn, requests), daemon=True).start()
+    finally:
+        listener.close()
+
+# Client side
+
+def _connect():
+    try:
+        address = worker_address()
+        authkey = worker_authkey()
+    except (OSError, RuntimeError) as e:
+        raise WorkerUnavailable(str(e))
+    try:
+        # Both ends prove they hold the key before anything is unpickled
+        return Client(address, family="AF_UNIX", authkey=authkey)
+    except (FileNotFoundError, ConnectionRefusedError, AuthenticationError) as e:
+        raise WorkerUnavailable(str(e))
+
+def start_worker():
+    """Start a detached worker process and wait until it accepts connections
+
+    A start that fails is not retried for FACE_WORKER_RETRY_AFTER_SECONDS, so
+    callers fall back to in-process inference at once instead of waiting out
+    the start timeout on every request.
+    """
+    with _start_lock:
+        try:
+            _connect().close()
+            return
+        except WorkerUnavailable:
+            pass
+
+        failed_at = _start_failed_at[0]
+        if failed_at is not None and time.monotonic() - failed_at < FACE_WORKER_RETRY_AFTER_SECONDS:
+            raise WorkerUnavailable("Face worker failed to start recently")
+
+        try:
+            subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__)],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
+        except OSError as e:
+            _start_failed_at[0] = time.monotonic()
+            raise WorkerUnavailable(f"Could not start face worker: {e}")
+        deadline = time.monotonic() + FACE_WORKER_START_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            try:
+                _connect().close()
+                _start_failed_at[0] = None
+                return
+            except WorkerUnavailable:
+                time.sleep(0.2)
+        _start_failed_at[0] = time.monotonic()
+        raise WorkerUnavailable(f"Face worker did not start within {FACE_WORKER_START_TIMEOUT_SECONDS}s")
+
+def start_worker_in_background():
+    """Start the worker from a daemon thread, once per process
+
+    Called at app startup so the worker has spawned and preloaded its models
+    before the first face match, instead of on that user's click. Does
+    nothing when autostart is off or DeepFace is not installed.
+    """
+    if not FACE_WORKER_AUTOSTART or not DEEPFACE_AVAILABLE:
+        return None
+    with _start_lock:
+        if not _background_start:
+            thread = threading.Thread(target=_start_quietly, name="face-worker-start", daemon=True)
+            _background_start.append(thread)
+            thread.start()
+    return _background_start[0]
+
+def _start_quietly():
+    try:
+        start_worker()
+    except WorkerUnavailable as e:
+        print(f"Face worker not started ({e}); face inference will run in process")
+
+def _call(request):
+    conn = getattr(_client, "conn", None)
+    for attempt in range(2):
+        if conn is None:
+            conn = _connect()
+            _client.conn = conn
+        try:
+            conn.send(request)
+            response = conn.recv()
+            break
+        except (EOFError, OSError):
+            # The worker restarted since this thread last used it: reconnect once
+            conn.close()
+            conn = _client.conn = None
+            if attempt:
+                raise WorkerUnavailable("Face worker connection lost")
+
+    if not response["ok"]:
+        raise RuntimeError(response["error"])
+    return response["result"]
+
+def infer(request):
+    """Run a worker request, starting the worker or falling back to in-process inference as needed"""
+    try:
+        try:
+            return _call(request)
+        except WorkerUnavailable:
+            if not FACE_WORKER_AUTOSTART or not DEEPFACE_AVAILABLE:
+                raise
+            start_worker()
+            return _call(request)
+    except WorkerUnavailable as e:
+        if not _fallback_reported[0]:
+            print(f"Face worker unavailable ({e}); running face inference in this process")
+            _fallback_reported[0] = True
+        return _run_locally(request)
+
+def embed(data, model_name, detector_backend):
+    """(embedding, face detected) for encoded image bytes"""
+    return infer({"op": "embed", "image": data, "model": model_name, "detector": detector_backend})
+
+def analyze(data, actions=("age", "gender", "race", "emotion"), detector_backend="opencv"):
+    """DeepFace.analyze result for the first face in encoded image bytes"""
+    return infer({"op": "analyze", "image": data, "actions": tuple(actions), "detector": detector_backend})
+
+def worker_status():
+    """PID of the running worker, or None"""
+    try:
+        return _call({"op": "ping"})
+    except WorkerUnavailable:
+        return None
+
+def worker_model_status():
+    """The worker's face_models.model_status(), or None if no worker is running"""
+    try:
+        return _call({"op": "models"})
+    except WorkerUnavailable:
+        return None
+
+if __name__ == "__main__":
+    sys.exit(serve())
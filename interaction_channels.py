@@ -11,25 +11,6 @@ def create_interaction_request(case_id, from_stage, to_stage, request_type, mess
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        # Create interaction requests table if it doesn't exist
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS interaction_requests (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                case_id TEXT NOT NULL,
-                from_stage TEXT NOT NULL,
-                to_stage TEXT NOT NULL,
-                request_type TEXT NOT NULL,
-                message TEXT NOT NULL,
-                requested_by TEXT NOT NULL,
-                status TEXT DEFAULT 'Pending',
-                response TEXT,
-                responded_by TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                responded_at TIMESTAMP,
-                FOREIGN KEY (case_id) REFERENCES cases (case_id)
-            )
-        """)
-        
         # Insert interaction request
         cursor.execute("""
             INSERT INTO interaction_requests 
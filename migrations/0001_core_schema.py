@@ -0,0 +1,301 @@
+"""Core tables: users, cases, documents, audit trail, comments and achievements"""
+from migrations import add_column_if_missing
+
+def upgrade(cursor):
+    """Create the core tables and backfill columns added after first release"""
+    # Users table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role TEXT NOT NULL,
+            email TEXT,
+            name TEXT,
+            team TEXT,
+            functional_designation TEXT,
+            referred_by TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active BOOLEAN DEFAULT 1
+        )
+    ''')
+    
+    # Create interaction_requests table for workflow communication
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS interaction_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT NOT NULL,
+            from_stage TEXT NOT NULL,
+            to_stage TEXT NOT NULL,
+            request_type TEXT NOT NULL,
+            message TEXT NOT NULL,
+            requested_by TEXT NOT NULL,
+            status TEXT DEFAULT 'Pending',
+            response TEXT,
+            responded_by TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            responded_at TIMESTAMP,
+            FOREIGN KEY (case_id) REFERENCES cases (case_id)
+        )
+    ''')
+    
+    # Account requests table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS account_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            full_name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            phone TEXT,
+            organization TEXT,
+            designation TEXT,
+            requested_role TEXT NOT NULL,
+            business_justification TEXT NOT NULL,
+            manager_name TEXT,
+            manager_email TEXT,
+            status TEXT DEFAULT 'Pending',
+            admin_notes TEXT,
+            processed_by TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            processed_at TIMESTAMP
+        )
+    ''')
+    
+    # Cases table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT UNIQUE NOT NULL,
+            lan TEXT NOT NULL,
+            case_type TEXT NOT NULL,
+            product TEXT NOT NULL,
+            region TEXT NOT NULL,
+            referred_by TEXT NOT NULL,
+            case_description TEXT NOT NULL,
+            case_date DATE NOT NULL,
+            status TEXT DEFAULT 'Draft',
+            created_by TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            reviewed_by TEXT,
+            reviewed_at TIMESTAMP,
+            approved_by TEXT,
+            approved_at TIMESTAMP,
+            legal_reviewed_by TEXT,
+            legal_reviewed_at TIMESTAMP,
+            closed_by TEXT,
+            closed_at TIMESTAMP,
+            closure_reason TEXT,
+            -- SLA tracking
+            fmr1_due_date DATE,
+            fmr1_submitted_date DATE,
+            fmr3_due_date DATE,
+            fmr3_submitted_date DATE,
+            document_retention_date DATE,
+            sla_status TEXT DEFAULT 'On Track',
+            -- Demographics
+            customer_name TEXT,
+            customer_dob DATE,
+            customer_pan TEXT,
+            customer_address TEXT,
+            customer_mobile TEXT,
+            customer_email TEXT,
+            branch_location TEXT,
+            loan_amount DECIMAL(15,2),
+            disbursement_date DATE,
+            repayment_status TEXT,
+            linked_loan_accounts TEXT,
+            customer_type TEXT DEFAULT 'Individual',
+            kyc_status TEXT DEFAULT 'Pending',
+            risk_category TEXT,
+            case_source TEXT,
+            FOREIGN KEY (created_by) REFERENCES users (username)
+        )
+    ''')
+    
+    # Documents table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS documents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            original_filename TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            uploaded_by TEXT NOT NULL,
+            uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (case_id) REFERENCES cases (case_id),
+            FOREIGN KEY (uploaded_by) REFERENCES users (username)
+        )
+    ''')
+    
+    # Audit logs table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS audit_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT,
+            action TEXT NOT NULL,
+            details TEXT,
+            performed_by TEXT NOT NULL,
+            performed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (case_id) REFERENCES cases (case_id),
+            FOREIGN KEY (performed_by) REFERENCES users (username)
+        )
+    ''')
+    
+    # Case actions table for Case Action workflow
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS case_actions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT NOT NULL,
+            action_type TEXT NOT NULL,
+            action_details TEXT,
+            created_by TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (case_id) REFERENCES cases (case_id),
+            FOREIGN KEY (created_by) REFERENCES users (username)
+        )
+    ''')
+    
+    # Case documents table for document uploads
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS case_documents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT NOT NULL,
+            original_filename TEXT NOT NULL,
+            stored_filename TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            upload_type TEXT,
+            uploaded_by TEXT NOT NULL,
+            uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (case_id) REFERENCES cases (case_id),
+            FOREIGN KEY (uploaded_by) REFERENCES users (username)
+        )
+    ''')
+    
+    # Case comments table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS case_comments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT NOT NULL,
+            comment TEXT NOT NULL,
+            comment_type TEXT DEFAULT 'General',
+            created_by TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (case_id) REFERENCES cases (case_id),
+            FOREIGN KEY (created_by) REFERENCES users (username)
+        )
+    ''')
+    
+    # Investigation details table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS investigation_details (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT NOT NULL,
+            investigation_type TEXT,
+            investigation_status TEXT DEFAULT 'In Progress',
+            field_verification_status TEXT DEFAULT 'Pending',
+            document_verification_status TEXT DEFAULT 'Pending',
+            reference_verification_status TEXT DEFAULT 'Pending',
+            technical_verification_status TEXT DEFAULT 'Pending',
+            investigation_findings TEXT,
+            risk_assessment TEXT,
+            fraud_indicators TEXT,
+            recommendations TEXT,
+            evidence_collected TEXT,
+            investigation_date DATE,
+            completed_date DATE,
+            investigator_name TEXT,
+            supervisor_name TEXT,
+            final_conclusion TEXT,
+            created_by TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (case_id) REFERENCES cases (case_id),
+            FOREIGN KEY (created_by) REFERENCES users (username)
+        )
+    ''')
+    
+    # Case assignments table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS case_assignments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT NOT NULL,
+            assignment_types TEXT,
+            assignee TEXT,
+            tat TEXT,
+            assigned_by TEXT,
+            assignment_date TEXT,
+            status TEXT DEFAULT 'Active',
+            FOREIGN KEY (case_id) REFERENCES cases (case_id)
+        )
+    ''')
+    
+    # Agency responses table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS agency_responses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT NOT NULL,
+            agency_name TEXT,
+            investigation_status TEXT,
+            investigation_summary TEXT,
+            risk_assessment TEXT,
+            recommendation TEXT,
+            additional_comments TEXT,
+            verification_details TEXT,
+            response_routing TEXT,
+            submitted_by TEXT,
+            submission_date TEXT,
+            FOREIGN KEY (case_id) REFERENCES cases (case_id)
+        )
+    ''')
+    
+    # Achievement tables
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS achievements (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT NOT NULL,
+            icon TEXT NOT NULL,
+            tier TEXT NOT NULL DEFAULT 'bronze',
+            points INTEGER NOT NULL DEFAULT 10,
+            category TEXT NOT NULL DEFAULT 'General',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_achievements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            achievement_id TEXT NOT NULL,
+            earned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (username) REFERENCES users (username),
+            FOREIGN KEY (achievement_id) REFERENCES achievements (id),
+            UNIQUE(username, achievement_id)
+        )
+    ''')
+    
+    # Columns added to existing tables over time
+    for column, definition in [
+        ("name", "TEXT"),
+        ("team", "TEXT"),
+        ("functional_designation", "TEXT"),
+        ("referred_by", "TEXT"),
+        ("all_roles_access", "BOOLEAN DEFAULT 0"),
+    ]:
+        add_column_if_missing(cursor, "users", column, definition)
+    
+    for column in ["investigation_findings", "recommendations", "risk_assessment"]:
+        add_column_if_missing(cursor, "investigation_details", column, "TEXT")
+    
+    # Demographic columns written by models.create_case and data_flow_manager
+    for column, definition in [
+        ("updated_by", "TEXT"),
+        ("customer_aadhaar", "TEXT"),
+        ("customer_occupation", "TEXT"),
+        ("customer_income", "TEXT"),
+        ("customer_cibil_score", "INTEGER"),
+        ("customer_address_full", "TEXT"),
+        ("customer_relationship_status", "TEXT"),
+    ]:
+        add_column_if_missing(cursor, "cases", column, definition)
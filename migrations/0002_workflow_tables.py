@@ -0,0 +1,298 @@
+"""Workflow tables that used to be created on the fly by the models and pages"""
+from migrations import add_column_if_missing
+
+CASES_SIMPLIFIED_DETAIL_FIELDS = [
+    'suspected_fraud_modus_operandi', 'source_of_suspicion', 'initial_loss_estimate',
+    'complaint_nature', 'customer_statement_summary', 'date_of_incident',
+    'escalation_source', 'escalation_reason', 'related_department',
+    'law_enforcement_agency', 'fir_case_number', 'date_of_referral',
+    'type_of_credentials_misused', 'method_of_compromise', 'date_detected',
+    'branch_name_code', 'escalation_trigger', 'responsible_officer',
+    'source_entity', 'alert_type', 'date_of_alert',
+    'platform', 'post_content_link', 'date_posted',
+    'call_id_reference', 'date_of_call',
+    'audit_type', 'observation_summary', 'audit_date',
+    'signal_type', 'trigger_source', 'observation_date',
+    'description', 'source', 'date_noted'
+]
+
+def upgrade(cursor):
+    """Create the workflow tables and reconcile columns the pages write to"""
+    # Simplified case entry table with the category-specific detail fields
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cases_simplified (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT UNIQUE NOT NULL,
+            category TEXT NOT NULL,
+            referred_by TEXT NOT NULL,
+            case_type TEXT NOT NULL,
+            case_date DATE NOT NULL,
+            case_description TEXT NOT NULL,
+            created_by TEXT NOT NULL,
+            created_at DATETIME NOT NULL,
+            status TEXT DEFAULT 'Registered',
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+
+            -- Fraud Suspect fields
+            suspected_fraud_modus_operandi TEXT,
+            source_of_suspicion TEXT,
+            initial_loss_estimate TEXT,
+
+            -- Customer Complaint fields
+            complaint_nature TEXT,
+            customer_statement_summary TEXT,
+            date_of_incident TEXT,
+
+            -- Internal Escalation fields
+            escalation_source TEXT,
+            escalation_reason TEXT,
+            related_department TEXT,
+
+            -- Legal Referral fields
+            law_enforcement_agency TEXT,
+            fir_case_number TEXT,
+            date_of_referral TEXT,
+
+            -- Credential Misuse fields
+            type_of_credentials_misused TEXT,
+            method_of_compromise TEXT,
+            date_detected TEXT,
+
+            -- Branch Escalation fields
+            branch_name_code TEXT,
+            escalation_trigger TEXT,
+            responsible_officer TEXT,
+
+            -- Third-Party Alert fields
+            source_entity TEXT,
+            alert_type TEXT,
+            date_of_alert TEXT,
+
+            -- Social Media Flag fields
+            platform TEXT,
+            post_content_link TEXT,
+            date_posted TEXT,
+
+            -- Call Center Escalation fields
+            call_id_reference TEXT,
+            -- escalation_reason already defined above
+            date_of_call TEXT,
+
+            -- Audit Observation fields
+            audit_type TEXT,
+            observation_summary TEXT,
+            audit_date TEXT,
+
+            -- EWS Early Warning Signal fields
+            signal_type TEXT,
+            trigger_source TEXT,
+            observation_date TEXT,
+
+            -- Other (Specify) fields
+            description TEXT,
+            source TEXT,
+            date_noted TEXT
+        )
+    ''')
+    
+    # Case allocation records
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS case_allocations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT NOT NULL,
+            investigation_type TEXT NOT NULL,
+            assigned_investigator TEXT NOT NULL,
+            priority_level TEXT NOT NULL,
+            expected_completion DATE,
+            allocation_notes TEXT,
+            special_instructions TEXT,
+            product TEXT,
+            branch_location TEXT,
+            region TEXT,
+            lan TEXT,
+            customer_name TEXT,
+            loan_amount REAL,
+            disbursement_date DATE,
+            date_of_birth DATE,
+            pan TEXT,
+            mobile_number TEXT,
+            email_id TEXT,
+            aadhaar_number TEXT,
+            relationship_status TEXT,
+            complete_address TEXT,
+            occupation TEXT,
+            monthly_income_range TEXT,
+            cibil_score INTEGER,
+            gst_business_proof TEXT,
+            pan_card_image TEXT,
+            aadhaar_card_image TEXT,
+            customer_photo TEXT,
+            supporting_documents TEXT,
+            created_by TEXT NOT NULL,
+            created_at DATETIME NOT NULL,
+            status TEXT DEFAULT 'Allocated',
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Internal fraud cases
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS internal_fraud_cases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT UNIQUE NOT NULL,
+            case_type TEXT NOT NULL,
+            detection_date DATE,
+            reported_by TEXT,
+            reporting_channel TEXT,
+            incident_description TEXT,
+            supporting_documents TEXT,
+            allocated_to TEXT,
+            allocation_date DATE,
+            allocation_remarks TEXT,
+            investigation_start_date DATE,
+            investigation_summary TEXT,
+            preliminary_findings TEXT,
+            evidence_collected TEXT,
+            final_reviewer TEXT,
+            reviewer_comments TEXT,
+            approver1_name TEXT,
+            approver1_decision TEXT,
+            approver2_name TEXT,
+            approver2_decision TEXT,
+            code_breach TEXT,
+            code_reference TEXT,
+            primary_closure_remarks TEXT,
+            hr_action TEXT,
+            scn_date DATE,
+            committee_review TEXT,
+            final_closure_date DATE,
+            final_closure_remarks TEXT,
+            created_by TEXT NOT NULL,
+            created_at DATETIME NOT NULL,
+            status TEXT DEFAULT 'Initiated',
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            current_stage TEXT DEFAULT 'Case Initiation',
+            workflow_stage INTEGER DEFAULT 1
+        )
+    ''')
+    
+    # Stakeholder action tracking
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stakeholder_actions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT NOT NULL,
+            task_title TEXT NOT NULL,
+            task_type TEXT NOT NULL,
+            stakeholder_type TEXT NOT NULL,
+            assigned_to TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            description TEXT NOT NULL,
+            expected_outcome TEXT,
+            due_date DATE NOT NULL,
+            estimated_hours REAL,
+            actual_hours REAL DEFAULT 0,
+            dependency_on TEXT,
+            special_instructions TEXT,
+            resources_needed TEXT,
+            status TEXT DEFAULT 'Pending',
+            progress_percentage INTEGER DEFAULT 0,
+            created_by TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            completed_at DATETIME NULL
+        )
+    ''')
+    
+    # Dashboard preferences per user
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_preferences (
+            username TEXT PRIMARY KEY,
+            dashboard_widgets TEXT,
+            layout_style TEXT,
+            auto_refresh TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Verification lab configuration
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS verification_config (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            config_type TEXT NOT NULL,
+            config_name TEXT NOT NULL,
+            config_value TEXT NOT NULL,
+            created_date TEXT NOT NULL,
+            modified_date TEXT NOT NULL,
+            created_by TEXT NOT NULL,
+            UNIQUE(config_type, config_name)
+        )
+    ''')
+    
+    # Final review adjudication decisions
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS adjudication_decisions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT NOT NULL,
+            category TEXT NOT NULL,
+            fraud_type TEXT,
+            severity TEXT NOT NULL,
+            summary TEXT NOT NULL,
+            adjudicated_by TEXT NOT NULL,
+            adjudicated_at DATETIME NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (case_id) REFERENCES cases (case_id)
+        )
+    ''')
+    
+    # Regulatory (FMR) reports
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS regulatory_reports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT NOT NULL,
+            report_type TEXT NOT NULL,
+            reporting_date DATE NOT NULL,
+            fraud_amount REAL NOT NULL,
+            fraud_type TEXT NOT NULL,
+            detection_method TEXT,
+            geographical_area TEXT,
+            recovery_amount REAL DEFAULT 0,
+            incident_description TEXT,
+            modus_operandi TEXT,
+            police_complaint TEXT,
+            fir_number TEXT,
+            police_station TEXT,
+            staff_involvement TEXT,
+            staff_action TEXT,
+            prevention_measures TEXT,
+            generated_by TEXT NOT NULL,
+            generated_at DATETIME NOT NULL,
+            submission_status TEXT DEFAULT 'Pending',
+            submitted_at DATETIME NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Databases created by the old case entry pages lack the detail fields
+    for column in CASES_SIMPLIFIED_DETAIL_FIELDS:
+        add_column_if_missing(cursor, "cases_simplified", column, "TEXT")
+    
+    # Columns written by the investigation panel's case action form
+    for column in [
+        "fraud_reason", "fraud_tags", "closure_reason", "regional_assignment",
+        "agency_assignment", "comments", "reviewed_by", "action_date"
+    ]:
+        add_column_if_missing(cursor, "case_actions", column, "TEXT")
+    
+    # Columns written by the investigation panel's assignment flow
+    for column in ["assignment_type", "assignment_details", "assigned_to", "created_by", "created_at"]:
+        add_column_if_missing(cursor, "case_assignments", column, "TEXT")
+    
+    # Columns written by the investigator panel
+    for column in [
+        "pan_verification", "aadhaar_verification", "bank_statement_verification",
+        "address_verification", "employment_verification", "mobile_verification",
+        "cibil_review", "form26as_review", "modus_operandi", "root_cause_analysis",
+        "business_action", "rcu_action", "orm_action", "compliance_action",
+        "it_action", "legal_action", "investigation_comments", "investigated_by"
+    ]:
+        add_column_if_missing(cursor, "investigation_details", column, "TEXT")
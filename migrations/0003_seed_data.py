@@ -0,0 +1,41 @@
+"""Default admin account, achievement catalogue and removal of legacy test users"""
+from database import get_password_hash
+
+LEGACY_TEST_USERS = ["initiator", "reviewer", "approver", "legal", "closure", "actioner"]
+
+DEFAULT_USERS = [
+    ("admin", "admin123", "Admin", "admin@abcl.com", "System Administrator", "IT", "System Admin", "Technical Team")
+]
+
+DEFAULT_ACHIEVEMENTS = [
+    ("first_case", "First Case", "Handle your first case", "🎯", "bronze", 10, "Getting Started"),
+    ("cases_5", "Case Handler", "Successfully handle 5 cases", "📝", "bronze", 25, "Progress"),
+    ("cases_10", "Case Expert", "Successfully handle 10 cases", "🏅", "silver", 50, "Progress"),
+    ("cases_25", "Case Master", "Successfully handle 25 cases", "🎖️", "silver", 100, "Progress"),
+    ("cases_50", "Case Champion", "Successfully handle 50 cases", "🏆", "gold", 250, "Progress"),
+    ("cases_100", "Case Legend", "Successfully handle 100 cases", "👑", "gold", 500, "Progress"),
+    ("speed_resolver", "Speed Demon", "Resolve cases quickly", "⚡", "silver", 75, "Performance"),
+    ("quality_expert", "Quality Master", "Maintain high quality standards", "💎", "gold", 200, "Performance"),
+    ("team_player", "Team Player", "Collaborate effectively", "🤝", "bronze", 30, "Collaboration"),
+    ("mentor", "Mentor", "Help train new team members", "🎓", "gold", 150, "Leadership")
+]
+
+def upgrade(cursor):
+    """Seed default data; existing rows are left untouched"""
+    cursor.executemany(
+        "DELETE FROM users WHERE username = ?",
+        [(username,) for username in LEGACY_TEST_USERS]
+    )
+    
+    for username, password, role, email, name, team, designation, referred_by in DEFAULT_USERS:
+        password_hash = get_password_hash(password)
+        cursor.execute('''
+            INSERT OR IGNORE INTO users (username, password_hash, role, email, name, team, 
+                                         functional_designation, referred_by) 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (username, password_hash, role, email, name, team, designation, referred_by))
+    
+    cursor.executemany('''
+        INSERT OR IGNORE INTO achievements (id, name, description, icon, tier, points, category) 
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', DEFAULT_ACHIEVEMENTS)
@@ -0,0 +1,54 @@
+"""Secondary indexes for the predicates the panels filter and sort on"""
+
+INDEXES = [
+    # Case listings filter by status / creator and sort newest first
+    ("idx_cases_simplified_status_created", "cases_simplified", "status, created_at"),
+    ("idx_cases_simplified_creator_created", "cases_simplified", "created_by, created_at"),
+    ("idx_cases_simplified_created", "cases_simplified", "created_at"),
+    ("idx_cases_status", "cases", "status"),
+    ("idx_cases_region", "cases", "region"),
+    ("idx_cases_product", "cases", "product"),
+    ("idx_cases_created", "cases", "created_at"),
+    
+    # Repeat-customer lookups (customer_pan = ? OR customer_mobile = ?)
+    ("idx_cases_customer_pan", "cases", "customer_pan"),
+    ("idx_cases_customer_mobile", "cases", "customer_mobile"),
+    
+    # Per-user statistics match any of the workflow actor columns
+    ("idx_cases_created_by", "cases", "created_by"),
+    ("idx_cases_reviewed_by", "cases", "reviewed_by"),
+    ("idx_cases_approved_by", "cases", "approved_by"),
+    ("idx_cases_closed_by", "cases", "closed_by"),
+    
+    # Per-case child rows
+    ("idx_case_comments_case", "case_comments", "case_id, created_at"),
+    ("idx_documents_case", "documents", "case_id, uploaded_at"),
+    ("idx_case_documents_case", "case_documents", "case_id, uploaded_at"),
+    ("idx_case_actions_case", "case_actions", "case_id"),
+    ("idx_case_assignments_case", "case_assignments", "case_id"),
+    ("idx_agency_responses_case", "agency_responses", "case_id"),
+    ("idx_investigation_details_case", "investigation_details", "case_id"),
+    ("idx_case_allocations_case", "case_allocations", "case_id"),
+    ("idx_case_allocations_created", "case_allocations", "created_at"),
+    ("idx_stakeholder_actions_case", "stakeholder_actions", "case_id"),
+    ("idx_adjudication_decisions_case", "adjudication_decisions", "case_id"),
+    ("idx_regulatory_reports_case", "regulatory_reports", "case_id"),
+    
+    # Audit trail: per case, and the global newest-first view
+    ("idx_audit_logs_case_performed", "audit_logs", "case_id, performed_at"),
+    ("idx_audit_logs_performed", "audit_logs", "performed_at"),
+    
+    # Stage inboxes and per-case interaction history
+    ("idx_interaction_requests_stage_status", "interaction_requests", "to_stage, status, created_at"),
+    ("idx_interaction_requests_case", "interaction_requests", "case_id, created_at"),
+    
+    ("idx_internal_fraud_cases_created", "internal_fraud_cases", "created_at"),
+    ("idx_account_requests_status_created", "account_requests", "status, created_at"),
+    ("idx_users_active_name", "users", "is_active, name"),
+]
+
+def upgrade(cursor):
+    """Create every index in INDEXES"""
+    for name, table, columns in INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+    cursor.execute("ANALYZE")
@@ -0,0 +1,60 @@
+"""FTS5 full-text index over cases and their comments, kept in sync by triggers"""
+
+# Everything the search box can match, in FTS column order
+INDEXED_CASE_COLUMNS = ["case_id", "lan", "customer_name", "customer_pan", "customer_mobile", "case_description"]
+
+# Comment text for one case; stage-data JSON blobs are not searchable prose
+CASE_COMMENTS_TEXT = '''
+    (SELECT group_concat(comment, ' ') FROM case_comments
+     WHERE case_id = {case_id} AND comment NOT LIKE 'STAGE_DATA:%')
+'''
+
+def upgrade(cursor):
+    """Create cases_fts, backfill it and install the sync triggers"""
+    columns = ", ".join(INDEXED_CASE_COLUMNS)
+    
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS cases_fts USING fts5(
+            {columns}, comments,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3 4'
+        )
+    ''')
+    
+    # Row ids mirror cases.id so search results join straight back to cases
+    cursor.execute(f'''
+        INSERT INTO cases_fts (rowid, {columns}, comments)
+        SELECT id, {columns}, {CASE_COMMENTS_TEXT.format(case_id="cases.case_id")}
+        FROM cases
+    ''')
+    
+    new_values = ", ".join(f"new.{column}" for column in INDEXED_CASE_COLUMNS)
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS cases_fts_after_insert AFTER INSERT ON cases BEGIN
+            INSERT INTO cases_fts (rowid, {columns}, comments)
+            VALUES (new.id, {new_values}, {CASE_COMMENTS_TEXT.format(case_id="new.case_id")});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS cases_fts_after_update AFTER UPDATE OF {columns} ON cases BEGIN
+            DELETE FROM cases_fts WHERE rowid = old.id;
+            INSERT INTO cases_fts (rowid, {columns}, comments)
+            VALUES (new.id, {new_values}, {CASE_COMMENTS_TEXT.format(case_id="new.case_id")});
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS cases_fts_after_delete AFTER DELETE ON cases BEGIN
+            DELETE FROM cases_fts WHERE rowid = old.id;
+        END
+    ''')
+    
+    # Re-aggregate the comment text of the affected case
+    for event, ref in [("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old")]:
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS case_comments_fts_after_{event.lower()}
+            AFTER {event} ON case_comments BEGIN
+                UPDATE cases_fts
+                SET comments = {CASE_COMMENTS_TEXT.format(case_id=f"{ref}.case_id")}
+                WHERE rowid = (SELECT id FROM cases WHERE case_id = {ref}.case_id);
+            END
+        ''')
@@ -0,0 +1,14 @@
+"""Indexes backing the keyset-paginated listings' filters"""
+
+INDEXES = [
+    # Each index ends in the sort column; the rowid (id) completes the keyset
+    ("idx_case_allocations_status_created", "case_allocations", "status, created_at"),
+    ("idx_case_allocations_investigator_created", "case_allocations", "assigned_investigator, created_at"),
+    ("idx_internal_fraud_cases_status_created", "internal_fraud_cases", "status, created_at"),
+    ("idx_internal_fraud_cases_stage_created", "internal_fraud_cases", "current_stage, created_at"),
+]
+
+def upgrade(cursor):
+    """Create every index in INDEXES"""
+    for name, table, columns in INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
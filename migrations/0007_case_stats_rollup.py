@@ -0,0 +1,275 @@
+"""Trigger-maintained case_stats rollup behind the dashboard statistics"""
+from case_stats import rebuild_case_stats
+
+# Trigger DDL as released; a change to the triggers belongs in a new migration
+ROLLUP_TRIGGERS = [
+    '''
+        CREATE TRIGGER IF NOT EXISTS cases_stats_insert AFTER INSERT ON cases
+        BEGIN
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'total', COALESCE('', ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'status', COALESCE(NEW.status, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'region', COALESCE(NEW.region, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'product', COALESCE(NEW.product, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'created_by', COALESCE(NEW.created_by, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'day', COALESCE(date(NEW.created_at), ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS cases_stats_delete AFTER DELETE ON cases
+        BEGIN
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'total', COALESCE('', ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'status', COALESCE(OLD.status, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'region', COALESCE(OLD.region, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'product', COALESCE(OLD.product, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'created_by', COALESCE(OLD.created_by, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'day', COALESCE(date(OLD.created_at), ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS cases_stats_update_status
+        AFTER UPDATE OF status ON cases
+        WHEN OLD.status IS NOT NEW.status
+        BEGIN
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'status', COALESCE(OLD.status, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'status', COALESCE(NEW.status, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS cases_stats_update_region
+        AFTER UPDATE OF region ON cases
+        WHEN OLD.region IS NOT NEW.region
+        BEGIN
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'region', COALESCE(OLD.region, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'region', COALESCE(NEW.region, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS cases_stats_update_product
+        AFTER UPDATE OF product ON cases
+        WHEN OLD.product IS NOT NEW.product
+        BEGIN
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'product', COALESCE(OLD.product, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'product', COALESCE(NEW.product, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS cases_stats_update_created_by
+        AFTER UPDATE OF created_by ON cases
+        WHEN OLD.created_by IS NOT NEW.created_by
+        BEGIN
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'created_by', COALESCE(OLD.created_by, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'created_by', COALESCE(NEW.created_by, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS cases_stats_update_day
+        AFTER UPDATE OF created_at ON cases
+        WHEN date(OLD.created_at) IS NOT date(NEW.created_at)
+        BEGIN
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'day', COALESCE(date(OLD.created_at), ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('cases', 'day', COALESCE(date(NEW.created_at), ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS internal_fraud_cases_stats_insert AFTER INSERT ON internal_fraud_cases
+        BEGIN
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'total', COALESCE('', ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'status', COALESCE(NEW.status, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'case_type', COALESCE(NEW.case_type, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'hr_action', COALESCE(NEW.hr_action, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'created_by', COALESCE(NEW.created_by, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'day', COALESCE(date(NEW.created_at), ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS internal_fraud_cases_stats_delete AFTER DELETE ON internal_fraud_cases
+        BEGIN
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'total', COALESCE('', ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'status', COALESCE(OLD.status, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'case_type', COALESCE(OLD.case_type, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'hr_action', COALESCE(OLD.hr_action, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'created_by', COALESCE(OLD.created_by, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'day', COALESCE(date(OLD.created_at), ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS internal_fraud_cases_stats_update_status
+        AFTER UPDATE OF status ON internal_fraud_cases
+        WHEN OLD.status IS NOT NEW.status
+        BEGIN
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'status', COALESCE(OLD.status, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'status', COALESCE(NEW.status, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS internal_fraud_cases_stats_update_case_type
+        AFTER UPDATE OF case_type ON internal_fraud_cases
+        WHEN OLD.case_type IS NOT NEW.case_type
+        BEGIN
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'case_type', COALESCE(OLD.case_type, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'case_type', COALESCE(NEW.case_type, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS internal_fraud_cases_stats_update_hr_action
+        AFTER UPDATE OF hr_action ON internal_fraud_cases
+        WHEN OLD.hr_action IS NOT NEW.hr_action
+        BEGIN
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'hr_action', COALESCE(OLD.hr_action, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'hr_action', COALESCE(NEW.hr_action, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS internal_fraud_cases_stats_update_created_by
+        AFTER UPDATE OF created_by ON internal_fraud_cases
+        WHEN OLD.created_by IS NOT NEW.created_by
+        BEGIN
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'created_by', COALESCE(OLD.created_by, ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'created_by', COALESCE(NEW.created_by, ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS internal_fraud_cases_stats_update_day
+        AFTER UPDATE OF created_at ON internal_fraud_cases
+        WHEN date(OLD.created_at) IS NOT date(NEW.created_at)
+        BEGIN
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'day', COALESCE(date(OLD.created_at), ''), -1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (-1);
+
+            INSERT INTO case_stats (source, dimension, value, count)
+            VALUES ('internal_fraud_cases', 'day', COALESCE(date(NEW.created_at), ''), 1)
+            ON CONFLICT (source, dimension, value) DO UPDATE SET count = count + (1);
+        END
+    ''',
+]
+
+def upgrade(cursor):
+    """Create case_stats, install its triggers and fill it from a recount"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS case_stats (
+            source TEXT NOT NULL,
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (source, dimension, value)
+        ) WITHOUT ROWID
+    ''')
+    
+    for statement in ROLLUP_TRIGGERS:
+        cursor.execute(statement)
+    
+    rebuild_case_stats(cursor)
@@ -0,0 +1,25 @@
+"""updated_at watermarks for the tables copied into the analytics snapshot"""
+from migrations import add_column_if_missing
+
+# Tables whose changed rows the snapshot picks up through updated_at
+WATERMARKED_TABLES = ["cases", "cases_simplified", "case_allocations", "internal_fraud_cases", "regulatory_reports"]
+
+def upgrade(cursor):
+    """Give every watermarked table an indexed, always-bumped updated_at"""
+    add_column_if_missing(cursor, "regulatory_reports", "updated_at", "DATETIME")
+    cursor.execute('''
+        UPDATE regulatory_reports SET updated_at = COALESCE(submitted_at, generated_at, created_at)
+        WHERE updated_at IS NULL
+    ''')
+    
+    for table in WATERMARKED_TABLES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_updated ON {table} (updated_at)")
+        
+        # Plenty of older write paths never touch updated_at; bump it for them
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_touch_updated_at AFTER UPDATE ON {table}
+            WHEN NEW.updated_at IS OLD.updated_at
+            BEGIN
+                UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+            END
+        ''')
@@ -0,0 +1,45 @@
+"""Dedicated per-stage data store replacing STAGE_DATA:{json} comments"""
+import json
+
+def upgrade(cursor):
+    """Create case_stage_data and carry over the stage data saved as comments"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS case_stage_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            data TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 1,
+            saved_by TEXT,
+            saved_at TEXT NOT NULL,
+            UNIQUE (case_id, stage)
+        )
+    ''')
+    
+    # Replay the comments oldest first so the latest save of a stage wins
+    cursor.execute('''
+        SELECT case_id, comment, created_by, created_at FROM case_comments
+        WHERE comment LIKE 'STAGE_DATA:%'
+        ORDER BY created_at, id
+    ''')
+    for case_id, comment, created_by, created_at in cursor.fetchall():
+        try:
+            package = json.loads(comment[len('STAGE_DATA:'):])
+        except ValueError:
+            continue
+        if not isinstance(package, dict):
+            continue
+        
+        cursor.execute('''
+            INSERT INTO case_stage_data (case_id, stage, data, version, saved_by, saved_at)
+            VALUES (?, ?, ?, 1, ?, ?)
+            ON CONFLICT (case_id, stage) DO UPDATE SET
+                data = excluded.data, version = version + 1,
+                saved_by = excluded.saved_by, saved_at = excluded.saved_at
+        ''', (
+            case_id,
+            package.get('stage', 'Unknown'),
+            json.dumps(package.get('data', {}), default=str),
+            package.get('user', created_by),
+            package.get('timestamp', created_at)
+        ))
@@ -0,0 +1,163 @@
+"""Append-only case_events log with its workflow state and queue projections"""
+from workflow_engine import seed_case_events
+
+# Trigger DDL as released; a change to the triggers belongs in a new migration
+WORKFLOW_TRIGGERS = [
+    '''
+        CREATE TRIGGER IF NOT EXISTS case_events_project AFTER INSERT ON case_events
+        BEGIN
+            UPDATE workflow_queue
+            SET depth = depth - 1,
+                exits = exits + 1,
+                seconds_in_status = seconds_in_status + COALESCE(NEW.seconds_in_previous, 0)
+            WHERE source = NEW.source AND status = NEW.from_status;
+
+            INSERT INTO workflow_queue (source, status, depth) VALUES (NEW.source, COALESCE(NEW.to_status, ''), 1)
+            ON CONFLICT (source, status) DO UPDATE SET depth = depth + 1;
+
+            INSERT INTO case_workflow_state (source, case_id, status, entered_at, last_event_id, transitions)
+            VALUES (NEW.source, NEW.case_id, NEW.to_status, NEW.created_at, NEW.id, 0)
+            ON CONFLICT (source, case_id) DO UPDATE SET
+                status = excluded.status, entered_at = excluded.entered_at,
+                last_event_id = excluded.last_event_id, transitions = transitions + 1;
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS cases_workflow_insert AFTER INSERT ON cases
+        BEGIN
+            INSERT INTO case_events (source, case_id, from_status, to_status, actor, comments, created_at)
+            VALUES ('cases', NEW.case_id, NULL, NEW.status, NEW.created_by, 'Case created', CURRENT_TIMESTAMP);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS cases_workflow_update AFTER UPDATE OF status ON cases
+        WHEN NEW.status IS NOT (
+            SELECT status FROM case_workflow_state WHERE source = 'cases' AND case_id = NEW.case_id
+        )
+        BEGIN
+            INSERT INTO case_events (source, case_id, from_status, to_status, actor, comments, created_at, seconds_in_previous)
+            SELECT source, case_id, status, NEW.status, NEW.updated_by, 'Status set outside the workflow engine',
+                   CURRENT_TIMESTAMP, strftime('%s', 'now') - strftime('%s', entered_at)
+            FROM case_workflow_state WHERE source = 'cases' AND case_id = NEW.case_id;
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS cases_workflow_delete AFTER DELETE ON cases
+        BEGIN
+            UPDATE workflow_queue SET depth = depth - 1
+            WHERE source = 'cases' AND status = (
+                SELECT COALESCE(status, '') FROM case_workflow_state
+                WHERE source = 'cases' AND case_id = OLD.case_id
+            );
+            DELETE FROM case_workflow_state WHERE source = 'cases' AND case_id = OLD.case_id;
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS cases_simplified_workflow_insert AFTER INSERT ON cases_simplified
+        BEGIN
+            INSERT INTO case_events (source, case_id, from_status, to_status, actor, comments, created_at)
+            VALUES ('cases_simplified', NEW.case_id, NULL, NEW.status, NEW.created_by, 'Case created', CURRENT_TIMESTAMP);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS cases_simplified_workflow_update AFTER UPDATE OF status ON cases_simplified
+        WHEN NEW.status IS NOT (
+            SELECT status FROM case_workflow_state WHERE source = 'cases_simplified' AND case_id = NEW.case_id
+        )
+        BEGIN
+            INSERT INTO case_events (source, case_id, from_status, to_status, actor, comments, created_at, seconds_in_previous)
+            SELECT source, case_id, status, NEW.status, NULL, 'Status set outside the workflow engine',
+                   CURRENT_TIMESTAMP, strftime('%s', 'now') - strftime('%s', entered_at)
+            FROM case_workflow_state WHERE source = 'cases_simplified' AND case_id = NEW.case_id;
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS cases_simplified_workflow_delete AFTER DELETE ON cases_simplified
+        BEGIN
+            UPDATE workflow_queue SET depth = depth - 1
+            WHERE source = 'cases_simplified' AND status = (
+                SELECT COALESCE(status, '') FROM case_workflow_state
+                WHERE source = 'cases_simplified' AND case_id = OLD.case_id
+            );
+            DELETE FROM case_workflow_state WHERE source = 'cases_simplified' AND case_id = OLD.case_id;
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS internal_fraud_cases_workflow_insert AFTER INSERT ON internal_fraud_cases
+        BEGIN
+            INSERT INTO case_events (source, case_id, from_status, to_status, actor, comments, created_at)
+            VALUES ('internal_fraud_cases', NEW.case_id, NULL, NEW.status, NEW.created_by, 'Case created', CURRENT_TIMESTAMP);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS internal_fraud_cases_workflow_update AFTER UPDATE OF status ON internal_fraud_cases
+        WHEN NEW.status IS NOT (
+            SELECT status FROM case_workflow_state WHERE source = 'internal_fraud_cases' AND case_id = NEW.case_id
+        )
+        BEGIN
+            INSERT INTO case_events (source, case_id, from_status, to_status, actor, comments, created_at, seconds_in_previous)
+            SELECT source, case_id, status, NEW.status, NULL, 'Status set outside the workflow engine',
+                   CURRENT_TIMESTAMP, strftime('%s', 'now') - strftime('%s', entered_at)
+            FROM case_workflow_state WHERE source = 'internal_fraud_cases' AND case_id = NEW.case_id;
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS internal_fraud_cases_workflow_delete AFTER DELETE ON internal_fraud_cases
+        BEGIN
+            UPDATE workflow_queue SET depth = depth - 1
+            WHERE source = 'internal_fraud_cases' AND status = (
+                SELECT COALESCE(status, '') FROM case_workflow_state
+                WHERE source = 'internal_fraud_cases' AND case_id = OLD.case_id
+            );
+            DELETE FROM case_workflow_state WHERE source = 'internal_fraud_cases' AND case_id = OLD.case_id;
+        END
+    ''',
+]
+def upgrade(cursor):
+    """Create the event log and projections, then open a stream for every case"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS case_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            case_id TEXT NOT NULL,
+            from_status TEXT,
+            to_status TEXT,
+            actor TEXT,
+            comments TEXT,
+            created_at TEXT NOT NULL,
+            seconds_in_previous INTEGER
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_case_events_case ON case_events (source, case_id, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_case_events_created ON case_events (created_at)")
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS case_workflow_state (
+            source TEXT NOT NULL,
+            case_id TEXT NOT NULL,
+            status TEXT,
+            entered_at TEXT NOT NULL,
+            last_event_id INTEGER NOT NULL,
+            transitions INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (source, case_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_case_workflow_state_queue ON case_workflow_state (source, status, entered_at)"
+    )
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS workflow_queue (
+            source TEXT NOT NULL,
+            status TEXT NOT NULL,
+            depth INTEGER NOT NULL DEFAULT 0,
+            exits INTEGER NOT NULL DEFAULT 0,
+            seconds_in_status INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (source, status)
+        ) WITHOUT ROWID
+    ''')
+
+    for statement in WORKFLOW_TRIGGERS:
+        cursor.execute(statement)
+
+    seed_case_events(cursor)
@@ -0,0 +1,26 @@
+"""Per-table write counters behind the query cache"""
+
+# The tables versioned when this migration was released
+VERSIONED_TABLES = ("cases", "cases_simplified", "users", "verification_config")
+
+def upgrade(cursor):
+    """Create table_versions and the triggers that bump it"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    cursor.executemany(
+        "INSERT OR IGNORE INTO table_versions (table_name, version) VALUES (?, 0)",
+        [(table,) for table in VERSIONED_TABLES]
+    )
+    
+    for table in VERSIONED_TABLES:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+                END
+            ''')
@@ -0,0 +1,28 @@
+"""Trigger-populated change_log feed (dropped again by 0016)"""
+
+# The tables watched when this migration was released
+CHANGE_FEED_TABLES = ("cases", "cases_simplified", "case_comments", "audit_logs")
+
+def upgrade(cursor):
+    """Create change_log and the triggers that fill it"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            operation TEXT NOT NULL,
+            row_id INTEGER,
+            changed_at TEXT NOT NULL
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_change_log_table ON change_log (table_name, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_change_log_changed ON change_log (changed_at)")
+    
+    for table in CHANGE_FEED_TABLES:
+        for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_change_log_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    INSERT INTO change_log (table_name, operation, row_id, changed_at)
+                    VALUES ('{table}', '{event}', {row}.rowid, CURRENT_TIMESTAMP);
+                END
+            ''')
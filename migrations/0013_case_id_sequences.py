@@ -0,0 +1,12 @@
+"""Per-day case ID sequences for the allocator in case_ids.py"""
+from case_ids import seed_case_id_sequences
+
+def upgrade(cursor):
+    """Create case_id_sequences and start each day after its existing case IDs"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS case_id_sequences (
+            day TEXT PRIMARY KEY,
+            next_value INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    seed_case_id_sequences(cursor)
@@ -0,0 +1,17 @@
+"""One updated_at format for the analytics snapshot watermark"""
+
+# The tables 0008 gave an updated_at watermark
+WATERMARKED_TABLES = ["cases", "cases_simplified", "case_allocations", "internal_fraud_cases", "regulatory_reports"]
+
+def upgrade(cursor):
+    """Rewrite local-time isoformat stamps ("T" separator) as UTC CURRENT_TIMESTAMP text
+
+    The snapshot compares updated_at as text, and "T" sorts after " ", so a
+    single isoformat stamp would hide every later trigger-stamped change made
+    the same day.
+    """
+    for table in WATERMARKED_TABLES:
+        cursor.execute(f'''
+            UPDATE {table} SET updated_at = datetime(updated_at, 'utc')
+            WHERE updated_at LIKE '____-__-__T%' AND datetime(updated_at, 'utc') IS NOT NULL
+        ''')
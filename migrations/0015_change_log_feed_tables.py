@@ -0,0 +1,8 @@
+"""Stop logging writes to tables the query cache already versions"""
+
+def upgrade(cursor):
+    """Drop the change_log triggers on cases and cases_simplified"""
+    for table in ("cases", "cases_simplified"):
+        for event in ("insert", "update", "delete"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {table}_change_log_{event}")
+    cursor.execute("DELETE FROM change_log WHERE table_name IN ('cases', 'cases_simplified')")
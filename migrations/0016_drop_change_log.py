@@ -0,0 +1,17 @@
+"""Drop the unused change_log feed and version audit_logs for the query cache"""
+
+def upgrade(cursor):
+    """Remove change_log with its triggers; add audit_logs to table_versions"""
+    for table in ("case_comments", "audit_logs"):
+        for event in ("insert", "update", "delete"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {table}_change_log_{event}")
+    cursor.execute("DROP TABLE IF EXISTS change_log")
+    
+    cursor.execute("INSERT OR IGNORE INTO table_versions (table_name, version) VALUES ('audit_logs', 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS audit_logs_version_{event.lower()} AFTER {event} ON audit_logs
+            BEGIN
+                UPDATE table_versions SET version = version + 1 WHERE table_name = 'audit_logs';
+            END
+        ''')
@@ -0,0 +1,102 @@
+"""
+Versioned schema migrations for the case management database
+Each module in this package named NNNN_description.py defines upgrade(cursor)
+and is applied exactly once, in version order, then recorded in schema_version
+"""
+import os
+import re
+import sqlite3
+import threading
+import importlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Non-POSIX platforms fall back to the in-process lock only
+    fcntl = None
+
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+_apply_lock = threading.Lock()
+_applied = False
+
+def add_column_if_missing(cursor, table, column, definition):
+    """Add a column to an existing table unless it is already there"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in cursor.fetchall()}
+    if column not in existing:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+def discover_migrations():
+    """Return (version, name, module) for every migration file, oldest first"""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    migrations = []
+    for filename in sorted(os.listdir(package_dir)):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{filename[:-3]}")
+        migrations.append((int(match.group(1)), match.group(2), module))
+    return migrations
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on path so only one process at a time runs the block"""
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def get_schema_version(conn):
+    """Get the highest applied migration version (0 for a fresh database)"""
+    try:
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] or 0
+
+def apply_migrations(force=False):
+    """Bring the database schema up to date, once per process
+    
+    Returns the list of versions applied by this call.
+    """
+    global _applied
+    from database import DATABASE_PATH, get_write_connection
+    
+    if _applied and not force:
+        return []
+    
+    with _apply_lock:
+        if _applied and not force:
+            return []
+        
+        applied_now = []
+        with file_lock(f"{DATABASE_PATH}.lock"):
+            with get_write_connection() as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY,
+                        name TEXT NOT NULL,
+                        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+            
+            for version, name, module in discover_migrations():
+                # Each migration commits together with its schema_version row
+                with get_write_connection() as conn:
+                    if version <= get_schema_version(conn):
+                        continue
+                    module.upgrade(conn.cursor())
+                    conn.execute(
+                        "INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                        (version, name)
+                    )
+                applied_now.append(version)
+        
+        _applied = True
+        return applied_now
@@ -1,11 +1,20 @@
+import re
 import sqlite3
 from datetime import datetime
-from database import get_db_connection, log_audit
+from database import get_db_connection, log_audit, flush_audit_log
+from unit_of_work import CaseUnitOfWork
+from workflow_engine import record_transition
+from query_cache import cached_query
+from pagination import fetch_page, DEFAULT_PAGE_SIZE
+from case_stats import get_rollup
+from case_records import listing_columns, records_from_cursor
+from case_archive import ARCHIVED_STATUSES, archive_lookup
 
 # Import internal fraud functions
 from models_internal_fraud import (
     create_internal_fraud_case, 
     get_internal_fraud_cases, 
+    get_internal_fraud_cases_page,
     get_internal_fraud_case_by_id,
     update_internal_fraud_case,
     update_internal_fraud_case_status,
@@ -18,83 +27,6 @@ def create_simplified_case(case_data):
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Create simplified cases table with dynamic case details fields
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS cases_simplified (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    case_id TEXT UNIQUE NOT NULL,
-                    category TEXT NOT NULL,
-                    referred_by TEXT NOT NULL,
-                    case_type TEXT NOT NULL,
-                    case_date DATE NOT NULL,
-                    case_description TEXT NOT NULL,
-                    created_by TEXT NOT NULL,
-                    created_at DATETIME NOT NULL,
-                    status TEXT DEFAULT 'Registered',
-                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    
-                    -- Fraud Suspect fields
-                    suspected_fraud_modus_operandi TEXT,
-                    source_of_suspicion TEXT,
-                    initial_loss_estimate TEXT,
-                    
-                    -- Customer Complaint fields
-                    complaint_nature TEXT,
-                    customer_statement_summary TEXT,
-                    date_of_incident TEXT,
-                    
-                    -- Internal Escalation fields
-                    escalation_source TEXT,
-                    escalation_reason TEXT,
-                    related_department TEXT,
-                    
-                    -- Legal Referral fields
-                    law_enforcement_agency TEXT,
-                    fir_case_number TEXT,
-                    date_of_referral TEXT,
-                    
-                    -- Credential Misuse fields
-                    type_of_credentials_misused TEXT,
-                    method_of_compromise TEXT,
-                    date_detected TEXT,
-                    
-                    -- Branch Escalation fields
-                    branch_name_code TEXT,
-                    escalation_trigger TEXT,
-                    responsible_officer TEXT,
-                    
-                    -- Third-Party Alert fields
-                    source_entity TEXT,
-                    alert_type TEXT,
-                    date_of_alert TEXT,
-                    
-                    -- Social Media Flag fields
-                    platform TEXT,
-                    post_content_link TEXT,
-                    date_posted TEXT,
-                    
-                    -- Call Center Escalation fields
-                    call_id_reference TEXT,
-                    -- escalation_reason already defined above
-                    date_of_call TEXT,
-                    
-                    -- Audit Observation fields
-                    audit_type TEXT,
-                    observation_summary TEXT,
-                    audit_date TEXT,
-                    
-                    -- EWS Early Warning Signal fields
-                    signal_type TEXT,
-                    trigger_source TEXT,
-                    observation_date TEXT,
-                    
-                    -- Other (Specify) fields
-                    description TEXT,
-                    source TEXT,
-                    date_noted TEXT
-                )
-            ''')
-            
             # Build dynamic insert query based on case_data keys
             base_fields = ['case_id', 'category', 'referred_by', 'case_type', 'case_date', 
                           'case_description', 'created_by', 'created_at', 'status']
@@ -169,47 +101,47 @@ def create_case(case_data, created_by):
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        # Check if case_id already exists
-        cursor.execute("SELECT COUNT(*) FROM cases WHERE case_id = ?", (case_data["case_id"],))
-        if cursor.fetchone()[0] > 0:
+        # Allocated case IDs never repeat; the UNIQUE index catches hand-typed duplicates
+        try:
+            cursor.execute('''
+                INSERT INTO cases (case_id, lan, case_type, product, region, referred_by, 
+                                 case_description, case_date, created_by, status,
+                                 customer_name, customer_dob, customer_pan, customer_aadhaar,
+                                 customer_mobile, customer_email, customer_address_full,
+                                 customer_occupation, customer_income, customer_cibil_score,
+                                 customer_relationship_status, branch_location, loan_amount, disbursement_date)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                case_data["case_id"],
+                case_data["lan"],
+                case_data["case_type"],
+                case_data["product"],
+                case_data["region"],
+                case_data["referred_by"],
+                case_data["case_description"],
+                case_data["case_date"],
+                created_by,
+                case_data.get("status", "Draft"),
+                case_data.get("customer_name", ""),
+                case_data.get("customer_dob", ""),
+                case_data.get("customer_pan", ""),
+                case_data.get("customer_aadhaar", ""),
+                case_data.get("customer_mobile", ""),
+                case_data.get("customer_email", ""),
+                case_data.get("customer_address_full", ""),
+                case_data.get("customer_occupation", ""),
+                case_data.get("customer_income", ""),
+                case_data.get("customer_cibil_score", 0),
+                case_data.get("customer_relationship_status", ""),
+                case_data.get("branch_location", ""),
+                case_data.get("loan_amount", 0),
+                case_data.get("disbursement_date", "")
+            ))
+        except sqlite3.IntegrityError as e:
+            if "cases.case_id" not in str(e):
+                raise
             return False, "Case ID already exists"
         
-        # Handle case data with comprehensive demographics
-        cursor.execute('''
-            INSERT INTO cases (case_id, lan, case_type, product, region, referred_by, 
-                             case_description, case_date, created_by, status,
-                             customer_name, customer_dob, customer_pan, customer_aadhaar,
-                             customer_mobile, customer_email, customer_address_full,
-                             customer_occupation, customer_income, customer_cibil_score,
-                             customer_relationship_status, branch_location, loan_amount, disbursement_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            case_data["case_id"],
-            case_data["lan"],
-            case_data["case_type"],
-            case_data["product"],
-            case_data["region"],
-            case_data["referred_by"],
-            case_data["case_description"],
-            case_data["case_date"],
-            created_by,
-            case_data.get("status", "Draft"),
-            case_data.get("customer_name", ""),
-            case_data.get("customer_dob", ""),
-            case_data.get("customer_pan", ""),
-            case_data.get("customer_aadhaar", ""),
-            case_data.get("customer_mobile", ""),
-            case_data.get("customer_email", ""),
-            case_data.get("customer_address_full", ""),
-            case_data.get("customer_occupation", ""),
-            case_data.get("customer_income", ""),
-            case_data.get("customer_cibil_score", 0),
-            case_data.get("customer_relationship_status", ""),
-            case_data.get("branch_location", ""),
-            case_data.get("loan_amount", 0),
-            case_data.get("disbursement_date", "")
-        ))
-        
         conn.commit()
         
         # Log audit
@@ -217,59 +149,64 @@ def create_case(case_data, created_by):
         
         return True, "Case created successfully"
 
+def cases_by_status_query(status=None, created_by=None):
+    """SQL and parameters for the cases_simplified listing"""
+    # Query cases_simplified table (where Case Entry data is stored)
+    query = f"SELECT {listing_columns('cases_simplified')} FROM cases_simplified"
+    params = []
+    conditions = []
+    
+    if status:
+        conditions.append("status = ?")
+        params.append(status)
+    
+    if created_by:
+        conditions.append("created_by = ?")
+        params.append(created_by)
+    
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    
+    query += " ORDER BY created_at DESC"
+    return query, params
+
+@cached_query("cases_simplified")
+def _query_cases_by_status(status, created_by):
+    """Cached cases_simplified listing; raises, so failures are never cached"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(*cases_by_status_query(status, created_by))
+        return records_from_cursor(cursor, "cases_simplified")
+
 def get_cases_by_status(status=None, created_by=None):
     """Get cases by status and/or creator from cases_simplified table"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Query cases_simplified table (where Case Entry data is stored)
-            query = "SELECT * FROM cases_simplified"
-            params = []
-            conditions = []
-            
-            if status:
-                conditions.append("status = ?")
-                params.append(status)
-            
-            if created_by:
-                conditions.append("created_by = ?")
-                params.append(created_by)
-            
-            if conditions:
-                query += " WHERE " + " AND ".join(conditions)
-            
-            query += " ORDER BY created_at DESC"
-            
-            cursor.execute(query, params)
-            columns = [description[0] for description in cursor.description]
-            rows = cursor.fetchall()
-            
-            # Convert to list of dictionaries
-            cases = []
-            for row in rows:
-                case_dict = dict(zip(columns, row))
-                cases.append(case_dict)
-            
-            return cases
-            
+        return _query_cases_by_status(status, created_by)
     except Exception as e:
         print(f"Error getting cases by status: {e}")
         return []
 
+def get_cases_page(status=None, created_by=None, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """Get one page of cases from cases_simplified, newest first"""
+    return fetch_page(
+        "cases_simplified",
+        filters={"status": status, "created_by": created_by},
+        cursor=cursor,
+        page_size=page_size
+    )
+
 def get_case_by_id(case_id):
-    """Get case by case_id from cases_simplified table"""
+    """Get case by case_id from cases_simplified table, falling back to the archives"""
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM cases_simplified WHERE case_id = ?", (case_id,))
             
-            columns = [description[0] for description in cursor.description]
-            row = cursor.fetchone()
-            
-            if row:
-                return dict(zip(columns, row))
-            return None
+            records = records_from_cursor(cursor, "cases_simplified")
+            if not records:
+                cursor = archive_lookup(conn, "cases_simplified", "case_id = ?", (case_id,), limit=1)
+                records = records_from_cursor(cursor, "cases_simplified") if cursor else []
+            return records[0] if records else None
             
     except Exception as e:
         print(f"Error getting case by ID: {e}")
@@ -278,27 +215,11 @@ def get_case_by_id(case_id):
 def update_case_status(case_id, new_status, updated_by, comments=None):
     """Update case status in cases_simplified table"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Update case status in cases_simplified table
-            cursor.execute('''
-                UPDATE cases_simplified 
-                SET status = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE case_id = ?
-            ''', (new_status, case_id))
-            
-            conn.commit()
-            
-            # Log audit
-            log_audit(
-                user_id=updated_by,
-                action=f"Status updated to {new_status}",
-                table_name="cases_simplified",
-                record_id=case_id
-            )
-            
-            return True
+        with CaseUnitOfWork(updated_by) as uow:
+            uow.set_status(case_id, new_status, table="cases_simplified", comments=comments)
+            uow.audit(case_id, f"Status updated to {new_status}", "Table: cases_simplified")
+        
+        return True
             
     except Exception as e:
         print(f"Error updating case status: {e}")
@@ -340,49 +261,44 @@ def get_case_documents(case_id):
         return cursor.fetchall()
 
 def add_case_document(case_id, filename, original_filename, file_path, file_size, uploaded_by):
-    """Add document to a case"""
+    """Add document to a case; returns the new document id"""
     with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO documents (case_id, filename, original_filename, file_path, file_size, uploaded_by)
             VALUES (?, ?, ?, ?, ?, ?)
         ''', (case_id, filename, original_filename, file_path, file_size, uploaded_by))
+        document_id = cursor.lastrowid
         conn.commit()
         
         # Log audit
         log_audit(case_id, "Document Added", f"Document: {original_filename}", uploaded_by)
+        return document_id
 
+@cached_query("cases")
 def get_case_statistics():
     """Get case statistics for dashboard"""
+    rollup = get_rollup("cases")
+    
+    stats = {
+        "total_cases": rollup["total"].get(None, 0),
+        "by_status": rollup["status"],
+        "by_region": rollup["region"],
+        "by_product": rollup["product"],
+    }
+    
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        stats = {}
-        
-        # Total cases
-        cursor.execute("SELECT COUNT(*) FROM cases")
-        stats["total_cases"] = cursor.fetchone()[0]
-        
-        # Cases by status
-        cursor.execute("SELECT status, COUNT(*) FROM cases GROUP BY status")
-        stats["by_status"] = dict(cursor.fetchall())
-        
-        # Cases by region
-        cursor.execute("SELECT region, COUNT(*) FROM cases GROUP BY region")
-        stats["by_region"] = dict(cursor.fetchall())
-        
-        # Cases by product
-        cursor.execute("SELECT product, COUNT(*) FROM cases GROUP BY product")
-        stats["by_product"] = dict(cursor.fetchall())
-        
         # Recent cases
         cursor.execute("SELECT * FROM cases ORDER BY created_at DESC LIMIT 10")
         stats["recent_cases"] = cursor.fetchall()
-        
-        return stats
+    
+    return stats
 
 def get_audit_logs(case_id=None, limit=100):
-    """Get audit logs"""
+    """Get audit logs, newest first, topping up from the archives when short"""
+    flush_audit_log()
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
@@ -400,46 +316,123 @@ def get_audit_logs(case_id=None, limit=100):
                 LIMIT ?
             ''', (limit,))
         
-        return cursor.fetchall()
+        logs = cursor.fetchall()
+        if len(logs) < limit:
+            # Archived entries are all older than the hot ones
+            where, params = ("case_id = ?", (case_id,)) if case_id else ("1 = 1", ())
+            archived = archive_lookup(conn, "audit_logs", where, params,
+                                      order_by="performed_at DESC", limit=limit - len(logs))
+            if archived:
+                logs += archived.fetchall()
+        return logs
 
+def get_audit_logs_page(case_id=None, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """Get one page of audit logs, newest first"""
+    flush_audit_log()
+    return fetch_page(
+        "audit_logs",
+        filters={"case_id": case_id},
+        cursor=cursor,
+        page_size=page_size,
+        order_column="performed_at"
+    )
 
+# Case columns archived cases are matched on (the cases_fts columns, less comments)
+SEARCHED_CASE_COLUMNS = ("case_id", "lan", "customer_name", "customer_pan", "customer_mobile", "case_description")
 
-def search_cases(search_term, filters=None):
-    """Search cases with optional filters"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+def build_fts_query(search_term):
+    """Turn free text into an FTS5 prefix query (every word must match)"""
+    words = re.findall(r"\w+", search_term or "")
+    return " ".join(f'"{word}"*' for word in words)
+
+def case_filter_clauses(filters):
+    """SQL conditions (on alias c) and parameters for the search filters"""
+    clauses = []
+    params = []
+    if filters:
+        if filters.get("status"):
+            clauses.append("c.status = ?")
+            params.append(filters["status"])
         
-        query = '''
-            SELECT * FROM cases 
-            WHERE (case_id LIKE ? OR lan LIKE ? OR case_description LIKE ?)
-        '''
-        params = [f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"]
+        if filters.get("region"):
+            clauses.append("c.region = ?")
+            params.append(filters["region"])
         
-        if filters:
-            if filters.get("status"):
-                query += " AND status = ?"
-                params.append(filters["status"])
-            
-            if filters.get("region"):
-                query += " AND region = ?"
-                params.append(filters["region"])
-            
-            if filters.get("product"):
-                query += " AND product = ?"
-                params.append(filters["product"])
-            
-            if filters.get("date_from"):
-                query += " AND case_date >= ?"
-                params.append(filters["date_from"])
-            
-            if filters.get("date_to"):
-                query += " AND case_date <= ?"
-                params.append(filters["date_to"])
+        if filters.get("product"):
+            clauses.append("c.product = ?")
+            params.append(filters["product"])
         
-        query += " ORDER BY created_at DESC"
+        if filters.get("date_from"):
+            clauses.append("c.case_date >= ?")
+            params.append(filters["date_from"])
         
+        if filters.get("date_to"):
+            clauses.append("c.case_date <= ?")
+            params.append(filters["date_to"])
+    return clauses, params
+
+def search_query(fts_query, filters=None, limit=None):
+    """SQL and parameters for the hot-table part of search_cases"""
+    if fts_query:
+        query = '''
+            SELECT c.*,
+                   snippet(cases_fts, -1, '<mark>', '</mark>', '…', 12) AS match_snippet,
+                   bm25(cases_fts) AS match_rank
+            FROM cases_fts
+            JOIN cases c ON c.id = cases_fts.rowid
+            WHERE cases_fts MATCH ?
+        '''
+        params = [fts_query]
+    else:
+        query = "SELECT c.*, NULL AS match_snippet, NULL AS match_rank FROM cases c WHERE 1 = 1"
+        params = []
+    
+    filter_clauses, filter_params = case_filter_clauses(filters)
+    for clause in filter_clauses:
+        query += f" AND {clause}"
+    params.extend(filter_params)
+    
+    query += " ORDER BY match_rank, c.created_at DESC" if fts_query else " ORDER BY c.created_at DESC"
+    
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    return query, params
+
+def search_cases(search_term, filters=None, limit=None):
+    """Search cases with optional filters
+    
+    Matches case ID, LAN, customer name, PAN, mobile, description and comment
+    text by word prefix through the cases_fts index, best matches first. Each
+    row carries a match_snippet with the hits wrapped in <mark> tags. An empty
+    search term returns every case passing the filters, newest first.
+    
+    When the hot table comes up empty (or short of limit), archived closed
+    cases are searched too and appended, newest first, without snippets.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        fts_query = build_fts_query(search_term)
+        query, params = search_query(fts_query, filters, limit)
         cursor.execute(query, params)
-        return cursor.fetchall()
+        results = cursor.fetchall()
+        
+        missed = len(results) < limit if limit else not results
+        if missed and (not filters or not filters.get("status") or filters["status"] in ARCHIVED_STATUSES):
+            # Archives carry no FTS index, so each word must appear in one of the searched columns
+            archive_clauses, archive_params = case_filter_clauses(filters)
+            for word in re.findall(r"\w+", search_term or ""):
+                archive_clauses.append("(" + " OR ".join(f"c.{column} LIKE ?" for column in SEARCHED_CASE_COLUMNS) + ")")
+                archive_params.extend([f"%{word}%"] * len(SEARCHED_CASE_COLUMNS))
+            archived = archive_lookup(
+                conn, "cases", " AND ".join(archive_clauses) or "1 = 1", archive_params,
+                extra_columns=("NULL AS match_snippet", "NULL AS match_rank"),
+                order_by="created_at DESC", limit=limit - len(results) if limit else None
+            )
+            if archived:
+                results += archived.fetchall()
+        return results
 
 
 # Achievement and Gamification Functions
@@ -622,51 +615,11 @@ def trigger_achievement_check(username, action_type, case_data=None):
         pass  # Fail silently
 
 def create_case_allocation(allocation_data):
-    """Create a new case allocation record"""
+    """Create a new case allocation record; returns its id, or False on failure"""
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Create case allocations table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS case_allocations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    case_id TEXT NOT NULL,
-                    investigation_type TEXT NOT NULL,
-                    assigned_investigator TEXT NOT NULL,
-                    priority_level TEXT NOT NULL,
-                    expected_completion DATE,
-                    allocation_notes TEXT,
-                    special_instructions TEXT,
-                    product TEXT,
-                    branch_location TEXT,
-                    region TEXT,
-                    lan TEXT,
-                    customer_name TEXT,
-                    loan_amount REAL,
-                    disbursement_date DATE,
-                    date_of_birth DATE,
-                    pan TEXT,
-                    mobile_number TEXT,
-                    email_id TEXT,
-                    aadhaar_number TEXT,
-                    relationship_status TEXT,
-                    complete_address TEXT,
-                    occupation TEXT,
-                    monthly_income_range TEXT,
-                    cibil_score INTEGER,
-                    gst_business_proof TEXT,
-                    pan_card_image TEXT,
-                    aadhaar_card_image TEXT,
-                    customer_photo TEXT,
-                    supporting_documents TEXT,
-                    created_by TEXT NOT NULL,
-                    created_at DATETIME NOT NULL,
-                    status TEXT DEFAULT 'Allocated',
-                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
             # Insert allocation data
             cursor.execute('''
                 INSERT INTO case_allocations (
@@ -697,23 +650,26 @@ def create_case_allocation(allocation_data):
                 allocation_data.get('supporting_documents', ''), allocation_data['created_by'],
                 allocation_data['created_at'], allocation_data['status']
             ))
+            allocation_id = cursor.lastrowid
             
             # Update original case status to 'Allocated'
+            record_transition(conn, "cases_simplified", allocation_data['case_id'], "Allocated", allocation_data['created_by'])
             cursor.execute('''
-                UPDATE cases_simplified SET status = 'Allocated', updated_at = ? WHERE case_id = ?
-            ''', (datetime.now().isoformat(), allocation_data['case_id']))
-            
-            conn.commit()
+                UPDATE cases_simplified SET status = 'Allocated', updated_at = CURRENT_TIMESTAMP WHERE case_id = ?
+            ''', (allocation_data['case_id'],))
             
-            # Log audit
+            # Log audit in the same transaction
             log_audit(
-                user_id=allocation_data['created_by'],
-                action=f"Created case allocation for {allocation_data['case_id']}",
-                table_name="case_allocations",
-                record_id=allocation_data['case_id']
+                allocation_data['case_id'],
+                f"Created case allocation for {allocation_data['case_id']}",
+                "Table: case_allocations",
+                allocation_data['created_by'],
+                conn
             )
-            
-            return True
+
+            conn.commit()
+
+            return allocation_id
             
     except Exception as e:
         print(f"Error creating case allocation: {e}")
@@ -742,3 +698,12 @@ def get_case_allocations():
         print(f"Error getting case allocations: {e}")
         return []
 
+def get_case_allocations_page(status=None, assigned_investigator=None, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """Get one page of case allocations, newest first"""
+    return fetch_page(
+        "case_allocations",
+        filters={"status": status, "assigned_investigator": assigned_investigator},
+        cursor=cursor,
+        page_size=page_size
+    )
+
@@ -1,6 +1,11 @@
 import sqlite3
 from datetime import datetime
 from database import get_db_connection, log_audit
+from pagination import fetch_page, DEFAULT_PAGE_SIZE
+from case_stats import get_rollup
+from case_records import listing_columns, records_from_cursor
+from unit_of_work import CaseUnitOfWork
+from workflow_engine import record_transition
 
 def create_internal_fraud_case(case_data):
     """Create a new internal fraud case record"""
@@ -8,47 +13,6 @@ def create_internal_fraud_case(case_data):
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Create internal fraud cases table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS internal_fraud_cases (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    case_id TEXT UNIQUE NOT NULL,
-                    case_type TEXT NOT NULL,
-                    detection_date DATE,
-                    reported_by TEXT,
-                    reporting_channel TEXT,
-                    incident_description TEXT,
-                    supporting_documents TEXT,
-                    allocated_to TEXT,
-                    allocation_date DATE,
-                    allocation_remarks TEXT,
-                    investigation_start_date DATE,
-                    investigation_summary TEXT,
-                    preliminary_findings TEXT,
-                    evidence_collected TEXT,
-                    final_reviewer TEXT,
-                    reviewer_comments TEXT,
-                    approver1_name TEXT,
-                    approver1_decision TEXT,
-                    approver2_name TEXT,
-                    approver2_decision TEXT,
-                    code_breach TEXT,
-                    code_reference TEXT,
-                    primary_closure_remarks TEXT,
-                    hr_action TEXT,
-                    scn_date DATE,
-                    committee_review TEXT,
-                    final_closure_date DATE,
-                    final_closure_remarks TEXT,
-                    created_by TEXT NOT NULL,
-                    created_at DATETIME NOT NULL,
-                    status TEXT DEFAULT 'Initiated',
-                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    current_stage TEXT DEFAULT 'Case Initiation',
-                    workflow_stage INTEGER DEFAULT 1
-                )
-            ''')
-            
             # Insert internal fraud case data
             cursor.execute('''
                 INSERT INTO internal_fraud_cases (
@@ -99,24 +63,25 @@ def get_internal_fraud_cases():
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM internal_fraud_cases ORDER BY created_at DESC
+            cursor.execute(f'''
+                SELECT {listing_columns('internal_fraud_cases')} FROM internal_fraud_cases ORDER BY created_at DESC
             ''')
             
-            columns = [description[0] for description in cursor.description]
-            rows = cursor.fetchall()
-            
-            cases = []
-            for row in rows:
-                case_dict = dict(zip(columns, row))
-                cases.append(case_dict)
-            
-            return cases
+            return records_from_cursor(cursor, "internal_fraud_cases")
             
     except Exception as e:
         print(f"Error getting internal fraud cases: {e}")
         return []
 
+def get_internal_fraud_cases_page(status=None, current_stage=None, approver1_decision=None, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """Get one page of internal fraud cases, newest first (status may be a list of statuses)"""
+    return fetch_page(
+        "internal_fraud_cases",
+        filters={"status": status, "current_stage": current_stage, "approver1_decision": approver1_decision},
+        cursor=cursor,
+        page_size=page_size
+    )
+
 def get_internal_fraud_case_by_id(case_id):
     """Get specific internal fraud case by ID"""
     try:
@@ -126,11 +91,8 @@ def get_internal_fraud_case_by_id(case_id):
                 SELECT * FROM internal_fraud_cases WHERE case_id = ?
             ''', (case_id,))
             
-            row = cursor.fetchone()
-            if row:
-                columns = [description[0] for description in cursor.description]
-                return dict(zip(columns, row))
-            return None
+            records = records_from_cursor(cursor, "internal_fraud_cases")
+            return records[0] if records else None
             
     except Exception as e:
         print(f"Error getting internal fraud case by ID: {e}")
@@ -147,7 +109,8 @@ def update_internal_fraud_case(case_id, update_data):
             values = []
             
             for key, value in update_data.items():
-                if key != 'case_id':  # Don't update case_id
+                # case_id never changes; updated_at is always stamped by SQLite below
+                if key not in ('case_id', 'updated_at'):
                     set_clauses.append(f"{key} = ?")
                     values.append(value)
             
@@ -156,6 +119,10 @@ def update_internal_fraud_case(case_id, update_data):
             
             values.append(case_id)  # For WHERE clause
             
+            if 'status' in update_data:
+                record_transition(conn, "internal_fraud_cases", case_id, update_data['status'],
+                                  update_data.get('updated_by', 'system'))
+            
             query = f'''
                 UPDATE internal_fraud_cases 
                 SET {', '.join(set_clauses)}, updated_at = CURRENT_TIMESTAMP
@@ -182,26 +149,11 @@ def update_internal_fraud_case(case_id, update_data):
 def update_internal_fraud_case_status(case_id, new_status, updated_by):
     """Update internal fraud case status"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                UPDATE internal_fraud_cases 
-                SET status = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE case_id = ?
-            ''', (new_status, case_id))
-            
-            conn.commit()
-            
-            # Log audit
-            log_audit(
-                case_id=case_id,
-                action=f"Status updated to {new_status}",
-                details=f"Status changed to {new_status}",
-                performed_by=updated_by
-            )
-            
-            return True
+        with CaseUnitOfWork(updated_by) as uow:
+            uow.set_status(case_id, new_status, table="internal_fraud_cases")
+            uow.audit(case_id, f"Status updated to {new_status}", f"Status changed to {new_status}")
+        
+        return True
             
     except Exception as e:
         print(f"Error updating internal fraud case status: {e}")
@@ -210,45 +162,22 @@ def update_internal_fraud_case_status(case_id, new_status, updated_by):
 def get_internal_fraud_case_statistics():
     """Get statistics for internal fraud cases"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Total cases
-            cursor.execute('SELECT COUNT(*) FROM internal_fraud_cases')
-            total_cases = cursor.fetchone()[0]
-            
-            # Cases by status
-            cursor.execute('''
-                SELECT status, COUNT(*) as count 
-                FROM internal_fraud_cases 
-                GROUP BY status
-            ''')
-            status_counts = dict(cursor.fetchall())
-            
-            # Cases by type
-            cursor.execute('''
-                SELECT case_type, COUNT(*) as count 
-                FROM internal_fraud_cases 
-                GROUP BY case_type
-            ''')
-            type_counts = dict(cursor.fetchall())
-            
-            # HR actions
-            cursor.execute('''
-                SELECT hr_action, COUNT(*) as count 
-                FROM internal_fraud_cases 
-                WHERE hr_action IS NOT NULL AND hr_action != ''
-                GROUP BY hr_action
-            ''')
-            hr_action_counts = dict(cursor.fetchall())
-            
-            return {
-                'total_cases': total_cases,
-                'status_distribution': status_counts,
-                'type_distribution': type_counts,
-                'hr_actions': hr_action_counts
-            }
-            
+        rollup = get_rollup("internal_fraud_cases")
+        
+        total_cases = rollup["total"].get(None, 0)
+        status_counts = rollup["status"]
+        type_counts = rollup["case_type"]
+        
+        # Only cases with an HR action recorded
+        hr_action_counts = {action: count for action, count in rollup["hr_action"].items() if action}
+        
+        return {
+            'total_cases': total_cases,
+            'status_distribution': status_counts,
+            'type_distribution': type_counts,
+            'hr_actions': hr_action_counts
+        }
+        
     except Exception as e:
         print(f"Error getting internal fraud case statistics: {e}")
         return {
@@ -1,11 +1,17 @@
 import streamlit as st
 import sqlite3
 import hashlib
-from database import get_db_connection, get_password_hash, get_account_requests, update_account_request_status
-from models import get_audit_logs, get_case_statistics
+from database import get_db_connection, get_password_hash, get_account_requests, update_account_request_status, flush_audit_log
+from models import get_audit_logs_page, get_case_statistics
+from pagination import current_page_cursor, show_page_controls, MAX_PAGE_SIZE
 from utils import format_datetime
 from auth import require_role
 from email_service import send_account_approval_notification
+from query_cache import cached_query, cache_stats
+from database_backup import BackupError, create_backup, create_incremental_backup, list_backups, verify_backup
+from data_export import ADMIN_EXPORTS, available_formats, export_tables
+from case_archive import ARCHIVE_AFTER_DAYS, AUDIT_ARCHIVE_AFTER_DAYS, archive_closed_cases, archive_audit_logs, get_archive_summary
+from face_worker import worker_status, worker_model_status
 
 @require_role(["Admin"])
 def show():
@@ -259,6 +265,26 @@ def show_system_statistics():
                 title="Regional Distribution"
             )
             st.plotly_chart(fig, use_container_width=True)
+    
+    # Query cache effectiveness since the server started
+    st.subheader("⚡ Query Cache")
+    cache = cache_stats()
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Hit Rate", f"{cache['hit_rate']:.0%}" if cache["hit_rate"] is not None else "N/A")
+    with col2:
+        st.metric("Hits", cache["hits"])
+    with col3:
+        st.metric("Misses", cache["misses"])
+    with col4:
+        st.metric("Cached Results", cache["entries"])
+    
+    if cache["functions"]:
+        st.dataframe([
+            {"Query": name, **counters}
+            for name, counters in sorted(cache["functions"].items())
+        ], use_container_width=True)
 
 def show_audit_logs():
     """Display audit logs"""
@@ -268,7 +294,7 @@ def show_audit_logs():
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        log_limit = st.number_input("Number of logs", min_value=10, max_value=1000, value=50)
+        page_size = st.number_input("Logs per page", min_value=10, max_value=MAX_PAGE_SIZE, value=50)
     
     with col2:
         filter_case_id = st.text_input("Filter by Case ID")
@@ -277,8 +303,11 @@ def show_audit_logs():
         if st.button("🔄 Refresh Logs"):
             st.rerun()
     
-    # Get and display logs
-    logs = get_audit_logs(case_id=filter_case_id if filter_case_id else None, limit=log_limit)
+    # Get and display one page of logs
+    case_filter = filter_case_id.strip() or None
+    cursor = current_page_cursor("audit_logs", {"case_id": case_filter, "page_size": page_size})
+    page = get_audit_logs_page(case_id=case_filter, cursor=cursor, page_size=page_size)
+    logs = page["rows"]
     
     if logs:
         log_data = []
@@ -292,6 +321,7 @@ def show_audit_logs():
             })
         
         st.dataframe(log_data, use_container_width=True)
+        show_page_controls("audit_logs", page)
         
         # Export logs
         if st.button("📥 Export Audit Logs"):
@@ -343,9 +373,27 @@ def show_system_settings():
     with st.expander("💾 Backup & Maintenance"):
         st.write("**Database Backup**")
         
-        if st.button("📦 Create Database Backup"):
-            create_database_backup()
-            st.success("Database backup created successfully")
+        col1, col2 = st.columns(2)
+        with col1:
+            incremental = st.checkbox("Incremental (changed pages only)")
+        with col2:
+            if st.button("📦 Create Database Backup"):
+                try:
+                    backup = create_database_backup(incremental)
+                    archives = f" plus {len(backup['archives'])} archive file(s)" if backup['archives'] else ""
+                    st.success(f"Database backup created: {backup['name']} ({backup['size'] / 1024:.0f} KB){archives}")
+                except (BackupError, sqlite3.Error, OSError) as e:
+                    st.error(f"Error creating backup: {str(e)}")
+        
+        backups = list_backups()
+        if backups:
+            st.dataframe(backups, use_container_width=True)
+            selected_backup = st.selectbox("Backup", [backup["name"] for backup in reversed(backups)])
+            if st.button("🔍 Verify Restore"):
+                if verify_backup(selected_backup):
+                    st.success(f"{selected_backup} restores cleanly and passes the integrity check")
+                else:
+                    st.error(f"{selected_backup} failed verification")
         
         st.write("**System Maintenance**")
         
@@ -390,13 +438,41 @@ def show_database_management():
         if st.button("📊 Analyze Database"):
             analyze_database()
             st.success("Database analysis completed")
+        
+        st.write("**Cold Storage**")
+        archive_days = st.number_input("Archive closed cases older than (days)", min_value=1, value=ARCHIVE_AFTER_DAYS)
+        audit_days = st.number_input("Archive audit logs older than (days)", min_value=1, value=AUDIT_ARCHIVE_AFTER_DAYS)
+        
+        if st.button("🗄️ Archive Old Records"):
+            try:
+                cases = archive_closed_cases(int(archive_days))
+                logs = archive_audit_logs(int(audit_days))
+                st.success(f"Archived {cases} closed cases and {logs} audit entries. Vacuum to reclaim the space.")
+            except Exception as e:
+                st.error(f"Error archiving records: {str(e)}")
+        
+        archive_summary = get_archive_summary()
+        if archive_summary:
+            st.dataframe(archive_summary, use_container_width=True)
+        
+        st.write("**Face Models**")
+        model_status = worker_model_status()
+        if model_status is None:
+            st.info("Face worker is not running; it starts with the first face match.")
+        else:
+            st.caption(f"Face worker PID {worker_status()}")
+            st.dataframe(model_status, use_container_width=True)
     
     with col2:
         st.write("**Data Operations**")
         
+        export_format = st.selectbox("Export format", available_formats())
         if st.button("📥 Export All Data"):
-            export_all_data()
-            st.success("Data export initiated")
+            try:
+                export_path, counts = export_all_data(export_format)
+                st.success(f"Exported {sum(counts.values())} rows to {export_path}")
+            except (sqlite3.Error, OSError, RuntimeError) as e:
+                st.error(f"Error exporting data: {str(e)}")
         
         if st.button("🔄 Reset Demo Data"):
             if st.checkbox("⚠️ I understand this will reset all data"):
@@ -404,6 +480,7 @@ def show_database_management():
                 st.success("Demo data reset completed")
 
 # Helper functions
+@cached_query("users")
 def get_all_users():
     """Get all users from database"""
     with get_db_connection() as conn:
@@ -458,14 +535,11 @@ def delete_user(user_id):
     except:
         return False
 
-def create_database_backup():
-    """Create database backup"""
-    import shutil
-    from datetime import datetime
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_name = f"case_management_backup_{timestamp}.db"
-    shutil.copy2("case_management.db", backup_name)
+def create_database_backup(incremental=False):
+    """Create an online, integrity-checked database backup"""
+    if incremental:
+        return create_incremental_backup()
+    return create_backup()
 
 def clean_temp_files():
     """Clean temporary files"""
@@ -498,25 +572,10 @@ def analyze_database():
         cursor.execute("ANALYZE")
         conn.commit()
 
-def export_all_data():
-    """Export all data to CSV files"""
-    import pandas as pd
-    from datetime import datetime
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    with get_db_connection() as conn:
-        # Export cases
-        cases_df = pd.read_sql_query("SELECT * FROM cases", conn)
-        cases_df.to_csv(f"exports/cases_export_{timestamp}.csv", index=False)
-        
-        # Export users (without passwords)
-        users_df = pd.read_sql_query("SELECT id, username, role, email, created_at, is_active FROM users", conn)
-        users_df.to_csv(f"exports/users_export_{timestamp}.csv", index=False)
-        
-        # Export audit logs
-        logs_df = pd.read_sql_query("SELECT * FROM audit_logs", conn)
-        logs_df.to_csv(f"exports/audit_logs_{timestamp}.csv", index=False)
+def export_all_data(fmt="csv"):
+    """Stream cases, users and audit logs into one ZIP under exports/"""
+    paths, counts = export_tables(ADMIN_EXPORTS, fmt=fmt, bundle=True)
+    return paths[0], counts
 
 def reset_demo_data():
     """Reset database to demo state"""
@@ -1,7 +1,10 @@
 import streamlit as st
-from database import get_db_connection, update_case_status, add_case_comment, log_audit
+from database import get_db_connection, get_write_connection
 from case_display_utils import show_standardized_case_details
 from datetime import datetime
+from case_records import get_field
+from unit_of_work import CaseUnitOfWork
+from workflow_engine import InvalidTransition
 
 def show():
     """Agency Workflow Panel for handling agency investigation responses"""
@@ -62,21 +65,6 @@ def show():
 def show_agency_cases():
     """Display cases assigned to agencies and handle responses"""
     
-    # Safe value extraction (handle both dict and sqlite3.Row)
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                # This is a sqlite3.Row object
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                # This is a dict
-                return obj.get(key, default)
-            else:
-                # This is an object with attributes
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
     # Get cases with Agency Investigation status
     with get_db_connection() as conn:
         cursor = conn.cursor()
@@ -115,10 +103,10 @@ def show_agency_cases():
     case_dict = {}
     
     for case in agency_cases:
-        case_id = safe_get(case, 'case_id', 'Unknown')
-        customer_name = safe_get(case, 'customer_name', 'Unknown')
-        case_type = safe_get(case, 'case_type', 'Unknown')
-        agency_name = safe_get(case, 'agency_name', 'Unknown')
+        case_id = get_field(case, 'case_id', 'Unknown')
+        customer_name = get_field(case, 'customer_name', 'Unknown')
+        case_type = get_field(case, 'case_type', 'Unknown')
+        agency_name = get_field(case, 'agency_name', 'Unknown')
         
         display_text = f"{case_id} - {customer_name} ({case_type}) - Agency: {agency_name}"
         case_options.append(display_text)
@@ -139,23 +127,8 @@ def show_agency_cases():
 def show_agency_case_response_form(case_details):
     """Show form for agency to submit investigation response"""
     
-    # Safe value extraction (handle both dict and sqlite3.Row)
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                # This is a sqlite3.Row object
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                # This is a dict
-                return obj.get(key, default)
-            else:
-                # This is an object with attributes
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
-    case_id = safe_get(case_details, 'case_id', 'Unknown')
-    agency_name = safe_get(case_details, 'agency_name', 'Unknown')
+    case_id = get_field(case_details, 'case_id', 'Unknown')
+    agency_name = get_field(case_details, 'agency_name', 'Unknown')
     
     # Display case information
     st.markdown("#### 📄 Case Information")
@@ -258,36 +231,18 @@ def show_agency_case_response_form(case_details):
 def submit_agency_response(case_id, agency_name, investigation_status, investigation_summary,
                           risk_assessment, recommendation, additional_comments, response_routing,
                           verification_details, uploaded_files):
-    """Process agency investigation response and route to appropriate workflow stage"""
+    """Process agency investigation response and route to appropriate workflow stage
+    
+    The response row, status change, comment and audit entries commit in one
+    transaction, so a routing the workflow refuses leaves no response behind.
+    """
     
     current_user = st.session_state.get("username", agency_name)
     
     try:
-        # Save agency response to database
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Create agency responses table if not exists
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS agency_responses (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    case_id TEXT NOT NULL,
-                    agency_name TEXT,
-                    investigation_status TEXT,
-                    investigation_summary TEXT,
-                    risk_assessment TEXT,
-                    recommendation TEXT,
-                    additional_comments TEXT,
-                    verification_details TEXT,
-                    response_routing TEXT,
-                    submitted_by TEXT,
-                    submission_date TEXT,
-                    FOREIGN KEY (case_id) REFERENCES cases (case_id)
-                )
-            ''')
-            
+        with get_write_connection() as conn:
             # Insert agency response
-            cursor.execute('''
+            conn.execute('''
                 INSERT INTO agency_responses 
                 (case_id, agency_name, investigation_status, investigation_summary, 
                  risk_assessment, recommendation, additional_comments, verification_details,
@@ -298,8 +253,19 @@ def submit_agency_response(case_id, agency_name, investigation_status, investiga
                 risk_assessment, recommendation, additional_comments, str(verification_details),
                 response_routing, current_user, datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             ))
-            conn.commit()
-        
+            
+            # Route response based on selection; joins the transaction above
+            with CaseUnitOfWork(current_user) as uow:
+                stage_agency_routing(uow, case_id, response_routing, agency_name, investigation_status,
+                                     risk_assessment, recommendation)
+    except InvalidTransition as e:
+        st.error(f"❌ Could not route the response to {response_routing}: {e}")
+        return
+    except Exception as e:
+        st.error(f"Error submitting agency response: {str(e)}")
+        return
+    
+    try:
         # Handle file uploads
         if uploaded_files:
             import os
@@ -310,30 +276,29 @@ def submit_agency_response(case_id, agency_name, investigation_status, investiga
                 file_path = os.path.join(upload_dir, file.name)
                 with open(file_path, "wb") as f:
                     f.write(file.getbuffer())
-        
-        # Route response based on selection
-        route_agency_response(case_id, response_routing, agency_name, investigation_status, 
-                            risk_assessment, recommendation, current_user)
-        
-        st.success("✅ Agency response submitted successfully!")
-        st.info(f"📍 Response routed to: {response_routing}")
-        
-        # Show next steps based on routing
-        if response_routing == "Case Allocator":
-            st.info("🔄 Case returned to Case Allocator for review and next steps")
-        elif response_routing == "Investigation Panel":
-            st.info("🔍 Case sent to Investigation Panel for further investigation")
-        elif response_routing == "Primary Reviewer":
-            st.info("📋 Case sent to Primary Reviewer for review and approval")
-        
-        st.rerun()
-        
-    except Exception as e:
-        st.error(f"Error submitting agency response: {str(e)}")
+    except OSError as e:
+        st.error(f"Response saved, but its files could not be stored: {str(e)}")
+        return
+    
+    st.success("✅ Agency response submitted successfully!")
+    st.info(f"📍 Response routed to: {response_routing}")
+    
+    # Show next steps based on routing
+    if response_routing == "Case Allocator":
+        st.info("🔄 Case returned to Case Allocator for review and next steps")
+    elif response_routing == "Investigation Panel":
+        st.info("🔍 Case sent to Investigation Panel for further investigation")
+    elif response_routing == "Primary Reviewer":
+        st.info("📋 Case sent to Primary Reviewer for review and approval")
+    
+    st.rerun()
 
-def route_agency_response(case_id, response_routing, agency_name, investigation_status, 
-                         risk_assessment, recommendation, submitted_by):
-    """Route agency response to appropriate workflow stage"""
+def stage_agency_routing(uow, case_id, response_routing, agency_name, investigation_status, 
+                         risk_assessment, recommendation):
+    """Stage the status change, comment and audit entries that route an agency response
+    
+    A stage the case cannot move to raises InvalidTransition when uow commits.
+    """
     
     # Create response comment
     comment = f"AGENCY INVESTIGATION RESPONSE\nAgency: {agency_name}\nStatus: {investigation_status}\nRisk: {risk_assessment}\nRecommendation: {recommendation}\nRouted to: {response_routing}"
@@ -348,28 +313,10 @@ def route_agency_response(case_id, response_routing, agency_name, investigation_
     else:
         new_status = "Agency Response Received"
     
-    # Update case status
-    update_case_status(case_id, new_status, submitted_by)
-    
-    # Add comment
-    add_case_comment(case_id, comment, submitted_by, "Agency Response")
-    
-    # Log audit
-    log_audit(case_id, f"Agency Response - {response_routing}", f"Agency response processed by {submitted_by}", submitted_by)
-
-def safe_get(obj, key, default=''):
-    """Safely get value from object (handles both dict and sqlite3.Row)"""
-    try:
-        if hasattr(obj, key):
-            return getattr(obj, key, default)
-        elif isinstance(obj, dict):
-            return obj.get(key, default)
-        elif hasattr(obj, '__getitem__'):
-            return obj[key] if key in obj else default
-        else:
-            return default
-    except (KeyError, IndexError, AttributeError):
-        return default
+    uow.set_status(case_id, new_status)
+    uow.audit(case_id, "Status Update", f"Status changed to: {new_status}")
+    uow.add_comment(case_id, comment, "Agency Response")
+    uow.audit(case_id, f"Agency Response - {response_routing}", f"Agency response processed by {uow.performed_by}")
 
 if __name__ == "__main__":
     show()
\ No newline at end of file
@@ -1,11 +1,37 @@
+import html
+import os
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 from models import get_case_statistics, search_cases
-from utils import export_cases_to_csv, get_dropdown_options, format_datetime
+from utils import get_dropdown_options, format_datetime
+from analytics_snapshot import analytics_query
+from data_export import export_case_rows, export_cases
 from datetime import datetime, timedelta
 
+
+def highlight_snippet(snippet):
+    """Escape a search snippet while keeping its <mark> highlights"""
+    escaped = html.escape(snippet or "")
+    return escaped.replace("&lt;mark&gt;", "<mark>").replace("&lt;/mark&gt;", "</mark>")
+
+def build_case_filter_sql(filters):
+    """SQL conditions and params for the page's case filters"""
+    conditions = ""
+    params = []
+    for key, condition in (
+        ("status", " AND status = ?"),
+        ("region", " AND region = ?"),
+        ("product", " AND product = ?"),
+        ("date_from", " AND case_date >= ?"),
+        ("date_to", " AND case_date <= ?"),
+    ):
+        if filters.get(key):
+            conditions += condition
+            params.append(filters[key])
+    return conditions, params
+
 def show():
     """Display analytics page"""
     # Standardized Investigation Intelligence Header
@@ -74,6 +100,11 @@ def show():
     with col4:
         filter_region = st.selectbox("Region", ["All"] + options["regions"])
     
+    search_term = st.text_input(
+        "Search Cases",
+        placeholder="Case ID, LAN, customer name, PAN, mobile, description or comments"
+    )
+    
     # Apply filters and get data
     filters = {}
     if filter_status != "All":
@@ -85,8 +116,22 @@ def show():
     if date_to:
         filters["date_to"] = date_to.strftime("%Y-%m-%d")
     
-    # Search cases with filters
-    filtered_cases = search_cases("", filters) if filters else None
+    # Count matches in the analytics snapshot; only a text search needs the rows
+    filter_sql, filter_params = build_case_filter_sql(filters)
+    filtered_count = analytics_query(
+        f"SELECT COUNT(*) AS count FROM cases WHERE 1 = 1{filter_sql}", filter_params
+    )[0]["count"]
+    filtered_cases = search_cases(search_term, filters) if search_term.strip() else None
+    
+    if search_term.strip():
+        st.markdown(f"**{len(filtered_cases)} matching case(s)**")
+        for case in filtered_cases[:20]:
+            st.markdown(
+                f"**{html.escape(str(case['case_id']))}** · {html.escape(str(case['customer_name'] or 'N/A'))} · "
+                f"{html.escape(str(case['status']))}  \n"
+                f"{highlight_snippet(case['match_snippet'])}",
+                unsafe_allow_html=True
+            )
     
     st.divider()
     
@@ -115,8 +160,9 @@ def show():
         st.metric("Pending Cases", pending_cases)
     
     with col5:
-        if len(filtered_cases) > 0:
-            st.metric("Filtered Results", len(filtered_cases))
+        result_count = len(filtered_cases) if filtered_cases is not None else filtered_count
+        if filters or search_term.strip():
+            st.metric("Filtered Results", result_count)
         else:
             st.metric("No Filter Applied", "")
     
@@ -126,15 +172,21 @@ def show():
     # Case trend over time
     st.subheader("Case Trend Over Time")
     if stats["total_cases"] > 0:
-        # This would ideally use actual date-based data
-        # For now, showing sample trend
+        daily_counts = analytics_query(f"""
+            SELECT substr(created_at, 1, 10) AS day, COUNT(*) AS cases
+            FROM cases WHERE 1 = 1{filter_sql}
+            GROUP BY substr(created_at, 1, 10) ORDER BY day
+        """, filter_params)
+        
+        # Days without new cases still belong on the chart
         dates = pd.date_range(start=date_from, end=date_to, freq='D')
-        sample_data = pd.DataFrame({
+        counts_by_day = {row["day"]: row["cases"] for row in daily_counts}
+        trend_data = pd.DataFrame({
             'Date': dates,
-            'Cases': [abs(hash(str(d)) % 10) for d in dates]  # Sample data
+            'Cases': [counts_by_day.get(d.strftime("%Y-%m-%d"), 0) for d in dates]
         })
         
-        fig = px.line(sample_data, x='Date', y='Cases', title='Daily Case Creation Trend')
+        fig = px.line(trend_data, x='Date', y='Cases', title='Daily Case Creation Trend')
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No data available for trend analysis")
@@ -197,22 +249,23 @@ def show():
     col1, col2, col3 = st.columns([2, 1, 1])
     
     with col1:
-        st.info(f"Ready to export {len(filtered_cases) if filtered_cases else stats['total_cases']} cases")
+        st.info(f"Ready to export {result_count if filters or search_term.strip() else stats['total_cases']} cases")
     
     with col2:
         if st.button("📊 Export to CSV", use_container_width=True):
-            cases_to_export = filtered_cases if filtered_cases else search_cases("", {})
-            if cases_to_export:
-                csv_data = export_cases_to_csv(cases_to_export)
-                if csv_data:
+            # Exports are written to a gzipped file instead of building the CSV in memory
+            if filtered_cases is not None:
+                export_path, exported_rows = export_case_rows(filtered_cases, fmt="csv.gz")
+            else:
+                export_path, exported_rows = export_cases(filters, fmt="csv.gz")
+            if exported_rows:
+                with open(export_path, "rb") as export_file:
                     st.download_button(
-                        label="📥 Download CSV",
-                        data=csv_data,
-                        file_name=f"cases_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv"
+                        label="📥 Download CSV (gzip)",
+                        data=export_file,
+                        file_name=os.path.basename(export_path),
+                        mime="application/gzip"
                     )
-                else:
-                    st.error("❌ Error generating CSV")
             else:
                 st.warning("No cases to export")
     
@@ -1,5 +1,6 @@
 import streamlit as st
-from models import get_cases_by_status, update_case_status, get_case_comments, add_case_comment, get_case_documents
+from models import get_cases_by_status, get_cases_page, update_case_status, get_case_comments, add_case_comment, get_case_documents
+from pagination import current_page_cursor, show_page_controls
 from utils import get_status_color, format_datetime, format_file_size
 from auth import get_current_user, require_role
 
@@ -107,7 +108,8 @@ def show():
     
     with tab2:
         st.subheader("Approved Cases")
-        approved_cases = get_cases_by_status("Final Review")
+        page = get_cases_page(status="Final Review", cursor=current_page_cursor("approver2_approved"))
+        approved_cases = page["rows"]
         
         if approved_cases:
             for case in approved_cases:
@@ -115,10 +117,12 @@ def show():
                     show_read_only_case_details(case)
         else:
             st.info("📭 No approved cases")
+        show_page_controls("approver2_approved", page)
     
     with tab3:
         st.subheader("Rejected Cases")
-        rejected_cases = get_cases_by_status("Rejected")
+        page = get_cases_page(status="Rejected", cursor=current_page_cursor("approver2_rejected"))
+        rejected_cases = page["rows"]
         
         if rejected_cases:
             for case in rejected_cases:
@@ -126,6 +130,7 @@ def show():
                     show_read_only_case_details(case)
         else:
             st.info("📭 No rejected cases")
+        show_page_controls("approver2_rejected", page)
 
 def show_case_details_for_approval2(case, current_user):
     """Display case details for approver 2 workflow using standardized format"""
@@ -181,6 +186,9 @@ def show_case_details_for_approval2(case, current_user):
                 if update_case_status(case['case_id'], "Final Review", current_user, f"APPROVER 2 APPROVED: {approval_comment}"):
                     st.success("✅ Case sent to Final Review")
                     st.rerun()
+                else:
+                    from error_handler import handle_status_change_error
+                    handle_status_change_error(case['case_id'], "Final Review")
             else:
                 st.warning("Please add approval comments")
     
@@ -190,6 +198,9 @@ def show_case_details_for_approval2(case, current_user):
                 if update_case_status(case['case_id'], "Rejected", current_user, f"REJECTED BY APPROVER 2: {approval_comment}"):
                     st.success("✅ Case rejected")
                     st.rerun()
+                else:
+                    from error_handler import handle_status_change_error
+                    handle_status_change_error(case['case_id'], "Rejected")
             else:
                 st.warning("Please add rejection comments")
     
@@ -199,6 +210,9 @@ def show_case_details_for_approval2(case, current_user):
                 if update_case_status(case['case_id'], "Approved", current_user, f"SENT BACK TO APPROVER 1: {approval_comment}"):
                     st.success("✅ Case sent back to Approver 1")
                     st.rerun()
+                else:
+                    from error_handler import handle_status_change_error
+                    handle_status_change_error(case['case_id'], "Approved")
             else:
                 st.warning("Please add comments")
 
@@ -1,7 +1,17 @@
 import streamlit as st
-from models import get_cases_by_status, update_case_status, get_case_comments, add_case_comment, get_case_documents
+from models import get_cases_by_status, get_cases_page, update_case_status, get_case_comments, add_case_comment, get_case_documents
+from pagination import current_page_cursor, show_page_controls
 from utils import get_status_color, format_datetime, format_file_size
 from auth import get_current_user, require_role
+from case_records import get_field
+from case_table_utils import show_bulk_status_actions
+
+# Bulk action label -> (status, comment prefix)
+BULK_APPROVAL_ACTIONS = {
+    "Send to Approver 2": ("Approver 2", "APPROVER 1 APPROVED (BULK)"),
+    "Reject": ("Rejected", "REJECTED (BULK)"),
+    "Send Back for Review": ("Under Review", "SENT BACK (BULK)"),
+}
 
 @require_role(["Approver", "Admin"])
 def show():
@@ -64,25 +74,16 @@ def show():
         approved_cases = get_cases_by_status("Approved")  # Cases approved by reviewers, pending final approval
         
         if approved_cases:
+            show_bulk_status_actions(approved_cases, current_user, BULK_APPROVAL_ACTIONS, "approval")
+            
             # Case level dropdown
             case_options = []
             for case in approved_cases:
-                def safe_get(obj, key, default='N/A'):
-                    try:
-                        if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                            return obj[key] if key in obj.keys() and obj[key] is not None else default
-                        elif hasattr(obj, 'get'):
-                            return obj.get(key, default)
-                        else:
-                            return getattr(obj, key, default)
-                    except (KeyError, AttributeError, TypeError):
-                        return default
-                        
-                case_id = safe_get(case, 'case_id', 'N/A')
-                customer_name = safe_get(case, 'customer_name', 'N/A')
-                case_type = safe_get(case, 'case_type', 'N/A')
+                case_id = get_field(case, 'case_id', 'N/A')
+                customer_name = get_field(case, 'customer_name', 'N/A')
+                case_type = get_field(case, 'case_type', 'N/A')
                 # Format amount for display  
-                loan_amount = safe_get(case, 'loan_amount', 0)
+                loan_amount = get_field(case, 'loan_amount', 0)
                 try:
                     loan_amount_float = float(loan_amount) if loan_amount else 0
                     formatted_loan = f"{loan_amount_float:,.0f}" if loan_amount_float > 0 else 'N/A'
@@ -104,18 +105,7 @@ def show():
                 # Find the selected case
                 selected_case = None
                 for case in approved_cases:
-                    def safe_get(obj, key, default='N/A'):
-                        try:
-                            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                                return obj[key] if key in obj.keys() and obj[key] is not None else default
-                            elif hasattr(obj, 'get'):
-                                return obj.get(key, default)
-                            else:
-                                return getattr(obj, key, default)
-                        except (KeyError, AttributeError, TypeError):
-                            return default
-                            
-                    if safe_get(case, 'case_id') == selected_case_id:
+                    if get_field(case, 'case_id') == selected_case_id:
                         selected_case = case
                         break
                 
@@ -131,7 +121,8 @@ def show():
     
     with tab3:
         st.subheader("Rejected Cases")
-        rejected_cases = get_cases_by_status("Rejected")
+        page = get_cases_page(status="Rejected", cursor=current_page_cursor("approver_rejected"))
+        rejected_cases = page["rows"]
         
         if rejected_cases:
             for case in rejected_cases:
@@ -139,6 +130,7 @@ def show():
                     show_read_only_case_details(case)
         else:
             st.info("📭 No rejected cases")
+        show_page_controls("approver_rejected", page)
 
 def show_case_details_for_approval(case, current_user):
     """Display case details for approval workflow using standardized format"""
@@ -194,6 +186,9 @@ def show_case_details_for_approval(case, current_user):
                 if update_case_status(case['case_id'], "Approver 2", current_user, f"APPROVER 1 APPROVED: {approval_comment}"):
                     st.success("✅ Case sent to Approver 2")
                     st.rerun()
+                else:
+                    from error_handler import handle_status_change_error
+                    handle_status_change_error(case['case_id'], "Approver 2")
             else:
                 st.warning("Please add approval comments")
     
@@ -203,6 +198,9 @@ def show_case_details_for_approval(case, current_user):
                 if update_case_status(case['case_id'], "Rejected", current_user, f"REJECTED: {approval_comment}"):
                     st.success("✅ Case rejected")
                     st.rerun()
+                else:
+                    from error_handler import handle_status_change_error
+                    handle_status_change_error(case['case_id'], "Rejected")
             else:
                 st.warning("Please add rejection comments")
     
@@ -212,6 +210,9 @@ def show_case_details_for_approval(case, current_user):
                 if update_case_status(case['case_id'], "Under Review", current_user, f"SENT BACK: {approval_comment}"):
                     st.success("✅ Case sent back for review")
                     st.rerun()
+                else:
+                    from error_handler import handle_status_change_error
+                    handle_status_change_error(case['case_id'], "Under Review")
             else:
                 st.warning("Please add comments explaining why it's being sent back")
 
@@ -264,22 +265,11 @@ def show_read_only_case_details(case):
 def show_simple_approval_actions(case, current_user):
     """Display simple approval actions without complex formatting"""
     
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
     # Simple case info display
-    case_id = safe_get(case, 'case_id', 'N/A')
-    customer_name = safe_get(case, 'customer_name', 'N/A')
-    case_type = safe_get(case, 'case_type', 'N/A')
-    loan_amount = safe_get(case, 'loan_amount', 'N/A')
+    case_id = get_field(case, 'case_id', 'N/A')
+    customer_name = get_field(case, 'customer_name', 'N/A')
+    case_type = get_field(case, 'case_type', 'N/A')
+    loan_amount = get_field(case, 'loan_amount', 'N/A')
     
     st.write(f"**Case ID:** {case_id}")
     st.write(f"**Customer:** {customer_name}")
@@ -305,11 +295,14 @@ def show_simple_approval_actions(case, current_user):
                     comment_text = f"APPROVED BY APPROVER 1: {approval_comments}"
                     from models import add_case_comment, update_case_status
                     
-                    if add_case_comment(case_id, comment_text, current_user, "Approval"):
-                        if update_case_status(case_id, "Approver 2", current_user):
+                    if update_case_status(case_id, "Approver 2", current_user):
+                        if add_case_comment(case_id, comment_text, current_user, "Approval"):
                             from error_handler import success_message
                             success_message("Case Approved", "Case approved and sent to Approver 2")
                             st.rerun()
+                    else:
+                        from error_handler import handle_status_change_error
+                        handle_status_change_error(case_id, "Approver 2")
                 except Exception as e:
                     from error_handler import handle_database_error
                     handle_database_error("case approval", e)
@@ -324,11 +317,14 @@ def show_simple_approval_actions(case, current_user):
                     comment_text = f"ADDITIONAL INFO REQUESTED: {approval_comments}"
                     from models import add_case_comment, update_case_status
                     
-                    if add_case_comment(case_id, comment_text, current_user, "Info Request"):
-                        if update_case_status(case_id, "Under Review", current_user):
+                    if update_case_status(case_id, "Under Review", current_user):
+                        if add_case_comment(case_id, comment_text, current_user, "Info Request"):
                             from error_handler import success_message
                             success_message("Information Requested", "Additional information requested")
                             st.rerun()
+                    else:
+                        from error_handler import handle_status_change_error
+                        handle_status_change_error(case_id, "Under Review")
                 except Exception as e:
                     from error_handler import handle_database_error
                     handle_database_error("information request", e)
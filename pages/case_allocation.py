@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date
-from models import get_cases_by_status, get_case_by_id, create_case_allocation, get_case_allocations
+from models import get_cases_by_status, get_case_by_id, create_case_allocation, get_case_allocations_page
+from pagination import current_page_cursor, show_page_controls
+from analytics_snapshot import analytics_query
 from auth import get_current_user, require_role
 from utils import generate_case_id, save_uploaded_file
 import os
@@ -401,32 +403,45 @@ def show_case_allocation_form(current_user):
             # Handle file uploads
             uploaded_files = {}
             if gst_business_proof:
-                uploaded_files['gst_business_proof'] = save_uploaded_file(gst_business_proof, selected_case_id)
+                uploaded_files['gst_business_proof'] = saved_file_path(gst_business_proof, selected_case_id)
             if pan_card_image:
-                uploaded_files['pan_card_image'] = save_uploaded_file(pan_card_image, selected_case_id)
+                uploaded_files['pan_card_image'] = saved_file_path(pan_card_image, selected_case_id)
             if aadhaar_card_image:
-                uploaded_files['aadhaar_card_image'] = save_uploaded_file(aadhaar_card_image, selected_case_id)
+                uploaded_files['aadhaar_card_image'] = saved_file_path(aadhaar_card_image, selected_case_id)
             if customer_photo:
-                uploaded_files['customer_photo'] = save_uploaded_file(customer_photo, selected_case_id)
+                uploaded_files['customer_photo'] = saved_file_path(customer_photo, selected_case_id)
             if supporting_documents:
-                doc_paths = [save_uploaded_file(doc, selected_case_id) for doc in supporting_documents]
-                uploaded_files['supporting_documents'] = ','.join(doc_paths) if doc_paths else ''
+                doc_paths = [saved_file_path(doc, selected_case_id) for doc in supporting_documents]
+                uploaded_files['supporting_documents'] = ','.join(path for path in doc_paths if path)
             
             allocation_data.update(uploaded_files)
             
             # Create allocation record
-            success = create_case_allocation(allocation_data)
+            allocation_id = create_case_allocation(allocation_data)
             
-            if success:
+            if allocation_id:
+                if allocation_data.get('customer_photo'):
+                    # The customer photo joins the cross-case face index like any other case photo
+                    from face_index import index_case_photo
+                    index_case_photo(allocation_data['customer_photo'], selected_case_id, f"case_allocations:{allocation_id}", "customer_photo")
                 st.success(f"✅ Case {selected_case_id} successfully allocated to {assigned_investigator}")
                 st.balloons()
                 st.rerun()
             else:
                 st.error("❌ Failed to create case allocation. Please try again.")
 
+def saved_file_path(uploaded_file, case_id):
+    """Save an upload and return its path, or None if it could not be saved"""
+    file_info, error = save_uploaded_file(uploaded_file, case_id)
+    if error:
+        st.warning(f"⚠️ {uploaded_file.name} was not saved: {error}")
+        return None
+    return file_info["file_path"]
+
 def show_allocated_cases():
-    """Display all allocated cases"""
-    allocated_cases = get_case_allocations()
+    """Display allocated cases one page at a time"""
+    page = get_case_allocations_page(cursor=current_page_cursor("allocated_cases"))
+    allocated_cases = page["rows"]
     
     if not allocated_cases:
         st.info("📭 No cases have been allocated yet.")
@@ -457,43 +472,49 @@ def show_allocated_cases():
                 st.write(f"**Region:** {case.get('region', 'N/A')}")
                 st.write(f"**Branch:** {case.get('branch_location', 'N/A')}")
                 st.write(f"**Created By:** {case.get('created_by', 'N/A')}")
+    
+    show_page_controls("allocated_cases", page)
 
 def show_allocation_statistics():
     """Display allocation statistics and analytics"""
-    allocated_cases = get_case_allocations()
-    
-    if not allocated_cases:
+    summary = analytics_query("""
+        SELECT COUNT(*) AS total,
+               SUM(CASE WHEN priority_level = 'High' THEN 1 ELSE 0 END) AS high_priority,
+               COUNT(DISTINCT assigned_investigator) AS investigators,
+               AVG(loan_amount) AS avg_loan_amount
+        FROM case_allocations
+    """)[0]
+    
+    if not summary["total"]:
         st.info("📊 No allocation data available for analytics.")
         return
     
-    # Convert to DataFrame for analysis
-    df = pd.DataFrame(allocated_cases)
-    
     # Statistics
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Allocations", len(df))
+        st.metric("Total Allocations", summary["total"])
     
     with col2:
-        high_priority = len(df[df['priority_level'] == 'High']) if 'priority_level' in df.columns else 0
-        st.metric("High Priority Cases", high_priority)
+        st.metric("High Priority Cases", summary["high_priority"] or 0)
     
     with col3:
-        unique_investigators = df['assigned_investigator'].nunique() if 'assigned_investigator' in df.columns else 0
-        st.metric("Active Investigators", unique_investigators)
+        st.metric("Active Investigators", summary["investigators"])
     
     with col4:
-        avg_loan_amount = df['loan_amount'].mean() if 'loan_amount' in df.columns else 0
-        st.metric("Avg Loan Amount", f"₹{avg_loan_amount:,.0f}")
+        st.metric("Avg Loan Amount", f"₹{summary['avg_loan_amount'] or 0:,.0f}")
     
     # Charts
-    if 'priority_level' in df.columns:
-        st.markdown("#### Priority Level Distribution")
-        priority_counts = df['priority_level'].value_counts()
-        st.bar_chart(priority_counts)
-    
-    if 'assigned_investigator' in df.columns:
-        st.markdown("#### Cases by Investigator")
-        investigator_counts = df['assigned_investigator'].value_counts()
-        st.bar_chart(investigator_counts)
\ No newline at end of file
+    priority_counts = analytics_query("""
+        SELECT priority_level, COUNT(*) AS count FROM case_allocations
+        GROUP BY priority_level ORDER BY count DESC
+    """)
+    st.markdown("#### Priority Level Distribution")
+    st.bar_chart(pd.DataFrame(priority_counts).set_index("priority_level")["count"])
+    
+    investigator_counts = analytics_query("""
+        SELECT assigned_investigator, COUNT(*) AS count FROM case_allocations
+        GROUP BY assigned_investigator ORDER BY count DESC
+    """)
+    st.markdown("#### Cases by Investigator")
+    st.bar_chart(pd.DataFrame(investigator_counts).set_index("assigned_investigator")["count"])
@@ -5,6 +5,7 @@ from datetime import datetime
 from models import create_simplified_case
 from utils import validate_case_data, save_uploaded_file, generate_case_id
 from auth import get_current_user, require_role
+from case_import import import_cases, import_summary
 
 def show():
     """Display simplified case entry page with only 7 required fields"""
@@ -541,6 +542,40 @@ def show():
     
     *Note: Detailed customer demographics, financial information, and investigation details will be captured in the Case Assignment module.*
     """)
+    
+    show_bulk_import(current_user)
+
+def show_bulk_import(current_user):
+    """Bulk case import from a CSV / XLSX referral sheet"""
+    with st.expander("📤 Bulk Import from Spreadsheet"):
+        st.caption(
+            "Upload a CSV or XLSX sheet with one referral per row. Columns use the case field names "
+            "(lan, customer_name, customer_mobile, customer_email, customer_pan, branch_location, "
+            "case_description, referred_by, case_type, product, region, loan_amount, ...)."
+        )
+        uploaded_sheet = st.file_uploader("Referral sheet", type=["csv", "xlsx"], key="bulk_case_import")
+        dry_run = st.checkbox("Validate only (don't import)", value=True)
+        
+        if uploaded_sheet and st.button("🚀 Run Import"):
+            try:
+                report = import_cases(uploaded_sheet, current_user, filename=uploaded_sheet.name, dry_run=dry_run)
+            except Exception as e:
+                st.error(f"❌ Could not read the sheet: {str(e)}")
+                return
+            
+            summary = import_summary(report)
+            cols = st.columns(3)
+            cols[0].metric("Imported" if not dry_run else "Valid", summary.get("Imported", 0) + summary.get("Valid", 0))
+            cols[1].metric("Rejected", summary.get("Rejected", 0))
+            cols[2].metric("Failed", summary.get("Failed", 0))
+            
+            st.dataframe(report, use_container_width=True, hide_index=True)
+            st.download_button(
+                label="📥 Download Row Report",
+                data=report.to_csv(index=False),
+                file_name=f"import_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv"
+            )
 
 def create_simplified_case(case_data):
     """Create a simplified case record with only basic information"""
@@ -550,23 +585,6 @@ def create_simplified_case(case_data):
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Create simplified cases table if it doesn't exist
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS cases_simplified (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    case_id TEXT UNIQUE NOT NULL,
-                    category TEXT NOT NULL,
-                    referred_by TEXT NOT NULL,
-                    case_type TEXT NOT NULL,
-                    case_date DATE NOT NULL,
-                    case_description TEXT NOT NULL,
-                    created_by TEXT NOT NULL,
-                    created_at DATETIME NOT NULL,
-                    status TEXT DEFAULT 'Registered',
-                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
             # Insert the case
             cursor.execute('''
                 INSERT INTO cases_simplified (
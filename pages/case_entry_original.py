@@ -2,8 +2,8 @@ import streamlit as st
 import uuid
 import os
 from datetime import datetime
-from models import create_simplified_case
-from utils import validate_case_data, save_uploaded_file, generate_case_id
+from models import create_simplified_case, add_case_document
+from utils import validate_case_data, save_uploaded_file, save_identity_document, generate_case_id
 from auth import get_current_user, require_role
 
 def query_gemini(prompt, max_tokens=1000):
@@ -644,6 +644,14 @@ def show():
                             )
                             if file_success:
                                 total_files_uploaded += 1
+                                # Record the file so it is kept with the case and the face index can find it
+                                file_path = os.path.join("uploads", filename)
+                                document_id = add_case_document(
+                                    case_data["case_id"], filename, doc_file.name, file_path, doc_file.size, current_user
+                                )
+                                if doc_type == "Customer_Photo":
+                                    from face_index import index_case_photo
+                                    index_case_photo(file_path, case_data["case_id"], f"documents:{document_id}", "customer_photo")
                     
                     if total_files_uploaded > 0:
                         st.success(f"✅ {total_files_uploaded} file(s) uploaded successfully (including identity documents)!")
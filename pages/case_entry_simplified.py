@@ -277,23 +277,6 @@ def create_simplified_case(case_data):
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Create simplified cases table if it doesn't exist
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS cases_simplified (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    case_id TEXT UNIQUE NOT NULL,
-                    category TEXT NOT NULL,
-                    referred_by TEXT NOT NULL,
-                    case_type TEXT NOT NULL,
-                    case_date DATE NOT NULL,
-                    case_description TEXT NOT NULL,
-                    created_by TEXT NOT NULL,
-                    created_at DATETIME NOT NULL,
-                    status TEXT DEFAULT 'Registered',
-                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
             # Insert the case
             cursor.execute('''
                 INSERT INTO cases_simplified (
@@ -1,7 +1,16 @@
 import streamlit as st
-from models import get_cases_by_status, update_case_status, get_case_comments, add_case_comment, get_case_documents
+from models import get_cases_by_status, get_cases_page, update_case_status, get_case_comments, add_case_comment, get_case_documents
+from pagination import current_page_cursor, show_page_controls
 from utils import get_status_color, format_datetime, format_file_size
 from auth import get_current_user, require_role
+from case_records import get_field
+from case_table_utils import show_bulk_status_actions
+
+# Bulk action label -> (status, comment prefix)
+BULK_CLOSURE_ACTIONS = {
+    "Close Cases": ("Closed", "CASE CLOSED (BULK)"),
+    "Send Back for Review": ("Under Review", "SENT BACK FROM CLOSURE (BULK)"),
+}
 
 @require_role(["Actioner", "Admin"])
 def show():
@@ -65,16 +74,19 @@ def show():
         ready_cases = get_cases_by_status("Legal Review")
         
         if ready_cases:
+            show_bulk_status_actions(ready_cases, current_user, BULK_CLOSURE_ACTIONS, "closure")
             show_enhanced_cases_ready_for_closure(ready_cases, current_user)
         else:
             st.info("📭 No cases ready for closure at this time")
     
     with tab2:
         st.subheader("Closed Cases")
-        closed_cases = get_cases_by_status("Closed")
+        # Closed cases only accumulate, so they are read one page at a time
+        page = get_cases_page(status="Closed", cursor=current_page_cursor("closure_closed"))
         
         from simple_case_display import show_simple_case_list
-        show_simple_case_list(closed_cases, current_user, "default")
+        show_simple_case_list(page["rows"], current_user, "default")
+        show_page_controls("closure_closed", page)
     
     with tab3:
         st.subheader("Closure Analytics")
@@ -463,6 +475,9 @@ def process_actioner_action(case, current_user, action_type, comments, files):
                 if update_case_status(case['case_id'], "Closed", current_user, final_comment):
                     st.success("✅ Case closed successfully")
                     st.rerun()
+                else:
+                    from error_handler import handle_status_change_error
+                    handle_status_change_error(case['case_id'], "Closed")
             else:
                 st.warning("Please add closure comments")
     
@@ -473,6 +488,9 @@ def process_actioner_action(case, current_user, action_type, comments, files):
                 if update_case_status(case['case_id'], "Under Review", current_user, comment_text):
                     st.success("✅ Case sent back for review")
                     st.rerun()
+                else:
+                    from error_handler import handle_status_change_error
+                    handle_status_change_error(case['case_id'], "Under Review")
             else:
                 st.warning("Please specify reason for sending back")
     
@@ -609,32 +627,21 @@ def show_closure_analytics():
 def show_enhanced_cases_ready_for_closure(cases, current_user):
     """Display cases ready for closure in simple presentable format with clickable Case IDs"""
     
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
     # Header for the cases list
     st.markdown("**Cases Available for Closure** *(Click on Case ID to expand and view full details including investigation reports)*")
     st.markdown("---")
     
     # Display each case in simple numbered format
     for i, case in enumerate(cases, 1):
-        case_id = safe_get(case, 'case_id', 'N/A')
-        customer_name = safe_get(case, 'customer_name', 'N/A')
-        case_type = safe_get(case, 'case_type', 'N/A')
-        product = safe_get(case, 'product', 'N/A')
-        region = safe_get(case, 'region', 'N/A')
-        status = safe_get(case, 'status', 'N/A')
-        loan_amount = safe_get(case, 'loan_amount', 0)
-        branch = safe_get(case, 'branch_location', 'N/A')
-        case_date = safe_get(case, 'case_date', 'N/A')
+        case_id = get_field(case, 'case_id', 'N/A')
+        customer_name = get_field(case, 'customer_name', 'N/A')
+        case_type = get_field(case, 'case_type', 'N/A')
+        product = get_field(case, 'product', 'N/A')
+        region = get_field(case, 'region', 'N/A')
+        status = get_field(case, 'status', 'N/A')
+        loan_amount = get_field(case, 'loan_amount', 0)
+        branch = get_field(case, 'branch_location', 'N/A')
+        case_date = get_field(case, 'case_date', 'N/A')
         
         # Format loan amount
         amount_display = f"₹{loan_amount:,}" if isinstance(loan_amount, (int, float)) and loan_amount > 0 else str(loan_amount)
@@ -649,18 +656,7 @@ def show_enhanced_cases_ready_for_closure(cases, current_user):
 def show_complete_case_details_with_investigation(case, current_user):
     """Show complete case details with comprehensive investigation details and reports"""
     
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
-    case_id = safe_get(case, 'case_id', 'N/A')
+    case_id = get_field(case, 'case_id', 'N/A')
     
     # Basic Case Information
     st.markdown("#### 📄 Case Information")
@@ -668,23 +664,23 @@ def show_complete_case_details_with_investigation(case, current_user):
     
     with col1:
         st.markdown("**Case Identification**")
-        st.write(f"Case ID: {safe_get(case, 'case_id')}")
-        st.write(f"LAN: {safe_get(case, 'lan')}")
-        st.write(f"Case Type: {safe_get(case, 'case_type')}")
+        st.write(f"Case ID: {get_field(case, 'case_id')}")
+        st.write(f"LAN: {get_field(case, 'lan')}")
+        st.write(f"Case Type: {get_field(case, 'case_type')}")
         
     with col2:
         st.markdown("**Customer Information**")
-        st.write(f"Customer: {safe_get(case, 'customer_name')}")
-        st.write(f"Mobile: {safe_get(case, 'customer_mobile')}")
-        st.write(f"Email: {safe_get(case, 'customer_email')}")
+        st.write(f"Customer: {get_field(case, 'customer_name')}")
+        st.write(f"Mobile: {get_field(case, 'customer_mobile')}")
+        st.write(f"Email: {get_field(case, 'customer_email')}")
         
     with col3:
         st.markdown("**Financial Details**")
-        st.write(f"Product: {safe_get(case, 'product')}")
-        loan_amt = safe_get(case, 'loan_amount', 0)
+        st.write(f"Product: {get_field(case, 'product')}")
+        loan_amt = get_field(case, 'loan_amount', 0)
         amount_display = f"₹{loan_amt:,}" if isinstance(loan_amt, (int, float)) and loan_amt > 0 else str(loan_amt)
         st.write(f"Amount: {amount_display}")
-        st.write(f"Branch: {safe_get(case, 'branch_location')}")
+        st.write(f"Branch: {get_field(case, 'branch_location')}")
     
     # Customer Demographic Details Section
     st.markdown("---")
@@ -729,24 +725,13 @@ def show_investigation_details(case_id):
             investigation = cursor.fetchone()
             
             if investigation:
-                def safe_get_inv(obj, key, default='N/A'):
-                    try:
-                        if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                            return obj[key] if key in obj.keys() and obj[key] is not None else default
-                        elif hasattr(obj, 'get'):
-                            return obj.get(key, default)
-                        else:
-                            return getattr(obj, key, default)
-                    except (KeyError, AttributeError, TypeError):
-                        return default
-                
-                st.write(f"**Investigation Type:** {safe_get_inv(investigation, 'investigation_type', 'N/A')}")
-                st.write(f"**Risk Level:** {safe_get_inv(investigation, 'risk_level', 'N/A')}")
-                st.write(f"**Investigation Status:** {safe_get_inv(investigation, 'status', 'N/A')}")
-                st.write(f"**Findings:** {safe_get_inv(investigation, 'findings', 'N/A')}")
-                st.write(f"**Recommendations:** {safe_get_inv(investigation, 'recommendations', 'N/A')}")
-                st.write(f"**Investigator:** {safe_get_inv(investigation, 'investigator_name', 'N/A')}")
-                st.write(f"**Investigation Date:** {safe_get_inv(investigation, 'created_at', 'N/A')}")
+                st.write(f"**Investigation Type:** {get_field(investigation, 'investigation_type', 'N/A')}")
+                st.write(f"**Risk Level:** {get_field(investigation, 'risk_level', 'N/A')}")
+                st.write(f"**Investigation Status:** {get_field(investigation, 'status', 'N/A')}")
+                st.write(f"**Findings:** {get_field(investigation, 'findings', 'N/A')}")
+                st.write(f"**Recommendations:** {get_field(investigation, 'recommendations', 'N/A')}")
+                st.write(f"**Investigator:** {get_field(investigation, 'investigator_name', 'N/A')}")
+                st.write(f"**Investigation Date:** {get_field(investigation, 'created_at', 'N/A')}")
             else:
                 st.info("No investigation details found for this case")
                 
@@ -771,19 +756,8 @@ def show_investigation_report(case_id):
             report = cursor.fetchone()
             
             if report:
-                def safe_get_rep(obj, key, default='N/A'):
-                    try:
-                        if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                            return obj[key] if key in obj.keys() and obj[key] is not None else default
-                        elif hasattr(obj, 'get'):
-                            return obj.get(key, default)
-                        else:
-                            return getattr(obj, key, default)
-                    except (KeyError, AttributeError, TypeError):
-                        return default
-                
-                st.write(f"**Report:** {safe_get_rep(report, 'filename', 'N/A')}")
-                st.write(f"**Generated:** {safe_get_rep(report, 'uploaded_at', 'N/A')}")
+                st.write(f"**Report:** {get_field(report, 'filename', 'N/A')}")
+                st.write(f"**Generated:** {get_field(report, 'uploaded_at', 'N/A')}")
                 
                 # Create download button for the report
                 if st.button(f"📥 Download Investigation Report", key=f"download_report_{case_id}"):
@@ -870,17 +844,6 @@ def show_communication_template_selector(case_id, current_user):
 def show_customer_demographic_details(case):
     """Show comprehensive customer demographic details in full-screen format"""
     
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
     # Create professional demographic display with full-screen layout
     st.markdown("""
     <style>
@@ -931,7 +894,7 @@ def show_customer_demographic_details(case):
     </style>
     """, unsafe_allow_html=True)
     
-    case_id = safe_get(case, 'case_id', 'N/A')
+    case_id = get_field(case, 'case_id', 'N/A')
     
     st.markdown('<div class="demographic-container">', unsafe_allow_html=True)
     
@@ -944,21 +907,21 @@ def show_customer_demographic_details(case):
     
     with col1:
         st.markdown(f'<div class="demographic-field"><span class="field-label">Case ID:</span><span class="field-value">{case_id}</span></div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Type:</span><span class="field-value">{safe_get(case, "case_type")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Type:</span><span class="field-value">{get_field(case, "case_type")}</span></div>', unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Product:</span><span class="field-value">{safe_get(case, "product")}</span></div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Region:</span><span class="field-value">{safe_get(case, "region")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Product:</span><span class="field-value">{get_field(case, "product")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Region:</span><span class="field-value">{get_field(case, "region")}</span></div>', unsafe_allow_html=True)
     
     with col3:
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Status:</span><span class="field-value">{safe_get(case, "status")}</span></div>', unsafe_allow_html=True)
-        loan_amt = safe_get(case, "loan_amount", 0)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Status:</span><span class="field-value">{get_field(case, "status")}</span></div>', unsafe_allow_html=True)
+        loan_amt = get_field(case, "loan_amount", 0)
         amount_str = f"₹{loan_amt:,}" if isinstance(loan_amt, (int, float)) and loan_amt > 0 else str(loan_amt)
         st.markdown(f'<div class="demographic-field"><span class="field-label">Amount:</span><span class="field-value">{amount_str}</span></div>', unsafe_allow_html=True)
     
     with col4:
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Branch:</span><span class="field-value">{safe_get(case, "branch_location")}</span></div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Date:</span><span class="field-value">{safe_get(case, "case_date")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Branch:</span><span class="field-value">{get_field(case, "branch_location")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Date:</span><span class="field-value">{get_field(case, "case_date")}</span></div>', unsafe_allow_html=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -969,21 +932,21 @@ def show_customer_demographic_details(case):
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Full Name:</span><span class="field-value">{safe_get(case, "customer_name")}</span></div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Date of Birth:</span><span class="field-value">{safe_get(case, "customer_dob")}</span></div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="demographic-field"><span class="field-label">PAN Number:</span><span class="field-value">{safe_get(case, "customer_pan")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Full Name:</span><span class="field-value">{get_field(case, "customer_name")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Date of Birth:</span><span class="field-value">{get_field(case, "customer_dob")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">PAN Number:</span><span class="field-value">{get_field(case, "customer_pan")}</span></div>', unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Aadhaar Number:</span><span class="field-value">{safe_get(case, "customer_aadhaar")}</span></div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Relationship Status:</span><span class="field-value">{safe_get(case, "customer_relationship_status")}</span></div>', unsafe_allow_html=True)
-        cibil_score = safe_get(case, "customer_cibil_score", 0)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Aadhaar Number:</span><span class="field-value">{get_field(case, "customer_aadhaar")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Relationship Status:</span><span class="field-value">{get_field(case, "customer_relationship_status")}</span></div>', unsafe_allow_html=True)
+        cibil_score = get_field(case, "customer_cibil_score", 0)
         cibil_str = str(cibil_score) if isinstance(cibil_score, (int, float)) and cibil_score > 0 else "N/A"
         st.markdown(f'<div class="demographic-field"><span class="field-label">CIBIL Score:</span><span class="field-value">{cibil_str}</span></div>', unsafe_allow_html=True)
     
     with col3:
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Occupation:</span><span class="field-value">{safe_get(case, "customer_occupation")}</span></div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Income Range:</span><span class="field-value">{safe_get(case, "customer_income")}</span></div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="demographic-field"><span class="field-label">LAN:</span><span class="field-value">{safe_get(case, "lan")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Occupation:</span><span class="field-value">{get_field(case, "customer_occupation")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Income Range:</span><span class="field-value">{get_field(case, "customer_income")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">LAN:</span><span class="field-value">{get_field(case, "lan")}</span></div>', unsafe_allow_html=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -994,15 +957,15 @@ def show_customer_demographic_details(case):
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Mobile Number:</span><span class="field-value">{safe_get(case, "customer_mobile")}</span></div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Email Address:</span><span class="field-value">{safe_get(case, "customer_email")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Mobile Number:</span><span class="field-value">{get_field(case, "customer_mobile")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Email Address:</span><span class="field-value">{get_field(case, "customer_email")}</span></div>', unsafe_allow_html=True)
     
     with col2:
-        address_text = safe_get(case, "customer_address_full", "N/A")
+        address_text = get_field(case, "customer_address_full", "N/A")
         # Truncate long addresses for display
         display_address = (address_text[:50] + "...") if len(address_text) > 50 else address_text
         st.markdown(f'<div class="demographic-field"><span class="field-label">Complete Address:</span><span class="field-value" title="{address_text}">{display_address}</span></div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Branch Location:</span><span class="field-value">{safe_get(case, "branch_location")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Branch Location:</span><span class="field-value">{get_field(case, "branch_location")}</span></div>', unsafe_allow_html=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -1013,18 +976,18 @@ def show_customer_demographic_details(case):
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        loan_amt = safe_get(case, "loan_amount", 0)
+        loan_amt = get_field(case, "loan_amount", 0)
         amount_display = f"₹{loan_amt:,}" if isinstance(loan_amt, (int, float)) and loan_amt > 0 else str(loan_amt)
         st.markdown(f'<div class="demographic-field"><span class="field-label">Loan Amount:</span><span class="field-value">{amount_display}</span></div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Product Type:</span><span class="field-value">{safe_get(case, "product")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Product Type:</span><span class="field-value">{get_field(case, "product")}</span></div>', unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Disbursement Date:</span><span class="field-value">{safe_get(case, "disbursement_date")}</span></div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Region:</span><span class="field-value">{safe_get(case, "region")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Disbursement Date:</span><span class="field-value">{get_field(case, "disbursement_date")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Region:</span><span class="field-value">{get_field(case, "region")}</span></div>', unsafe_allow_html=True)
     
     with col3:
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Current Status:</span><span class="field-value">{safe_get(case, "status")}</span></div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="demographic-field"><span class="field-label">Created Date:</span><span class="field-value">{safe_get(case, "case_date")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Current Status:</span><span class="field-value">{get_field(case, "status")}</span></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="demographic-field"><span class="field-label">Created Date:</span><span class="field-value">{get_field(case, "case_date")}</span></div>', unsafe_allow_html=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
     st.markdown('</div>', unsafe_allow_html=True)
@@ -1060,30 +1023,19 @@ def show_comprehensive_investigation_details(case_id):
                 if investigations:
                     st.markdown("**Investigation Analysis:**")
                     for investigation in investigations:
-                        def safe_get_inv(obj, key, default='N/A'):
-                            try:
-                                if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                                    return obj[key] if key in obj.keys() and obj[key] is not None else default
-                                elif hasattr(obj, 'get'):
-                                    return obj.get(key, default)
-                                else:
-                                    return getattr(obj, key, default)
-                            except (KeyError, AttributeError, TypeError):
-                                return default
-                        
                         col1, col2 = st.columns(2)
                         with col1:
-                            st.write(f"• **Investigation Type:** {safe_get_inv(investigation, 'investigation_type', 'N/A')}")
-                            st.write(f"• **Risk Level:** {safe_get_inv(investigation, 'risk_level', 'N/A')}")
-                            st.write(f"• **Status:** {safe_get_inv(investigation, 'status', 'N/A')}")
-                            st.write(f"• **Investigator:** {safe_get_inv(investigation, 'investigator_name', 'N/A')}")
+                            st.write(f"• **Investigation Type:** {get_field(investigation, 'investigation_type', 'N/A')}")
+                            st.write(f"• **Risk Level:** {get_field(investigation, 'risk_level', 'N/A')}")
+                            st.write(f"• **Status:** {get_field(investigation, 'status', 'N/A')}")
+                            st.write(f"• **Investigator:** {get_field(investigation, 'investigator_name', 'N/A')}")
                         
                         with col2:
-                            st.write(f"• **Investigation Date:** {safe_get_inv(investigation, 'created_at', 'N/A')}")
-                            findings = safe_get_inv(investigation, 'findings', 'N/A')
+                            st.write(f"• **Investigation Date:** {get_field(investigation, 'created_at', 'N/A')}")
+                            findings = get_field(investigation, 'findings', 'N/A')
                             st.write(f"• **Key Findings:** {findings[:100]}..." if len(findings) > 100 else f"• **Key Findings:** {findings}")
                         
-                        recommendations = safe_get_inv(investigation, 'recommendations', 'N/A')
+                        recommendations = get_field(investigation, 'recommendations', 'N/A')
                         st.write(f"• **Recommendations:** {recommendations}")
                         st.markdown("---")
                 
@@ -1091,21 +1043,10 @@ def show_comprehensive_investigation_details(case_id):
                 if investigation_comments:
                     st.markdown("**Investigation Comments & Updates:**")
                     for comment in investigation_comments[:3]:  # Show latest 3 comments
-                        def safe_get_comment(obj, key, default='N/A'):
-                            try:
-                                if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                                    return obj[key] if key in obj.keys() and obj[key] is not None else default
-                                elif hasattr(obj, 'get'):
-                                    return obj.get(key, default)
-                                else:
-                                    return getattr(obj, key, default)
-                            except (KeyError, AttributeError, TypeError):
-                                return default
-                        
-                        comment_text = safe_get_comment(comment, 'comment', 'N/A')
-                        comment_type = safe_get_comment(comment, 'comment_type', 'N/A')
-                        created_by = safe_get_comment(comment, 'created_by', 'N/A')
-                        created_at = safe_get_comment(comment, 'created_at', 'N/A')
+                        comment_text = get_field(comment, 'comment', 'N/A')
+                        comment_type = get_field(comment, 'comment_type', 'N/A')
+                        created_by = get_field(comment, 'created_by', 'N/A')
+                        created_at = get_field(comment, 'created_at', 'N/A')
                         
                         st.write(f"• **{comment_type}** by {created_by} on {created_at}")
                         st.write(f"  {comment_text}")
@@ -1146,22 +1087,11 @@ def show_investigation_reports_with_download(case_id):
                 st.markdown("**Available Investigation Reports & Documents:**")
                 
                 for i, report in enumerate(reports, 1):
-                    def safe_get_report(obj, key, default='N/A'):
-                        try:
-                            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                                return obj[key] if key in obj.keys() and obj[key] is not None else default
-                            elif hasattr(obj, 'get'):
-                                return obj.get(key, default)
-                            else:
-                                return getattr(obj, key, default)
-                        except (KeyError, AttributeError, TypeError):
-                            return default
-                    
-                    filename = safe_get_report(report, 'filename', 'N/A')
-                    file_path = safe_get_report(report, 'file_path', 'N/A')
-                    uploaded_at = safe_get_report(report, 'uploaded_at', 'N/A')
-                    uploaded_by = safe_get_report(report, 'uploaded_by', 'N/A')
-                    file_size = safe_get_report(report, 'file_size', 0)
+                    filename = get_field(report, 'filename', 'N/A')
+                    file_path = get_field(report, 'file_path', 'N/A')
+                    uploaded_at = get_field(report, 'uploaded_at', 'N/A')
+                    uploaded_by = get_field(report, 'uploaded_by', 'N/A')
+                    file_size = get_field(report, 'file_size', 0)
                     
                     # Format file size
                     if isinstance(file_size, (int, float)) and file_size > 0:
@@ -1203,18 +1133,7 @@ def show_investigation_reports_with_download(case_id):
 def show_cause_notice_section(case, current_user):
     """Show comprehensive Show Cause Notice generation with AI assistance"""
     
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
-    case_id = safe_get(case, 'case_id', 'N/A')
+    case_id = get_field(case, 'case_id', 'N/A')
     
     st.write("Generate Show Cause Notice based on customer information and investigation findings:")
     
@@ -1347,29 +1266,18 @@ def show_cause_notice_section(case, current_user):
 def generate_ai_scn_draft(case, scn_type):
     """Generate AI-powered SCN draft based on case and investigation information"""
     
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
     try:
         from datetime import datetime
         
         # Extract case information
-        case_id = safe_get(case, 'case_id')
-        customer_name = safe_get(case, 'customer_name')
-        lan = safe_get(case, 'lan')
-        loan_amount = safe_get(case, 'loan_amount', 0)
-        case_type = safe_get(case, 'case_type')
-        case_description = safe_get(case, 'case_description')
-        product = safe_get(case, 'product')
-        branch = safe_get(case, 'branch_location')
+        case_id = get_field(case, 'case_id')
+        customer_name = get_field(case, 'customer_name')
+        lan = get_field(case, 'lan')
+        loan_amount = get_field(case, 'loan_amount', 0)
+        case_type = get_field(case, 'case_type')
+        case_description = get_field(case, 'case_description')
+        product = get_field(case, 'product')
+        branch = get_field(case, 'branch_location')
         
         # Get investigation details if available  
         investigation_details = get_investigation_details_for_scn(case_id)
@@ -1432,32 +1340,21 @@ The document should be detailed, professional, and based on the case facts provi
 def generate_template_scn_draft(case, scn_type):
     """Generate template-based SCN draft as fallback"""
     
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
     from datetime import datetime
     
     # Extract case information with safe access
-    case_id = safe_get(case, 'case_id')
-    customer_name = safe_get(case, 'customer_name')
-    lan = safe_get(case, 'lan')
-    loan_amount = safe_get(case, 'loan_amount', 0)
-    case_type = safe_get(case, 'case_type')
-    case_description = safe_get(case, 'case_description')
-    product = safe_get(case, 'product')
-    branch = safe_get(case, 'branch_location')
-    customer_pan = safe_get(case, 'pan', 'N/A')
-    customer_mobile = safe_get(case, 'mobile_number', 'N/A')
-    customer_email = safe_get(case, 'email_id', 'N/A')
-    disbursement_date = safe_get(case, 'disbursement_date', 'N/A')
+    case_id = get_field(case, 'case_id')
+    customer_name = get_field(case, 'customer_name')
+    lan = get_field(case, 'lan')
+    loan_amount = get_field(case, 'loan_amount', 0)
+    case_type = get_field(case, 'case_type')
+    case_description = get_field(case, 'case_description')
+    product = get_field(case, 'product')
+    branch = get_field(case, 'branch_location')
+    customer_pan = get_field(case, 'pan', 'N/A')
+    customer_mobile = get_field(case, 'mobile_number', 'N/A')
+    customer_email = get_field(case, 'email_id', 'N/A')
+    disbursement_date = get_field(case, 'disbursement_date', 'N/A')
     
     if scn_type == "Show Cause Notice (SCN)":
         return f"""**SHOW CAUSE NOTICE**
@@ -1640,23 +1537,12 @@ def get_investigation_details_for_scn(case_id):
             investigation = cursor.fetchone()
             
             if investigation:
-                def safe_get_inv(obj, key, default='N/A'):
-                    try:
-                        if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                            return obj[key] if key in obj.keys() and obj[key] is not None else default
-                        elif hasattr(obj, 'get'):
-                            return obj.get(key, default)
-                        else:
-                            return getattr(obj, key, default)
-                    except (KeyError, AttributeError, TypeError):
-                        return default
-                
-                return f"""Investigation Type: {safe_get_inv(investigation, 'investigation_type')}
-Risk Level: {safe_get_inv(investigation, 'risk_level')}
-Status: {safe_get_inv(investigation, 'status')}
-Findings: {safe_get_inv(investigation, 'findings')}
-Recommendations: {safe_get_inv(investigation, 'recommendations')}
-Investigator: {safe_get_inv(investigation, 'investigator_name')}"""
+                return f"""Investigation Type: {get_field(investigation, 'investigation_type')}
+Risk Level: {get_field(investigation, 'risk_level')}
+Status: {get_field(investigation, 'status')}
+Findings: {get_field(investigation, 'findings')}
+Recommendations: {get_field(investigation, 'recommendations')}
+Investigator: {get_field(investigation, 'investigator_name')}"""
             else:
                 return "No investigation details available for this case."
                 
@@ -1706,27 +1592,19 @@ def issue_show_cause_notice(case, content, grounds, violations, deadline, instru
     try:
         from models import add_case_comment, update_case_status
         
-        def safe_get(obj, key, default='N/A'):
-            try:
-                if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                    return obj[key] if key in obj.keys() and obj[key] is not None else default
-                elif hasattr(obj, 'get'):
-                    return obj.get(key, default)
-                else:
-                    return getattr(obj, key, default)
-            except (KeyError, AttributeError, TypeError):
-                return default
-        
-        case_id = safe_get(case, 'case_id')
+        case_id = get_field(case, 'case_id')
         
         issued_content = f"SCN ISSUED - Type: {scn_type}\n\nContent:\n{content}\n\nLegal Grounds: {grounds}\nViolations: {violations}\nResponse Deadline: {deadline}\nSpecial Instructions: {instructions}\n\nStatus: OFFICIALLY ISSUED"
         
-        if add_case_comment(case_id, issued_content, current_user, "SCN Issued"):
-            # Update case status to Legal Review Complete after SCN issuance
-            if update_case_status(case_id, "Legal Review Complete", current_user):
+        # Update case status to Legal Review Complete after SCN issuance
+        if update_case_status(case_id, "Legal Review Complete", current_user):
+            if add_case_comment(case_id, issued_content, current_user, "SCN Issued"):
                 from error_handler import success_message
                 success_message("SCN Issued Successfully", f"{scn_type} has been officially issued with response deadline: {deadline}")
                 st.rerun()
+        else:
+            from error_handler import handle_status_change_error
+            handle_status_change_error(case_id, "Legal Review Complete")
         
     except Exception as e:
         from error_handler import handle_database_error
@@ -1742,18 +1620,7 @@ def generate_scn_pdf(case, content, grounds, violations, deadline, instructions,
         from datetime import datetime
         import os
         
-        def safe_get(obj, key, default='N/A'):
-            try:
-                if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                    return obj[key] if key in obj.keys() and obj[key] is not None else default
-                elif hasattr(obj, 'get'):
-                    return obj.get(key, default)
-                else:
-                    return getattr(obj, key, default)
-            except (KeyError, AttributeError, TypeError):
-                return default
-        
-        case_id = safe_get(case, 'case_id')
+        case_id = get_field(case, 'case_id')
         
         # Create PDF file
         filename = f"SCN_{case_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
@@ -3,6 +3,7 @@ import pandas as pd
 from datetime import datetime
 from auth import require_role, get_current_user
 from models import get_cases_by_status
+from workflow_engine import get_queue_depths
 from utils import format_datetime
 import plotly.express as px
 import plotly.graph_objects as go
@@ -113,10 +114,11 @@ def show():
                        "Approved", "Legal Review", "Closed", "Rejected"]
         stats = {"total_cases": 0, "by_status": {}}
         
+        # Queue depths come from the workflow projection, not a scan per status
+        queue = get_queue_depths("cases_simplified")
         for status in all_statuses:
-            cases = get_cases_by_status(status)
-            stats["by_status"][status] = len(cases)
-            stats["total_cases"] += len(cases)
+            stats["by_status"][status] = queue.get(status, 0)
+            stats["total_cases"] += queue.get(status, 0)
         
         # Workflow stage metrics
         st.subheader("📈 Workflow Stage Overview")
@@ -124,7 +126,7 @@ def show():
         col1, col2, col3, col4, col5 = st.columns(5)
         
         with col1:
-            pending_allocation = len(get_cases_by_status("Submitted"))
+            pending_allocation = queue.get("Submitted", 0)
             st.markdown(f"""
             <div class="workflow-card">
                 <div class="metric-value">{pending_allocation}</div>
@@ -133,7 +135,7 @@ def show():
             """, unsafe_allow_html=True)
         
         with col2:
-            under_investigation = len(get_cases_by_status("Under Investigation"))
+            under_investigation = queue.get("Under Investigation", 0)
             st.markdown(f"""
             <div class="workflow-card">
                 <div class="metric-value">{under_investigation}</div>
@@ -142,7 +144,7 @@ def show():
             """, unsafe_allow_html=True)
         
         with col3:
-            primary_review = len(get_cases_by_status("Under Review"))
+            primary_review = queue.get("Under Review", 0)
             st.markdown(f"""
             <div class="workflow-card">
                 <div class="metric-value">{primary_review}</div>
@@ -151,7 +153,7 @@ def show():
             """, unsafe_allow_html=True)
         
         with col4:
-            final_review = len(get_cases_by_status("Final Review"))
+            final_review = queue.get("Final Review", 0)
             st.markdown(f"""
             <div class="workflow-card">
                 <div class="metric-value">{final_review}</div>
@@ -160,7 +162,7 @@ def show():
             """, unsafe_allow_html=True)
         
         with col5:
-            legal_review = len(get_cases_by_status("Legal Review"))
+            legal_review = queue.get("Legal Review", 0)
             st.markdown(f"""
             <div class="workflow-card">
                 <div class="metric-value">{legal_review}</div>
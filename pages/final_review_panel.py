@@ -332,35 +332,24 @@ def process_final_adjudication(case, category, fraud_type, severity, summary, cu
         save_adjudication_decision(adjudication_data)
         
         # Route based on categorization
-        if category == "Fraud":
-            # Route to Legal Compliance Center
-            update_case_status(case_id, "Legal Review")
-            add_case_comment(
-                case_id,
-                f"FINAL ADJUDICATION: Categorized as {category} ({fraud_type}) with {severity} severity. Routed to Legal Compliance Center for fraud processing.",
-                current_user
-            )
-            st.success(f"✅ Case {case_id} categorized as {category} and routed to Legal Compliance Center")
-            
-        elif category == "Non-Fraud":
-            # Route to Case Closure
-            update_case_status(case_id, "Case Closure")
-            add_case_comment(
-                case_id,
-                f"FINAL ADJUDICATION: Categorized as {category} with {severity} severity. Routed to Case Closure.",
-                current_user
-            )
-            st.success(f"✅ Case {case_id} categorized as {category} and routed to Case Closure")
-            
-        elif category == "Other Incident":
-            # Route to Stakeholder Actioner
-            update_case_status(case_id, "Stakeholder Action")
+        routes = {
+            "Fraud": ("Legal Review", "Legal Compliance Center", f"{category} ({fraud_type})", "fraud processing"),
+            "Non-Fraud": ("Case Closure", "Case Closure", category, None),
+            "Other Incident": ("Stakeholder Action", "Stakeholder Actioner", category, "resolution"),
+        }
+        if category in routes:
+            new_status, destination, label, purpose = routes[category]
+            if not update_case_status(case_id, new_status, current_user, summary):
+                st.error(f"❌ Case {case_id} cannot be routed to {destination} from its current status")
+                return
             add_case_comment(
                 case_id,
-                f"FINAL ADJUDICATION: Categorized as {category} with {severity} severity. Routed to Stakeholder Actioner for resolution.",
+                f"FINAL ADJUDICATION: Categorized as {label} with {severity} severity. Routed to {destination}"
+                + (f" for {purpose}." if purpose else "."),
+                "Final Adjudication",
                 current_user
             )
-            st.success(f"✅ Case {case_id} categorized as {category} and routed to Stakeholder Actioner")
+            st.success(f"✅ Case {case_id} categorized as {category} and routed to {destination}")
             
         # Log audit trail
         log_audit(case_id, "Final Adjudication", f"Case adjudicated as {category} by {current_user}", current_user)
@@ -374,22 +363,6 @@ def save_adjudication_decision(adjudication_data):
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Create adjudication_decisions table if not exists
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS adjudication_decisions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    case_id TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    fraud_type TEXT,
-                    severity TEXT NOT NULL,
-                    summary TEXT NOT NULL,
-                    adjudicated_by TEXT NOT NULL,
-                    adjudicated_at DATETIME NOT NULL,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (case_id) REFERENCES cases (case_id)
-                )
-            """)
-            
             # Insert adjudication decision
             cursor.execute("""
                 INSERT INTO adjudication_decisions (
@@ -418,10 +391,13 @@ def send_back_for_reinvestigation(case, summary, current_user):
     """Send case back for re-investigation"""
     try:
         case_id = case['case_id']
-        update_case_status(case_id, "Investigation")
+        if not update_case_status(case_id, "Investigation", current_user, summary):
+            st.error(f"❌ Case {case_id} cannot be sent back from its current status")
+            return
         add_case_comment(
             case_id,
             f"SENT BACK FOR RE-INVESTIGATION: {summary}",
+            "Re-investigation",
             current_user
         )
         log_audit(case_id, "Sent Back", f"Case sent back for re-investigation by {current_user}", current_user)
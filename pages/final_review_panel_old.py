@@ -459,22 +459,6 @@ def save_adjudication_decision(adjudication_data):
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Create adjudication_decisions table if not exists
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS adjudication_decisions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    case_id TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    fraud_type TEXT,
-                    severity TEXT NOT NULL,
-                    summary TEXT NOT NULL,
-                    adjudicated_by TEXT NOT NULL,
-                    adjudicated_at DATETIME NOT NULL,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (case_id) REFERENCES cases (case_id)
-                )
-            """)
-            
             # Insert adjudication decision
             cursor.execute("""
                 INSERT INTO adjudication_decisions (
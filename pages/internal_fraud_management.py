@@ -1,8 +1,10 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date
-from models_internal_fraud import create_internal_fraud_case, get_internal_fraud_cases, update_internal_fraud_case, get_internal_fraud_case_by_id
+from models_internal_fraud import create_internal_fraud_case, get_internal_fraud_cases, get_internal_fraud_cases_page, update_internal_fraud_case, get_internal_fraud_case_by_id
+from pagination import current_page_cursor, show_page_controls
 from auth import get_current_user, require_role
+from analytics_snapshot import analytics_query
 from utils import generate_case_id, save_uploaded_file
 import os
 
@@ -207,17 +209,38 @@ def show_sidebar_navigation():
     current_section = st.session_state.get('if_selected_section', 'Case Initiation')
     st.sidebar.markdown(f"**Current:** {current_section}")
 
+def select_case_page(key, label, empty_message, **filters):
+    """Pick an internal fraud case from a page of the cases matching filters
+    
+    Returns the selected case_id, or None when the page is empty.
+    """
+    cursor = current_page_cursor(key, filters)
+    page = get_internal_fraud_cases_page(cursor=cursor, **filters)
+    
+    if not page["rows"]:
+        st.info(empty_message)
+        if cursor is not None:
+            # Cases moved on since this page was opened: let the user page back
+            show_page_controls(key, page)
+        return None
+    
+    case_options = [f"{case.get('case_id')} - {case.get('case_type', 'Unknown')}" for case in page["rows"]]
+    selected_case = st.selectbox(label, case_options)
+    show_page_controls(key, page)
+    return selected_case.split(" - ")[0] if selected_case else None
+
 def show_case_initiation_workflow():
     """Case Initiation workflow section"""
     st.markdown('<div class="section-header">Case Initiation</div>', unsafe_allow_html=True)
     
     current_user = get_current_user()
     
-    # Case selection for existing cases
-    cases = get_internal_fraud_cases()
-    case_options = ["Create New Case"] + [f"{case.get('case_id')} - {case.get('case_type', 'Unknown')}" for case in cases]
+    # Case selection for existing cases, one page at a time
+    page = get_internal_fraud_cases_page(cursor=current_page_cursor("internal_fraud_initiation"))
+    case_options = ["Create New Case"] + [f"{case.get('case_id')} - {case.get('case_type', 'Unknown')}" for case in page["rows"]]
     
     selected_case = st.selectbox("Select Case:", case_options)
+    show_page_controls("internal_fraud_initiation", page)
     
     if selected_case == "Create New Case":
         show_new_case_initiation_form()
@@ -368,8 +391,7 @@ def show_edit_case_initiation_form(case_data):
                 'detection_date': detection_date.isoformat(),
                 'reported_by': reported_by,
                 'reporting_channel': reporting_channel,
-                'incident_description': incident_description,
-                'updated_at': datetime.now().isoformat()
+                'incident_description': incident_description
             }
             
             # Handle file uploads
@@ -392,18 +414,12 @@ def show_case_allocation_workflow():
     """Case Allocation workflow section"""
     st.markdown('<div class="section-header">Case Allocation</div>', unsafe_allow_html=True)
     
-    cases = get_internal_fraud_cases()
-    initiated_cases = [case for case in cases if case.get('status') in ['Initiated', 'Allocated']]
+    case_id = select_case_page(
+        "internal_fraud_allocation", "Select Case for Allocation:", "No cases available for allocation.",
+        status=['Initiated', 'Allocated']
+    )
     
-    if not initiated_cases:
-        st.info("No cases available for allocation.")
-        return
-    
-    case_options = [f"{case.get('case_id')} - {case.get('case_type', 'Unknown')}" for case in initiated_cases]
-    selected_case = st.selectbox("Select Case for Allocation:", case_options)
-    
-    if selected_case:
-        case_id = selected_case.split(" - ")[0]
+    if case_id:
         case_data = get_internal_fraud_case_by_id(case_id)
         
         if case_data:
@@ -451,8 +467,7 @@ def show_case_allocation_workflow():
                         'allocation_remarks': allocation_remarks,
                         'status': 'Allocated',
                         'current_stage': 'Case Allocation',
-                        'workflow_stage': 2,
-                        'updated_at': datetime.now().isoformat()
+                        'workflow_stage': 2
                     }
                     
                     success = update_internal_fraud_case(case_id, update_data)
@@ -466,18 +481,12 @@ def show_investigation_workflow():
     """Investigation workflow section"""
     st.markdown('<div class="section-header">Investigation</div>', unsafe_allow_html=True)
     
-    cases = get_internal_fraud_cases()
-    allocated_cases = [case for case in cases if case.get('status') in ['Allocated', 'Under Investigation']]
-    
-    if not allocated_cases:
-        st.info("No cases available for investigation.")
-        return
-    
-    case_options = [f"{case.get('case_id')} - {case.get('case_type', 'Unknown')}" for case in allocated_cases]
-    selected_case = st.selectbox("Select Case for Investigation:", case_options)
+    case_id = select_case_page(
+        "internal_fraud_investigation", "Select Case for Investigation:", "No cases available for investigation.",
+        status=['Allocated', 'Under Investigation']
+    )
     
-    if selected_case:
-        case_id = selected_case.split(" - ")[0]
+    if case_id:
         case_data = get_internal_fraud_case_by_id(case_id)
         
         if case_data:
@@ -528,8 +537,7 @@ def show_investigation_workflow():
                         'preliminary_findings': preliminary_findings,
                         'status': 'Under Investigation',
                         'current_stage': 'Investigation',
-                        'workflow_stage': 3,
-                        'updated_at': datetime.now().isoformat()
+                        'workflow_stage': 3
                     }
                     
                     # Handle evidence files
@@ -552,18 +560,12 @@ def show_review_assessment_workflow():
     """Review & Assessment workflow section"""
     st.markdown('<div class="section-header">Review & Assessment</div>', unsafe_allow_html=True)
     
-    cases = get_internal_fraud_cases()
-    investigation_cases = [case for case in cases if case.get('status') in ['Under Investigation', 'Under Review']]
+    case_id = select_case_page(
+        "internal_fraud_review", "Select Case for Review:", "No cases available for review.",
+        status=['Under Investigation', 'Under Review']
+    )
     
-    if not investigation_cases:
-        st.info("No cases available for review.")
-        return
-    
-    case_options = [f"{case.get('case_id')} - {case.get('case_type', 'Unknown')}" for case in investigation_cases]
-    selected_case = st.selectbox("Select Case for Review:", case_options)
-    
-    if selected_case:
-        case_id = selected_case.split(" - ")[0]
+    if case_id:
         case_data = get_internal_fraud_case_by_id(case_id)
         
         if case_data:
@@ -608,8 +610,7 @@ def show_review_assessment_workflow():
                         'reviewer_comments': reviewer_comments,
                         'status': 'Under Review',
                         'current_stage': 'Review & Assessment',
-                        'workflow_stage': 4,
-                        'updated_at': datetime.now().isoformat()
+                        'workflow_stage': 4
                     }
                     
                     success = update_internal_fraud_case(case_id, update_data)
@@ -623,18 +624,12 @@ def show_approver1_workflow():
     """Approver 1 Decision workflow section"""
     st.markdown('<div class="section-header">Approver 1 Decision</div>', unsafe_allow_html=True)
     
-    cases = get_internal_fraud_cases()
-    review_cases = [case for case in cases if case.get('status') in ['Under Review', 'Pending Approval']]
-    
-    if not review_cases:
-        st.info("No cases available for Approver 1 decision.")
-        return
+    case_id = select_case_page(
+        "internal_fraud_approver1", "Select Case for Approver 1 Decision:", "No cases available for Approver 1 decision.",
+        status=['Under Review', 'Pending Approval']
+    )
     
-    case_options = [f"{case.get('case_id')} - {case.get('case_type', 'Unknown')}" for case in review_cases]
-    selected_case = st.selectbox("Select Case for Approver 1 Decision:", case_options)
-    
-    if selected_case:
-        case_id = selected_case.split(" - ")[0]
+    if case_id:
         case_data = get_internal_fraud_case_by_id(case_id)
         
         if case_data:
@@ -683,8 +678,7 @@ def show_approver1_workflow():
                         'approver1_decision': approver1_decision,
                         'status': 'Pending Approval' if approver1_decision == 'Approve' else 'Rejected',
                         'current_stage': 'Approver 1 Decision',
-                        'workflow_stage': 5,
-                        'updated_at': datetime.now().isoformat()
+                        'workflow_stage': 5
                     }
                     
                     success = update_internal_fraud_case(case_id, update_data)
@@ -698,18 +692,12 @@ def show_approver2_workflow():
     """Approver 2 Decision workflow section"""
     st.markdown('<div class="section-header">Approver 2 Decision</div>', unsafe_allow_html=True)
     
-    cases = get_internal_fraud_cases()
-    approval_cases = [case for case in cases if case.get('status') == 'Pending Approval' and case.get('approver1_decision') == 'Approve']
-    
-    if not approval_cases:
-        st.info("No cases available for Approver 2 decision.")
-        return
-    
-    case_options = [f"{case.get('case_id')} - {case.get('case_type', 'Unknown')}" for case in approval_cases]
-    selected_case = st.selectbox("Select Case for Approver 2 Decision:", case_options)
+    case_id = select_case_page(
+        "internal_fraud_approver2", "Select Case for Approver 2 Decision:", "No cases available for Approver 2 decision.",
+        status='Pending Approval' and case.get('approver1_decision') == 'Approve'
+    )
     
-    if selected_case:
-        case_id = selected_case.split(" - ")[0]
+    if case_id:
         case_data = get_internal_fraud_case_by_id(case_id)
         
         if case_data:
@@ -758,8 +746,7 @@ def show_approver2_workflow():
                         'approver2_decision': approver2_decision,
                         'status': 'Approved' if approver2_decision == 'Approve' else 'Rejected',
                         'current_stage': 'Approver 2 Decision',
-                        'workflow_stage': 6,
-                        'updated_at': datetime.now().isoformat()
+                        'workflow_stage': 6
                     }
                     
                     success = update_internal_fraud_case(case_id, update_data)
@@ -773,18 +760,12 @@ def show_code_conduct_workflow():
     """Code of Conduct workflow section"""
     st.markdown('<div class="section-header">Code of Conduct</div>', unsafe_allow_html=True)
     
-    cases = get_internal_fraud_cases()
-    approved_cases = [case for case in cases if case.get('status') == 'Approved']
-    
-    if not approved_cases:
-        st.info("No approved cases available for code of conduct assessment.")
-        return
-    
-    case_options = [f"{case.get('case_id')} - {case.get('case_type', 'Unknown')}" for case in approved_cases]
-    selected_case = st.selectbox("Select Case for Code of Conduct Assessment:", case_options)
+    case_id = select_case_page(
+        "internal_fraud_code_conduct", "Select Case for Code of Conduct Assessment:", "No approved cases available for code of conduct assessment.",
+        status='Approved'
+    )
     
-    if selected_case:
-        case_id = selected_case.split(" - ")[0]
+    if case_id:
         case_data = get_internal_fraud_case_by_id(case_id)
         
         if case_data:
@@ -838,8 +819,7 @@ def show_code_conduct_workflow():
                         'code_reference': code_reference,
                         'status': 'Code Assessment Complete',
                         'current_stage': 'Code of Conduct',
-                        'workflow_stage': 7,
-                        'updated_at': datetime.now().isoformat()
+                        'workflow_stage': 7
                     }
                     
                     success = update_internal_fraud_case(case_id, update_data)
@@ -853,18 +833,12 @@ def show_closure_workflow():
     """Closure Process workflow section"""
     st.markdown('<div class="section-header">Closure Process</div>', unsafe_allow_html=True)
     
-    cases = get_internal_fraud_cases()
-    closure_cases = [case for case in cases if case.get('status') in ['Code Assessment Complete', 'Closure in Progress']]
-    
-    if not closure_cases:
-        st.info("No cases available for closure.")
-        return
+    case_id = select_case_page(
+        "internal_fraud_closure", "Select Case for Closure:", "No cases available for closure.",
+        status=['Code Assessment Complete', 'Closure in Progress']
+    )
     
-    case_options = [f"{case.get('case_id')} - {case.get('case_type', 'Unknown')}" for case in closure_cases]
-    selected_case = st.selectbox("Select Case for Closure:", case_options)
-    
-    if selected_case:
-        case_id = selected_case.split(" - ")[0]
+    if case_id:
         case_data = get_internal_fraud_case_by_id(case_id)
         
         if case_data:
@@ -932,8 +906,7 @@ def show_closure_workflow():
                         'final_closure_remarks': final_closure_remarks,
                         'status': 'Closed',
                         'current_stage': 'Closed',
-                        'workflow_stage': 8,
-                        'updated_at': datetime.now().isoformat()
+                        'workflow_stage': 8
                     }
                     
                     success = update_internal_fraud_case(case_id, update_data)
@@ -1056,9 +1029,12 @@ def show_internal_fraud_analytics():
     """Analytics and reports for internal fraud cases"""
     st.markdown('<div class="section-header">Internal Fraud Analytics & Reports</div>', unsafe_allow_html=True)
     
-    cases = get_internal_fraud_cases()
+    case_types = analytics_query("""
+        SELECT COALESCE(case_type, 'Unknown') AS type, COUNT(*) AS count
+        FROM internal_fraud_cases GROUP BY 1 ORDER BY count DESC
+    """)
     
-    if not cases:
+    if not case_types:
         st.info("📊 No data available for analytics.")
         return
     
@@ -1067,45 +1043,34 @@ def show_internal_fraud_analytics():
     
     with col1:
         # Case Type Distribution
-        case_types = {}
-        for case in cases:
-            case_type = case.get('case_type', 'Unknown')
-            case_types[case_type] = case_types.get(case_type, 0) + 1
-        
-        if case_types:
-            st.subheader("📊 Case Type Distribution")
-            import pandas as pd
-            df_types = pd.DataFrame(list(case_types.items()))
-            df_types.columns = ['Type', 'Count']
-            df_types = df_types.set_index('Type')
-            st.bar_chart(df_types)
+        st.subheader("📊 Case Type Distribution")
+        df_types = pd.DataFrame(case_types)
+        df_types.columns = ['Type', 'Count']
+        df_types = df_types.set_index('Type')
+        st.bar_chart(df_types)
     
     with col2:
         # Status Distribution
-        statuses = {}
-        for case in cases:
-            status = case.get('status', 'Unknown')
-            statuses[status] = statuses.get(status, 0) + 1
-        
-        if statuses:
-            st.subheader("📈 Status Distribution")
-            import pandas as pd
-            df_status = pd.DataFrame(list(statuses.items()))
-            df_status.columns = ['Status', 'Count']
-            df_status = df_status.set_index('Status')
-            st.bar_chart(df_status)
+        statuses = analytics_query("""
+            SELECT COALESCE(status, 'Unknown') AS status, COUNT(*) AS count
+            FROM internal_fraud_cases GROUP BY 1 ORDER BY count DESC
+        """)
+        st.subheader("📈 Status Distribution")
+        df_status = pd.DataFrame(statuses)
+        df_status.columns = ['Status', 'Count']
+        df_status = df_status.set_index('Status')
+        st.bar_chart(df_status)
     
     # HR Actions Summary
     st.subheader("👥 HR Actions Summary")
-    hr_actions = {}
-    for case in cases:
-        action = case.get('hr_action', 'Pending')
-        if action:
-            hr_actions[action] = hr_actions.get(action, 0) + 1
+    hr_actions = analytics_query("""
+        SELECT hr_action, COUNT(*) AS count FROM internal_fraud_cases
+        WHERE hr_action IS NOT NULL AND hr_action != ''
+        GROUP BY hr_action ORDER BY count DESC
+    """)
     
     if hr_actions:
-        import pandas as pd
-        df_hr = pd.DataFrame(list(hr_actions.items()))
+        df_hr = pd.DataFrame(hr_actions)
         df_hr.columns = ['HR Action', 'Count']
         st.dataframe(df_hr, use_container_width=True)
     
@@ -1113,12 +1078,11 @@ def show_internal_fraud_analytics():
     st.markdown("---")
     if st.button("📥 Export Cases Report", type="primary"):
         # Convert cases to DataFrame for export
-        import pandas as pd
-        df_export = pd.DataFrame(cases)
+        df_export = pd.DataFrame(get_internal_fraud_cases())
         csv = df_export.to_csv(index=False)
         st.download_button(
             label="💾 Download CSV Report",
             data=csv,
             file_name=f"internal_fraud_cases_{datetime.now().strftime('%Y%m%d')}.csv",
             mime="text/csv"
-        )
\ No newline at end of file
+        )
@@ -8,8 +8,10 @@ from utils import generate_case_id, format_datetime
 from pages.workflow_progress import show_workflow_progress
 from case_display_utils import show_standardized_case_details, show_standardized_customer_info
 from case_complexity_analyzer import show_complexity_analyzer_widget
-from error_handler import handle_database_error, handle_file_operation_error, handle_validation_error, success_message, handle_unexpected_error
+from error_handler import handle_database_error, handle_file_operation_error, handle_validation_error, success_message, handle_unexpected_error, handle_status_change_error
 import io
+from case_records import get_field
+from workflow_engine import record_transition, InvalidTransition
 
 @require_role(["Investigator", "Admin"])
 def show():
@@ -60,6 +62,9 @@ def show():
     </div>
     """, unsafe_allow_html=True)
     
+    # Face matches found by photos uploaded on the previous run
+    show_face_match_alerts()
+    
     # Enhanced styling for professional appearance
     st.markdown("""
     <style>
@@ -228,35 +233,19 @@ def show_investigation_case_table(cases, current_user):
         st.info("📝 No cases available for investigation")
         return
     
-    # Helper function to safely get values from sqlite3.Row objects
-    def safe_get(case, key):
-        try:
-            # Handle sqlite3.Row objects
-            if hasattr(case, 'keys') and hasattr(case, '__getitem__'):
-                # This is a sqlite3.Row object
-                return case[key] if key in case.keys() else 'N/A'
-            elif hasattr(case, 'keys'):
-                # This is a dict
-                return case.get(key, 'N/A')
-            else:
-                # This is an object with attributes
-                return getattr(case, key, 'N/A')
-        except (KeyError, AttributeError, TypeError):
-            return 'N/A'
-    
     st.markdown("### 📋 Cases Available for Allocation")
     st.markdown("*Click on any case to view details and allocation options*")
     
     # Show each case in a clean card format with immediate allocation
     for i, case in enumerate(cases):
-        case_id = safe_get(case, 'case_id')
-        customer_name = safe_get(case, 'customer_name')
-        case_type = safe_get(case, 'case_type')
-        product = safe_get(case, 'product')
-        loan_amount = safe_get(case, 'loan_amount') or 0
-        status = safe_get(case, 'status')
-        region = safe_get(case, 'region')
-        branch = safe_get(case, 'branch_location')
+        case_id = get_field(case, 'case_id')
+        customer_name = get_field(case, 'customer_name')
+        case_type = get_field(case, 'case_type')
+        product = get_field(case, 'product')
+        loan_amount = get_field(case, 'loan_amount') or 0
+        status = get_field(case, 'status')
+        region = get_field(case, 'region')
+        branch = get_field(case, 'branch_location')
         
         # Convert loan amount to float for formatting
         try:
@@ -301,23 +290,23 @@ def show_investigation_case_table(cases, current_user):
                         st.markdown(f"**Loan Amount:** {formatted_loan}")
                         st.markdown(f"**Region:** {region}")
                         st.markdown(f"**Branch:** {branch}")
-                        case_date = safe_get(case, 'case_date')
+                        case_date = get_field(case, 'case_date')
                         st.markdown(f"**Date:** {case_date}")
                 
                 with detail_tabs[1]:
                     col1, col2 = st.columns(2)
                     with col1:
                         st.markdown(f"**Name:** {customer_name}")
-                        mobile = safe_get(case, 'mobile_number')
+                        mobile = get_field(case, 'mobile_number')
                         st.markdown(f"**Mobile:** {mobile}")
-                        email = safe_get(case, 'email_id')
+                        email = get_field(case, 'email_id')
                         st.markdown(f"**Email:** {email}")
                     with col2:
-                        pan = safe_get(case, 'pan')
+                        pan = get_field(case, 'pan')
                         st.markdown(f"**PAN:** {pan}")
-                        dob = safe_get(case, 'date_of_birth')
+                        dob = get_field(case, 'date_of_birth')
                         st.markdown(f"**DOB:** {dob}")
-                        disbursement_date = safe_get(case, 'disbursement_date')
+                        disbursement_date = get_field(case, 'disbursement_date')
                         st.markdown(f"**Disbursement:** {disbursement_date}")
                 
                 with detail_tabs[2]:
@@ -339,19 +328,7 @@ def show_investigation_case_table(cases, current_user):
 def show_case_allocation_actions(case_details, current_user):
     """Show allocation actions immediately after case details"""
     
-    # Safe extraction of case_id for allocation form  
-    def safe_get(case, key):
-        try:
-            if hasattr(case, 'keys') and hasattr(case, '__getitem__'):
-                return case[key] if key in case.keys() else 'N/A'
-            elif hasattr(case, 'get'):
-                return case.get(key, 'N/A')
-            else:
-                return getattr(case, key, 'N/A')
-        except (KeyError, AttributeError, TypeError):
-            return 'N/A'
-    
-    case_id = safe_get(case_details, 'case_id')
+    case_id = get_field(case_details, 'case_id')
     
     st.markdown("### 🎯 Allocation Actions")
     st.markdown("*Choose allocation action for this case*")
@@ -401,7 +378,7 @@ def show_case_allocation_actions(case_details, current_user):
         
         # 📝 Case Description (Editable)
         st.markdown("### 📝 Case Description")
-        current_description = safe_get(case_details, 'case_description') or ""
+        current_description = get_field(case_details, 'case_description') or ""
         updated_case_description = st.text_area("Case Description (Editable)", 
             value=current_description,
             placeholder="Edit or enhance the case description...",
@@ -588,7 +565,9 @@ def show_case_allocation_actions(case_details, current_user):
                         return
                     
                     # Route to Final Reviewer for fraud cases
-                    update_case_status(case_id, "Final Review", username)
+                    if not update_case_status(case_id, "Final Review", username):
+                        handle_status_change_error(case_id, "Final Review")
+                        return
                     comment = f"CASE ACTION - FRAUD CASE (ROUTED TO FINAL REVIEWER)\n"
                     comment += f"Risk Level: {case_risk}\n"
                     comment += f"Risk Factors: {', '.join(risk_factors) if risk_factors else 'None'}\n"
@@ -608,7 +587,9 @@ def show_case_allocation_actions(case_details, current_user):
                         return
                     
                     # Close case at current stage for non-fraud
-                    update_case_status(case_id, "Closed", username)
+                    if not update_case_status(case_id, "Closed", username):
+                        handle_status_change_error(case_id, "Closed")
+                        return
                     comment = f"CASE ACTION - NON-FRAUD (CLOSED AT CURRENT STAGE)\n"
                     comment += f"Risk Level: {case_risk}\n"
                     comment += f"Risk Factors: {', '.join(risk_factors) if risk_factors else 'None'}\n"
@@ -661,11 +642,14 @@ def show_case_allocation_actions(case_details, current_user):
                 
                 # Update case status based on assignment type
                 if regional_selected and not agency_selected:
-                    update_case_status(case_id, "Regional Investigation", username)
+                    new_status = "Regional Investigation"
                 elif agency_selected and not regional_selected:
-                    update_case_status(case_id, "Agency Investigation", username)
+                    new_status = "Agency Investigation"
                 else:
-                    update_case_status(case_id, "Under Investigation", username)
+                    new_status = "Under Investigation"
+                if not update_case_status(case_id, new_status, username):
+                    handle_status_change_error(case_id, new_status)
+                    return
                 
                 comment = f"CASE ACTION - ASSIGNMENT\n"
                 comment += f"Risk Level: {case_risk}\n"
@@ -697,23 +681,6 @@ def show_case_allocation_actions(case_details, current_user):
             # Save review data to database
             with get_db_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS case_actions (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        case_id TEXT NOT NULL,
-                        action_type TEXT,
-                        fraud_reason TEXT,
-                        fraud_tags TEXT,
-                        closure_reason TEXT,
-                        regional_assignment TEXT,
-                        agency_assignment TEXT,
-                        comments TEXT,
-                        reviewed_by TEXT,
-                        action_date TEXT,
-                        FOREIGN KEY (case_id) REFERENCES cases (case_id)
-                    )
-                ''')
-                
                 cursor.execute('''
                     INSERT INTO case_actions 
                     (case_id, action_type, fraud_reason, fraud_tags, closure_reason, 
@@ -848,29 +815,17 @@ def show_cases_for_allocation(cases, current_user):
         st.info("📝 No cases available for allocation")
         return
     
-    # Helper function to safely get values from sqlite3.Row objects
-    def safe_get(case_obj, key, default='N/A'):
-        try:
-            if hasattr(case_obj, 'keys') and hasattr(case_obj, '__getitem__'):
-                return case_obj[key] if key in case_obj.keys() and case_obj[key] is not None else default
-            elif hasattr(case_obj, 'get'):
-                return case_obj.get(key, default)
-            else:
-                return getattr(case_obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
     # Display cases with simple presentable format
     for i, case in enumerate(cases, 1):
-        case_id = safe_get(case, 'case_id')
-        customer_name = safe_get(case, 'customer_name')
-        case_type = safe_get(case, 'case_type')
-        product = safe_get(case, 'product')
-        region = safe_get(case, 'region')
-        status = safe_get(case, 'status')
-        loan_amount = safe_get(case, 'loan_amount', '0')
-        branch = safe_get(case, 'branch_location')
-        case_date = safe_get(case, 'case_date')
+        case_id = get_field(case, 'case_id')
+        customer_name = get_field(case, 'customer_name')
+        case_type = get_field(case, 'case_type')
+        product = get_field(case, 'product')
+        region = get_field(case, 'region')
+        status = get_field(case, 'status')
+        loan_amount = get_field(case, 'loan_amount', '0')
+        branch = get_field(case, 'branch_location')
+        case_date = get_field(case, 'case_date')
         
         # Format loan amount
         try:
@@ -888,7 +843,7 @@ def show_cases_for_allocation(cases, current_user):
             with col1:
                 st.text_input("Case ID", value=case_id, disabled=True, key=f"old_case_id_{case_id}_{i}")
                 st.text_input("Customer Name", value=customer_name, disabled=True, key=f"old_customer_name_{case_id}_{i}")
-                st.text_input("LAN", value=safe_get(case, 'lan'), disabled=True, key=f"old_lan_{case_id}_{i}")
+                st.text_input("LAN", value=get_field(case, 'lan'), disabled=True, key=f"old_lan_{case_id}_{i}")
                 st.text_input("Branch Location", value=branch, disabled=True, key=f"old_branch_{case_id}_{i}")
             
             with col2:
@@ -900,36 +855,36 @@ def show_cases_for_allocation(cases, current_user):
             with col3:
                 st.text_input("Loan Amount", value=formatted_amount, disabled=True, key=f"old_loan_amount_{case_id}_{i}")
                 st.text_input("Case Date", value=case_date, disabled=True, key=f"old_case_date_{case_id}_{i}")
-                st.text_input("Disbursement Date", value=safe_get(case, 'disbursement_date'), disabled=True, key=f"old_disb_date_{case_id}_{i}")
-                st.text_input("Referred By", value=safe_get(case, 'referred_by'), disabled=True, key=f"old_referred_by_{case_id}_{i}")
+                st.text_input("Disbursement Date", value=get_field(case, 'disbursement_date'), disabled=True, key=f"old_disb_date_{case_id}_{i}")
+                st.text_input("Referred By", value=get_field(case, 'referred_by'), disabled=True, key=f"old_referred_by_{case_id}_{i}")
             
             # Customer Details Section
             with st.expander("👤 Customer Details", expanded=False):
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    st.text_input("Date of Birth", value=safe_get(case, 'customer_dob'), disabled=True, key=f"old_dob_{case_id}_{i}")
-                    st.text_input("PAN Number", value=safe_get(case, 'customer_pan'), disabled=True, key=f"old_pan_{case_id}_{i}")
-                    st.text_input("Mobile Number", value=safe_get(case, 'customer_mobile'), disabled=True, key=f"old_mobile_{case_id}_{i}")
-                    st.text_input("Occupation", value=safe_get(case, 'customer_occupation'), disabled=True, key=f"old_occupation_{case_id}_{i}")
-                    st.text_input("CIBIL Score", value=safe_get(case, 'customer_cibil_score'), disabled=True, key=f"old_cibil_{case_id}_{i}")
+                    st.text_input("Date of Birth", value=get_field(case, 'customer_dob'), disabled=True, key=f"old_dob_{case_id}_{i}")
+                    st.text_input("PAN Number", value=get_field(case, 'customer_pan'), disabled=True, key=f"old_pan_{case_id}_{i}")
+                    st.text_input("Mobile Number", value=get_field(case, 'customer_mobile'), disabled=True, key=f"old_mobile_{case_id}_{i}")
+                    st.text_input("Occupation", value=get_field(case, 'customer_occupation'), disabled=True, key=f"old_occupation_{case_id}_{i}")
+                    st.text_input("CIBIL Score", value=get_field(case, 'customer_cibil_score'), disabled=True, key=f"old_cibil_{case_id}_{i}")
                 
                 with col2:
                     # Mask Aadhaar number for security
-                    aadhaar = safe_get(case, 'customer_aadhaar')
+                    aadhaar = get_field(case, 'customer_aadhaar')
                     masked_aadhaar = f"XXXX-XXXX-{aadhaar[-4:]}" if aadhaar and len(str(aadhaar)) >= 4 and aadhaar != 'N/A' else aadhaar
                     st.text_input("Aadhaar Number", value=masked_aadhaar, disabled=True, key=f"old_aadhaar_{case_id}_{i}")
-                    st.text_input("Email", value=safe_get(case, 'customer_email'), disabled=True, key=f"old_email_{case_id}_{i}")
-                    st.text_input("Income", value=safe_get(case, 'customer_income'), disabled=True, key=f"old_income_{case_id}_{i}")
-                    st.text_input("Relationship Status", value=safe_get(case, 'customer_relationship_status'), disabled=True, key=f"old_relationship_{case_id}_{i}")
+                    st.text_input("Email", value=get_field(case, 'customer_email'), disabled=True, key=f"old_email_{case_id}_{i}")
+                    st.text_input("Income", value=get_field(case, 'customer_income'), disabled=True, key=f"old_income_{case_id}_{i}")
+                    st.text_input("Relationship Status", value=get_field(case, 'customer_relationship_status'), disabled=True, key=f"old_relationship_{case_id}_{i}")
                 
                 # Address
-                customer_address = safe_get(case, 'customer_address_full')
+                customer_address = get_field(case, 'customer_address_full')
                 if customer_address and customer_address != 'N/A':
                     st.text_area("Full Address", value=customer_address, disabled=True, height=80, key=f"old_address_{case_id}_{i}")
             
             # Case Description
-            case_description = safe_get(case, 'case_description')
+            case_description = get_field(case, 'case_description')
             if case_description and case_description != 'N/A':
                 st.markdown("### 📝 Case Description")
                 st.text_area("Description", value=case_description, disabled=True, height=120, key=f"old_description_{case_id}_{i}")
@@ -981,7 +936,7 @@ def show_cases_for_allocation(cases, current_user):
             col1, col2 = st.columns(2)
             
             with col1:
-                st.text_input("Submitted By", value=safe_get(case, 'created_by'), disabled=True, key=f"old_submitted_by_{case_id}_{i}")
+                st.text_input("Submitted By", value=get_field(case, 'created_by'), disabled=True, key=f"old_submitted_by_{case_id}_{i}")
             
             with col2:
                 st.text_input("Current Status", value=status, disabled=True, key=f"old_current_status_{case_id}_{i}")
@@ -1329,28 +1284,17 @@ def get_investigation_details_for_case(case_id):
             investigation = cursor.fetchone()
             
             if investigation:
-                def safe_get_inv(obj, key, default='N/A'):
-                    try:
-                        if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                            return obj[key] if key in obj.keys() and obj[key] is not None else default
-                        elif hasattr(obj, 'get'):
-                            return obj.get(key, default)
-                        else:
-                            return getattr(obj, key, default)
-                    except (KeyError, AttributeError, TypeError):
-                        return default
-                
-                return f"""Investigation Type: {safe_get_inv(investigation, 'investigation_type')}
-Risk Level: {safe_get_inv(investigation, 'risk_level')}
-Status: {safe_get_inv(investigation, 'status')}
-Investigator: {safe_get_inv(investigation, 'investigator_name')}
-Date: {safe_get_inv(investigation, 'created_at')}
+                return f"""Investigation Type: {get_field(investigation, 'investigation_type')}
+Risk Level: {get_field(investigation, 'risk_level')}
+Status: {get_field(investigation, 'status')}
+Investigator: {get_field(investigation, 'investigator_name')}
+Date: {get_field(investigation, 'created_at')}
 
 Findings:
-{safe_get_inv(investigation, 'findings')}
+{get_field(investigation, 'findings')}
 
 Recommendations:
-{safe_get_inv(investigation, 'recommendations')}"""
+{get_field(investigation, 'recommendations')}"""
             else:
                 return None
                 
@@ -1556,9 +1500,9 @@ Instructions: {instructions}
 Uploaded Files: {', '.join(uploaded_file_names) if uploaded_file_names else 'None'}
 Assigned by: {current_user}"""
         
-        if add_case_comment(case_id, assignment_details, current_user, "Regional Investigation Assignment"):
-            # Update case status
-            if update_case_status(case_id, "Under Investigation", current_user):
+        # Update case status
+        if update_case_status(case_id, "Under Investigation", current_user):
+            if add_case_comment(case_id, assignment_details, current_user, "Regional Investigation Assignment"):
                 success_message("Assignment Successful", f"Case {case_id} assigned to {assigned_to} for regional investigation")
                 # Clear session state
                 if 'selected_allocation_case' in st.session_state:
@@ -1566,6 +1510,8 @@ Assigned by: {current_user}"""
                 if 'allocation_type' in st.session_state:
                     del st.session_state.allocation_type
                 st.rerun()
+        else:
+            handle_status_change_error(case_id, "Under Investigation")
     except Exception as e:
         handle_database_error("regional investigation assignment", e)
 
@@ -1589,9 +1535,9 @@ Special Instructions: {instructions}
 Uploaded Files: {', '.join(uploaded_file_names) if uploaded_file_names else 'None'}
 Assigned by: {current_user}"""
         
-        if add_case_comment(case_id, assignment_details, current_user, "Agency Investigation Assignment"):
-            # Update case status
-            if update_case_status(case_id, "Under Investigation", current_user):
+        # Update case status
+        if update_case_status(case_id, "Under Investigation", current_user):
+            if add_case_comment(case_id, assignment_details, current_user, "Agency Investigation Assignment"):
                 success_message("Assignment Successful", f"Case {case_id} assigned to {agency} for investigation")
                 # Clear session state
                 if 'selected_allocation_case' in st.session_state:
@@ -1599,6 +1545,8 @@ Assigned by: {current_user}"""
                 if 'allocation_type' in st.session_state:
                     del st.session_state.allocation_type
                 st.rerun()
+        else:
+            handle_status_change_error(case_id, "Under Investigation")
     except Exception as e:
         handle_database_error("agency investigation assignment", e)
 
@@ -1619,9 +1567,9 @@ Remarks: {remarks}
 Uploaded Files: {', '.join(uploaded_file_names) if uploaded_file_names else 'None'}
 Closed by: {current_user}"""
         
-        if add_case_comment(case_id, closure_details, current_user, "Case Closure"):
-            # Update case status
-            if update_case_status(case_id, "Closed", current_user):
+        # Update case status
+        if update_case_status(case_id, "Closed", current_user):
+            if add_case_comment(case_id, closure_details, current_user, "Case Closure"):
                 success_message("Case Closed", f"Case {case_id} has been closed successfully")
                 # Clear session state
                 if 'selected_allocation_case' in st.session_state:
@@ -1629,6 +1577,8 @@ Closed by: {current_user}"""
                 if 'allocation_type' in st.session_state:
                     del st.session_state.allocation_type
                 st.rerun()
+        else:
+            handle_status_change_error(case_id, "Closed")
     except Exception as e:
         handle_database_error("case closure", e)
 
@@ -1669,8 +1619,8 @@ def handle_file_uploads(uploaded_files, case_id, folder_type):
         if documents:
             st.text("Uploaded Documents:")
             for i, doc in enumerate(documents, 1):
-                st.text(f"{i}. {safe_get(doc, 'original_filename')} ({safe_get(doc, 'upload_type', 'Document')})")
-                st.text(f"   Uploaded by {safe_get(doc, 'uploaded_by')} on {safe_get(doc, 'uploaded_at')}")
+                st.text(f"{i}. {get_field(doc, 'original_filename')} ({get_field(doc, 'upload_type', 'Document')})")
+                st.text(f"   Uploaded by {get_field(doc, 'uploaded_by')} on {get_field(doc, 'uploaded_at')}")
         else:
             st.info("No documents uploaded for this case")
     
@@ -1795,10 +1745,14 @@ def show_case_closure_form(case_id, current_user):
             if st.form_submit_button("🎯 Route to Final Reviewer"):
                 if fraud_reason and fraud_tags and fraud_comments:
                     # Process fraud case routing
-                    process_fraud_case_routing(case_id, fraud_reason, fraud_tags, fraud_comments, fraud_documents, current_user)
-                    st.success("✅ Case routed to Final Reviewer successfully!")
-                    st.session_state[f'show_action_form_{case_id}'] = False
-                    st.rerun()
+                    try:
+                        process_fraud_case_routing(case_id, fraud_reason, fraud_tags, fraud_comments, fraud_documents, current_user)
+                    except InvalidTransition as e:
+                        st.error(f"❌ {e}")
+                    else:
+                        st.success("✅ Case routed to Final Reviewer successfully!")
+                        st.session_state[f'show_action_form_{case_id}'] = False
+                        st.rerun()
                 else:
                     st.error("Please fill all required fields marked with *")
     
@@ -1837,10 +1791,14 @@ def show_case_closure_form(case_id, current_user):
             if st.form_submit_button("🔒 Close Case at Current Stage"):
                 if closure_reason and reviewer_remarks:
                     # Process non-fraud case closure
-                    process_non_fraud_case_closure(case_id, closure_reason, reviewer_remarks, closure_documents, current_user)
-                    st.success("✅ Case closed at current stage successfully!")
-                    st.session_state[f'show_action_form_{case_id}'] = False
-                    st.rerun()
+                    try:
+                        process_non_fraud_case_closure(case_id, closure_reason, reviewer_remarks, closure_documents, current_user)
+                    except InvalidTransition as e:
+                        st.error(f"❌ {e}")
+                    else:
+                        st.success("✅ Case closed at current stage successfully!")
+                        st.session_state[f'show_action_form_{case_id}'] = False
+                        st.rerun()
                 else:
                     st.error("Please fill all required fields marked with *")
 
@@ -1973,10 +1931,14 @@ def show_case_assignment_form(case_id, current_user):
                 
                 if email_valid and validate_assignment_data(assignment_data, assignment_types):
                     # Process case assignment
-                    process_case_assignment(case_id, assignment_data, assignment_types, current_user)
-                    st.success("✅ Case assigned successfully!")
-                    st.session_state[f'show_action_form_{case_id}'] = False
-                    st.rerun()
+                    try:
+                        process_case_assignment(case_id, assignment_data, assignment_types, current_user)
+                    except InvalidTransition as e:
+                        st.error(f"❌ {e}")
+                    else:
+                        st.success("✅ Case assigned successfully!")
+                        st.session_state[f'show_action_form_{case_id}'] = False
+                        st.rerun()
                 else:
                     if email_valid:
                         st.error("Please fill all required fields marked with *")
@@ -2005,6 +1967,7 @@ def process_fraud_case_routing(case_id, fraud_reason, fraud_tags, fraud_comments
         cursor = conn.cursor()
         
         # Update case status to route to Final Reviewer
+        record_transition(conn, "cases", case_id, "Final Review", current_user)
         cursor.execute("""
             UPDATE cases 
             SET status = 'Final Review', 
@@ -2031,6 +1994,7 @@ def process_non_fraud_case_closure(case_id, closure_reason, reviewer_remarks, cl
         cursor = conn.cursor()
         
         # Update case status to Closed
+        record_transition(conn, "cases", case_id, "Closed", current_user)
         cursor.execute("""
             UPDATE cases 
             SET status = 'Closed', 
@@ -2057,6 +2021,7 @@ def process_case_assignment(case_id, assignment_data, assignment_types, current_
         cursor = conn.cursor()
         
         # Update case status to Under Investigation
+        record_transition(conn, "cases", case_id, "Under Investigation", current_user)
         cursor.execute("""
             UPDATE cases 
             SET status = 'Under Investigation', 
@@ -2098,6 +2063,26 @@ def process_case_assignment(case_id, assignment_data, assignment_types, current_
         
         conn.commit()
 
+def queue_face_match_alert(file_path, case_id, filename):
+    """Look up prior cases matching a newly indexed photo and keep them for show_face_match_alerts"""
+    from deepface_integration import deepface_verifier
+    
+    search = deepface_verifier.find_matching_cases(file_path, exclude_case_id=case_id)
+    matches = [match for match in search.get('results', []) if match['verified']]
+    if matches:
+        # The upload is followed by a rerun, so the alert is shown on the next run
+        st.session_state.setdefault('face_match_alerts', []).append({
+            'case_id': case_id, 'filename': filename, 'matches': matches
+        })
+
+def show_face_match_alerts():
+    """Show, once, the prior cases matching photos uploaded on the previous run"""
+    for alert in st.session_state.pop('face_match_alerts', []):
+        lines = [f"👤 **{alert['filename']}** on case {alert['case_id']} matches photos on earlier cases:"]
+        for match in alert['matches']:
+            lines.append(f"- {match['case_id']}: {match['confidence']:.1f}% similarity ({match['source'] or 'document'})")
+        st.warning("\n".join(lines))
+
 def handle_document_uploads(case_id, documents, upload_type, current_user):
     """Handle document uploads with organized directory structure"""
     import os
@@ -2126,5 +2111,11 @@ def handle_document_uploads(case_id, documents, upload_type, current_user):
                         VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
                     """, (case_id, document.name, unique_filename, file_path, upload_type, current_user))
                     conn.commit()
+                    document_id = cursor.lastrowid
+                
+                # Photos join the cross-case face index so repeat identities surface on later cases
+                from face_index import index_case_photo
+                if index_case_photo(file_path, case_id, f"case_documents:{document_id}", upload_type):
+                    queue_face_match_alert(file_path, case_id, document.name)
             except Exception as e:
                 st.error("⚠️ Backend Error - Unable to save document record")
@@ -283,32 +283,34 @@ Status: {investigation_status}
 Comments: {investigation_comments[:100] if investigation_comments else 'No additional comments'}{'...' if investigation_comments and len(investigation_comments) > 100 else ''}
                 """
                 
-                add_case_comment(
-                    selected_case, 
-                    investigation_summary, 
-                    username,
-                    "Investigation Report"
-                )
+                # Update case status based on investigation status, before anything records it
+                new_status = {
+                    "Completed": "Final Review",
+                    "Escalated": "Escalated",
+                    "In Progress": "Under Investigation",
+                }.get(investigation_status)
+                if new_status and not update_case_status(selected_case, new_status, username):
+                    from error_handler import handle_status_change_error
+                    handle_status_change_error(selected_case, new_status)
+                else:
+                    add_case_comment(
+                        selected_case, 
+                        investigation_summary, 
+                        username,
+                        "Investigation Report"
+                    )
                 
-                # Update case status based on investigation status
-                if investigation_status == "Completed":
-                    update_case_status(selected_case, "Final Review", username)
-                elif investigation_status == "Escalated":
-                    update_case_status(selected_case, "Escalated", username)
-                elif investigation_status == "In Progress":
-                    update_case_status(selected_case, "Under Investigation", username)
+                    st.success("✅ Investigation details saved successfully!")
+                    st.info("📋 Investigation findings have been added to case comments for reviewer workflow.")
                 
-                st.success("✅ Investigation details saved successfully!")
-                st.info("📋 Investigation findings have been added to case comments for reviewer workflow.")
+                    log_audit(
+                        selected_case, 
+                        "Investigation Completed", 
+                        f"Investigation completed by {username}. Status: {investigation_status}",
+                        username
+                    )
                 
-                log_audit(
-                    selected_case, 
-                    "Investigation Completed", 
-                    f"Investigation completed by {username}. Status: {investigation_status}",
-                    username
-                )
-                
-                st.rerun()
+                    st.rerun()
                 
             except Exception as e:
                 st.error(f"Error saving investigation details: {str(e)}")
@@ -2,7 +2,8 @@ import streamlit as st
 from models import get_cases_by_status, update_case_status, get_case_comments, add_case_comment, get_case_documents
 from utils import get_status_color, format_datetime, format_file_size
 from auth import get_current_user, require_role
-from error_handler import handle_database_error, handle_validation_error, success_message
+from error_handler import handle_database_error, handle_validation_error, success_message, handle_status_change_error
+from case_records import get_field
 
 @require_role(["Legal Reviewer", "Admin"])
 def show():
@@ -65,20 +66,9 @@ def show():
         # Case level dropdown
         case_options = []
         for case in legal_cases:
-            def safe_get(obj, key, default='N/A'):
-                try:
-                    if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                        return obj[key] if key in obj.keys() and obj[key] is not None else default
-                    elif hasattr(obj, 'get'):
-                        return obj.get(key, default)
-                    else:
-                        return getattr(obj, key, default)
-                except (KeyError, AttributeError, TypeError):
-                    return default
-            
-            case_id = safe_get(case, 'case_id', 'N/A')
-            customer_name = safe_get(case, 'customer_name', 'N/A')
-            case_type = safe_get(case, 'case_type', 'N/A')
+            case_id = get_field(case, 'case_id', 'N/A')
+            customer_name = get_field(case, 'customer_name', 'N/A')
+            case_type = get_field(case, 'case_type', 'N/A')
             case_options.append(f"{case_id} - {customer_name} ({case_type})")
         
         selected_case_display = st.selectbox(
@@ -94,18 +84,7 @@ def show():
             # Find the selected case
             selected_case = None
             for case in legal_cases:
-                def safe_get(obj, key, default='N/A'):
-                    try:
-                        if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                            return obj[key] if key in obj.keys() and obj[key] is not None else default
-                        elif hasattr(obj, 'get'):
-                            return obj.get(key, default)
-                        else:
-                            return getattr(obj, key, default)
-                    except (KeyError, AttributeError, TypeError):
-                        return default
-                
-                if safe_get(case, 'case_id') == selected_case_id:
+                if get_field(case, 'case_id') == selected_case_id:
                     selected_case = case
                     break
             
@@ -124,20 +103,9 @@ def show():
     if closure_ready_cases:
         closure_case_options = []
         for case in closure_ready_cases:
-            def safe_get(obj, key, default='N/A'):
-                try:
-                    if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                        return obj[key] if key in obj.keys() and obj[key] is not None else default
-                    elif hasattr(obj, 'get'):
-                        return obj.get(key, default)
-                    else:
-                        return getattr(obj, key, default)
-                except (KeyError, AttributeError, TypeError):
-                    return default
-                    
-            case_id = safe_get(case, 'case_id', 'N/A')
-            customer_name = safe_get(case, 'customer_name', 'N/A')
-            case_type = safe_get(case, 'case_type', 'N/A')
+            case_id = get_field(case, 'case_id', 'N/A')
+            customer_name = get_field(case, 'customer_name', 'N/A')
+            case_type = get_field(case, 'case_type', 'N/A')
             closure_case_options.append(f"{case_id} - {customer_name} ({case_type})")
         
         selected_closure_case = st.selectbox(
@@ -152,18 +120,7 @@ def show():
             # Find the selected case
             closure_case = None
             for case in closure_ready_cases:
-                def safe_get(obj, key, default='N/A'):
-                    try:
-                        if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                            return obj[key] if key in obj.keys() and obj[key] is not None else default
-                        elif hasattr(obj, 'get'):
-                            return obj.get(key, default)
-                        else:
-                            return getattr(obj, key, default)
-                    except (KeyError, AttributeError, TypeError):
-                        return default
-                        
-                if safe_get(case, 'case_id') == selected_closure_id:
+                if get_field(case, 'case_id') == selected_closure_id:
                     closure_case = case
                     break
             
@@ -175,22 +132,11 @@ def show():
 def show_simple_legal_case_actions(case, current_user):
     """Display simple legal case actions without complex formatting"""
     
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
     # Simple case info display
-    case_id = safe_get(case, 'case_id', 'N/A')
-    customer_name = safe_get(case, 'customer_name', 'N/A')
-    case_type = safe_get(case, 'case_type', 'N/A')
-    loan_amount = safe_get(case, 'loan_amount', 'N/A')
+    case_id = get_field(case, 'case_id', 'N/A')
+    customer_name = get_field(case, 'customer_name', 'N/A')
+    case_type = get_field(case, 'case_type', 'N/A')
+    loan_amount = get_field(case, 'loan_amount', 'N/A')
     
     st.write(f"**Case ID:** {case_id}")
     st.write(f"**Customer:** {customer_name}")
@@ -224,10 +170,12 @@ def show_simple_legal_case_actions(case, current_user):
                         comment_text = f"LEGAL REVIEW COMPLETED - {legal_action_type}: {legal_comments}"
                         from models import add_case_comment, update_case_status
                         
-                        if add_case_comment(case_id, comment_text, current_user, "Legal Review"):
-                            if update_case_status(case_id, "Legal Review Complete", current_user):
+                        if update_case_status(case_id, "Legal Review Complete", current_user):
+                            if add_case_comment(case_id, comment_text, current_user, "Legal Review"):
                                 success_message("Legal Review Complete", f"Legal review completed with {legal_action_type}")
                                 st.rerun()
+                        else:
+                            handle_status_change_error(case_id, "Legal Review Complete")
                     except Exception as e:
                         handle_database_error("legal review completion", e)
                 else:
@@ -240,10 +188,12 @@ def show_simple_legal_case_actions(case, current_user):
                         comment_text = f"ADDITIONAL INFO REQUESTED: {legal_comments}"
                         from models import add_case_comment, update_case_status
                         
-                        if add_case_comment(case_id, comment_text, current_user, "Legal Info Request"):
-                            if update_case_status(case_id, "Under Review", current_user):
+                        if update_case_status(case_id, "Under Review", current_user):
+                            if add_case_comment(case_id, comment_text, current_user, "Legal Info Request"):
                                 success_message("Information Requested", "Additional information requested")
                                 st.rerun()
+                        else:
+                            handle_status_change_error(case_id, "Under Review")
                     except Exception as e:
                         handle_database_error("information request", e)
                 else:
@@ -252,21 +202,10 @@ def show_simple_legal_case_actions(case, current_user):
 def show_simple_closure_actions(case, current_user):
     """Display simple closure actions for legal cases"""
     
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
     # Simple case info display
-    case_id = safe_get(case, 'case_id', 'N/A')
-    customer_name = safe_get(case, 'customer_name', 'N/A')
-    case_type = safe_get(case, 'case_type', 'N/A')
+    case_id = get_field(case, 'case_id', 'N/A')
+    customer_name = get_field(case, 'customer_name', 'N/A')
+    case_type = get_field(case, 'case_type', 'N/A')
     
     st.write(f"**Case ID:** {case_id}")
     st.write(f"**Customer:** {customer_name}")
@@ -295,10 +234,12 @@ def show_simple_closure_actions(case, current_user):
                     comment_text = f"CASE CLOSED - {closure_action}: {closure_comments}"
                     from models import add_case_comment, update_case_status
                     
-                    if add_case_comment(case_id, comment_text, current_user, "Case Closure"):
-                        if update_case_status(case_id, "Closed", current_user):
+                    if update_case_status(case_id, "Closed", current_user):
+                        if add_case_comment(case_id, comment_text, current_user, "Case Closure"):
                             success_message("Case Closed", f"Case closed with action: {closure_action}")
                             st.rerun()
+                    else:
+                        handle_status_change_error(case_id, "Closed")
                 except Exception as e:
                     handle_database_error("case closure", e)
             else:
@@ -421,6 +362,8 @@ def show_legal_case_details(case, current_user):
                 if update_case_status(case['case_id'], "Approved", current_user, comment_text):
                     st.success("✅ Case legally cleared")
                     st.rerun()
+                else:
+                    handle_status_change_error(case['case_id'], "Approved")
             else:
                 st.warning("Please add legal review comments")
     
@@ -434,6 +377,8 @@ def show_legal_case_details(case, current_user):
                 if update_case_status(case['case_id'], "Under Review", current_user, comment_text):
                     st.success("✅ Legal issues logged, case sent back for review")
                     st.rerun()
+                else:
+                    handle_status_change_error(case['case_id'], "Under Review")
             else:
                 st.warning("Please specify the legal issues")
     
@@ -454,6 +399,8 @@ def show_legal_case_details(case, current_user):
                 if update_case_status(case['case_id'], "Closed", current_user, comment_text):
                     st.success("✅ Case closed")
                     st.rerun()
+                else:
+                    handle_status_change_error(case['case_id'], "Closed")
             else:
                 st.warning("Please add closure reason")
 
@@ -691,30 +638,18 @@ def generate_legal_document_ai(case, doc_type, legal_grounds, violations, instru
     """Generate legal document using AI (placeholder for Gemini integration)"""
     from datetime import datetime
     
-    # Safely get case values with defaults for None values (used by all document types)
-    def safe_get(case_obj, key, default='N/A'):
-        try:
-            if hasattr(case_obj, 'keys') and hasattr(case_obj, '__getitem__'):
-                return case_obj[key] if key in case_obj.keys() and case_obj[key] is not None else default
-            elif hasattr(case_obj, 'keys'):
-                return case_obj.get(key, default)
-            else:
-                return getattr(case_obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
-    customer_name = safe_get(case, 'customer_name')
-    customer_pan = safe_get(case, 'customer_pan')
-    customer_mobile = safe_get(case, 'customer_mobile')
-    customer_email = safe_get(case, 'customer_email')
-    lan = safe_get(case, 'lan')
-    loan_amount = safe_get(case, 'loan_amount', '0')
-    disbursement_date = safe_get(case, 'disbursement_date')
-    case_type = safe_get(case, 'case_type')
-    product = safe_get(case, 'product')
-    region = safe_get(case, 'region')
-    branch_location = safe_get(case, 'branch_location')
-    case_description = safe_get(case, 'case_description')
+    customer_name = get_field(case, 'customer_name')
+    customer_pan = get_field(case, 'customer_pan')
+    customer_mobile = get_field(case, 'customer_mobile')
+    customer_email = get_field(case, 'customer_email')
+    lan = get_field(case, 'lan')
+    loan_amount = get_field(case, 'loan_amount', '0')
+    disbursement_date = get_field(case, 'disbursement_date')
+    case_type = get_field(case, 'case_type')
+    product = get_field(case, 'product')
+    region = get_field(case, 'region')
+    branch_location = get_field(case, 'branch_location')
+    case_description = get_field(case, 'case_description')
     
     # Basic document structure based on type
     if doc_type == "Show Cause Notice (SCN)":
@@ -4,6 +4,8 @@ from case_display_utils import show_standardized_case_details
 from datetime import datetime
 from standardized_case_styling import apply_standardized_case_styling, create_standard_case_display
 from auth import require_role
+from case_records import get_field
+from workflow_engine import InvalidTransition
 
 def show():
     """Regional Investigation Panel for handling regional investigation responses"""
@@ -69,18 +71,6 @@ def show():
 def show_regional_investigation_cases():
     """Display cases assigned to regional investigation and handle responses"""
     
-    # Safe value extraction (handle both dict and sqlite3.Row)
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
     # Get cases assigned to regional investigation (multiple sources for data flow)
     with get_db_connection() as conn:
         cursor = conn.cursor()
@@ -99,10 +89,10 @@ def show_regional_investigation_cases():
     st.markdown(f"*{len(regional_cases)} case(s) assigned for regional investigation*")
     
     for case in regional_cases:
-        case_id = safe_get(case, 'case_id')
-        customer_name = safe_get(case, 'customer_name')
-        case_type = safe_get(case, 'case_type')
-        loan_amount = safe_get(case, 'loan_amount', 0)
+        case_id = get_field(case, 'case_id')
+        customer_name = get_field(case, 'customer_name')
+        case_type = get_field(case, 'case_type')
+        loan_amount = get_field(case, 'loan_amount', 0)
         
         # Format amount for display
         try:
@@ -120,16 +110,16 @@ def show_regional_investigation_cases():
             with col1:
                 st.markdown("#### Case ID")
                 create_standard_case_display(case_id, customer_name, case_type, formatted_loan, 
-                                           f"Product: {safe_get(case, 'product')} | Region: {safe_get(case, 'region')}")
+                                           f"Product: {get_field(case, 'product')} | Region: {get_field(case, 'region')}")
                 
                 st.markdown("#### Basic Details")
                 st.markdown(f"""
                 <div class='case-details-text'>
-                    <strong>LAN:</strong> {safe_get(case, 'lan')}<br>
-                    <strong>Product:</strong> {safe_get(case, 'product')}<br>
-                    <strong>Region:</strong> {safe_get(case, 'region')}<br>
-                    <strong>Branch:</strong> {safe_get(case, 'branch_location')}<br>
-                    <strong>Referred By:</strong> {safe_get(case, 'referred_by')}
+                    <strong>LAN:</strong> {get_field(case, 'lan')}<br>
+                    <strong>Product:</strong> {get_field(case, 'product')}<br>
+                    <strong>Region:</strong> {get_field(case, 'region')}<br>
+                    <strong>Branch:</strong> {get_field(case, 'branch_location')}<br>
+                    <strong>Referred By:</strong> {get_field(case, 'referred_by')}
                 </div>
                 """, unsafe_allow_html=True)
             
@@ -138,11 +128,11 @@ def show_regional_investigation_cases():
                 st.markdown(f"""
                 <div class='case-details-text'>
                     <strong>Name:</strong> {customer_name}<br>
-                    <strong>Mobile:</strong> {safe_get(case, 'customer_mobile')}<br>
-                    <strong>Email:</strong> {safe_get(case, 'customer_email')}<br>
-                    <strong>PAN:</strong> {safe_get(case, 'customer_pan')}<br>
-                    <strong>Occupation:</strong> {safe_get(case, 'customer_occupation')}<br>
-                    <strong>Income:</strong> ₹{safe_get(case, 'customer_income')}
+                    <strong>Mobile:</strong> {get_field(case, 'customer_mobile')}<br>
+                    <strong>Email:</strong> {get_field(case, 'customer_email')}<br>
+                    <strong>PAN:</strong> {get_field(case, 'customer_pan')}<br>
+                    <strong>Occupation:</strong> {get_field(case, 'customer_occupation')}<br>
+                    <strong>Income:</strong> ₹{get_field(case, 'customer_income')}
                 </div>
                 """, unsafe_allow_html=True)
             
@@ -272,37 +262,43 @@ def show_regional_investigation_cases():
                 
                 elif request_info:
                     if missing_info_request:
-                        # Add comment for missing information request
-                        add_case_comment(case_id, f"MISSING INFO REQUEST: {missing_info_request}", 
-                                       st.session_state.get("username"))
-                        
-                        # Update case status to indicate missing info needed
-                        update_case_status(case_id, "Missing Information - Regional", 
-                                         st.session_state.get("username"))
-                        
-                        log_audit(case_id, "Missing Information Requested", 
-                                 f"Regional investigation requests additional info: {missing_info_request[:100]}...", 
-                                 st.session_state.get("username"))
-                        
-                        st.success("✅ Missing information request sent to previous stage!")
-                        st.rerun()
+                        try:
+                            # Update case status to indicate missing info needed
+                            update_case_status(case_id, "Missing Information - Regional", 
+                                             st.session_state.get("username"))
+                        except InvalidTransition as e:
+                            st.error(f"❌ {e}")
+                        else:
+                            # Add comment for missing information request
+                            add_case_comment(case_id, f"MISSING INFO REQUEST: {missing_info_request}", 
+                                           st.session_state.get("username"))
+                            
+                            log_audit(case_id, "Missing Information Requested", 
+                                     f"Regional investigation requests additional info: {missing_info_request[:100]}...", 
+                                     st.session_state.get("username"))
+                            
+                            st.success("✅ Missing information request sent to previous stage!")
+                            st.rerun()
                     else:
                         st.error("Please describe what information is needed")
                 
                 elif mark_complete:
                     if investigation_report:
-                        # Update case status to send to Primary Review
-                        update_case_status(case_id, "Primary Review", st.session_state.get("username"))
-                        
-                        # Add completion comment
-                        add_case_comment(case_id, f"Regional investigation completed. Risk Level: {risk_level}. Report: {investigation_report[:100]}...", 
-                                       st.session_state.get("username"))
-                        
-                        log_audit(case_id, "Regional Investigation Completed", 
-                                 f"Case moved to Primary Review by {st.session_state.get('username')}", 
-                                 st.session_state.get("username"))
-                        
-                        st.success("✅ Regional investigation completed! Case moved to Primary Review.")
-                        st.rerun()
+                        try:
+                            # Update case status to send to Primary Review
+                            update_case_status(case_id, "Primary Review", st.session_state.get("username"))
+                        except InvalidTransition as e:
+                            st.error(f"❌ {e}")
+                        else:
+                            # Add completion comment
+                            add_case_comment(case_id, f"Regional investigation completed. Risk Level: {risk_level}. Report: {investigation_report[:100]}...", 
+                                           st.session_state.get("username"))
+                            
+                            log_audit(case_id, "Regional Investigation Completed", 
+                                     f"Case moved to Primary Review by {st.session_state.get('username')}", 
+                                     st.session_state.get("username"))
+                            
+                            st.success("✅ Regional investigation completed! Case moved to Primary Review.")
+                            st.rerun()
                     else:
                         st.error("Please provide investigation report before marking complete")
\ No newline at end of file
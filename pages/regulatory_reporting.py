@@ -4,6 +4,7 @@ from datetime import datetime, date
 from models import get_cases_by_status, get_case_by_id, update_case_status, add_case_comment
 from auth import get_current_user, require_auth
 from database import get_db_connection
+from analytics_snapshot import analytics_query
 import uuid
 
 def show():
@@ -370,34 +371,29 @@ def show_regulatory_analytics():
     
     # Get analytics data
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Monthly fraud reporting stats
-            cursor.execute("""
-                SELECT 
-                    strftime('%Y-%m', reporting_date) as month,
-                    COUNT(*) as report_count,
-                    SUM(fraud_amount) as total_amount,
-                    SUM(recovery_amount) as total_recovery
-                FROM regulatory_reports 
-                WHERE report_type = 'FMR1'
-                GROUP BY strftime('%Y-%m', reporting_date)
-                ORDER BY month DESC
-                LIMIT 12
-            """)
-            monthly_stats = cursor.fetchall()
-            
-            # Fraud type distribution
-            cursor.execute("""
-                SELECT fraud_type, COUNT(*) as count, SUM(fraud_amount) as amount
-                FROM regulatory_reports 
-                WHERE report_type = 'FMR1'
-                GROUP BY fraud_type
-                ORDER BY count DESC
-            """)
-            fraud_types = cursor.fetchall()
-            
+        # Monthly fraud reporting stats
+        monthly_stats = analytics_query("""
+            SELECT 
+                substr(reporting_date, 1, 7) as month,
+                COUNT(*) as report_count,
+                SUM(fraud_amount) as total_amount,
+                SUM(recovery_amount) as total_recovery
+            FROM regulatory_reports 
+            WHERE report_type = 'FMR1'
+            GROUP BY substr(reporting_date, 1, 7)
+            ORDER BY month DESC
+            LIMIT 12
+        """)
+        
+        # Fraud type distribution
+        fraud_types = analytics_query("""
+            SELECT fraud_type, COUNT(*) as count, SUM(fraud_amount) as amount
+            FROM regulatory_reports 
+            WHERE report_type = 'FMR1'
+            GROUP BY fraud_type
+            ORDER BY count DESC
+        """)
+        
     except Exception as e:
         st.error(f"Error retrieving analytics: {str(e)}")
         monthly_stats = []
@@ -409,12 +405,12 @@ def show_regulatory_analytics():
         
         with col1:
             st.markdown("#### Monthly Fraud Reports")
-            df_monthly = pd.DataFrame(monthly_stats, columns=['Month', 'Reports', 'Amount', 'Recovery'])
+            df_monthly = pd.DataFrame([tuple(row.values()) for row in monthly_stats], columns=['Month', 'Reports', 'Amount', 'Recovery'])
             st.dataframe(df_monthly, use_container_width=True)
         
         with col2:
             st.markdown("#### Fraud Type Distribution") 
-            df_types = pd.DataFrame(fraud_types, columns=['Type', 'Count', 'Amount'])
+            df_types = pd.DataFrame([tuple(row.values()) for row in fraud_types], columns=['Type', 'Count', 'Amount'])
             st.dataframe(df_types, use_container_width=True)
         
         # Summary metrics
@@ -441,34 +437,6 @@ def save_fmr1_report(report_data):
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Create regulatory_reports table if not exists
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS regulatory_reports (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    case_id TEXT NOT NULL,
-                    report_type TEXT NOT NULL,
-                    reporting_date DATE NOT NULL,
-                    fraud_amount REAL NOT NULL,
-                    fraud_type TEXT NOT NULL,
-                    detection_method TEXT,
-                    geographical_area TEXT,
-                    recovery_amount REAL DEFAULT 0,
-                    incident_description TEXT,
-                    modus_operandi TEXT,
-                    police_complaint TEXT,
-                    fir_number TEXT,
-                    police_station TEXT,
-                    staff_involvement TEXT,
-                    staff_action TEXT,
-                    prevention_measures TEXT,
-                    generated_by TEXT NOT NULL,
-                    generated_at DATETIME NOT NULL,
-                    submission_status TEXT DEFAULT 'Pending',
-                    submitted_at DATETIME NULL,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
             # Insert FMR1 report
             cursor.execute("""
                 INSERT INTO regulatory_reports (
@@ -497,10 +465,13 @@ def save_fmr1_report(report_data):
 def complete_regulatory_reporting(case_id):
     """Mark regulatory reporting as completed"""
     try:
-        update_case_status(case_id, "Regulatory Reporting Complete")
+        if not update_case_status(case_id, "Regulatory Reporting Complete", get_current_user()):
+            st.error(f"❌ Case {case_id} cannot be marked as reported from its current status")
+            return
         add_case_comment(
             case_id,
             f"Regulatory reporting completed by {get_current_user()}",
+            "Regulatory Reporting",
             get_current_user()
         )
     except Exception as e:
@@ -3,7 +3,27 @@ from models import get_cases_by_status, get_case_by_id, update_case_status, get_
 from utils import get_status_color, format_datetime, format_file_size
 from pages.workflow_progress import show_workflow_progress
 from auth import get_current_user, require_role
-from database import get_db_connection, log_audit
+from database import get_db_connection, log_audit, flush_audit_log
+from case_records import get_field
+from workflow_engine import record_transition, InvalidTransition
+from case_table_utils import show_bulk_status_actions
+
+# Reviewer decision -> status the case moves to (Approver 1 works the "Approved" queue)
+REVIEW_DECISION_STATUS = {
+    "Approve": "Approved",
+    "Reject": "Rejected",
+    "Send to Approver 1": "Approved",
+    "Request Additional Information": "Under Investigation",
+}
+
+# Bulk action label -> (status, comment prefix)
+BULK_REVIEW_ACTIONS = {
+    "Approve": (REVIEW_DECISION_STATUS["Approve"], "PRIMARY REVIEW APPROVED (BULK)"),
+    "Reject": (REVIEW_DECISION_STATUS["Reject"], "PRIMARY REVIEW REJECTED (BULK)"),
+    "Request Additional Information": (
+        REVIEW_DECISION_STATUS["Request Additional Information"], "ADDITIONAL INFO REQUESTED (BULK)"
+    ),
+}
 
 @require_role(["Reviewer", "Investigator", "Admin"])
 def show():
@@ -80,6 +100,7 @@ def show():
         all_review_cases = primary_review_cases + submitted_cases
         
         if all_review_cases:
+            show_bulk_status_actions(all_review_cases, current_user, BULK_REVIEW_ACTIONS, "primary_review")
             from standardized_page_format import show_standardized_case_list
             show_standardized_case_list(all_review_cases, "Primary Review", current_user, show_primary_review_case_details)
         else:
@@ -90,6 +111,7 @@ def show():
         under_review_cases = get_cases_by_status("Under Review")
         
         if under_review_cases:
+            show_bulk_status_actions(under_review_cases, current_user, BULK_REVIEW_ACTIONS, "under_review")
             from standardized_page_format import show_standardized_case_list
             show_standardized_case_list(under_review_cases, "Primary Review (In Progress)", current_user, show_primary_review_case_details)
         else:
@@ -111,19 +133,7 @@ def show_primary_review_case_details(case, current_user):
     from data_flow_manager import show_previous_stage_summary, get_previous_stage_data, save_stage_data
     from interaction_channels import create_interaction_request_form
     
-    # Safe value extraction
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
-    case_id = safe_get(case, 'case_id')
+    case_id = get_field(case, 'case_id')
     
     # Show case information
     create_case_information_section(case, show_flow_data=True)
@@ -208,14 +218,16 @@ def show_primary_review_case_details(case, current_user):
                     new_status = "Under Review"
                 
                 from models import update_case_status
-                update_case_status(case_id, new_status, current_user)
-                
-                # Add comment
-                from models import add_case_comment
-                add_case_comment(case_id, f"PRIMARY REVIEW COMPLETED: {review_outcome}. {review_comments[:100]}...", current_user)
-                
-                st.success(f"✅ Primary review completed! Case status updated to {new_status}")
-                st.rerun()
+                if update_case_status(case_id, new_status, current_user):
+                    # Add comment
+                    from models import add_case_comment
+                    add_case_comment(case_id, f"PRIMARY REVIEW COMPLETED: {review_outcome}. {review_comments[:100]}...", current_user)
+                    
+                    st.success(f"✅ Primary review completed! Case status updated to {new_status}")
+                    st.rerun()
+                else:
+                    from error_handler import handle_status_change_error
+                    handle_status_change_error(case_id, new_status)
             else:
                 st.error("Please select review outcome and provide comments")
         
@@ -266,19 +278,7 @@ def show_completed_review_summary(case, current_user):
 def show_comprehensive_case_review(case, current_user):
     """Display comprehensive case review with all information from case entry and allocation"""
     
-    # Safe value extraction
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
-    case_id = safe_get(case, 'case_id')
+    case_id = get_field(case, 'case_id')
     
     # Create comprehensive sections
     st.markdown("### 📋 Comprehensive Case Overview")
@@ -289,24 +289,24 @@ def show_comprehensive_case_review(case, current_user):
         
         with col1:
             st.markdown("**Case Identification**")
-            st.text(f"Case ID: {safe_get(case, 'case_id')}")
-            st.text(f"LAN: {safe_get(case, 'lan')}")
-            st.text(f"Case Type: {safe_get(case, 'case_type')}")
-            st.text(f"Product: {safe_get(case, 'product')}")
+            st.text(f"Case ID: {get_field(case, 'case_id')}")
+            st.text(f"LAN: {get_field(case, 'lan')}")
+            st.text(f"Case Type: {get_field(case, 'case_type')}")
+            st.text(f"Product: {get_field(case, 'product')}")
             
         with col2:
             st.markdown("**Status & Timeline**")
-            st.text(f"Status: {safe_get(case, 'status')}")
-            st.text(f"Case Date: {safe_get(case, 'case_date')}")
-            st.text(f"Created By: {safe_get(case, 'created_by')}")
-            st.text(f"Referred By: {safe_get(case, 'referred_by')}")
+            st.text(f"Status: {get_field(case, 'status')}")
+            st.text(f"Case Date: {get_field(case, 'case_date')}")
+            st.text(f"Created By: {get_field(case, 'created_by')}")
+            st.text(f"Referred By: {get_field(case, 'referred_by')}")
             
         with col3:
             st.markdown("**Geographic & Financial**")
-            st.text(f"Region: {safe_get(case, 'region')}")
-            st.text(f"Branch: {safe_get(case, 'branch_location')}")
-            st.text(f"Loan Amount: ₹{safe_get(case, 'loan_amount')}")
-            st.text(f"Disbursement Date: {safe_get(case, 'disbursement_date')}")
+            st.text(f"Region: {get_field(case, 'region')}")
+            st.text(f"Branch: {get_field(case, 'branch_location')}")
+            st.text(f"Loan Amount: ₹{get_field(case, 'loan_amount')}")
+            st.text(f"Disbursement Date: {get_field(case, 'disbursement_date')}")
     
     # Section 2: Customer Demographics
     with st.expander("👤 Customer Demographics", expanded=True):
@@ -314,21 +314,21 @@ def show_comprehensive_case_review(case, current_user):
         
         with col1:
             st.markdown("**Personal Information**")
-            st.text(f"Customer Name: {safe_get(case, 'customer_name')}")
-            st.text(f"Date of Birth: {safe_get(case, 'customer_dob')}")
-            st.text(f"PAN: {safe_get(case, 'customer_pan')}")
-            st.text(f"Customer Type: {safe_get(case, 'customer_type')}")
+            st.text(f"Customer Name: {get_field(case, 'customer_name')}")
+            st.text(f"Date of Birth: {get_field(case, 'customer_dob')}")
+            st.text(f"PAN: {get_field(case, 'customer_pan')}")
+            st.text(f"Customer Type: {get_field(case, 'customer_type')}")
             
         with col2:
             st.markdown("**Contact Information**")
-            st.text(f"Mobile: {safe_get(case, 'customer_mobile')}")
-            st.text(f"Email: {safe_get(case, 'customer_email')}")
-            st.text(f"KYC Status: {safe_get(case, 'kyc_status')}")
-            st.text(f"Risk Category: {safe_get(case, 'risk_category')}")
+            st.text(f"Mobile: {get_field(case, 'customer_mobile')}")
+            st.text(f"Email: {get_field(case, 'customer_email')}")
+            st.text(f"KYC Status: {get_field(case, 'kyc_status')}")
+            st.text(f"Risk Category: {get_field(case, 'risk_category')}")
     
     # Section 3: Case Description
     with st.expander("📝 Case Description", expanded=True):
-        description = safe_get(case, 'case_description')
+        description = get_field(case, 'case_description')
         st.text_area("Case Details", value=description, height=100, disabled=True)
     
     # Section 4: Case Actions & Assignments
@@ -353,19 +353,20 @@ def show_comprehensive_case_review(case, current_user):
         if case_actions:
             st.markdown("**Case Actions Taken:**")
             for action in case_actions:
-                st.text(f"• {safe_get(action, 'action_type')} by {safe_get(action, 'created_by')} on {safe_get(action, 'created_at')}")
-                if safe_get(action, 'action_details'):
-                    st.text(f"  Details: {safe_get(action, 'action_details')}")
+                st.text(f"• {get_field(action, 'action_type')} by {get_field(action, 'created_by')} on {get_field(action, 'created_at')}")
+                if get_field(action, 'action_details'):
+                    st.text(f"  Details: {get_field(action, 'action_details')}")
         
         if case_assignments:
             st.markdown("**Case Assignments:**")
             for assignment in case_assignments:
-                st.text(f"• {safe_get(assignment, 'assignment_type')} assigned to {safe_get(assignment, 'assigned_to')}")
-                st.text(f"  Details: {safe_get(assignment, 'assignment_details')}")
-                st.text(f"  Date: {safe_get(assignment, 'created_at')}")
+                st.text(f"• {get_field(assignment, 'assignment_type')} assigned to {get_field(assignment, 'assigned_to')}")
+                st.text(f"  Details: {get_field(assignment, 'assignment_details')}")
+                st.text(f"  Date: {get_field(assignment, 'created_at')}")
     
     # Section 5: Case History & Comments
     with st.expander("📋 Case History & Comments", expanded=True):
+        flush_audit_log()
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
@@ -385,13 +386,13 @@ def show_comprehensive_case_review(case, current_user):
         if comments:
             st.markdown("**Case Comments:**")
             for comment in comments:
-                st.text(f"• {safe_get(comment, 'created_by')} ({safe_get(comment, 'comment_type')}): {safe_get(comment, 'comment')}")
-                st.text(f"  Date: {safe_get(comment, 'created_at')}")
+                st.text(f"• {get_field(comment, 'created_by')} ({get_field(comment, 'comment_type')}): {get_field(comment, 'comment')}")
+                st.text(f"  Date: {get_field(comment, 'created_at')}")
         
         if audit_logs:
             st.markdown("**Audit Trail:**")
             for log in audit_logs[:5]:  # Show last 5 audit entries
-                st.text(f"• {safe_get(log, 'action')} by {safe_get(log, 'performed_by')} on {safe_get(log, 'performed_at')}")
+                st.text(f"• {get_field(log, 'action')} by {get_field(log, 'performed_by')} on {get_field(log, 'performed_at')}")
     
     # Section 6: Documents
     with st.expander("📎 Case Documents", expanded=True):
@@ -407,13 +408,13 @@ def show_comprehensive_case_review(case, current_user):
         if documents:
             st.markdown("**Uploaded Documents:**")
             for doc in documents:
-                st.text(f"• {safe_get(doc, 'original_filename')} ({safe_get(doc, 'upload_type')})")
-                st.text(f"  Uploaded by {safe_get(doc, 'uploaded_by')} on {safe_get(doc, 'uploaded_at')}")
+                st.text(f"• {get_field(doc, 'original_filename')} ({get_field(doc, 'upload_type')})")
+                st.text(f"  Uploaded by {get_field(doc, 'uploaded_by')} on {get_field(doc, 'uploaded_at')}")
         else:
             st.info("No documents uploaded for this case")
     
     # Section 7: Review Actions
-    if safe_get(case, 'status') in ['Submitted', 'Under Review', 'Under Investigation']:
+    if get_field(case, 'status') in ['Submitted', 'Under Review', 'Under Investigation']:
         with st.expander("✅ Review Actions", expanded=True):
             st.markdown("**Reviewer Decision**")
             
@@ -436,26 +437,31 @@ def show_comprehensive_case_review(case, current_user):
             if st.button(f"📤 Submit Review", key=f"submit_review_{case_id}"):
                 if review_decision != "Select Decision..." and reviewer_comments.strip():
                     # Process review decision
-                    new_status = "Approver 1" if review_decision == "Send to Approver 1" else review_decision
+                    new_status = REVIEW_DECISION_STATUS[review_decision]
                     
-                    with get_db_connection() as conn:
-                        cursor = conn.cursor()
-                        cursor.execute("""
-                            UPDATE cases 
-                            SET status = ?, reviewed_by = ?, reviewed_at = CURRENT_TIMESTAMP, updated_by = ?
-                            WHERE case_id = ?
-                        """, (new_status, current_user, current_user, case_id))
+                    try:
+                        with get_db_connection() as conn:
+                            cursor = conn.cursor()
+                            record_transition(conn, "cases", case_id, new_status, current_user,
+                                              f"REVIEWER DECISION: {review_decision}")
+                            cursor.execute("""
+                                UPDATE cases 
+                                SET status = ?, reviewed_by = ?, reviewed_at = CURRENT_TIMESTAMP, updated_by = ?
+                                WHERE case_id = ?
+                            """, (new_status, current_user, current_user, case_id))
                         
-                        # Add comment
-                        cursor.execute("""
-                            INSERT INTO case_comments (case_id, comment, comment_type, created_by, created_at)
-                            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                        """, (case_id, f"REVIEWER DECISION: {review_decision}\n{reviewer_comments}", "Review", current_user))
+                            # Add comment
+                            cursor.execute("""
+                                INSERT INTO case_comments (case_id, comment, comment_type, created_by, created_at)
+                                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                            """, (case_id, f"REVIEWER DECISION: {review_decision}\n{reviewer_comments}", "Review", current_user))
                         
-                        conn.commit()
-                    
-                    st.success(f"✅ Review submitted successfully! Case status updated to: {new_status}")
-                    st.rerun()
+                            conn.commit()
+                    except InvalidTransition as e:
+                        st.error(f"❌ {e}")
+                    else:
+                        st.success(f"✅ Review submitted successfully! Case status updated to: {new_status}")
+                        st.rerun()
                 else:
                     st.error("Please select a decision and add comments")
 
@@ -518,33 +518,6 @@ def save_stakeholder_action(action_data):
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Create stakeholder_actions table if not exists
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS stakeholder_actions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    case_id TEXT NOT NULL,
-                    task_title TEXT NOT NULL,
-                    task_type TEXT NOT NULL,
-                    stakeholder_type TEXT NOT NULL,
-                    assigned_to TEXT NOT NULL,
-                    priority TEXT NOT NULL,
-                    description TEXT NOT NULL,
-                    expected_outcome TEXT,
-                    due_date DATE NOT NULL,
-                    estimated_hours REAL,
-                    actual_hours REAL DEFAULT 0,
-                    dependency_on TEXT,
-                    special_instructions TEXT,
-                    resources_needed TEXT,
-                    status TEXT DEFAULT 'Pending',
-                    progress_percentage INTEGER DEFAULT 0,
-                    created_by TEXT NOT NULL,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    completed_at DATETIME NULL
-                )
-            """)
-            
             # Insert action
             cursor.execute("""
                 INSERT INTO stakeholder_actions (
@@ -1,48 +1,40 @@
 import streamlit as st
 import json
-import sqlite3
 from datetime import datetime
 import os
+from database import get_db_connection, get_write_connection
+from query_cache import cached_query
 from typing import Dict, List, Any
 
 
-def load_verification_config():
-    """Load verification configuration from database or create default"""
-    try:
-        conn = sqlite3.connect('case_management.db')
+@cached_query("verification_config", deep_copy=True)
+def _query_verification_config():
+    """Cached verification_config rows by type and name; raises, so failures are never cached"""
+    with get_db_connection() as conn:
         cursor = conn.cursor()
 
-        # Create verification_config table if not exists
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS verification_config (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                config_type TEXT NOT NULL,
-                config_name TEXT NOT NULL,
-                config_value TEXT NOT NULL,
-                created_date TEXT NOT NULL,
-                modified_date TEXT NOT NULL,
-                created_by TEXT NOT NULL,
-                UNIQUE(config_type, config_name)
-            )
-        ''')
-
         # Load existing configurations
         cursor.execute(
             'SELECT config_type, config_name, config_value FROM verification_config'
         )
         results = cursor.fetchall()
 
-        config = {}
-        for config_type, config_name, config_value in results:
-            if config_type not in config:
-                config[config_type] = {}
-            try:
-                config[config_type][config_name] = json.loads(config_value)
-            except:
-                config[config_type][config_name] = config_value
+    config = {}
+    for config_type, config_name, config_value in results:
+        if config_type not in config:
+            config[config_type] = {}
+        try:
+            config[config_type][config_name] = json.loads(config_value)
+        except:
+            config[config_type][config_name] = config_value
+
+    return config
+
 
-        conn.close()
-        return config
+def load_verification_config():
+    """Load verification configuration from database or create default"""
+    try:
+        return _query_verification_config()
     except Exception as e:
         st.error(f"Error loading configuration: {str(e)}")
         return get_default_config()
@@ -52,26 +44,23 @@ def save_verification_config(config_type: str, config_name: str,
                              config_value: Any, user_id: str):
     """Save verification configuration to database"""
     try:
-        conn = sqlite3.connect('case_management.db')
-        cursor = conn.cursor()
-
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         value_json = json.dumps(config_value) if isinstance(
             config_value, (dict, list)) else str(config_value)
 
-        cursor.execute(
-            '''
-            INSERT OR REPLACE INTO verification_config 
-            (config_type, config_name, config_value, created_date, modified_date, created_by)
-            VALUES (?, ?, ?, 
-                COALESCE((SELECT created_date FROM verification_config 
-                         WHERE config_type = ? AND config_name = ?), ?),
-                ?, ?)
-        ''', (config_type, config_name, value_json, config_type, config_name,
-              current_time, current_time, user_id))
-
-        conn.commit()
-        conn.close()
+        with get_write_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''
+                INSERT OR REPLACE INTO verification_config 
+                (config_type, config_name, config_value, created_date, modified_date, created_by)
+                VALUES (?, ?, ?, 
+                    COALESCE((SELECT created_date FROM verification_config 
+                             WHERE config_type = ? AND config_name = ?), ?),
+                    ?, ?)
+            ''', (config_type, config_name, value_json, config_type, config_name,
+                  current_time, current_time, user_id))
+
         return True
     except Exception as e:
         st.error(f"Error saving configuration: {str(e)}")
@@ -275,13 +264,11 @@ def show_field_configuration():
                                  use_container_width=True,
                                  type="secondary"):
                         try:
-                            conn = sqlite3.connect('case_management.db')
-                            cursor = conn.cursor()
-                            cursor.execute(
-                                'DELETE FROM verification_config WHERE config_type = ? AND config_name = ?',
-                                ("verification_fields", field_name))
-                            conn.commit()
-                            conn.close()
+                            with get_write_connection() as conn:
+                                cursor = conn.cursor()
+                                cursor.execute(
+                                    'DELETE FROM verification_config WHERE config_type = ? AND config_name = ?',
+                                    ("verification_fields", field_name))
                             st.success(f"Field '{field_name}' deleted!")
                             st.rerun()
                         except Exception as e:
@@ -430,13 +417,11 @@ def show_api_configuration():
                                  use_container_width=True,
                                  type="secondary"):
                         try:
-                            conn = sqlite3.connect('case_management.db')
-                            cursor = conn.cursor()
-                            cursor.execute(
-                                'DELETE FROM verification_config WHERE config_type = ? AND config_name = ?',
-                                ("api_endpoints", api_name))
-                            conn.commit()
-                            conn.close()
+                            with get_write_connection() as conn:
+                                cursor = conn.cursor()
+                                cursor.execute(
+                                    'DELETE FROM verification_config WHERE config_type = ? AND config_name = ?',
+                                    ("api_endpoints", api_name))
                             st.success(f"API endpoint '{api_name}' deleted!")
                             st.rerun()
                         except Exception as e:
@@ -665,13 +650,11 @@ def show_fraud_type_configuration():
                              use_container_width=True,
                              type="secondary"):
                     try:
-                        conn = sqlite3.connect('case_management.db')
-                        cursor = conn.cursor()
-                        cursor.execute(
-                            'DELETE FROM verification_config WHERE config_type = ? AND config_name = ?',
-                            ("fraud_types", fraud_type))
-                        conn.commit()
-                        conn.close()
+                        with get_write_connection() as conn:
+                            cursor = conn.cursor()
+                            cursor.execute(
+                                'DELETE FROM verification_config WHERE config_type = ? AND config_name = ?',
+                                ("fraud_types", fraud_type))
                         st.success(f"Fraud type '{fraud_type}' deleted!")
                         st.rerun()
                     except Exception as e:
@@ -810,15 +793,15 @@ def show():
     # Recent changes log
     st.subheader("📝 Recent Changes")
     try:
-        conn = sqlite3.connect('case_management.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT config_type, config_name, modified_date, created_by 
-            FROM verification_config 
-            ORDER BY modified_date DESC 
-            LIMIT 10
-        ''')
-        recent_changes = cursor.fetchall()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT config_type, config_name, modified_date, created_by 
+                FROM verification_config 
+                ORDER BY modified_date DESC 
+                LIMIT 10
+            ''')
+            recent_changes = cursor.fetchall()
 
         if recent_changes:
             for config_type, config_name, modified_date, created_by in recent_changes:
@@ -827,8 +810,6 @@ def show():
                 )
         else:
             st.write("No recent changes found.")
-
-        conn.close()
     except Exception as e:
         st.write("Unable to load recent changes.")
 
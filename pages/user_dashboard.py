@@ -6,8 +6,13 @@ from datetime import datetime, timedelta
 from auth import require_role, get_current_user
 from models import get_cases_by_status, get_case_comments
 from database import get_db_connection, log_audit
+from case_stats import get_rollup
+from query_cache import cached_query
 from utils import format_datetime
 
+# Auto refresh choice -> seconds between a widget's checks for changes
+AUTO_REFRESH_SECONDS = {"Off": None, "10 seconds": 10, "30 seconds": 30, "1 minute": 60, "5 minutes": 300}
+
 @require_role(["Admin", "Initiator", "Reviewer", "Approver", "Legal Reviewer", "Actioner", "Investigator"])
 def show():
     """Customizable User Dashboard with Case Summary Widgets"""
@@ -94,21 +99,26 @@ def show():
     with layout_col1:
         layout_style = st.selectbox("Layout Style", ["2 Columns", "3 Columns", "Single Column"])
     with layout_col2:
-        auto_refresh = st.selectbox("Auto Refresh", ["Off", "30 seconds", "1 minute", "5 minutes"])
+        auto_refresh = st.selectbox("Auto Refresh", list(AUTO_REFRESH_SECONDS), help="Widgets re-render on this timer, re-querying only when their data has changed")
+    
+    # Save user preferences when they change, not on every rerun
+    preferences = (tuple(selected_widgets), layout_style, auto_refresh)
+    if st.session_state.get("dashboard_preferences") != preferences:
+        save_user_preferences(username, selected_widgets, layout_style, auto_refresh)
+        st.session_state["dashboard_preferences"] = preferences
     
-    # Save user preferences
-    save_user_preferences(username, selected_widgets, layout_style, auto_refresh)
+    refresh_seconds = AUTO_REFRESH_SECONDS.get(auto_refresh)
     
     st.markdown("---")
     
     # Display selected widgets
     if selected_widgets:
         if layout_style == "Single Column":
-            display_widgets_single_column(selected_widgets, widget_options, username, user_role)
+            display_widgets_single_column(selected_widgets, widget_options, username, user_role, refresh_seconds)
         elif layout_style == "2 Columns":
-            display_widgets_two_columns(selected_widgets, widget_options, username, user_role)
+            display_widgets_two_columns(selected_widgets, widget_options, username, user_role, refresh_seconds)
         else:  # 3 Columns
-            display_widgets_three_columns(selected_widgets, widget_options, username, user_role)
+            display_widgets_three_columns(selected_widgets, widget_options, username, user_role, refresh_seconds)
     else:
         st.info("👆 Select widgets above to customize your dashboard")
 
@@ -125,14 +135,14 @@ def get_default_widgets(user_role):
     }
     return role_defaults.get(user_role, ["📈 Case Statistics", "🎯 My Cases Summary"])
 
-def display_widgets_single_column(selected_widgets, widget_options, username, user_role):
+def display_widgets_single_column(selected_widgets, widget_options, username, user_role, refresh_seconds=None):
     """Display widgets in single column layout"""
     for widget_name in selected_widgets:
         widget_key = widget_options[widget_name]
-        render_widget(widget_key, widget_name, username, user_role)
+        render_widget(widget_key, widget_name, username, user_role, refresh_seconds)
         st.markdown("---")
 
-def display_widgets_two_columns(selected_widgets, widget_options, username, user_role):
+def display_widgets_two_columns(selected_widgets, widget_options, username, user_role, refresh_seconds=None):
     """Display widgets in two column layout"""
     col1, col2 = st.columns(2)
     
@@ -141,12 +151,12 @@ def display_widgets_two_columns(selected_widgets, widget_options, username, user
         
         if i % 2 == 0:
             with col1:
-                render_widget(widget_key, widget_name, username, user_role)
+                render_widget(widget_key, widget_name, username, user_role, refresh_seconds)
         else:
             with col2:
-                render_widget(widget_key, widget_name, username, user_role)
+                render_widget(widget_key, widget_name, username, user_role, refresh_seconds)
 
-def display_widgets_three_columns(selected_widgets, widget_options, username, user_role):
+def display_widgets_three_columns(selected_widgets, widget_options, username, user_role, refresh_seconds=None):
     """Display widgets in three column layout"""
     col1, col2, col3 = st.columns(3)
     
@@ -155,18 +165,30 @@ def display_widgets_three_columns(selected_widgets, widget_options, username, us
         
         if i % 3 == 0:
             with col1:
-                render_widget(widget_key, widget_name, username, user_role)
+                render_widget(widget_key, widget_name, username, user_role, refresh_seconds)
         elif i % 3 == 1:
             with col2:
-                render_widget(widget_key, widget_name, username, user_role)
+                render_widget(widget_key, widget_name, username, user_role, refresh_seconds)
         else:
             with col3:
-                render_widget(widget_key, widget_name, username, user_role)
+                render_widget(widget_key, widget_name, username, user_role, refresh_seconds)
 
-def render_widget(widget_key, widget_name, username, user_role):
-    """Render individual widget based on type"""
+def render_widget(widget_key, widget_name, username, user_role, refresh_seconds=None):
+    """Render individual widget based on type
+    
+    With auto refresh on, the widget body runs as a fragment on its own timer.
+    Every widget reads through the query cache, so a run against unchanged
+    tables costs one version lookup instead of its queries.
+    """
     st.markdown(f"### {widget_name}")
     
+    if refresh_seconds:
+        st.fragment(render_widget_body, run_every=refresh_seconds)(widget_key, username, user_role)
+    else:
+        render_widget_body(widget_key, username, user_role)
+
+def render_widget_body(widget_key, username, user_role):
+    """Draw the contents of one widget"""
     if widget_key == "case_stats":
         render_case_statistics_widget(username, user_role)
     elif widget_key == "my_cases":
@@ -184,30 +206,99 @@ def render_widget(widget_key, widget_name, username, user_role):
     elif widget_key == "workflow_progress":
         render_workflow_progress_widget(username, user_role)
 
+@cached_query("cases")
+def load_status_counts():
+    """Case counts by status from the rollup"""
+    return dict(get_rollup("cases")["status"])
+
+@cached_query("cases")
+def load_my_cases(created_by):
+    """Latest five cases, limited to one creator unless created_by is None"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        query = "SELECT case_id, customer_name, status, case_type, loan_amount FROM cases"
+        params = ()
+        if created_by is not None:
+            query += " WHERE created_by = ?"
+            params = (created_by,)
+        cursor.execute(query + " ORDER BY created_at DESC LIMIT 5", params)
+        return [dict(row) for row in cursor.fetchall()]
+
+@cached_query("audit_logs")
+def load_recent_activity(performed_by):
+    """Latest five audit entries, limited to one user unless performed_by is None"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        query = "SELECT case_id, action, details, performed_by, performed_at FROM audit_logs"
+        params = ()
+        if performed_by is not None:
+            query += " WHERE performed_by = ?"
+            params = (performed_by,)
+        cursor.execute(query + " ORDER BY performed_at DESC LIMIT 5", params)
+        return [dict(row) for row in cursor.fetchall()]
+
+@cached_query("cases")
+def load_priority_cases():
+    """High-value or fraud cases waiting in review"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT case_id, customer_name, loan_amount, status FROM cases 
+            WHERE status IN ('Under Review', 'Final Review', 'Legal Review') 
+            AND (loan_amount > 500000 OR case_type LIKE '%Fraud%')
+            ORDER BY loan_amount DESC, created_at ASC
+            LIMIT 5
+        """)
+        return [dict(row) for row in cursor.fetchall()]
+
+@cached_query("cases")
+def load_timeline():
+    """Cases created per day over the last week"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT DATE(created_at) as date, COUNT(*) as count 
+            FROM cases 
+            WHERE created_at >= date('now', '-7 days')
+            GROUP BY DATE(created_at)
+            ORDER BY date DESC
+        """)
+        return [{'Date': row[0], 'Cases': row[1]} for row in cursor.fetchall()]
+
+@cached_query("cases")
+def load_performance(username):
+    """Volume and approval rate of the cases a user created or last updated"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT 
+                COUNT(*) as total_processed,
+                AVG(CASE WHEN status = 'Approved' THEN 1 ELSE 0 END) * 100 as approval_rate,
+                COUNT(CASE WHEN created_at >= date('now', '-30 days') THEN 1 END) as last_30_days
+            FROM cases
+            WHERE created_by = ? OR updated_by = ?
+        """, (username, username))
+        return dict(cursor.fetchone())
+
 def render_case_statistics_widget(username, user_role):
     """Render case statistics widget"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Get case counts by status
-            cursor.execute("SELECT status, COUNT(*) as count FROM cases GROUP BY status")
-            status_counts = dict(cursor.fetchall())
-            
-            # Get total cases
-            total_cases = sum(status_counts.values())
-            
-            # Display metrics
-            metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
-            
-            with metric_col1:
-                st.metric("Total Cases", total_cases)
-            with metric_col2:
-                st.metric("Active", status_counts.get("Submitted", 0) + status_counts.get("Under Review", 0))
-            with metric_col3:
-                st.metric("Approved", status_counts.get("Approved", 0))
-            with metric_col4:
-                st.metric("Closed", status_counts.get("Closed", 0))
+        status_counts = load_status_counts()
+        
+        # Get total cases
+        total_cases = sum(status_counts.values())
+        
+        # Display metrics
+        metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+        
+        with metric_col1:
+            st.metric("Total Cases", total_cases)
+        with metric_col2:
+            st.metric("Active", status_counts.get("Submitted", 0) + status_counts.get("Under Review", 0))
+        with metric_col3:
+            st.metric("Approved", status_counts.get("Approved", 0))
+        with metric_col4:
+            st.metric("Closed", status_counts.get("Closed", 0))
                 
     except Exception as e:
         st.error(f"Error loading case statistics: {str(e)}")
@@ -215,31 +306,20 @@ def render_case_statistics_widget(username, user_role):
 def render_my_cases_widget(username, user_role):
     """Render my cases summary widget"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Get user's cases
-            if user_role == "Admin":
-                cursor.execute("SELECT * FROM cases ORDER BY created_at DESC LIMIT 5")
-            else:
-                cursor.execute("SELECT * FROM cases WHERE created_by = ? ORDER BY created_at DESC LIMIT 5", (username,))
-            
-            cases = cursor.fetchall()
-            
-            if cases:
-                for case in cases:
-                    case_dict = dict(case)
+        cases = load_my_cases(None if user_role == "Admin" else username)
+        
+        if cases:
+            for case_dict in cases:
+                # Create case card
+                with st.container():
+                    st.markdown(f"""
+                    **{case_dict['case_id']}** - {case_dict['customer_name']}
                     
-                    # Create case card
-                    with st.container():
-                        st.markdown(f"""
-                        **{case_dict['case_id']}** - {case_dict['customer_name']}
-                        
-                        📊 Status: `{case_dict['status']}` | 🏢 {case_dict['case_type']} | 💰 ₹{case_dict.get('loan_amount', 0):,.0f}
-                        """)
-                        st.divider()
-            else:
-                st.info("No cases found")
+                    📊 Status: `{case_dict['status']}` | 🏢 {case_dict['case_type']} | 💰 ₹{case_dict.get('loan_amount') or 0:,.0f}
+                    """)
+                    st.divider()
+        else:
+            st.info("No cases found")
                 
     except Exception as e:
         st.error(f"Error loading my cases: {str(e)}")
@@ -247,24 +327,21 @@ def render_my_cases_widget(username, user_role):
 def render_status_distribution_widget(username, user_role):
     """Render status distribution chart widget"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT status, COUNT(*) as count FROM cases GROUP BY status")
-            data = cursor.fetchall()
+        status_counts = load_status_counts()
+        
+        if status_counts:
+            # Convert to list of dictionaries for DataFrame
+            data_list = [{'Status': status, 'Count': count} for status, count in status_counts.items()]
+            df = pd.DataFrame(data_list)
             
-            if data:
-                # Convert to list of dictionaries for DataFrame
-                data_list = [{'Status': row[0], 'Count': row[1]} for row in data]
-                df = pd.DataFrame(data_list)
-                
-                # Create pie chart
-                fig = px.pie(df, values='Count', names='Status', 
-                           title="Case Status Distribution",
-                           color_discrete_sequence=px.colors.qualitative.Set3)
-                fig.update_layout(height=300, showlegend=True)
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.info("No data available")
+            # Create pie chart
+            fig = px.pie(df, values='Count', names='Status', 
+                       title="Case Status Distribution",
+                       color_discrete_sequence=px.colors.qualitative.Set3)
+            fig.update_layout(height=300, showlegend=True)
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No data available")
                 
     except Exception as e:
         st.error(f"Error loading status chart: {str(e)}")
@@ -272,39 +349,18 @@ def render_status_distribution_widget(username, user_role):
 def render_recent_activity_widget(username, user_role):
     """Render recent activity widget"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Get recent audit logs
-            if user_role == "Admin":
-                cursor.execute("""
-                    SELECT case_id, action, details, performed_by, created_at 
-                    FROM audit_logs 
-                    ORDER BY created_at DESC 
-                    LIMIT 5
+        activities = load_recent_activity(None if user_role == "Admin" else username)
+        
+        if activities:
+            for activity_dict in activities:
+                st.markdown(f"""
+                **{activity_dict['action']}** - {activity_dict['case_id']}
+                
+                👤 {activity_dict['performed_by']} | ⏰ {format_datetime(activity_dict['performed_at'])}
                 """)
-            else:
-                cursor.execute("""
-                    SELECT case_id, action, details, performed_by, created_at 
-                    FROM audit_logs 
-                    WHERE performed_by = ?
-                    ORDER BY created_at DESC 
-                    LIMIT 5
-                """, (username,))
-            
-            activities = cursor.fetchall()
-            
-            if activities:
-                for activity in activities:
-                    activity_dict = dict(activity)
-                    st.markdown(f"""
-                    **{activity_dict['action']}** - {activity_dict['case_id']}
-                    
-                    👤 {activity_dict['performed_by']} | ⏰ {format_datetime(activity_dict['created_at'])}
-                    """)
-                    st.divider()
-            else:
-                st.info("No recent activity")
+                st.divider()
+        else:
+            st.info("No recent activity")
                 
     except Exception as e:
         st.error(f"Error loading recent activity: {str(e)}")
@@ -312,33 +368,22 @@ def render_recent_activity_widget(username, user_role):
 def render_priority_cases_widget(username, user_role):
     """Render priority cases widget"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Get high priority cases (high loan amounts or urgent status)
-            cursor.execute("""
-                SELECT * FROM cases 
-                WHERE status IN ('Under Review', 'Final Review', 'Legal Review') 
-                AND (loan_amount > 500000 OR case_type LIKE '%Fraud%')
-                ORDER BY loan_amount DESC, created_at ASC
-                LIMIT 5
-            """)
-            
-            priority_cases = cursor.fetchall()
-            
-            if priority_cases:
-                for case in priority_cases:
-                    case_dict = dict(case)
-                    priority_level = "🔴 HIGH" if case_dict.get('loan_amount', 0) > 1000000 else "🟡 MEDIUM"
-                    
-                    st.markdown(f"""
-                    {priority_level} **{case_dict['case_id']}**
-                    
-                    👤 {case_dict['customer_name']} | 💰 ₹{case_dict.get('loan_amount', 0):,.0f} | 📊 {case_dict['status']}
-                    """)
-                    st.divider()
-            else:
-                st.info("No priority cases")
+        # High priority cases (high loan amounts or urgent status)
+        priority_cases = load_priority_cases()
+        
+        if priority_cases:
+            for case_dict in priority_cases:
+                loan_amount = case_dict.get('loan_amount') or 0
+                priority_level = "🔴 HIGH" if loan_amount > 1000000 else "🟡 MEDIUM"
+                
+                st.markdown(f"""
+                {priority_level} **{case_dict['case_id']}**
+                
+                👤 {case_dict['customer_name']} | 💰 ₹{loan_amount:,.0f} | 📊 {case_dict['status']}
+                """)
+                st.divider()
+        else:
+            st.info("No priority cases")
                 
     except Exception as e:
         st.error(f"Error loading priority cases: {str(e)}")
@@ -346,33 +391,20 @@ def render_priority_cases_widget(username, user_role):
 def render_timeline_widget(username, user_role):
     """Render timeline widget"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Get cases created in last 7 days
-            cursor.execute("""
-                SELECT DATE(created_at) as date, COUNT(*) as count 
-                FROM cases 
-                WHERE created_at >= date('now', '-7 days')
-                GROUP BY DATE(created_at)
-                ORDER BY date DESC
-            """)
-            
-            timeline_data = cursor.fetchall()
+        # Cases created in last 7 days
+        timeline_data = load_timeline()
+        
+        if timeline_data:
+            df = pd.DataFrame(timeline_data)
             
-            if timeline_data:
-                # Convert to list of dictionaries for DataFrame
-                data_list = [{'Date': row[0], 'Cases': row[1]} for row in timeline_data]
-                df = pd.DataFrame(data_list)
-                
-                # Create line chart
-                fig = px.line(df, x='Date', y='Cases', 
-                            title="Cases Created (Last 7 Days)",
-                            markers=True)
-                fig.update_layout(height=250)
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.info("No timeline data")
+            # Create line chart
+            fig = px.line(df, x='Date', y='Cases', 
+                        title="Cases Created (Last 7 Days)",
+                        markers=True)
+            fig.update_layout(height=250)
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No timeline data")
                 
     except Exception as e:
         st.error(f"Error loading timeline: {str(e)}")
@@ -380,42 +412,27 @@ def render_timeline_widget(username, user_role):
 def render_performance_widget(username, user_role):
     """Render performance metrics widget"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Calculate performance metrics
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total_processed,
-                    AVG(CASE WHEN status = 'Approved' THEN 1 ELSE 0 END) * 100 as approval_rate,
-                    COUNT(CASE WHEN created_at >= date('now', '-30 days') THEN 1 END) as last_30_days
-                FROM cases
-                WHERE performed_by = ? OR created_by = ?
-            """, (username, username))
-            
-            metrics = cursor.fetchone()
+        metrics_dict = load_performance(username)
+        
+        if metrics_dict.get('total_processed'):
+            perf_col1, perf_col2 = st.columns(2)
+            with perf_col1:
+                st.metric("Cases Processed", metrics_dict.get('total_processed', 0))
+                st.metric("Last 30 Days", metrics_dict.get('last_30_days', 0))
             
-            if metrics:
-                metrics_dict = dict(metrics)
-                
-                perf_col1, perf_col2 = st.columns(2)
-                with perf_col1:
-                    st.metric("Cases Processed", metrics_dict.get('total_processed', 0))
-                    st.metric("Last 30 Days", metrics_dict.get('last_30_days', 0))
+            with perf_col2:
+                approval_rate = metrics_dict.get('approval_rate') or 0
+                st.metric("Approval Rate", f"{approval_rate:.1f}%")
                 
-                with perf_col2:
-                    approval_rate = metrics_dict.get('approval_rate', 0)
-                    st.metric("Approval Rate", f"{approval_rate:.1f}%")
-                    
-                    # Performance indicator
-                    if approval_rate > 80:
-                        st.success("🏆 Excellent Performance")
-                    elif approval_rate > 60:
-                        st.info("👍 Good Performance")
-                    else:
-                        st.warning("📈 Room for Improvement")
-            else:
-                st.info("No performance data")
+                # Performance indicator
+                if approval_rate > 80:
+                    st.success("🏆 Excellent Performance")
+                elif approval_rate > 60:
+                    st.info("👍 Good Performance")
+                else:
+                    st.warning("📈 Room for Improvement")
+        else:
+            st.info("No performance data")
                 
     except Exception as e:
         st.error(f"Error loading performance metrics: {str(e)}")
@@ -423,32 +440,26 @@ def render_performance_widget(username, user_role):
 def render_workflow_progress_widget(username, user_role):
     """Render workflow progress widget"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Get workflow stage counts
-            workflow_stages = [
-                "Draft", "Submitted", "Under Review", "Under Investigation", 
-                "Final Review", "Legal Review", "Approved", "Closed"
-            ]
-            
-            stage_counts = {}
-            for stage in workflow_stages:
-                cursor.execute("SELECT COUNT(*) FROM cases WHERE status = ?", (stage,))
-                count = cursor.fetchone()[0]
-                stage_counts[stage] = count
-            
-            # Create horizontal bar chart
-            stages = list(stage_counts.keys())
-            counts = list(stage_counts.values())
-            
-            fig = go.Figure(data=[go.Bar(y=stages, x=counts, orientation='h')])
-            fig.update_layout(
-                title="Workflow Stage Distribution",
-                height=300,
-                yaxis={'categoryorder': 'array', 'categoryarray': stages}
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        # Get workflow stage counts
+        workflow_stages = [
+            "Draft", "Submitted", "Under Review", "Under Investigation", 
+            "Final Review", "Legal Review", "Approved", "Closed"
+        ]
+        
+        status_counts = load_status_counts()
+        stage_counts = {stage: status_counts.get(stage, 0) for stage in workflow_stages}
+        
+        # Create horizontal bar chart
+        stages = list(stage_counts.keys())
+        counts = list(stage_counts.values())
+        
+        fig = go.Figure(data=[go.Bar(y=stages, x=counts, orientation='h')])
+        fig.update_layout(
+            title="Workflow Stage Distribution",
+            height=300,
+            yaxis={'categoryorder': 'array', 'categoryarray': stages}
+        )
+        st.plotly_chart(fig, use_container_width=True)
             
     except Exception as e:
         st.error(f"Error loading workflow progress: {str(e)}")
@@ -459,17 +470,6 @@ def save_user_preferences(username, widgets, layout, refresh):
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Create preferences table if not exists
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS user_preferences (
-                    username TEXT PRIMARY KEY,
-                    dashboard_widgets TEXT,
-                    layout_style TEXT,
-                    auto_refresh TEXT,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
             # Save preferences
             widgets_str = ",".join(widgets) if widgets else ""
             cursor.execute("""
@@ -3,6 +3,7 @@ import re
 from datetime import datetime
 from database import get_db_connection, get_password_hash
 from auth import get_current_user, require_role
+from query_cache import cached_query
 
 @require_role(["Admin"])
 def show():
@@ -296,6 +297,7 @@ def show_edit_user():
                 else:
                     st.error(f"❌ {message}")
 
+@cached_query("users")
 def get_all_users():
     """Get all users from database"""
     with get_db_connection() as conn:
@@ -6,6 +6,7 @@ from models import get_case_statistics, get_cases_by_status
 from utils import format_datetime
 from auth import get_current_user_role, require_role
 from pages.workflow_progress import show_workflow_progress, show_mini_progress
+from workflow_engine import get_queue_depths, get_stage_summary
 
 @require_role(["Admin", "Reviewer", "Approver", "Investigator", "Legal Reviewer", "Actioner"])
 def show():
@@ -59,12 +60,15 @@ def show():
     # Create pipeline metrics
     col1, col2, col3, col4, col5 = st.columns(5)
     
+    # Queue depths come from the workflow projection instead of recounting cases
+    queue = get_queue_depths("cases_simplified")
+    
     pipeline_stages = {
-        "Entry": len([c for c in all_cases if c['status'] == 'Draft']),
-        "Primary Review": len([c for c in all_cases if c['status'] in ['Submitted', 'Under Review']]),
-        "Investigation": len([c for c in all_cases if c['status'] == 'Under Investigation']),
-        "Final Review": len([c for c in all_cases if c['status'] == 'Final Review']),
-        "Completed": len([c for c in all_cases if c['status'] in ['Approved', 'Closed']])
+        "Entry": queue.get('Draft', 0),
+        "Primary Review": queue.get('Submitted', 0) + queue.get('Under Review', 0),
+        "Investigation": queue.get('Under Investigation', 0),
+        "Final Review": queue.get('Final Review', 0),
+        "Completed": queue.get('Approved', 0) + queue.get('Closed', 0)
     }
     
     with col1:
@@ -134,10 +138,7 @@ def show():
     
     with col1:
         # Status distribution pie chart
-        status_counts = {}
-        for case in all_cases:
-            status = case['status']
-            status_counts[status] = status_counts.get(status, 0) + 1
+        status_counts = {status: depth for status, depth in queue.items() if status in statuses}
         
         if status_counts:
             fig_pie = px.pie(
@@ -170,10 +171,10 @@ def show():
     st.subheader("🚦 Bottleneck Analysis")
     
     bottleneck_data = {
-        "Primary Review": len([c for c in all_cases if c['status'] in ['Submitted', 'Under Review']]),
-        "Investigation": len([c for c in all_cases if c['status'] == 'Under Investigation']),
-        "Final Review": len([c for c in all_cases if c['status'] == 'Final Review']),
-        "Legal Review": len([c for c in all_cases if c['status'] == 'Legal Review'])
+        "Primary Review": pipeline_stages["Primary Review"],
+        "Investigation": pipeline_stages["Investigation"],
+        "Final Review": pipeline_stages["Final Review"],
+        "Legal Review": queue.get('Legal Review', 0)
     }
     
     # Find bottleneck
@@ -198,6 +199,20 @@ def show():
         else:
             st.success("✅ No significant bottlenecks detected in the workflow")
     
+    # Time cases spend in each stage before moving on
+    stage_summary = get_stage_summary("cases_simplified")
+    if stage_summary:
+        st.markdown("**⏳ Time in Stage**")
+        st.dataframe(pd.DataFrame([
+            {
+                "Stage": stage["stage"],
+                "Waiting": stage["depth"],
+                "Moved On": stage["exits"],
+                "Avg Days in Stage": round(stage["avg_days"], 1) if stage["avg_days"] is not None else None
+            }
+            for stage in stage_summary
+        ]), use_container_width=True, hide_index=True)
+    
     # Interactive case search and progress view
     st.subheader("🔍 Case Progress Lookup")
     
@@ -1,16 +1,19 @@
 import streamlit as st
-from models import get_case_by_id
 from utils import format_datetime
+from workflow_engine import get_case_workflow
 
 def show_workflow_progress(case_id):
     """Display animated workflow progress tracker"""
     
-    # Get case details
-    case = get_case_by_id(case_id)
-    if not case:
+    # Read the case's workflow projection and transition history
+    workflow = get_case_workflow(case_id, "cases_simplified") or get_case_workflow(case_id, "cases")
+    if not workflow:
         return
     
-    current_status = case['status']
+    current_status = workflow['status']
+    
+    # When the case last entered each status
+    entered_at = {event['to_status']: event['created_at'] for event in workflow['events']}
     
     # Define workflow steps following proper sequence
     workflow_steps = [
@@ -313,18 +316,8 @@ def show_workflow_progress(case_id):
         
         # Get step date if available
         step_date = ""
-        if step_class == "completed" or step_class == "current":
-            if step["status"] == case["status"]:
-                # Handle both dict and sqlite3.Row objects
-                try:
-                    if hasattr(case, 'keys'):  # sqlite3.Row object
-                        updated_at = case["updated_at"] if "updated_at" in case.keys() else None
-                        created_at = case["created_at"] if "created_at" in case.keys() else None
-                        step_date = format_datetime(updated_at or created_at or "")
-                    else:  # dict object
-                        step_date = format_datetime(case.get("updated_at", case.get("created_at", "")))
-                except:
-                    step_date = ""
+        if (step_class == "completed" or step_class == "current") and step["status"] in entered_at:
+            step_date = format_datetime(entered_at[step["status"]])
         
         st.markdown(f"""
             <div class="step-container">
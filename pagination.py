@@ -0,0 +1,132 @@
+"""
+Keyset pagination for listing queries and the page controls that drive them
+"""
+from database import get_db_connection
+from case_records import DEFERRED_COLUMNS, listing_columns, records_from_cursor
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+# Counting stops here so the total stays cheap on very large tables
+COUNT_ESTIMATE_CAP = 1000
+
+def page_queries(table, filters=None, cursor=None, order_column="created_at"):
+    """Count and page SQL for fetch_page, with their parameters
+
+    Returns (count_sql, count_params, page_sql, page_params); both statements
+    end in a LIMIT placeholder whose value is left to the caller.
+    """
+    conditions = []
+    params = []
+    for column, value in (filters or {}).items():
+        if value is None or value == "":
+            continue
+        if isinstance(value, (list, tuple)):
+            conditions.append(f"{column} IN ({', '.join('?' * len(value))})")
+            params.extend(value)
+        else:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    count_query = f"SELECT COUNT(*) FROM (SELECT 1 FROM {table}{where} LIMIT ?)"
+
+    page_conditions = list(conditions)
+    page_params = list(params)
+    if cursor:
+        page_conditions.append(f"({order_column}, id) < (?, ?)")
+        page_params.extend(cursor)
+
+    # Case tables come back without their long text columns
+    columns = listing_columns(table) if table in DEFERRED_COLUMNS else "*"
+    query = f"SELECT {columns} FROM {table}"
+    if page_conditions:
+        query += " WHERE " + " AND ".join(page_conditions)
+    query += f" ORDER BY {order_column} DESC, id DESC LIMIT ?"
+
+    return count_query, params, query, page_params
+
+def fetch_page(table, filters=None, cursor=None, page_size=DEFAULT_PAGE_SIZE, order_column="created_at"):
+    """Fetch one page of rows, newest first, starting after cursor
+
+    Rows are ordered by (order_column, id) descending and the cursor is the
+    (order_column, id) pair of the last row on the previous page, so each page
+    is an index range read no matter how deep the listing goes. Filters are
+    column/value equality pairs applied in SQL; a list or tuple value matches
+    any of its items. Table, column and filter names must come from code,
+    never from user input.
+
+    Returns a dict with rows (CaseRecords for the case tables, dicts
+    otherwise), next_cursor (None on the last page), total and
+    total_is_estimate (True when the count hit the cap).
+    """
+    page_size = max(1, min(int(page_size or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+    count_query, params, query, page_params = page_queries(table, filters, cursor, order_column)
+
+    with get_db_connection() as conn:
+        cursor_db = conn.cursor()
+
+        cursor_db.execute(count_query, params + [COUNT_ESTIMATE_CAP + 1])
+        total = cursor_db.fetchone()[0]
+
+        # One extra row tells us whether another page follows
+        cursor_db.execute(query, page_params + [page_size + 1])
+        if table in DEFERRED_COLUMNS:
+            rows = records_from_cursor(cursor_db, table)
+        else:
+            columns = [description[0] for description in cursor_db.description]
+            rows = [dict(zip(columns, row)) for row in cursor_db.fetchall()]
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = (rows[-1][order_column], rows[-1]["id"])
+
+    return {
+        "rows": rows,
+        "next_cursor": next_cursor,
+        "total": min(total, COUNT_ESTIMATE_CAP),
+        "total_is_estimate": total > COUNT_ESTIMATE_CAP,
+    }
+
+def current_page_cursor(key, filters=None):
+    """Return the cursor for the page being viewed in a listing
+
+    The listing starts over from the first page whenever its filters change.
+    """
+    import streamlit as st
+
+    state_key = f"{key}_page_cursors"
+    filter_key = f"{key}_page_filters"
+    signature = repr(sorted((filters or {}).items()))
+
+    if state_key not in st.session_state or st.session_state.get(filter_key) != signature:
+        st.session_state[state_key] = [None]
+        st.session_state[filter_key] = signature
+
+    return st.session_state[state_key][-1]
+
+def show_page_controls(key, page):
+    """Render previous/next controls for a page returned by fetch_page"""
+    import streamlit as st
+
+    state_key = f"{key}_page_cursors"
+    cursors = st.session_state.setdefault(state_key, [None])
+    page_number = len(cursors)
+
+    total = f"{page['total']}+" if page["total_is_estimate"] else str(page["total"])
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+
+    with col1:
+        if st.button("⬅️ Previous", key=f"{key}_prev_page", disabled=page_number == 1):
+            cursors.pop()
+            st.rerun()
+
+    with col2:
+        st.caption(f"Page {page_number} · {total} records")
+
+    with col3:
+        if st.button("Next ➡️", key=f"{key}_next_page", disabled=page["next_cursor"] is None):
+            cursors.append(page["next_cursor"])
+            st.rerun()
@@ -0,0 +1,117 @@
+"""
+Process-wide cache for hot read queries, invalidated by table version
+Every cached table has a counter in table_versions that triggers bump on each
+insert, update and delete, whichever connection or process makes the write.
+A cached result remembers the counters of the tables it read and is served
+only while they are unchanged, so the one cheap version lookup replaces the
+query on every Streamlit rerun and a write invalidates exactly the results
+that depend on it.
+"""
+import copy
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+# Tables whose writes are versioned for the cache (triggers installed by migrations 0011 and 0016)
+VERSIONED_TABLES = ("cases", "cases_simplified", "users", "verification_config", "audit_logs")
+
+CACHE_MAX_ENTRIES = 512
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {}
+
+def table_versions(tables):
+    """Current version of each table, as a tuple in the order given"""
+    from database import get_db_connection
+    
+    placeholders = ", ".join("?" * len(tables))
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT table_name, version FROM table_versions WHERE table_name IN ({placeholders})",
+            tables
+        )
+        versions = dict(cursor.fetchall())
+    return tuple(versions.get(table, 0) for table in tables)
+
+def _counter(name):
+    return _stats.setdefault(name, {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0, "bypassed": 0})
+
+def cached_query(*tables, deep_copy=False):
+    """Cache a read function's result until one of its tables is written
+
+    Results are keyed by function and arguments. Callers get a copy of the
+    cached list or dict, so mutating it can't leak into other sessions; pass
+    deep_copy=True for nested structures callers may edit. Calls made inside
+    an open transaction bypass the cache.
+    """
+    for table in tables:
+        if table not in VERSIONED_TABLES:
+            raise ValueError(f"Table {table} is not versioned for the query cache")
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        copier = copy.deepcopy if deep_copy else copy.copy
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            from database import _get_open_transaction
+
+            # Inside an open transaction the versions and rows include uncommitted
+            # writes that may yet roll back, so neither serve nor store a result
+            if _get_open_transaction() is not None:
+                with _lock:
+                    _counter(name)["bypassed"] += 1
+                return func(*args, **kwargs)
+
+            key = (name, args, tuple(sorted(kwargs.items())))
+            # Versions are read before the query, so a write racing it only costs a later miss
+            versions = table_versions(tables)
+
+            with _lock:
+                counter = _counter(name)
+                entry = _cache.get(key)
+                if entry is not None and entry[0] == versions:
+                    _cache.move_to_end(key)
+                    counter["hits"] += 1
+                    return copier(entry[1])
+                counter["misses"] += 1
+                if entry is not None:
+                    counter["invalidations"] += 1
+
+            result = func(*args, **kwargs)
+
+            with _lock:
+                _cache[key] = (versions, result)
+                _cache.move_to_end(key)
+                while len(_cache) > CACHE_MAX_ENTRIES:
+                    evicted_key, _ = _cache.popitem(last=False)
+                    _counter(evicted_key[0])["evictions"] += 1
+            return copier(result)
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+def clear_query_cache():
+    """Drop every cached result (the hit/miss counters are kept)"""
+    with _lock:
+        _cache.clear()
+
+def cache_stats():
+    """Hit/miss counters per cached function plus overall totals"""
+    with _lock:
+        functions = {name: dict(counter) for name, counter in _stats.items()}
+        entries = len(_cache)
+
+    hits = sum(counter["hits"] for counter in functions.values())
+    misses = sum(counter["misses"] for counter in functions.values())
+    return {
+        "entries": entries,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if hits + misses else None,
+        "functions": functions,
+    }
@@ -0,0 +1,165 @@
+"""
+Query plan regression check for the data access modules
+Builds a scratch database from the migrations, runs EXPLAIN QUERY PLAN on every
+SQL statement in the checked modules and fails if any of them falls back to a
+full table scan. Run with: python query_plan_check.py
+"""
+import ast
+import os
+import re
+import sys
+import tempfile
+
+import database
+
+CHECKED_MODULES = ["database.py", "models.py", "interaction_channels.py", "data_flow_manager.py", "workflow_engine.py", "case_ids.py", "unit_of_work.py", "case_complexity_analyzer.py"]
+
+# Small lookup tables where a scan is cheaper than an index
+SCAN_ALLOWED_TABLES = {"users", "achievements", "user_achievements", "account_requests", "schema_version"}
+
+# Statements that scan by design, with the reason they are acceptable
+SCAN_ALLOWED_QUERIES = {
+    "SELECT c.*, NULL AS match_snippet, NULL AS match_rank FROM cases c WHERE 1 = 1":
+        "prefix of search_cases without a search term; the filtered forms come from dynamic_queries",
+}
+
+# Filters each fetch_page caller passes, as (table, filters, order_column)
+PAGED_LISTINGS = [
+    ("cases_simplified", {"status": "x"}, "created_at"),
+    ("cases_simplified", {"created_by": "x"}, "created_at"),
+    ("case_allocations", {"status": "x"}, "created_at"),
+    ("case_allocations", {"assigned_investigator": "x"}, "created_at"),
+    ("internal_fraud_cases", {"status": "x"}, "created_at"),
+    ("internal_fraud_cases", {"current_stage": "x"}, "created_at"),
+    ("internal_fraud_cases", {"status": ["x", "x"]}, "created_at"),
+    ("internal_fraud_cases", {"status": "x", "approver1_decision": "x"}, "created_at"),
+    ("internal_fraud_cases", {}, "created_at"),
+    ("audit_logs", {}, "performed_at"),
+    ("audit_logs", {"case_id": "x"}, "performed_at"),
+]
+
+def dynamic_queries():
+    """Statements assembled at runtime, built by the same functions the app calls"""
+    from case_records import listing_columns
+    from models import cases_by_status_query, search_query
+    from pagination import page_queries
+    from unit_of_work import CASE_TABLES, STATUS_ACTOR_FIELDS, status_update_sql
+    from workflow_engine import TRANSITION_EVENT_SQL
+    
+    queries = []
+    for status, created_by in [("x", None), (None, "x"), ("x", "x")]:
+        queries.append(("models.get_cases_by_status", cases_by_status_query(status, created_by)[0]))
+    
+    for fts_query, filters in [
+        (None, {"status": "x", "region": "x"}),
+        (None, {"date_from": "x", "date_to": "x"}),
+        ("x", {"status": "x"}),
+    ]:
+        queries.append(("models.search_cases", search_query(fts_query, filters)[0]))
+    
+    for table, filters, order_column in PAGED_LISTINGS:
+        count_sql, _, page_sql, _ = page_queries(table, filters, ("x", "x"), order_column)
+        queries.append(("pagination.fetch_page", count_sql))
+        queries.append(("pagination.fetch_page", page_sql))
+    
+    # One statement per shape: a plain status change plus each actor-stamping status
+    for table in CASE_TABLES:
+        for status in dict.fromkeys(["Open", *STATUS_ACTOR_FIELDS]):
+            sql = status_update_sql(table, status)[0]
+            if ("unit_of_work.status_update_sql", sql) not in queries:
+                queries.append(("unit_of_work.status_update_sql", sql))
+    
+    queries.append(("workflow_engine.record_transition", TRANSITION_EVENT_SQL))
+    queries.append((
+        "models_internal_fraud.get_internal_fraud_cases",
+        f"SELECT {listing_columns('internal_fraud_cases')} FROM internal_fraud_cases ORDER BY created_at DESC"
+    ))
+    return queries
+
+SQL_START = re.compile(r"^\s*(SELECT|UPDATE|DELETE|INSERT|WITH)\s")
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+def extract_queries(path):
+    """Yield (location, sql) for every SQL string literal in a module"""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    
+    module = os.path.splitext(os.path.basename(path))[0]
+    functions = [node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]
+    
+    # Fragments of f-strings are only checkable in their dynamic_queries form
+    skipped = {
+        id(part) for node in ast.walk(tree) if isinstance(node, ast.JoinedStr)
+        for part in node.values
+    }
+    # Docstrings can open with an SQL keyword too
+    skipped.update(
+        id(function.body[0].value) for function in functions
+        if isinstance(function.body[0], ast.Expr) and isinstance(function.body[0].value, ast.Constant)
+    )
+    for function in functions:
+        for node in ast.walk(function):
+            if id(node) in skipped:
+                continue
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and SQL_START.match(node.value):
+                yield f"{module}.{function.name}", node.value
+
+def normalize(sql):
+    """Collapse whitespace so queries compare independent of formatting"""
+    return " ".join(sql.split())
+
+def find_full_scans(conn, sql):
+    """Return the tables a statement reads with a full table scan"""
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", [None] * sql.count("?")).fetchall()
+    scans = []
+    for row in rows:
+        match = FULL_SCAN.match(row[3])
+        if match and match.group(1) not in SCAN_ALLOWED_TABLES:
+            scans.append(match.group(1))
+    return scans
+
+def run_checks():
+    """Check every query and return a list of failure messages"""
+    failures = []
+    queries = []
+    for path in CHECKED_MODULES:
+        queries.extend(extract_queries(path))
+    queries.extend(dynamic_queries())
+    
+    checked = 0
+    with database.get_db_connection() as conn:
+        for location, sql in queries:
+            sql = normalize(sql)
+            # Plain INSERT ... VALUES reads no table, so there is no plan to check
+            if (sql.startswith("INSERT") and " SELECT " not in sql) or sql in SCAN_ALLOWED_QUERIES:
+                continue
+            checked += 1
+            try:
+                scans = find_full_scans(conn, sql)
+            except Exception as e:
+                failures.append(f"{location}: could not plan query ({e}): {sql}")
+                continue
+            if scans:
+                failures.append(f"{location}: full scan of {', '.join(scans)}: {sql}")
+    return failures, checked
+
+def main():
+    from migrations import apply_migrations
+    
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        database.DATABASE_PATH = os.path.join(scratch_dir, "query_plan_check.db")
+        apply_migrations(force=True)
+        failures, total = run_checks()
+        database.close_all_connections()
+    
+    if failures:
+        print(f"{len(failures)} of {total} queries regressed to a table scan:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    
+    print(f"All {total} queries use an index")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
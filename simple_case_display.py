@@ -2,6 +2,7 @@
 Simple case display utilities without formatting
 """
 import streamlit as st
+from case_records import get_field
 
 def show_simple_case_list(cases, current_user, panel_type="default"):
     """
@@ -20,28 +21,13 @@ def show_simple_case_list(cases, current_user, panel_type="default"):
     st.write("")
     
     for i, case in enumerate(cases, 1):
-        # Safe value extraction (handle both dict and sqlite3.Row)
-        def safe_get(obj, key, default='N/A'):
-            try:
-                if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                    # This is a sqlite3.Row object
-                    return obj[key] if key in obj.keys() and obj[key] is not None else default
-                elif hasattr(obj, 'get'):
-                    # This is a dict
-                    return obj.get(key, default)
-                else:
-                    # This is an object with attributes
-                    return getattr(obj, key, default)
-            except (KeyError, AttributeError, TypeError):
-                return default
-        
-        case_id = safe_get(case, 'case_id')
-        customer_name = safe_get(case, 'customer_name')
-        case_type = safe_get(case, 'case_type')
-        product = safe_get(case, 'product')
-        region = safe_get(case, 'region')
-        loan_amount = safe_get(case, 'loan_amount') or 0
-        status = safe_get(case, 'status')
+        case_id = get_field(case, 'case_id')
+        customer_name = get_field(case, 'customer_name')
+        case_type = get_field(case, 'case_type')
+        product = get_field(case, 'product')
+        region = get_field(case, 'region')
+        loan_amount = get_field(case, 'loan_amount') or 0
+        status = get_field(case, 'status')
         
         # Convert loan amount to simple format
         try:
@@ -80,19 +66,8 @@ def show_simple_case_list(cases, current_user, panel_type="default"):
 
 def add_simple_closure_actions(case, current_user, case_index=0):
     """Add simple closure actions without formatting"""
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
-    case_id = safe_get(case, 'case_id')
-    status = safe_get(case, 'status')
+    case_id = get_field(case, 'case_id')
+    status = get_field(case, 'status')
     
     if status in ['Legal Review', 'Final Review']:
         st.write("   Actions available:")
@@ -121,11 +96,14 @@ def add_simple_closure_actions(case, current_user, case_index=0):
                     comment_text = f"CASE CLOSED - {closure_action}: {closure_comment}"
                     from models import update_case_status, add_case_comment
                     try:
-                        if add_case_comment(case_id, comment_text, current_user, "Closure Action"):
-                            if update_case_status(case_id, "Closed", current_user):
+                        if update_case_status(case_id, "Closed", current_user):
+                            if add_case_comment(case_id, comment_text, current_user, "Closure Action"):
                                 from error_handler import success_message
                                 success_message("Case Closed", f"Case closed with action: {closure_action}")
                                 st.rerun()
+                        else:
+                            from error_handler import handle_status_change_error
+                            handle_status_change_error(case_id, "Closed")
                     except Exception as e:
                         from error_handler import handle_database_error
                         handle_database_error("case closure", e)
@@ -139,11 +117,14 @@ def add_simple_closure_actions(case, current_user, case_index=0):
                     comment_text = f"ADDITIONAL INFO REQUESTED: {closure_comment}"
                     from models import add_case_comment, update_case_status
                     try:
-                        if add_case_comment(case_id, comment_text, current_user, "Info Request"):
-                            if update_case_status(case_id, "Under Review", current_user):
+                        if update_case_status(case_id, "Under Review", current_user):
+                            if add_case_comment(case_id, comment_text, current_user, "Info Request"):
                                 from error_handler import success_message
                                 success_message("Information Requested", "Additional information requested")
                                 st.rerun()
+                        else:
+                            from error_handler import handle_status_change_error
+                            handle_status_change_error(case_id, "Under Review")
                     except Exception as e:
                         from error_handler import handle_database_error
                         handle_database_error("information request", e)
@@ -155,19 +136,8 @@ def add_simple_closure_actions(case, current_user, case_index=0):
 
 def add_simple_reviewer_actions(case, current_user, case_index=0):
     """Add simple reviewer actions without formatting"""
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
-    case_id = safe_get(case, 'case_id')
-    status = safe_get(case, 'status')
+    case_id = get_field(case, 'case_id')
+    status = get_field(case, 'status')
     
     if status in ['Submitted', 'Under Review']:
         st.write("   Review Actions:")
@@ -193,6 +163,9 @@ def add_simple_reviewer_actions(case, current_user, case_index=0):
                             from error_handler import success_message
                             success_message("Case Approved", "Case approved and sent to Approver 1")
                             st.rerun()
+                        else:
+                            from error_handler import handle_status_change_error
+                            handle_status_change_error(case_id, "Approved")
                     except Exception as e:
                         from error_handler import handle_database_error
                         handle_database_error("case approval", e)
@@ -210,6 +183,9 @@ def add_simple_reviewer_actions(case, current_user, case_index=0):
                             from error_handler import success_message
                             success_message("Case Rejected", "Case rejected")
                             st.rerun()
+                        else:
+                            from error_handler import handle_status_change_error
+                            handle_status_change_error(case_id, "Rejected")
                     except Exception as e:
                         from error_handler import handle_database_error
                         handle_database_error("case rejection", e)
@@ -237,19 +213,8 @@ def add_simple_reviewer_actions(case, current_user, case_index=0):
 
 def add_simple_legal_actions(case, current_user, case_index=0):
     """Add simple legal actions without formatting"""
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
-    case_id = safe_get(case, 'case_id')
-    status = safe_get(case, 'status')
+    case_id = get_field(case, 'case_id')
+    status = get_field(case, 'status')
     
     if status == 'Legal Review':
         st.write("   Legal Actions:")
@@ -278,11 +243,14 @@ def add_simple_legal_actions(case, current_user, case_index=0):
                     comment_text = f"LEGAL REVIEW COMPLETED - {legal_action}: {legal_comment}"
                     from models import update_case_status, add_case_comment
                     try:
-                        if add_case_comment(case_id, comment_text, current_user, "Legal Review"):
-                            if update_case_status(case_id, "Legal Review Complete", current_user):
+                        if update_case_status(case_id, "Legal Review Complete", current_user):
+                            if add_case_comment(case_id, comment_text, current_user, "Legal Review"):
                                 from error_handler import success_message
                                 success_message("Legal Review Complete", f"Legal review completed with action: {legal_action}")
                                 st.rerun()
+                        else:
+                            from error_handler import handle_status_change_error
+                            handle_status_change_error(case_id, "Legal Review Complete")
                     except Exception as e:
                         from error_handler import handle_database_error
                         handle_database_error("legal review completion", e)
@@ -296,11 +264,14 @@ def add_simple_legal_actions(case, current_user, case_index=0):
                     comment_text = f"LEGAL INFO REQUESTED: {legal_comment}"
                     from models import add_case_comment, update_case_status
                     try:
-                        if add_case_comment(case_id, comment_text, current_user, "Legal Info Request"):
-                            if update_case_status(case_id, "Under Review", current_user):
+                        if update_case_status(case_id, "Under Review", current_user):
+                            if add_case_comment(case_id, comment_text, current_user, "Legal Info Request"):
                                 from error_handler import success_message
                                 success_message("Information Requested", "Additional information requested")
                                 st.rerun()
+                        else:
+                            from error_handler import handle_status_change_error
+                            handle_status_change_error(case_id, "Under Review")
                     except Exception as e:
                         from error_handler import handle_database_error
                         handle_database_error("legal information request", e)
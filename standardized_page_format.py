@@ -4,6 +4,7 @@ Provides consistent page structure across all workflow stages
 """
 import streamlit as st
 from standardized_case_styling import apply_standardized_case_styling, create_standard_case_display
+from case_records import get_field
 
 def create_standardized_page_header(page_title, subtitle=None):
     """Create standardized page header with Investigation Intelligence branding"""
@@ -60,22 +61,10 @@ def create_case_information_section(case_data, show_flow_data=True):
     
     st.markdown("### 📄 Case Information")
     
-    # Safe value extraction
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default)
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
-    case_id = safe_get(case_data, 'case_id')
-    customer_name = safe_get(case_data, 'customer_name')
-    case_type = safe_get(case_data, 'case_type')
-    loan_amount = safe_get(case_data, 'loan_amount', 0)
+    case_id = get_field(case_data, 'case_id')
+    customer_name = get_field(case_data, 'customer_name')
+    case_type = get_field(case_data, 'case_type')
+    loan_amount = get_field(case_data, 'loan_amount', 0)
     
     # Format amount
     try:
@@ -87,7 +76,7 @@ def create_case_information_section(case_data, show_flow_data=True):
     # Case ID section with standardized display
     st.markdown("#### Case ID")
     create_standard_case_display(case_id, customer_name, case_type, formatted_loan, 
-                               f"Product: {safe_get(case_data, 'product')} | Region: {safe_get(case_data, 'region')}")
+                               f"Product: {get_field(case_data, 'product')} | Region: {get_field(case_data, 'region')}")
     
     # Basic case details in two columns
     col1, col2 = st.columns(2)
@@ -96,12 +85,12 @@ def create_case_information_section(case_data, show_flow_data=True):
         st.markdown("#### Basic Details")
         st.markdown(f"""
         <div class='case-details-text'>
-            <strong>LAN:</strong> {safe_get(case_data, 'lan')}<br>
-            <strong>Product:</strong> {safe_get(case_data, 'product')}<br>
-            <strong>Region:</strong> {safe_get(case_data, 'region')}<br>
-            <strong>Branch:</strong> {safe_get(case_data, 'branch_location')}<br>
-            <strong>Referred By:</strong> {safe_get(case_data, 'referred_by')}<br>
-            <strong>Status:</strong> {safe_get(case_data, 'status')}
+            <strong>LAN:</strong> {get_field(case_data, 'lan')}<br>
+            <strong>Product:</strong> {get_field(case_data, 'product')}<br>
+            <strong>Region:</strong> {get_field(case_data, 'region')}<br>
+            <strong>Branch:</strong> {get_field(case_data, 'branch_location')}<br>
+            <strong>Referred By:</strong> {get_field(case_data, 'referred_by')}<br>
+            <strong>Status:</strong> {get_field(case_data, 'status')}
         </div>
         """, unsafe_allow_html=True)
     
@@ -110,11 +99,11 @@ def create_case_information_section(case_data, show_flow_data=True):
         st.markdown(f"""
         <div class='case-details-text'>
             <strong>Name:</strong> {customer_name}<br>
-            <strong>Mobile:</strong> {safe_get(case_data, 'customer_mobile')}<br>
-            <strong>Email:</strong> {safe_get(case_data, 'customer_email')}<br>
-            <strong>PAN:</strong> {safe_get(case_data, 'customer_pan')}<br>
-            <strong>Occupation:</strong> {safe_get(case_data, 'customer_occupation')}<br>
-            <strong>Income:</strong> ₹{safe_get(case_data, 'customer_income')}
+            <strong>Mobile:</strong> {get_field(case_data, 'customer_mobile')}<br>
+            <strong>Email:</strong> {get_field(case_data, 'customer_email')}<br>
+            <strong>PAN:</strong> {get_field(case_data, 'customer_pan')}<br>
+            <strong>Occupation:</strong> {get_field(case_data, 'customer_occupation')}<br>
+            <strong>Income:</strong> ₹{get_field(case_data, 'customer_income')}
         </div>
         """, unsafe_allow_html=True)
     
@@ -128,22 +117,10 @@ def create_case_information_section(case_data, show_flow_data=True):
 def create_standardized_case_section(case_data, section_title, additional_info=""):
     """Create a standardized case section with consistent formatting"""
     
-    # Safe value extraction
-    def safe_get(obj, key, default='N/A'):
-        try:
-            if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):
-                return obj[key] if key in obj.keys() and obj[key] is not None else default
-            elif hasattr(obj, 'get'):
-                return obj.get(key, default) 
-            else:
-                return getattr(obj, key, default)
-        except (KeyError, AttributeError, TypeError):
-            return default
-    
-    case_id = safe_get(case_data, 'case_id')
-    customer_name = safe_get(case_data, 'customer_name')
-    case_type = safe_get(case_data, 'case_type')
-    loan_amount = safe_get(case_data, 'loan_amount', 0)
+    case_id = get_field(case_data, 'case_id')
+    customer_name = get_field(case_data, 'customer_name')
+    case_type = get_field(case_data, 'case_type')
+    loan_amount = get_field(case_data, 'loan_amount', 0)
     
     # Format amount
     try:
@@ -0,0 +1,224 @@
+"""
+Unit of work for case state transitions
+Stages a case's status change, comments, stage payloads and audit entries and
+applies them together in one transaction on the writer connection, so a failed
+step never leaves a half-applied transition behind. bulk_set_status applies one
+transition to many cases the same way.
+"""
+import json
+from datetime import datetime, timezone
+from database import get_write_connection, AUDIT_INSERT_SQL
+from workflow_engine import record_transition, check_transition, InvalidTransition, TRANSITION_EVENT_SQL
+
+# Status -> (actor column, timestamp column) stamped on the cases table
+STATUS_ACTOR_FIELDS = {
+    "Under Review": ("reviewed_by", "reviewed_at"),
+    "Approved": ("approved_by", "approved_at"),
+    "Legal Review": ("legal_reviewed_by", "legal_reviewed_at"),
+    "Closed": ("closed_by", "closed_at"),
+}
+
+CASE_TABLES = ("cases", "cases_simplified", "internal_fraud_cases")
+
+# SQLite's default limit on host parameters is 999 in older builds
+BULK_LOOKUP_CHUNK = 500
+
+CASE_COMMENT_INSERT_SQL = "INSERT INTO case_comments (case_id, comment, comment_type, created_by) VALUES (?, ?, ?, ?)"
+
+STAGE_DATA_UPSERT_SQL = '''
+    INSERT INTO case_stage_data (case_id, stage, data, version, saved_by, saved_at)
+    VALUES (?, ?, ?, 1, ?, ?)
+    ON CONFLICT (case_id, stage) DO UPDATE SET
+        data = excluded.data, version = version + 1,
+        saved_by = excluded.saved_by, saved_at = excluded.saved_at
+'''
+
+def status_update_sql(table, new_status):
+    """UPDATE setting a case's status, and whether it also takes the actor
+    
+    Parameters are (status, [actor,] case_id); on cases the matching
+    reviewer/approver fields are stamped as well.
+    """
+    set_clauses = ["status = ?", "updated_at = CURRENT_TIMESTAMP"]
+    stamps_actor = table == "cases" and new_status in STATUS_ACTOR_FIELDS
+    if stamps_actor:
+        actor_field, timestamp_field = STATUS_ACTOR_FIELDS[new_status]
+        set_clauses.append(f"{actor_field} = ?")
+        set_clauses.append(f"{timestamp_field} = CURRENT_TIMESTAMP")
+    return f"UPDATE {table} SET {', '.join(set_clauses)} WHERE case_id = ?", stamps_actor
+
+class CaseUnitOfWork:
+    """Collects the writes for one case action and commits them atomically
+    
+    Use as a context manager: the staged work commits when the block exits
+    normally and is discarded if it raises.
+    
+        with CaseUnitOfWork(current_user) as uow:
+            uow.set_status(case_id, "Approved")
+            uow.add_comment(case_id, "Looks good", "Approval")
+    """
+    
+    def __init__(self, performed_by):
+        self.performed_by = performed_by
+        self._statements = []
+        self._audit_entries = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+        return False
+    
+    def update_case(self, case_id, fields, table="cases"):
+        """Stage a column update on a case row (updated_at is always bumped)"""
+        if table not in CASE_TABLES:
+            raise ValueError(f"Unknown case table: {table}")
+        
+        set_clauses = [f"{column} = ?" for column in fields if column != "case_id"]
+        params = [value for column, value in fields.items() if column != "case_id"]
+        set_clauses.append("updated_at = CURRENT_TIMESTAMP")
+        params.append(case_id)
+        
+        self._statements.append((
+            f"UPDATE {table} SET {', '.join(set_clauses)} WHERE case_id = ?",
+            params
+        ))
+    
+    def set_status(self, case_id, new_status, table="cases", comments=None):
+        """Stage a status change, stamping the matching reviewer/approver fields
+
+        The change is checked against the workflow graph and logged as a
+        workflow event when the unit commits; a disallowed transition raises
+        InvalidTransition and nothing is applied.
+        """
+        if table not in CASE_TABLES:
+            raise ValueError(f"Unknown case table: {table}")
+
+        self._statements.append((
+            lambda conn: record_transition(conn, table, case_id, new_status, self.performed_by, comments),
+            None
+        ))
+
+        sql, stamps_actor = status_update_sql(table, new_status)
+        params = [new_status, self.performed_by, case_id] if stamps_actor else [new_status, case_id]
+        self._statements.append((sql, params))
+    
+    def add_comment(self, case_id, comment, comment_type="General"):
+        """Stage a case comment and its audit entry"""
+        self._statements.append((
+            CASE_COMMENT_INSERT_SQL,
+            (case_id, comment, comment_type, self.performed_by)
+        ))
+        self.audit(case_id, "Comment Added", f"Comment type: {comment_type}")
+    
+    def save_stage_data(self, case_id, stage_name, stage_data):
+        """Stage a save of one stage's data for the next workflow stages
+        
+        Saving a stage again replaces its data and bumps its version.
+        """
+        self._statements.append((
+            STAGE_DATA_UPSERT_SQL,
+            (case_id, stage_name, json.dumps(stage_data, default=str), self.performed_by, datetime.now().isoformat())
+        ))
+        self.audit(case_id, f"{stage_name} Data Saved", f"Stage data saved by {self.performed_by}")
+    
+    def audit(self, case_id, action, details):
+        """Stage an audit log entry"""
+        performed_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        self._audit_entries.append((case_id, action, details, self.performed_by, performed_at))
+    
+    def commit(self):
+        """Apply all staged writes in a single transaction"""
+        if not self._statements and not self._audit_entries:
+            return
+        
+        with get_write_connection() as conn:
+            for sql, params in self._statements:
+                if callable(sql):
+                    # Staged checks run inside the transaction, just before the writes they guard
+                    sql(conn)
+                else:
+                    conn.execute(sql, params)
+            if self._audit_entries:
+                conn.executemany(AUDIT_INSERT_SQL, self._audit_entries)
+        
+        self.discard()
+    
+    def discard(self):
+        """Drop everything staged so far"""
+        self._statements = []
+        self._audit_entries = []
+
+def bulk_set_status(case_ids, new_status, performed_by, comment=None, table="cases_simplified"):
+    """Move many cases to new_status in one transaction
+    
+    Every case is checked against the workflow graph first. Cases that may
+    move get their workflow event, status update, optional comment and audit
+    entry written together with executemany; the rest are reported and left
+    untouched, so one bad case never blocks the batch. Returns one
+    {case_id, ok, moved, message} per distinct case, in the order given; a
+    case already in new_status is ok but not moved.
+    """
+    if table not in CASE_TABLES:
+        raise ValueError(f"Unknown case table: {table}")
+    
+    case_ids = list(dict.fromkeys(case_ids))
+    results = []
+    moving = []
+    
+    with get_write_connection() as conn:
+        current = {}
+        for start in range(0, len(case_ids), BULK_LOOKUP_CHUNK):
+            chunk = case_ids[start:start + BULK_LOOKUP_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            current.update(conn.execute(
+                f"SELECT case_id, status FROM case_workflow_state WHERE source = ? AND case_id IN ({placeholders})",
+                (table, *chunk)
+            ).fetchall())
+        
+        for case_id in case_ids:
+            if case_id not in current:
+                results.append({"case_id": case_id, "ok": False, "moved": False, "message": "Case not found"})
+                continue
+            from_status = current[case_id]
+            if from_status == new_status:
+                results.append({"case_id": case_id, "ok": True, "moved": False, "message": f"Already '{new_status}'"})
+                continue
+            try:
+                check_transition(from_status, new_status, table)
+            except InvalidTransition as e:
+                results.append({"case_id": case_id, "ok": False, "moved": False, "message": str(e)})
+                continue
+            moving.append(case_id)
+            results.append({"case_id": case_id, "ok": True, "moved": True, "message": f"Moved from '{from_status}' to '{new_status}'"})
+        
+        if moving:
+            sql, stamps_actor = status_update_sql(table, new_status)
+            performed_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            
+            conn.executemany(TRANSITION_EVENT_SQL, [
+                (new_status, performed_by, comment, table, case_id, new_status) for case_id in moving
+            ])
+            conn.executemany(sql, [
+                (new_status, performed_by, case_id) if stamps_actor else (new_status, case_id) for case_id in moving
+            ])
+            audit_entries = [
+                (case_id, "Status Update", f"Status changed to: {new_status} (bulk action)", performed_by, performed_at)
+                for case_id in moving
+            ]
+            if comment:
+                comment_type = f"Status Change to {new_status}"
+                conn.executemany(CASE_COMMENT_INSERT_SQL, [
+                    (case_id, comment, comment_type, performed_by) for case_id in moving
+                ])
+                audit_entries += [
+                    (case_id, "Comment Added", f"Comment type: {comment_type}", performed_by, performed_at)
+                    for case_id in moving
+                ]
+            conn.executemany(AUDIT_INSERT_SQL, audit_entries)
+    
+    return results
@@ -1,27 +1,15 @@
-import random
-import string
 import os
 import uuid
 from datetime import datetime
 
 def generate_case_id():
-    """Generate auto case ID in format: CASE20250728CE806A"""
-    # Get current date in YYYYMMDD format
-    date_str = datetime.now().strftime("%Y%m%d")
+    """Generate auto case ID in format: CASE20250728CE806A
     
-    # Generate 2 random uppercase letters
-    letters = ''.join(random.choices(string.ascii_uppercase, k=2))
-    
-    # Generate 3 random digits
-    digits = ''.join(random.choices(string.digits, k=3))
-    
-    # Generate 1 random uppercase letter
-    final_letter = random.choice(string.ascii_uppercase)
-    
-    # Combine to create case ID
-    case_id = f"CASE{date_str}{letters}{digits}{final_letter}"
-    
-    return case_id
+    IDs come from the per-day sequence in case_ids, so they are unique and
+    ascending without any lookup.
+    """
+    from case_ids import next_case_id
+    return next_case_id()
 
 def format_datetime(dt_string):
     """Format datetime string for display"""
@@ -252,27 +240,3 @@ def get_dropdown_options():
             "Investigation Completed"
         ]
     }
-
-def export_cases_to_csv(cases_data):
-    """Export cases data to CSV format"""
-    import pandas as pd
-    import io
-    
-    if not cases_data:
-        return None
-    
-    # Convert cases data to DataFrame
-    df = pd.DataFrame(cases_data)
-    
-    # Format datetime columns
-    if 'created_at' in df.columns:
-        df['created_at'] = pd.to_datetime(df['created_at']).dt.strftime('%Y-%m-%d %H:%M')
-    if 'updated_at' in df.columns:
-        df['updated_at'] = pd.to_datetime(df['updated_at']).dt.strftime('%Y-%m-%d %H:%M')
-    
-    # Create CSV buffer
-    csv_buffer = io.StringIO()
-    df.to_csv(csv_buffer, index=False)
-    
-    return csv_buffer.getvalue()
-
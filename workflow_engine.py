@@ -0,0 +1,423 @@
+"""
+Event-sourced case workflow
+Every status change is appended to case_events after being checked against
+the declared transition graph. Triggers on case_events (installed by migration
+0010) keep two projections current: case_workflow_state (each case's status,
+when it entered it and how many transitions it has made) and workflow_queue
+(cases waiting in each status plus the time cases spent there before moving
+on). Queue views and progress trackers read those instead of rescanning the
+case tables.
+
+Status writes that bypass record_transition are still caught by an update
+trigger on each case table and logged without validation, so the projections
+never drift from the tables.
+
+Verify the projections against the case tables with: python workflow_engine.py
+Rebuild them from the event log with: python workflow_engine.py --rebuild
+"""
+import sys
+
+from database import get_db_connection, get_write_connection, init_database
+
+# Stages shown by the progress trackers, in workflow order
+WORKFLOW_STAGES = [
+    "Case Registration",
+    "Case Allocation",
+    "Agency Investigation",
+    "Regional Investigation",
+    "Primary Review",
+    "Approver 1",
+    "Approver 2",
+    "Final Review",
+    "Legal Review",
+    "Closure"
+]
+
+CASE_STATUS_STAGE = {
+    "Draft": "Case Registration",
+    "Submitted": "Case Allocation",
+    "Registered": "Case Allocation",
+    "Allocated": "Case Allocation",
+    "Allocator Review": "Case Allocation",
+    "Under Investigation": "Case Allocation",
+    "Investigation": "Case Allocation",
+    "Escalated": "Case Allocation",
+    "Agency Investigation": "Agency Investigation",
+    "Agency Response Received": "Agency Investigation",
+    "Regional Investigation": "Regional Investigation",
+    "Missing Information - Regional": "Regional Investigation",
+    "Primary Review": "Primary Review",
+    "Under Review": "Primary Review",
+    "Approved": "Approver 1",
+    "Approver 1": "Approver 1",
+    "Approver 2": "Approver 2",
+    "Investigation Complete": "Final Review",
+    "Final Review": "Final Review",
+    "Legal Review": "Legal Review",
+    "Legal Review Complete": "Legal Review",
+    "Regulatory Reporting Complete": "Legal Review",
+    "Stakeholder Action": "Closure",
+    "Case Closure": "Closure",
+    "Fraud Confirmed": "Closure",
+    "Non-Fraud": "Closure",
+    "Rejected": "Closure",
+    "Closed": "Closure"
+}
+
+# Status -> statuses a case may move to from it
+_INVESTIGATION_NEXT = (
+    "Under Investigation", "Agency Investigation", "Regional Investigation", "Escalated",
+    "Investigation Complete", "Primary Review", "Under Review", "Final Review", "Closed"
+)
+_APPROVER_1_NEXT = ("Approver 2", "Final Review", "Legal Review", "Under Review", "Rejected", "Closed")
+
+CASE_TRANSITIONS = {
+    "Draft": ("Submitted", "Registered", "Closed"),
+    "Submitted": (
+        "Registered", "Allocated", "Under Investigation", "Agency Investigation", "Regional Investigation",
+        "Escalated", "Primary Review", "Under Review", "Approved", "Final Review", "Rejected", "Closed"
+    ),
+    "Registered": (
+        "Allocated", "Under Investigation", "Agency Investigation", "Regional Investigation",
+        "Primary Review", "Under Review", "Closed"
+    ),
+    "Allocated": (
+        "Under Investigation", "Agency Investigation", "Regional Investigation",
+        "Primary Review", "Under Review", "Closed"
+    ),
+    "Allocator Review": ("Allocated", "Under Investigation", "Agency Investigation", "Regional Investigation", "Closed"),
+    "Under Investigation": _INVESTIGATION_NEXT,
+    "Investigation": _INVESTIGATION_NEXT,
+    "Escalated": ("Under Investigation", "Under Review", "Final Review", "Closed"),
+    "Agency Investigation": (
+        "Allocator Review", "Agency Response Received", "Under Investigation", "Regional Investigation",
+        "Under Review", "Final Review", "Closed"
+    ),
+    "Agency Response Received": ("Allocator Review", "Under Investigation", "Under Review", "Final Review", "Closed"),
+    "Regional Investigation": (
+        "Missing Information - Regional", "Under Investigation", "Primary Review", "Under Review", "Final Review", "Closed"
+    ),
+    "Missing Information - Regional": ("Regional Investigation", "Under Investigation", "Primary Review"),
+    "Investigation Complete": ("Final Review", "Legal Review", "Case Closure", "Stakeholder Action", "Investigation", "Closed"),
+    "Primary Review": ("Under Review", "Approved", "Approver 2", "Under Investigation", "Rejected", "Closed"),
+    "Under Review": (
+        "Primary Review", "Approved", "Approver 2", "Under Investigation", "Final Review",
+        "Legal Review", "Legal Review Complete", "Rejected", "Closed"
+    ),
+    "Approved": _APPROVER_1_NEXT,
+    "Approver 1": _APPROVER_1_NEXT,
+    "Approver 2": ("Final Review", "Approved", "Under Review", "Rejected", "Closed"),
+    "Final Review": (
+        "Legal Review", "Case Closure", "Stakeholder Action", "Investigation", "Under Investigation",
+        "Under Review", "Approved", "Closed"
+    ),
+    "Legal Review": (
+        "Legal Review Complete", "Regulatory Reporting Complete", "Case Closure", "Approved", "Under Review", "Closed"
+    ),
+    "Legal Review Complete": ("Regulatory Reporting Complete", "Case Closure", "Under Review", "Closed"),
+    "Regulatory Reporting Complete": ("Legal Review Complete", "Case Closure", "Closed"),
+    "Stakeholder Action": ("Case Closure", "Final Review", "Closed"),
+    "Case Closure": ("Under Review", "Closed"),
+    "Fraud Confirmed": ("Legal Review", "Under Review", "Closed"),
+    "Non-Fraud": ("Case Closure", "Under Review", "Closed"),
+    "Rejected": ("Under Review", "Approved", "Closed"),
+    "Closed": ("Under Review",)
+}
+
+INTERNAL_FRAUD_STATUS_STAGE = {
+    "Initiated": "Case Initiation",
+    "Allocated": "Case Allocation",
+    "Under Investigation": "Investigation",
+    "Under Review": "Review & Assessment",
+    "Pending Approval": "Approver 1 Decision",
+    "Approved": "Approver 2 Decision",
+    "Rejected": "Closed",
+    "Code Assessment Complete": "Code of Conduct",
+    "Closure in Progress": "Code of Conduct",
+    "Closed": "Closed"
+}
+
+INTERNAL_FRAUD_TRANSITIONS = {
+    "Initiated": ("Allocated", "Closed"),
+    "Allocated": ("Under Investigation", "Closed"),
+    "Under Investigation": ("Under Review", "Closed"),
+    "Under Review": ("Pending Approval", "Under Investigation", "Rejected"),
+    "Pending Approval": ("Approved", "Rejected", "Under Review"),
+    "Approved": ("Code Assessment Complete", "Closure in Progress", "Closed"),
+    "Code Assessment Complete": ("Closure in Progress", "Closed"),
+    "Closure in Progress": ("Closed",),
+    "Rejected": ("Under Review", "Closed"),
+    "Closed": ()
+}
+
+# Case table -> (transition graph, status -> stage)
+WORKFLOWS = {
+    "cases": (CASE_TRANSITIONS, CASE_STATUS_STAGE),
+    "cases_simplified": (CASE_TRANSITIONS, CASE_STATUS_STAGE),
+    "internal_fraud_cases": (INTERNAL_FRAUD_TRANSITIONS, INTERNAL_FRAUD_STATUS_STAGE),
+}
+
+# Appends a transition from the case's projected status; a no-op when the
+# status is unchanged or the case has no workflow state (it does not exist)
+TRANSITION_EVENT_SQL = '''
+    INSERT INTO case_events (source, case_id, from_status, to_status, actor, comments, created_at, seconds_in_previous)
+    SELECT source, case_id, status, ?, ?, ?, CURRENT_TIMESTAMP,
+           strftime('%s', 'now') - strftime('%s', entered_at)
+    FROM case_workflow_state
+    WHERE source = ? AND case_id = ? AND status IS NOT ?
+'''
+
+class InvalidTransition(ValueError):
+    """A status change the workflow graph does not allow"""
+
+def stage_for_status(status, source="cases"):
+    """Workflow stage a status belongs to (the status itself when undeclared)"""
+    return WORKFLOWS[source][1].get(status, status)
+
+def allowed_transitions(status, source="cases"):
+    """Statuses a case in the given status may move to"""
+    transitions = WORKFLOWS[source][0]
+    if status in transitions:
+        return tuple(transitions[status])
+    # Legacy statuses outside the graph may move to any declared status
+    return tuple(transitions)
+
+def check_transition(from_status, to_status, source="cases"):
+    """Raise InvalidTransition unless from_status -> to_status is allowed"""
+    if source not in WORKFLOWS:
+        raise ValueError(f"Unknown case table: {source}")
+    if from_status == to_status:
+        return
+    if to_status not in WORKFLOWS[source][0]:
+        raise InvalidTransition(f"'{to_status}' is not a workflow status")
+    if to_status not in allowed_transitions(from_status, source):
+        raise InvalidTransition(f"A case cannot move from '{from_status}' to '{to_status}'")
+
+def record_transition(conn, source, case_id, new_status, actor, comments=None):
+    """Validate a status change and append its event on the caller's connection
+
+    Call it in the same transaction as the UPDATE that sets the status, before
+    that UPDATE runs. The current status is read from the projection inside the
+    transaction, so concurrent writers can't validate against a stale status.
+    Returns False when the case has no workflow state.
+    """
+    row = conn.execute(
+        "SELECT status FROM case_workflow_state WHERE source = ? AND case_id = ?",
+        (source, case_id)
+    ).fetchone()
+    if row is None:
+        return False
+
+    check_transition(row[0], new_status, source)
+    conn.execute(TRANSITION_EVENT_SQL, (new_status, actor, comments, source, case_id, new_status))
+    return True
+
+def seed_case_events(cursor):
+    """Append an opening event for every case that has no workflow state yet"""
+    for source in WORKFLOWS:
+        cursor.execute(f'''
+            INSERT INTO case_events (source, case_id, from_status, to_status, actor, comments, created_at)
+            SELECT '{source}', c.case_id, NULL, c.status, c.created_by, 'Imported current status',
+                   COALESCE(c.updated_at, c.created_at, CURRENT_TIMESTAMP)
+            FROM {source} c
+            WHERE c.case_id IS NOT NULL AND NOT EXISTS (
+                SELECT 1 FROM case_workflow_state s WHERE s.source = '{source}' AND s.case_id = c.case_id
+            )
+            ORDER BY c.id
+        ''')
+
+def rebuild_workflow_projections(cursor=None):
+    """Replay case_events into fresh projections, then reconcile with the case tables"""
+    if cursor is not None:
+        _rebuild(cursor)
+        return
+    with get_write_connection() as conn:
+        _rebuild(conn.cursor())
+
+def _rebuild(cursor):
+    """Rebuild inside the caller's transaction"""
+    cursor.execute("DELETE FROM case_workflow_state")
+    cursor.execute("DELETE FROM workflow_queue")
+
+    for source in WORKFLOWS:
+        # Latest event of every case still in the table
+        cursor.execute(f'''
+            INSERT INTO case_workflow_state (source, case_id, status, entered_at, last_event_id, transitions)
+            SELECT e.source, e.case_id, e.to_status, e.created_at, e.id,
+                   (SELECT COUNT(*) - 1 FROM case_events x WHERE x.source = e.source AND x.case_id = e.case_id)
+            FROM case_events e
+            JOIN {source} c ON c.case_id = e.case_id
+            WHERE e.source = '{source}' AND e.id = (
+                SELECT MAX(id) FROM case_events m WHERE m.source = e.source AND m.case_id = e.case_id
+            )
+        ''')
+
+    cursor.execute('''
+        INSERT INTO workflow_queue (source, status, depth)
+        SELECT source, COALESCE(status, ''), COUNT(*) FROM case_workflow_state GROUP BY 1, 2
+    ''')
+    cursor.execute('''
+        INSERT INTO workflow_queue (source, status, depth, exits, seconds_in_status)
+        SELECT source, from_status, 0, COUNT(*), COALESCE(SUM(seconds_in_previous), 0)
+        FROM case_events WHERE from_status IS NOT NULL GROUP BY 1, 2
+        ON CONFLICT (source, status) DO UPDATE SET
+            exits = excluded.exits, seconds_in_status = excluded.seconds_in_status
+    ''')
+
+    # Statuses written while the triggers were missing become catch-up events
+    for source in WORKFLOWS:
+        cursor.execute(f'''
+            INSERT INTO case_events (source, case_id, from_status, to_status, actor, comments, created_at, seconds_in_previous)
+            SELECT s.source, s.case_id, s.status, c.status, NULL, 'Reconciled with case table', CURRENT_TIMESTAMP,
+                   strftime('%s', 'now') - strftime('%s', s.entered_at)
+            FROM case_workflow_state s
+            JOIN {source} c ON c.case_id = s.case_id
+            WHERE s.source = '{source}' AND s.status IS NOT c.status
+        ''')
+    seed_case_events(cursor)
+
+def verify_workflow_projections():
+    """Compare the projections with the case tables; returns a list of mismatches"""
+    mismatches = []
+
+    with get_db_connection() as conn:
+        # One snapshot for every read so concurrent transitions can't skew them
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        cursor = conn.cursor()
+
+        for source in WORKFLOWS:
+            cursor.execute(f'''
+                SELECT c.case_id, c.status, s.status
+                FROM {source} c
+                LEFT JOIN case_workflow_state s ON s.source = '{source}' AND s.case_id = c.case_id
+                WHERE c.case_id IS NOT NULL AND (s.case_id IS NULL OR s.status IS NOT c.status)
+            ''')
+            for case_id, table_status, projected in cursor.fetchall():
+                mismatches.append(f"{source} {case_id}: table status {table_status!r}, projected {projected!r}")
+
+            cursor.execute(f"SELECT COALESCE(status, ''), COUNT(*) FROM {source} GROUP BY 1")
+            expected = dict(cursor.fetchall())
+            cursor.execute(
+                "SELECT status, depth FROM workflow_queue WHERE source = ? AND depth != 0", (source,)
+            )
+            stored = dict(cursor.fetchall())
+            for status in sorted(set(expected) | set(stored)):
+                if expected.get(status, 0) != stored.get(status, 0):
+                    mismatches.append(
+                        f"{source} queue {status!r}: depth {stored.get(status, 0)}, recount {expected.get(status, 0)}"
+                    )
+
+    return mismatches
+
+def get_queue_depths(source="cases"):
+    """Cases currently waiting in each status, as {status: count}"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT status, depth FROM workflow_queue WHERE source = ? AND depth > 0",
+            (source,)
+        )
+        return {status if status != "" else None: depth for status, depth in cursor.fetchall()}
+
+def get_stage_summary(source="cases"):
+    """Per-stage queue depth and average days spent, in workflow order
+
+    Returns a list of dicts with stage, depth, exits and avg_days (None until a
+    case has left the stage).
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT status, depth, exits, seconds_in_status FROM workflow_queue WHERE source = ?",
+            (source,)
+        )
+        rows = cursor.fetchall()
+
+    stages = {}
+    for status, depth, exits, seconds in rows:
+        stage = stages.setdefault(
+            stage_for_status(status, source),
+            {"depth": 0, "exits": 0, "seconds": 0}
+        )
+        stage["depth"] += depth
+        stage["exits"] += exits
+        stage["seconds"] += seconds
+
+    order = {stage: position for position, stage in enumerate(dict.fromkeys(WORKFLOWS[source][1].values()))}
+    summary = []
+    for stage, totals in sorted(stages.items(), key=lambda item: order.get(item[0], len(order))):
+        summary.append({
+            "stage": stage,
+            "depth": totals["depth"],
+            "exits": totals["exits"],
+            "avg_days": totals["seconds"] / totals["exits"] / 86400 if totals["exits"] else None,
+        })
+    return summary
+
+def get_queue_cases(status, source="cases", limit=50):
+    """Case ids waiting in a status, longest waiting first, with their entry time"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT case_id, entered_at FROM case_workflow_state
+            WHERE source = ? AND status = ?
+            ORDER BY entered_at
+            LIMIT ?
+        ''', (source, status, limit))
+        return [{"case_id": case_id, "entered_at": entered_at} for case_id, entered_at in cursor.fetchall()]
+
+def get_case_workflow(case_id, source="cases"):
+    """A case's projected workflow state and its event history, oldest first
+
+    Returns None when the case has no workflow state.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT status, entered_at, transitions,
+                   strftime('%s', 'now') - strftime('%s', entered_at) AS seconds_in_status
+            FROM case_workflow_state WHERE source = ? AND case_id = ?
+        ''', (source, case_id))
+        state = cursor.fetchone()
+        if state is None:
+            return None
+
+        cursor.execute('''
+            SELECT from_status, to_status, actor, comments, created_at, seconds_in_previous
+            FROM case_events WHERE source = ? AND case_id = ?
+            ORDER BY id
+        ''', (source, case_id))
+        events = [
+            dict(zip(("from_status", "to_status", "actor", "comments", "created_at", "seconds_in_previous"), row))
+            for row in cursor.fetchall()
+        ]
+
+    return {
+        "status": state[0],
+        "stage": stage_for_status(state[0], source),
+        "entered_at": state[1],
+        "transitions": state[2],
+        "seconds_in_status": state[3],
+        "events": events,
+    }
+
+def main(argv):
+    init_database()
+
+    if "--rebuild" in argv:
+        rebuild_workflow_projections()
+        print("Rebuilt the workflow projections from case_events")
+
+    mismatches = verify_workflow_projections()
+    if mismatches:
+        print(f"{len(mismatches)} workflow projections disagree with the case tables:")
+        for mismatch in mismatches:
+            print(f"  - {mismatch}")
+        return 1
+
+    print("Workflow projections match the case tables")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))